@@ -0,0 +1,149 @@
+"""
+In-process queue of background jobs.
+
+Jobs run in the process that enqueued them. When the interpreter exits normally (i.e. a worker process is recycled),
+pending jobs are run right away, ignoring their delays, for up to `EXIT_FLUSH_TIMEOUT` seconds; jobs are still lost if
+the process is killed, so only use it for work that is safe to lose or redo. Build jobs from plain data -
+request-bound objects (XBlocks, runtime) must not be used by jobs.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+
+class BackgroundJobQueue(object):
+    """
+    Queue of jobs processed in background by a single daemon worker thread.
+
+    A job enqueued while another job with the same key is still pending replaces it, so repeated triggers result in
+    a single run. Jobs can be delayed to debounce them: each replacement postpones the job by the delay again, so a
+    burst of triggers results in a single run after the burst ends. To keep a steady stream of triggers from
+    postponing a job forever, it is not postponed past `MAX_DELAYS` delays after the first trigger.
+
+    Replaced jobs are counted as coalesced; counters are available via :meth:`get_stats` and logged whenever the
+    queue becomes idle.
+    """
+    WORKER_THREAD_NAME = "group-project-background-jobs"
+    MAX_DELAYS = 5
+    EXIT_FLUSH_TIMEOUT = 10
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = OrderedDict()
+        self._running = 0
+        self._worker = None
+        self._flush_at_exit_registered = False
+        self._stats = {'enqueued': 0, 'coalesced': 0, 'processed': 0, 'failed': 0}
+
+    def enqueue(self, key, job, delay=0):
+        """
+        :param tuple key: Job key - pending jobs with equal keys are coalesced
+        :param callable job: Callable performing the job
+        :param float delay: Number of seconds to wait before running the job
+        """
+        now = time.time()
+        with self._condition:
+            self._stats['enqueued'] += 1
+            first_enqueued_at = now
+            if key in self._pending:
+                self._stats['coalesced'] += 1
+                log.debug("Replacing pending background job %s", key)
+                _, first_enqueued_at, _ = self._pending.pop(key)
+            due_time = min(now + delay, first_enqueued_at + delay * self.MAX_DELAYS)
+            self._pending[key] = (due_time, first_enqueued_at, job)
+            self._ensure_worker()
+            self._condition.notify_all()
+
+    def get_stats(self):
+        """
+        :rtype: dict[str, int]
+        :returns: Numbers of enqueued, coalesced (replaced while pending), processed and failed jobs
+        """
+        with self._condition:
+            return dict(self._stats)
+
+    def join(self, timeout=None):
+        """
+        Waits until all pending jobs are processed
+        :param float|None timeout: Maximum time to wait, in seconds
+        :rtype: bool
+        :returns: True if queue is idle, False if timed out
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            while self._pending or self._running:
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def flush(self, timeout=None):
+        """
+        Runs pending jobs right away, without waiting for their delays, and waits until they are processed
+        :param float|None timeout: Maximum time to wait, in seconds
+        :rtype: bool
+        :returns: True if queue is idle, False if timed out
+        """
+        with self._condition:
+            for key, (_, first_enqueued_at, job) in self._pending.items():
+                self._pending[key] = (0, first_enqueued_at, job)
+            if self._pending:
+                self._ensure_worker()
+                self._condition.notify_all()
+        return self.join(timeout)
+
+    def _flush_at_exit(self):
+        if not self.flush(self.EXIT_FLUSH_TIMEOUT):
+            with self._condition:
+                log.warning(
+                    "%s queue exits with %s pending and %s running jobs",
+                    self.WORKER_THREAD_NAME, len(self._pending), self._running
+                )
+
+    def _ensure_worker(self):
+        # daemon worker is stopped abruptly when interpreter exits, so pending jobs are flushed before that
+        if not self._flush_at_exit_registered:
+            atexit.register(self._flush_at_exit)
+            self._flush_at_exit_registered = True
+        # worker thread does not survive fork, so it is (re)started lazily
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, name=self.WORKER_THREAD_NAME)
+            self._worker.daemon = True
+            self._worker.start()
+
+    def _take_job(self):
+        with self._condition:
+            while True:
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+                key, (due_time, _, job) = min(self._pending.iteritems(), key=lambda item: item[1][0])
+                wait_time = due_time - time.time()
+                if wait_time > 0:
+                    self._condition.wait(wait_time)
+                    continue
+                del self._pending[key]
+                self._running += 1
+                return key, job
+
+    def _work(self):
+        while True:
+            key, job = self._take_job()
+            try:
+                job()
+                outcome = 'processed'
+            except Exception:  # pylint: disable=broad-except
+                outcome = 'failed'
+                log.exception("Background job %s failed", key)
+            with self._condition:
+                self._stats[outcome] += 1
+                self._running -= 1
+                if not (self._pending or self._running):
+                    log.info("%s queue is idle, job stats: %s", self.WORKER_THREAD_NAME, self._stats)
+                self._condition.notify_all()
+
@@ -0,0 +1,50 @@
+"""
+Content-addressed storage of submitted files.
+
+Each distinct file is stored once in `default_storage`, at a path derived from SHA1 hash of its content and its name,
+so identical files uploaded by different workgroups (i.e. filled-in templates) share the stored file. Original file
+name is the last part of the path, so downloaded files keep it and storages that serve files directly detect content
+type correctly.
+
+Workgroup uploads refer to blobs by URL, recorded by submissions API along with the rest of the submission. These
+records are the durable index of stored blobs: blobs are never deleted, so an upload of a file the latest submissions
+of the project refer to is not stored again (see :meth:`group_project_v2.upload_file.UploadFile.save_file`). Other
+uploads check the storage itself.
+"""
+import logging
+import posixpath
+
+from django.core.files.storage import default_storage
+
+log = logging.getLogger(__name__)
+
+BLOBS_ROOT = "group_work/blobs"
+
+
+def get_blob_path(sha1, file_name):
+    """
+    :param str sha1: Hex digest of file content SHA1 hash
+    :param unicode file_name: File name
+    :rtype: unicode
+    """
+    return posixpath.join(BLOBS_ROOT, sha1[:2], sha1, file_name)
+
+
+def save_blob(blob_path, content):
+    """
+    Stores content at blob path, unless it is already stored
+    :param unicode blob_path: Blob path
+    :param django.core.files.File content: File content
+    :rtype: bool
+    :returns: True if content was written to storage
+    """
+    if default_storage.exists(blob_path):
+        log.debug("Blob already stored at %s", blob_path)
+        return False
+
+    log.debug("Storing blob to %s", blob_path)
+    saved_path = default_storage.save(blob_path, content)
+    if saved_path != blob_path:
+        # same content was stored concurrently, storage picked another name for this copy
+        default_storage.delete(saved_path)
+    return True
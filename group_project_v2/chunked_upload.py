@@ -0,0 +1,243 @@
+"""
+Resumable uploads of large submissions, sent in chunks by multiple requests.
+
+Client sends each chunk as a regular upload request with `Content-Range: bytes <start>-<end>/<total>` header (the way
+jQuery File Upload does with `maxChunkSize` option). Chunks are kept in `default_storage`, so any server can receive
+the next chunk or assemble the file, and are named after their byte range, so the number of bytes received so far
+can be found without reading them. Upload session is identified by the uploading user, workgroup, upload and file
+name, size and modification time, so that uploading the same file again resumes the session instead of starting from
+zero. Sessions that did not receive chunks for a while are expired: they are not resumed, and are deleted by
+`discard_expired_uploads` (see `discard_expired_chunked_uploads` management command).
+"""
+import hashlib
+import logging
+import posixpath
+import re
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+log = logging.getLogger(__name__)
+
+CHUNKS_ROOT = "group_work/chunked_uploads"
+UPLOAD_EXPIRATION = timedelta(days=1)
+CHUNK_NAME_TEMPLATE = "{start:012d}-{end:012d}"
+CONTENT_RANGE_REGEX = re.compile(r"^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<total>\d+)$")
+
+ContentRange = namedtuple("ContentRange", "start end total")
+
+
+class ChunkOffsetError(Exception):
+    """
+    Raised when chunk does not continue the bytes received so far
+    """
+    def __init__(self, message, uploaded_bytes):
+        super(ChunkOffsetError, self).__init__(message)
+        self.uploaded_bytes = uploaded_bytes
+
+
+def parse_content_range(header):
+    """
+    Parses Content-Range header of chunk upload request
+    :param str|None header: Header value
+    :rtype: ContentRange|None
+    :raises ValueError: if header is malformed
+    """
+    if not header:
+        return None
+    match = CONTENT_RANGE_REGEX.match(header.strip())
+    if not match:
+        raise ValueError("Malformed Content-Range header: {}".format(header))
+    content_range = ContentRange(*(int(match.group(group)) for group in ("start", "end", "total")))
+    if not content_range.start <= content_range.end < content_range.total:
+        raise ValueError("Invalid Content-Range header: {}".format(header))
+    return content_range
+
+
+def _get_modified_time(path):
+    """
+    :param str path: Stored file path
+    :rtype: datetime.datetime
+    """
+    try:
+        get_modified_time = default_storage.get_modified_time
+    except AttributeError:  # Django < 1.10
+        get_modified_time = default_storage.modified_time
+    return get_modified_time(path)
+
+
+def _is_older_than(modified_time, max_age):
+    """
+    :param datetime.datetime modified_time: Modification time - naive (local) or aware, depending on storage
+    :param timedelta max_age: Maximum age
+    :rtype: bool
+    """
+    now = timezone.now() if timezone.is_aware(modified_time) else datetime.now()
+    return modified_time < now - max_age
+
+
+class AssembledFile(object):
+    """
+    Read-only view of uploaded chunks as a single file. Content is streamed from stored chunks, in order.
+    """
+    def __init__(self, name, size, chunk_paths):
+        self.name = name
+        self.size = size
+        self._chunk_paths = chunk_paths
+
+    def chunks(self, chunk_size=None):
+        for chunk_path in self._chunk_paths:
+            chunk_file = default_storage.open(chunk_path)
+            try:
+                for data in chunk_file.chunks(chunk_size):
+                    yield data
+            finally:
+                chunk_file.close()
+
+    def seek(self, position):
+        # chunks are always read from the beginning
+        if position != 0:
+            raise ValueError("AssembledFile can only be rewound to the beginning")
+
+
+class ChunkedUpload(object):
+    """
+    Chunks of a file uploaded in multiple requests
+    """
+    def __init__(self, session_id, file_name, total_size):
+        self.session_id = session_id
+        self.file_name = file_name
+        self.total_size = total_size
+
+    @classmethod
+    def for_submission(cls, user_id, group_id, upload_id, file_name, total_size, last_modified=None):
+        """
+        Gets upload session of a file submitted by a user on behalf of a workgroup
+        :param int|str user_id: User ID
+        :param int group_id: Workgroup ID
+        :param str upload_id: Upload ID
+        :param unicode file_name: Uploaded file name
+        :param int total_size: Uploaded file size, in bytes
+        :param unicode|None last_modified: File modification time reported by client, so that a changed file with the
+            same name and size is not resumed from the chunks of its previous version
+        :rtype: ChunkedUpload
+        """
+        session_key = u":".join(
+            unicode(part) for part in (user_id, group_id, upload_id, file_name, total_size, last_modified or u"")
+        )
+        session_id = hashlib.sha1(session_key.encode('utf-8')).hexdigest()
+        return cls(session_id, file_name, total_size)
+
+    @property
+    def chunks_path(self):
+        return posixpath.join(CHUNKS_ROOT, self.session_id)
+
+    def _list_chunk_names(self):
+        try:
+            return default_storage.listdir(self.chunks_path)[1]
+        except OSError:  # FileSystemStorage raises it if nothing was stored yet
+            return []
+
+    def _get_stored_chunks(self):
+        """
+        Lists stored chunks that make contiguous content from the beginning of the file
+        :rtype: (list[str], int)
+        :returns: Paths of the chunks, in order, and number of bytes they contain
+        """
+        ranges = []
+        for file_name in self._list_chunk_names():
+            try:
+                start, end = (int(position) for position in file_name.split("-"))
+            except ValueError:
+                continue
+            ranges.append((start, end, file_name))
+
+        chunk_paths, uploaded_bytes = [], 0
+        for start, end, file_name in sorted(ranges):
+            if start == uploaded_bytes:
+                chunk_paths.append(posixpath.join(self.chunks_path, file_name))
+                uploaded_bytes = end + 1
+        return chunk_paths, uploaded_bytes
+
+    @property
+    def uploaded_bytes(self):
+        return self._get_stored_chunks()[1]
+
+    def save_chunk(self, chunk_file, content_range):
+        """
+        Stores a chunk
+        :param file chunk_file: Chunk content
+        :param ContentRange content_range: Position of the chunk in the file
+        :rtype: int
+        :returns: Number of bytes received so far
+        :raises ChunkOffsetError: if chunk does not start where already received content ends
+        :raises ValueError: if chunk size does not match its position
+        """
+        uploaded_bytes = self.uploaded_bytes
+        if content_range.start != uploaded_bytes:
+            raise ChunkOffsetError(
+                "Chunk starts at {}, but {} bytes are uploaded".format(content_range.start, uploaded_bytes),
+                uploaded_bytes
+            )
+
+        chunk_size = content_range.end - content_range.start + 1
+        if chunk_file.size != chunk_size:
+            raise ValueError("Chunk size {} does not match Content-Range size {}".format(chunk_file.size, chunk_size))
+
+        chunk_name = CHUNK_NAME_TEMPLATE.format(start=content_range.start, end=content_range.end)
+        default_storage.save(posixpath.join(self.chunks_path, chunk_name), chunk_file)
+        log.debug("Stored bytes %s-%s of upload %s", content_range.start, content_range.end, self.session_id)
+        return content_range.end + 1
+
+    @property
+    def is_complete(self):
+        return self.uploaded_bytes >= self.total_size
+
+    def open(self):
+        """
+        :rtype: AssembledFile
+        """
+        chunk_paths, uploaded_bytes = self._get_stored_chunks()
+        return AssembledFile(self.file_name, uploaded_bytes, chunk_paths)
+
+    def is_expired(self, max_age=UPLOAD_EXPIRATION):
+        """
+        :param timedelta max_age: How long session is kept after the last chunk is received
+        :rtype: bool
+        :returns: True if session has chunks, but did not receive any for longer than `max_age`
+        """
+        modified_times = [
+            _get_modified_time(posixpath.join(self.chunks_path, file_name)) for file_name in self._list_chunk_names()
+        ]
+        return bool(modified_times) and _is_older_than(max(modified_times), max_age)
+
+    def discard(self):
+        """
+        Deletes all stored chunks
+        """
+        for file_name in self._list_chunk_names():
+            default_storage.delete(posixpath.join(self.chunks_path, file_name))
+
+
+def discard_expired_uploads(max_age=UPLOAD_EXPIRATION):
+    """
+    Deletes chunks of upload sessions that did not receive chunks for longer than `max_age`, i.e. abandoned by client
+    :param timedelta max_age: How long session is kept after the last chunk is received
+    :rtype: int
+    :returns: Number of discarded sessions
+    """
+    try:
+        session_ids = default_storage.listdir(CHUNKS_ROOT)[0]
+    except OSError:  # nothing was uploaded in chunks yet
+        return 0
+
+    discarded = 0
+    for session_id in session_ids:
+        upload = ChunkedUpload(session_id, None, None)
+        if upload.is_expired(max_age):
+            upload.discard()
+            discarded += 1
+    log.info("Discarded %s expired chunked uploads", discarded)
+    return discarded
@@ -0,0 +1,161 @@
+"""
+Deferred calculation of group grades.
+
+When `deferred_grading` key of `group_project_v2` XBlock settings bucket (`XBLOCK_SETTINGS` Django setting) is set,
+peer review submit request only records a grading job for the reviewed group and returns. The grade is calculated
+and sent by a later request: the grading status request the client sends once the job is due, or the next render of
+the peer review stage by a reviewer of the group, if the client did not send it. XBlock runtime builds the blocks for
+that request as usual, so jobs only hold plain IDs. Jobs are kept in Django cache, so they can be processed by any
+process using the same cache backend. A job is only removed once the grade is sent, so if a process exits while
+processing a job, the claim expires and the job is processed by a later request; failed jobs are retried likewise.
+
+Jobs are keyed by activity and group, so submissions made while a job is pending are coalesced into it and result in
+a single grade calculation. Submissions made while a job is being processed record a new job, so their answers are
+graded too. With `grade_recalculation_window` set, a job is due once the window passes without new submissions for the
+group (but no later than `MAX_DELAYS` windows after the first one), so a series of saves - i.e. TA grading questions
+one by one - results in a single grade calculation. Numbers of scheduled, coalesced (skipped recomputations),
+processed and failed jobs are counted in Django cache as well, see :func:`get_grading_stats`.
+"""
+import hashlib
+import logging
+import time
+import uuid
+
+from django.core.cache import caches
+
+log = logging.getLogger(__name__)
+
+JOBS_CACHE_ALIAS = 'default'
+JOB_KEY_PREFIX = 'group_project_v2:deferred_grading:'
+CLAIM_KEY_PREFIX = 'group_project_v2:deferred_grading:claim:'
+STATS_KEY_PREFIX = 'group_project_v2:deferred_grading:stats:'
+JOB_TIMEOUT = 24 * 60 * 60
+CLAIM_TIMEOUT = 60
+RETRY_DELAY = 60
+MAX_DELAYS = 5
+STATS = ('scheduled', 'coalesced', 'processed', 'failed')
+
+
+class GradingState(object):
+    PENDING = 'pending'
+    COMPLETE = 'complete'
+    FAILED = 'failed'
+    UNKNOWN = 'unknown'
+
+
+def _make_job_key(activity_id, group_id):
+    return JOB_KEY_PREFIX + hashlib.md5(u"{}:{}".format(activity_id, group_id).encode('utf-8')).hexdigest()
+
+
+def _make_claim_key(activity_id, group_id):
+    return CLAIM_KEY_PREFIX + hashlib.md5(u"{}:{}".format(activity_id, group_id).encode('utf-8')).hexdigest()
+
+
+def _get_status(job, now):
+    if job is None:
+        return {'state': GradingState.UNKNOWN, 'due_in': 0}
+    return {'state': GradingState.PENDING, 'due_in': max(job['due_at'] - now, 0)}
+
+
+def _count(stat):
+    cache = caches[JOBS_CACHE_ALIAS]
+    key = STATS_KEY_PREFIX + stat
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:  # evicted since added
+        cache.add(key, 1, None)
+
+
+def schedule_grading(activity_id, group_id, delay=0):
+    """
+    Records grading job for the group, or coalesces the submission into pending one and postpones it
+    :param unicode activity_id: Activity content ID
+    :param int group_id: Group ID
+    :param float delay: Number of seconds to wait for more submissions before calculating the grade
+    :rtype: dict
+    :returns: Job status
+    """
+    cache = caches[JOBS_CACHE_ALIAS]
+    now = time.time()
+    job_key = _make_job_key(activity_id, group_id)
+    pending_job = cache.get(job_key)
+    _count('scheduled')
+    first_scheduled_at = now
+    if pending_job is not None:
+        _count('coalesced')
+        log.debug("Coalescing grading of group %s in %s into pending job", group_id, activity_id)
+        first_scheduled_at = pending_job['first_scheduled_at']
+    # version tells jobs recorded while an earlier one was processed from the processed one
+    job = {
+        'activity_id': activity_id, 'group_id': group_id, 'version': uuid.uuid4().hex,
+        'first_scheduled_at': first_scheduled_at, 'due_at': min(now + delay, first_scheduled_at + delay * MAX_DELAYS)
+    }
+    cache.set(job_key, job, JOB_TIMEOUT)
+    return _get_status(job, now)
+
+
+def get_due_group_ids(activity_id, group_ids):
+    """
+    :param unicode activity_id: Activity content ID
+    :param collections.Iterable[int] group_ids: Group IDs
+    :rtype: list[int]
+    :returns: IDs of groups that have due grading jobs
+    """
+    job_keys = {_make_job_key(activity_id, group_id): group_id for group_id in group_ids}
+    now = time.time()
+    return sorted(
+        job_keys[job_key] for job_key, job in caches[JOBS_CACHE_ALIAS].get_many(job_keys.keys()).iteritems()
+        if job['due_at'] <= now
+    )
+
+
+def process_job(activity_id, group_id, processor):
+    """
+    Processes grading job of the group if it is due, unless it is being processed by another request
+    :param unicode activity_id: Activity content ID
+    :param int group_id: Group ID
+    :param callable processor: Callable receiving group ID and calculating its grade; errors are reported by raising
+    :rtype: dict
+    :returns: Job status
+    """
+    cache = caches[JOBS_CACHE_ALIAS]
+    job_key = _make_job_key(activity_id, group_id)
+    job = cache.get(job_key)
+    if job is None or job['due_at'] > time.time():
+        return _get_status(job, time.time())
+
+    claim_key = _make_claim_key(activity_id, group_id)
+    if not cache.add(claim_key, True, CLAIM_TIMEOUT):
+        return _get_status(job, time.time())
+
+    try:
+        # job might have been processed by the previous claim holder since it was read
+        job = cache.get(job_key)
+        if job is None:
+            return {'state': GradingState.COMPLETE, 'due_in': 0}
+        try:
+            processor(group_id)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Deferred grading of group %s in %s failed", group_id, activity_id)
+            _count('failed')
+            if cache.get(job_key) == job:
+                cache.set(job_key, dict(job, due_at=time.time() + RETRY_DELAY), JOB_TIMEOUT)
+            return {'state': GradingState.FAILED, 'due_in': 0}
+
+        _count('processed')
+        # job recorded by a submission made while grading is kept - the grade might have been calculated without it
+        if cache.get(job_key) == job:
+            cache.delete(job_key)
+        return {'state': GradingState.COMPLETE, 'due_in': 0}
+    finally:
+        cache.delete(claim_key)
+
+
+def get_grading_stats():
+    """
+    :rtype: dict[str, int]
+    :returns: Numbers of scheduled, coalesced (skipped recomputations), processed and failed grading jobs
+    """
+    counters = caches[JOBS_CACHE_ALIAS].get_many([STATS_KEY_PREFIX + stat for stat in STATS])
+    return {stat: counters.get(STATS_KEY_PREFIX + stat, 0) for stat in STATS}
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import logging
 import itertools
+import threading
 from operator import itemgetter
 from datetime import datetime
 
@@ -14,16 +15,24 @@ from xblock.fragment import Fragment
 from xblock.validation import ValidationMessage
 from xblockutils.studio_editable import XBlockWithPreviewMixin, NestedXBlockSpec
 
-from group_project_v2 import messages
+from group_project_v2 import deferred_grading, messages
 from group_project_v2.mixins import (
     CommonMixinCollection, DashboardXBlockMixin, DashboardRootXBlockMixin,
     AuthXBlockMixin
 )
+from group_project_v2.notifications import (
+    StageNotificationsMixin, register_timed_notifications
+)
+from group_project_v2.profiling import profiled
+from group_project_v2.project_api.cache_warmer import (
+    DEFAULT_MAX_WORKERS, ProjectAPICacheWarmer, get_unsuitable_cache_policies
+)
 from group_project_v2.project_navigator import GroupProjectNavigatorXBlock
 from group_project_v2.stage.utils import StageState
 from group_project_v2.utils import (
     mean, make_key, groupwork_protected_view, get_default_stage, DiscussionXBlockShim, Constants,
-    add_resource, gettext as _, get_block_content_id, export_to_csv, named_tuple_with_docstring
+    add_resource, add_resource_bundle, gettext as _, get_block_content_id, export_to_csv, named_tuple_with_docstring,
+    log_and_suppress_exceptions
 )
 from group_project_v2.stage import (
     BasicStage, SubmissionStage, TeamEvaluationStage, PeerReviewStage,
@@ -48,6 +57,9 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
     CSV_HEADERS = ['Name', 'Username', 'Email']
     CSV_TIMESTAMP_FORMAT = "%Y_%m_%d_%H_%M_%S"
 
+    WARM_UP_CACHES_ON_PUBLISH_KEY = "warm_up_caches_on_publish"
+    CACHE_WARM_UP_MAX_WORKERS_KEY = "cache_warm_up_max_workers"
+
     editable_fields = ('display_name', )
     has_score = False
     has_children = True
@@ -91,8 +103,7 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
 
     @lazy
     def activities(self):
-        all_children = [self.runtime.get_block(child_id) for child_id in self.children]
-        return [child for child in all_children if isinstance(child, GroupActivityXBlock)]
+        return [child for child in self._children if isinstance(child, GroupActivityXBlock)]
 
     @lazy
     def navigator(self):
@@ -114,6 +125,7 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
         else:
             return Fragment(fallback_message)
 
+    @profiled
     @groupwork_protected_view
     def student_view(self, context):
         ctx = self._sanitize_context(context)
@@ -166,14 +178,12 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
 
         fragment.add_content(self.render_template('student_view', render_context))
 
-        add_resource(self, 'css', 'public/css/group_project.css', fragment)
-        add_resource(self, 'css', 'public/css/group_project_common.css', fragment)
+        add_resource_bundle(self, 'project_student_view', fragment)
         add_resource(self, 'css', 'public/css/vendor/font-awesome/font-awesome.css', fragment, via_url=True)
-        add_resource(self, 'javascript', 'public/js/group_project.js', fragment)
-        add_resource(self, 'javascript', 'public/js/group_project_common.js', fragment)
         fragment.initialize_js("GroupProjectBlock")
         return fragment
 
+    @profiled
     @groupwork_protected_view
     @AuthXBlockMixin.check_dashboard_access_for_current_user
     def dashboard_view(self, context):
@@ -188,12 +198,12 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
 
         render_context = {'project': self, 'activity_contents': activity_contents}
         fragment.add_content(self.render_template('dashboard_view', render_context))
-        add_resource(self, 'css', 'public/css/group_project_common.css', fragment)
-        add_resource(self, 'css', 'public/css/group_project_dashboard.css', fragment)
+        add_resource_bundle(self, 'project_dashboard_view', fragment)
         add_resource(self, 'css', 'public/css/vendor/font-awesome/font-awesome.css', fragment, via_url=True)
 
         return fragment
 
+    @profiled
     @groupwork_protected_view
     @AuthXBlockMixin.check_dashboard_access_for_current_user
     def dashboard_detail_view(self, context):
@@ -221,15 +231,14 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
         fragment.add_frag_resources(activity_fragment)
 
         fragment.add_content(self.render_template('dashboard_detail_view', render_context))
-        add_resource(self, 'css', 'public/css/group_project_common.css', fragment)
-        add_resource(self, 'css', 'public/css/group_project_dashboard.css', fragment)
+        add_resource_bundle(self, 'project_dashboard_detail_view', fragment)
         add_resource(self, 'css', 'public/css/vendor/font-awesome/font-awesome.css', fragment, via_url=True)
-        add_resource(self, 'javascript', 'public/js/group_project_dashboard_detail.js', fragment)
 
         fragment.initialize_js('GroupProjectBlockDashboardDetailsView')
 
         return fragment
 
+    @profiled
     @XBlock.handler
     def download_incomplete_list(self, request, _suffix=''):
         target_stage_id = self.get_block_id_from_string(request.GET.get(Constants.ACTIVATE_BLOCK_ID_PARAMETER_NAME))
@@ -258,6 +267,65 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
 
         return response
 
+    @log_and_suppress_exceptions
+    def on_studio_published(self, course_id, services):
+        """
+        A hook into when this xblock is published in Studio. If enabled in settings, registers notification timers
+        of all project stages and preloads project API caches for this project in background, so that first
+        dashboard load after publishing does not hit cold caches. Caches are only preloaded if their policies make
+        preloaded values visible to LMS processes, see :func:`get_unsuitable_cache_policies`.
+        """
+        self.schedule_notification_timers(course_id, services)
+
+        if not self._get_setting(self.WARM_UP_CACHES_ON_PUBLISH_KEY, False):
+            return None
+
+        unsuitable_policies = get_unsuitable_cache_policies()
+        if unsuitable_policies:
+            log.warning(
+                "Skipping project API cache warm-up: cache policies of %s are not shared or expire too soon",
+                ", ".join(unsuitable_policies)
+            )
+            return None
+
+        warm_up_thread = threading.Thread(
+            target=self.warm_up_caches, args=(unicode(course_id),), name="group-project-cache-warm-up"
+        )
+        warm_up_thread.daemon = True
+        warm_up_thread.start()
+        return warm_up_thread
+
+    @log_and_suppress_exceptions
+    def schedule_notification_timers(self, course_id, services):
+        """
+        If batch registration is enabled in settings, collects notification timers of all project stages and
+        schedules registration of the changed ones in one go while publishing. Stages skip their timers in this case.
+        :param CourseLocator course_id: Course ID
+        :param dict[str, object] services: runtime services
+        """
+        notifications_service = services.get('notifications')
+        if not notifications_service or not self._get_setting(
+                StageNotificationsMixin.BATCH_NOTIFICATION_TIMERS_KEY, False
+        ):
+            return
+
+        timers = {}
+        for activity in self.activities:
+            for stage in activity.stages:
+                timers.update(stage.get_notification_timers(course_id))
+
+        register_timed_notifications(timers)
+
+    @log_and_suppress_exceptions
+    def warm_up_caches(self, course_id):
+        """
+        Preloads project API caches with this project's workgroups, users, organizations and roles
+        :param str course_id: Course ID
+        """
+        max_workers = self._get_setting(self.CACHE_WARM_UP_MAX_WORKERS_KEY, DEFAULT_MAX_WORKERS)
+        warmer = ProjectAPICacheWarmer(self.project_api, max_workers)
+        return warmer.warm_up_course(course_id, [self.content_id])
+
     def validate(self):
         validation = super(GroupProjectXBlock, self).validate()
 
@@ -272,7 +340,7 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
     def _get_target_block(self, target_block_id):
         try:
             if target_block_id:
-                return self.runtime.get_block(target_block_id)
+                return self.get_block_by_id(target_block_id)
         except (InvalidKeyError, KeyError, NoSuchUsage) as exc:
             log.exception(exc)
 
@@ -370,6 +438,8 @@ class GroupActivityXBlock(
     DEFAULT_DASHBOARD_DETAILS_URL_TPL = "/dashboard_details_view?activate_block_id={activity_id}"
     TA_REVIEW_URL_KEY = 'ta_review_url'
     DEFAULT_TA_REVIEW_URL_TPL = "ta_grading=true&activate_block_id={activate_block_id}&group_id={group_id}"
+    DEFERRED_GRADING_KEY = 'deferred_grading'
+    GRADE_RECALCULATION_WINDOW_KEY = 'grade_recalculation_window'
 
     @property
     def id(self):
@@ -479,7 +549,7 @@ class GroupActivityXBlock(
     def get_stage_to_display(self, target_block_id):
         try:
             if target_block_id:
-                stage = self.runtime.get_block(target_block_id)
+                stage = self.get_block_by_id(target_block_id)
                 if self.get_child_category(stage) in STAGE_TYPES and stage.available_to_current_user:
                     return stage
         except (InvalidKeyError, KeyError, NoSuchUsage) as exc:
@@ -487,6 +557,7 @@ class GroupActivityXBlock(
 
         return self.default_stage
 
+    @profiled
     @groupwork_protected_view
     def student_view(self, context):
         """
@@ -565,6 +636,7 @@ class GroupActivityXBlock(
 
         return fragment
 
+    @profiled
     @groupwork_protected_view
     @AuthXBlockMixin.check_dashboard_access_for_current_user
     def dashboard_view(self, context):
@@ -581,6 +653,7 @@ class GroupActivityXBlock(
 
         return fragment
 
+    @profiled
     @groupwork_protected_view
     @AuthXBlockMixin.check_dashboard_access_for_current_user
     def dashboard_detail_view(self, context):
@@ -724,7 +797,7 @@ class GroupActivityXBlock(
             user_stats[user.id] = state
 
             if isinstance(stage, PeerReviewStage):
-                groups_to_grade[user.id] = stage.get_review_subjects(user.id)
+                groups_to_grade[user.id] = stage.review_subjects_by_user.get(user.id, [])
 
         external_group_status, external_group_status_label, internal_group_status = cls._get_group_statuses(
             stage, target_workgroups, user_stats
@@ -740,7 +813,8 @@ class GroupActivityXBlock(
 
     @classmethod
     def _get_group_statuses(cls, stage, target_workgroups, user_stats):
-        internal_group_status, external_group_status, external_group_status_label = {}, {}, {}
+        internal_group_status, external_group_status_label = {}, {}
+        external_group_status = stage.get_external_group_statuses(target_workgroups)
         for group in target_workgroups:
             user_completions = [user_stats.get(user.id, StageState.UNKNOWN) for user in group.users]
             student_review_state = StageState.NOT_STARTED
@@ -752,9 +826,7 @@ class GroupActivityXBlock(
                 student_review_state = StageState.UNKNOWN
             internal_group_status[group.id] = student_review_state
 
-            external_status = stage.get_external_group_status(group)
-            external_group_status[group.id] = external_status
-            external_group_status_label[group.id] = stage.get_external_status_label(external_status)
+            external_group_status_label[group.id] = stage.get_external_status_label(external_group_status[group.id])
         return external_group_status, external_group_status_label, internal_group_status
 
     def mark_complete(self, user_id):
@@ -772,6 +844,51 @@ class GroupActivityXBlock(
                 )
                 validation.add(ValidationMessage(ValidationMessage.ERROR, message))
 
+    @property
+    def deferred_grading_enabled(self):
+        return bool(
+            self._get_setting(self.DEFERRED_GRADING_KEY, False) or
+            self._get_setting(self.GRADE_RECALCULATION_WINDOW_KEY, 0)
+        )
+
+    def schedule_grade_calculation(self, group_id):
+        """
+        Calculates and sends group grade. If deferred grading is enabled, records grading job to be processed by a
+        later request instead - see `group_project_v2.deferred_grading`. If grade recalculation window is set, the job
+        is also postponed until the group had no new submissions for the duration of the window.
+        :param int group_id: Group ID
+        :rtype: dict|None
+        :returns: Grading job status if grading is deferred
+        """
+        if not self.deferred_grading_enabled:
+            self.calculate_and_send_grade(group_id)
+            return None
+
+        return deferred_grading.schedule_grading(
+            self.content_id, group_id, delay=self._get_setting(self.GRADE_RECALCULATION_WINDOW_KEY, 0) or 0
+        )
+
+    def process_grading_job(self, group_id):
+        """
+        Calculates and sends group grade if grading job of the group is due
+        :param int group_id: Group ID
+        :rtype: dict
+        :returns: Grading job status
+        """
+        return deferred_grading.process_job(self.content_id, group_id, self.calculate_and_send_grade)
+
+    @log_and_suppress_exceptions
+    def process_due_grading_jobs(self, group_ids):
+        """
+        Calculates and sends grades of the groups that have due grading jobs - i.e. if client stopped polling
+        grading status
+        :param collections.Iterable[int] group_ids: Group IDs
+        """
+        if not self.deferred_grading_enabled:
+            return
+        for group_id in deferred_grading.get_due_group_ids(self.content_id, group_ids):
+            self.process_grading_job(group_id)
+
     def calculate_and_send_grade(self, group_id):
         grade_value = self.calculate_grade(group_id)
         if grade_value is not None:
@@ -818,7 +935,7 @@ class GroupActivityXBlock(
         }
         all_reviewer_ids = set([self.real_user_id(review_item['reviewer']) for review_item in review_item_data])
         group_reviewer_ids = [
-            user["id"] for user in self.project_api.get_workgroup_reviewers(group_id, self.content_id)
+            user.id for user in self.project_api.get_reviewers_for_workgroup(group_id, self.content_id)
         ]
         admin_reviewer_ids = [reviewer_id for reviewer_id in all_reviewer_ids if reviewer_id not in group_reviewer_ids]
 
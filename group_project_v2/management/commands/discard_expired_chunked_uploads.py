@@ -0,0 +1,21 @@
+""" Deletes chunks of abandoned chunked uploads """
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from group_project_v2.chunked_upload import UPLOAD_EXPIRATION, discard_expired_uploads
+
+
+class Command(BaseCommand):
+    help = "Deletes stored chunks of uploads that did not receive chunks for a while, i.e. abandoned by users."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-hours', type=int, dest='max_age_hours',
+            default=int(UPLOAD_EXPIRATION.total_seconds() // 3600),
+            help="Discard uploads that did not receive chunks for this many hours."
+        )
+
+    def handle(self, *args, **options):
+        discarded = discard_expired_uploads(timedelta(hours=options['max_age_hours']))
+        self.stdout.write("Discarded {} expired uploads".format(discarded))
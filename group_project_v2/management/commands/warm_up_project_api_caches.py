@@ -0,0 +1,41 @@
+""" Preloads project API caches for a course """
+from django.core.management.base import BaseCommand, CommandError
+
+from group_project_v2.project_api import API_SERVER, TypedProjectAPI
+from group_project_v2.project_api.cache_warmer import (
+    DEFAULT_MAX_WORKERS, MIN_USEFUL_TTL, ProjectAPICacheWarmer, get_unsuitable_cache_policies
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Preloads projects, workgroups, user details, organizations and roles for a course into project API caches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', help="Course ID")
+        parser.add_argument(
+            '--content-id', action='append', dest='content_ids', default=None,
+            help="Group project content ID to warm up; can be repeated. Defaults to all projects in the course."
+        )
+        parser.add_argument(
+            '--max-workers', type=int, dest='max_workers', default=DEFAULT_MAX_WORKERS,
+            help="Maximum number of concurrent API requests."
+        )
+
+    def handle(self, *args, **options):
+        unsuitable_policies = get_unsuitable_cache_policies()
+        if unsuitable_policies:
+            raise CommandError(
+                "Preloaded values would not be seen by LMS processes or expire before use: cache policies of {methods} "
+                "must be shared and have TTL of at least {ttl} seconds (see api_cache_policies setting).".format(
+                    methods=", ".join(unsuitable_policies), ttl=int(MIN_USEFUL_TTL.total_seconds())
+                )
+            )
+
+        warmer = ProjectAPICacheWarmer(TypedProjectAPI(API_SERVER), options['max_workers'])
+        stats = warmer.warm_up_course(options['course_id'], options['content_ids'])
+        self.stdout.write("Preloaded: " + ", ".join(
+            "{count} {record_type}".format(record_type=record_type, count=count)
+            for record_type, count in sorted(stats.items())
+        ))
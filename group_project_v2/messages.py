@@ -57,3 +57,10 @@ SUCCESSFUL_UPLOAD_MESSAGE_TPL = _(
     u"deliverable by clicking the <span class='icon {icon}'></span> icon at any time before the deadline."
 )
 FAILED_UPLOAD_MESSAGE_TPL = _(u"Error uploading file: {error_goes_here}.")
+UPLOAD_SESSION_INVALID = _(u"File name and size are required to upload a file.")
+UPLOAD_CHUNK_OUT_OF_ORDER = _(u"Upload was interrupted. Please upload the file again to resume.")
+SUBMISSIONS_DOWNLOAD_NOT_ALLOWED = _(u"Only TAs can download submissions of all groups.")
+INVALID_CLIENT_FILTER = _(u"Client filter must be an organization ID.")
+SUBMISSIONS_ARCHIVE_TOO_LARGE = _(
+    u"Submissions are too large to download as a single archive. Filter groups by client to download fewer of them."
+)
@@ -2,6 +2,7 @@ import functools
 import logging
 import os
 import itertools
+from collections import namedtuple
 
 from lazy.lazy import lazy
 from opaque_keys import InvalidKeyError
@@ -17,17 +18,38 @@ from group_project_v2.project_api import ProjectAPIXBlockMixin
 from group_project_v2.project_api.dtos import WorkgroupDetails
 from group_project_v2.utils import (
     MUST_BE_OVERRIDDEN, NO_EDITABLE_SETTINGS, Constants, GroupworkAccessDeniedError,
-    loader, groupwork_protected_view, add_resource
+    loader, groupwork_protected_view, add_resource_bundle, render_content_scoped_template
 )
 
 log = logging.getLogger(__name__)
 
+# pylint: disable=invalid-name
+ChildrenIndex = namedtuple("ChildrenIndex", "children categories by_id by_category")
+
 
 class ChildrenNavigationXBlockMixin(object):
     @lazy
+    def _children_index(self):
+        """
+        Child blocks, loaded once per block instance and indexed by id and category. All children accessors use it,
+        so each child block is only instantiated once.
+        :rtype: ChildrenIndex
+        """
+        children, categories, by_id, by_category = [], [], {}, {}
+        for child_id in self.children:
+            child = self.runtime.get_block(child_id)
+            if child is None:
+                continue
+            category = self.get_child_category(child)
+            children.append(child)
+            categories.append(category)
+            by_id[child_id] = child
+            by_category.setdefault(category, []).append(child)
+        return ChildrenIndex(children, categories, by_id, by_category)
+
+    @property
     def _children(self):
-        children = (self.runtime.get_block(child_id) for child_id in self.children)
-        return [child for child in children if child is not None]
+        return self._children_index.children
 
     @staticmethod
     def get_child_category(child):
@@ -45,17 +67,31 @@ class ChildrenNavigationXBlockMixin(object):
             return child_id.split(".")[1]
 
     def get_children_by_category(self, *child_categories):
-        return [child for child in self._children if self.get_child_category(child) in child_categories]
+        index = self._children_index
+        if len(child_categories) == 1:
+            return list(index.by_category.get(child_categories[0], ()))
+        return [
+            child for child, category in zip(index.children, index.categories) if category in child_categories
+        ]
 
     def get_child_of_category(self, child_category):
-        try:
-            return next(child for child in self._children if self.get_child_category(child) == child_category)
-        except StopIteration:
-            return None
+        children = self._children_index.by_category.get(child_category)
+        return children[0] if children else None
 
     def has_child_of_category(self, child_category):
+        # does not need to instantiate children, as block type is part of child id
         return any(self.get_child_id_block_type(child) == child_category for child in self.children)
 
+    def get_block_by_id(self, block_id):
+        """
+        Gets block by id: children are taken from children index, other blocks are loaded from runtime.
+        """
+        try:
+            child = self._children_index.by_id.get(block_id)
+        except TypeError:  # unhashable id
+            child = None
+        return child if child is not None else self.runtime.get_block(block_id)
+
     @staticmethod
     def get_block_id_from_string(block_id_string):
         if not block_id_string:
@@ -400,15 +436,13 @@ class XBlockWithComponentsMixin(StudioContainerWithNestedXBlocksMixin):
         Add some HTML to the author view that allows authors to add child blocks.
         """
         fragment = super(XBlockWithComponentsMixin, self).author_edit_view(context)
-        add_resource(self, 'css', 'public/css/group_project.css', fragment)
-        add_resource(self, 'css', 'public/css/group_project_edit.css', fragment)
+        add_resource_bundle(self, 'author_edit_view', fragment)
         return fragment
 
     @groupwork_protected_view
     def author_preview_view(self, context):
         fragment = super(XBlockWithComponentsMixin, self).author_preview_view(context)
-        add_resource(self, 'css', 'public/css/group_project.css', fragment)
-        add_resource(self, 'css', 'public/css/group_project_preview.css', fragment)
+        add_resource_bundle(self, 'author_preview_view', fragment)
         return fragment
 
 
@@ -426,9 +460,10 @@ class XBlockWithUrlNameDisplayMixin(object):
 
     def get_url_name_fragment(self, caption):
         fragment = Fragment()
-        fragment.add_content(loader.render_template(
-            "templates/html/url_name.html",
-            {'url_name': self.url_name, 'caption': caption}
+        url_name = self.url_name
+        fragment.add_content(render_content_scoped_template(
+            self, "templates/html/url_name.html",
+            {'url_name': url_name, 'caption': caption}, (url_name, caption)
         ))
         return fragment
 
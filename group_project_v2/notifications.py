@@ -1,11 +1,20 @@
+import functools
+import hashlib
+import json
 import logging
+import threading
+from collections import OrderedDict, namedtuple
 from datetime import datetime, timedelta
 import pytz
+from django.core.cache import caches
+from django.db import close_old_connections
 
+from group_project_v2.background_jobs import BackgroundJobQueue
 from group_project_v2.utils import log_and_suppress_exceptions
 
 try:
     from edx_notifications.data import NotificationMessage  # pylint: disable=import-error
+    from edx_notifications.lib import publisher as notifications_publisher  # pylint: disable=import-error
 except ImportError:
     # Notifications is an optional runtime configuration, so it may not be available for import
     pass
@@ -13,6 +22,12 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+TIMERS_CACHE_ALIAS = 'default'
+TIMERS_KEY_PREFIX = 'group_project_v2:notification_timers:'
+# Fingerprints are kept until timer parameters (i.e. stage dates) change, as a fingerprint of changed timer no longer
+# matches. Timers cancelled by other means than stage deletion are not restored - clear the fingerprints to restore them
+TIMERS_TIMEOUT = None
+
 
 class NotificationMessageTypes(object):
     MESSAGE_TYPE_PREFIX = u'open-edx.xblock.group-project-v2.'
@@ -46,87 +61,311 @@ def add_click_link_params(msg, course_id, location):
     msg.add_click_link_params({'course_id': unicode(course_id), 'location': unicode(location)})
 
 
+class StageTimedNotification(namedtuple(
+        'StageTimedNotification', 'msg_type course_id location payload send_at scope_context'
+)):
+    """
+    Parameters of a timed notification sent to all project participants on a stage key date. Only holds plain data,
+    so that timers of all project stages can be collected and registered with notifications service together.
+    """
+    @property
+    def fingerprint(self):
+        """
+        :rtype: str
+        :returns: Hash of notification parameters - timers with equal fingerprints need not be registered again
+        """
+        return hashlib.sha1(json.dumps(self._asdict(), sort_keys=True, default=unicode)).hexdigest()
+
+
+def _make_timer_key(timer_name):
+    return TIMERS_KEY_PREFIX + hashlib.md5(timer_name.encode('utf-8')).hexdigest()
+
+
+class NotificationTimersQueue(BackgroundJobQueue):
+    """
+    Queue of notification timer registration jobs, keyed by timer name.
+    """
+    WORKER_THREAD_NAME = "group-project-notification-timers"
+
+
+notification_timers_queue = NotificationTimersQueue()  # pylint: disable=invalid-name
+
+
+def _publish_timed_notification(timer_name, notification):
+    """
+    :param unicode timer_name: Timer name
+    :param StageTimedNotification notification: Notification parameters
+    """
+    msg = NotificationMessage(
+        msg_type=notifications_publisher.get_notification_type(notification.msg_type),
+        namespace=notification.course_id,
+        payload=notification.payload
+    )
+
+    add_click_link_params(msg, notification.course_id, notification.location)
+
+    notifications_publisher.publish_timed_notification(
+        msg=msg,
+        send_at=notification.send_at,
+        # send to all students participating in this project
+        scope_name=NotificationScopes.PARTICIPANTS,
+        scope_context=notification.scope_context,
+        timer_name=timer_name,
+        ignore_if_past_due=True  # don't send if we're already late!
+    )
+
+
+def _update_timed_notification(timer_name, notification):
+    """
+    Registers or cancels a notification timer and records its fingerprint. Runs in background, so it uses
+    notifications publisher API instead of the runtime service, and releases database connections it opened.
+    :param unicode timer_name: Timer name
+    :param StageTimedNotification|None notification: Notification parameters; None to cancel the timer
+    """
+    close_old_connections()
+    try:
+        if notification is None:
+            notifications_publisher.cancel_timed_notification(timer_name)
+            caches[TIMERS_CACHE_ALIAS].delete(_make_timer_key(timer_name))
+        else:
+            _publish_timed_notification(timer_name, notification)
+            caches[TIMERS_CACHE_ALIAS].set(_make_timer_key(timer_name), notification.fingerprint, TIMERS_TIMEOUT)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Failed to update notification timer %s", timer_name)
+    finally:
+        close_old_connections()
+
+
+def register_timed_notifications(timers):
+    """
+    Schedules registration of stage notification timers in background (see :class:`NotificationTimersQueue`).
+    Fingerprints of registered timers are kept in Django cache, and timers that did not change since they were
+    registered are skipped. Timers set to None are cancelled, if they were registered.
+    A fingerprint is only recorded once its timer is registered, so timers that failed to register, or were lost
+    with the process before registering, are registered by the next publish.
+    :param dict[unicode, StageTimedNotification|None] timers: Timers by name
+    :rtype: int
+    :returns: Number of timers scheduled to be registered or cancelled
+    """
+    timer_keys = {timer_name: _make_timer_key(timer_name) for timer_name in timers}
+    registered_fingerprints = caches[TIMERS_CACHE_ALIAS].get_many(timer_keys.values())
+
+    changed_timers = []
+    for timer_name, notification in sorted(timers.iteritems()):
+        registered_fingerprint = registered_fingerprints.get(timer_keys[timer_name])
+        if notification is None:
+            if registered_fingerprint is not None:
+                changed_timers.append((timer_name, None))
+        elif notification.fingerprint != registered_fingerprint:
+            changed_timers.append((timer_name, notification))
+
+    for timer_name, notification in changed_timers:
+        notification_timers_queue.enqueue(
+            (timer_name, ), functools.partial(_update_timed_notification, timer_name, notification)
+        )
+    log.info("Scheduled update of %s of %s notification timers", len(changed_timers), len(timers))
+    return len(changed_timers)
+
+
+def forget_timed_notifications(timer_names):
+    """
+    Drops fingerprints of timers cancelled by other means, so they are registered again if needed
+    :param collections.Iterable[unicode] timer_names: Timer names
+    """
+    caches[TIMERS_CACHE_ALIAS].delete_many([_make_timer_key(timer_name) for timer_name in timer_names])
+
+
+def _make_file_upload_message(msg_type, course_id, location, activity_name, uploader_username):
+    msg = NotificationMessage(
+        msg_type=msg_type,
+        namespace=course_id,
+        payload={
+            '_schema_version': 1,
+            'action_username': uploader_username,
+            'activity_name': activity_name,
+        }
+    )
+    add_click_link_params(msg, course_id, location)
+    return msg
+
+
+class UploadNotificationsQueue(BackgroundJobQueue):
+    """
+    Queue of file upload notification jobs, keyed by stage and workgroup.
+    """
+    WORKER_THREAD_NAME = "group-project-upload-notifications"
+
+
+class _UploadsDigest(object):
+    """
+    Uploads made to a stage by members of a workgroup, to be announced to the workgroup in a single notification.
+    Only holds plain data, as it is sent in background, through notifications publisher API.
+    """
+    def __init__(self, course_id, location, activity_name, members):
+        """
+        :param unicode course_id: Course ID
+        :param unicode location: Stage location
+        :param unicode activity_name: Activity display name
+        :param tuple[(int, unicode)] members: IDs and usernames of workgroup members
+        """
+        self.course_id = course_id
+        self.location = location
+        self.activity_name = activity_name
+        self.members = members
+        self.uploader_ids = OrderedDict()
+
+    def send(self):
+        # this NotificationType is registered in the list of default Open edX Notifications
+        msg_type = notifications_publisher.get_notification_type(NotificationMessageTypes.FILE_UPLOADED)
+        usernames = dict(self.members)
+
+        # recipients are not notified of their own uploads, so recipients who uploaded get a different digest
+        recipients_by_uploaders = OrderedDict()
+        for user_id, _username in self.members:
+            uploader_ids = tuple(uploader_id for uploader_id in self.uploader_ids if uploader_id != user_id)
+            if uploader_ids:
+                recipients_by_uploaders.setdefault(uploader_ids, []).append(user_id)
+
+        for uploader_ids, recipient_ids in recipients_by_uploaders.iteritems():
+            uploader_username = u", ".join(
+                usernames[uploader_id] for uploader_id in uploader_ids if usernames.get(uploader_id)
+            )
+            msg = _make_file_upload_message(
+                msg_type, self.course_id, self.location, self.activity_name, uploader_username
+            )
+            notifications_publisher.bulk_publish_notification_to_users(recipient_ids, msg)
+
+
+class FileUploadNotificationDispatcher(object):
+    """
+    Sends file upload notifications to workgroup members in background. Uploads made to a stage by a workgroup
+    within a window after the first one are announced in a single digest notification per recipient.
+    """
+    def __init__(self):
+        self._queue = UploadNotificationsQueue()
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def dispatch(self, stage, workgroup, user_id, delay=0):
+        """
+        :param BaseGroupActivityStage stage: Stage the file was uploaded to
+        :param group_project_v2.project_api.dtos.WorkgroupDetails workgroup: Uploader's workgroup
+        :param int user_id: Uploader ID
+        :param float delay: Digest window, in seconds - notification is sent after the delay
+        """
+        location = unicode(stage.location) if stage.location else ''
+        key = (location, workgroup.id)
+        with self._lock:
+            digest = self._pending.get(key)
+            is_new_digest = digest is None
+            if is_new_digest:
+                members = tuple((user.id, user.username) for user in workgroup.users)
+                digest = _UploadsDigest(unicode(stage.course_id), location, stage.activity.display_name, members)
+                self._pending[key] = digest
+            digest.uploader_ids[user_id] = True
+
+        if is_new_digest:
+            self._queue.enqueue(key, functools.partial(self._send, key), delay)
+
+    def _send(self, key):
+        with self._lock:
+            digest = self._pending.pop(key)
+        log.info("Sending file upload notification on location = %s to group id = %s", *key)
+        close_old_connections()
+        try:
+            digest.send()
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Failed to send file upload notification on location = %s to group id = %s", *key)
+        finally:
+            close_old_connections()
+
+    def join(self, timeout=None):
+        """
+        Waits until all pending notifications are sent
+        :param float|None timeout: Maximum time to wait, in seconds
+        :rtype: bool
+        """
+        return self._queue.join(timeout)
+
+
+upload_notification_dispatcher = FileUploadNotificationDispatcher()  # pylint: disable=invalid-name
+
+
 class StageNotificationsMixin(object):
+    BATCH_NOTIFICATION_TIMERS_KEY = 'batch_notification_timers'
+    STAGE_TIMERS = (NotificationTimers.OPEN, NotificationTimers.DUE, NotificationTimers.COMING_DUE)
+
     def _get_stage_timer_name(self, timer_name_suffix):
         return '{location}-{timer_name_suffix}'.format(
             location=unicode(self.location),
             timer_name_suffix=timer_name_suffix
         )
 
-    # pylint: disable=too-many-arguments
-    def _set_activity_timed_notification(self, course_id, msg_type, event_date, send_at_date,
-                                         services, timer_name_suffix):
-
-        notifications_service = services.get('notifications')
-
+    def _make_timed_notification(self, course_id, msg_type, event_date, send_at_date):
         activity_date_tz = event_date.replace(tzinfo=pytz.UTC)
-        send_at_date_tz = send_at_date.replace(tzinfo=pytz.UTC)
 
-        msg = NotificationMessage(
-            msg_type=notifications_service.get_notification_type(msg_type),
-            namespace=unicode(course_id),
+        return StageTimedNotification(
+            msg_type=msg_type,
+            course_id=unicode(course_id),
+            location=unicode(self.location),
             payload={
                 '_schema_version': 1,
                 'activity_name': self.activity.display_name,
                 'stage': self.display_name,
                 'due_date': activity_date_tz.strftime('%-m/%-d/%-y'),
-            }
-        )
-
-        add_click_link_params(msg, course_id, self.location)
-
-        notifications_service.publish_timed_notification(
-            msg=msg,
-            send_at=send_at_date_tz,
-            # send to all students participating in this project
-            scope_name=NotificationScopes.PARTICIPANTS,
+            },
+            send_at=send_at_date.replace(tzinfo=pytz.UTC),
             scope_context={
                 'course_id': unicode(course_id),
                 'content_id': unicode(self.activity.project.location),
             },
-            timer_name=self._get_stage_timer_name(timer_name_suffix),
-            ignore_if_past_due=True  # don't send if we're already late!
         )
 
+    def get_notification_timers(self, course_id):
+        """
+        Collects notifications to be sent on stage key dates
+        :param CourseLocator course_id: Course ID
+        :rtype: dict[unicode, StageTimedNotification|None]
+        :returns: Notifications by timer name; None for stage timers that are not needed
+        """
+        timers = dict.fromkeys(self._get_stage_timer_name(timer_suffix) for timer_suffix in self.STAGE_TIMERS)
+
+        if self.open_date:
+            open_date = datetime.combine(self.open_date, datetime.min.time())
+            timers[self._get_stage_timer_name(NotificationTimers.OPEN)] = self._make_timed_notification(
+                course_id, NotificationMessageTypes.STAGE_OPEN, open_date, open_date
+            )
+
+        if self.close_date:
+            close_date = datetime.combine(self.close_date, datetime.min.time())
+            timers[self._get_stage_timer_name(NotificationTimers.DUE)] = self._make_timed_notification(
+                course_id, NotificationMessageTypes.STAGE_DUE, close_date, close_date
+            )
+            # send a notice 3 days prior to closing stage
+            timers[self._get_stage_timer_name(NotificationTimers.COMING_DUE)] = self._make_timed_notification(
+                course_id, NotificationMessageTypes.STAGE_DUE, close_date, close_date - timedelta(days=3)
+            )
+
+        return timers
+
     @log_and_suppress_exceptions
     def on_studio_published(self, course_id, services):
         """
         A hook into when this xblock is published in Studio. When we are published we should
-        register a Notification to be send on key dates
+        register a Notification to be send on key dates. If batch registration is enabled, timers of all project
+        stages are registered by the project instead (see `GroupProjectXBlock.schedule_notification_timers`).
         """
         log.info('{}.on_published() on location = {}'.format(self.__class__.__name__, self.location))
 
         notifications_service = services.get('notifications')
-        if notifications_service:
-            if self.open_date:
-                self._set_activity_timed_notification(
-                    course_id,
-                    NotificationMessageTypes.STAGE_OPEN,
-                    datetime.combine(self.open_date, datetime.min.time()),
-                    datetime.combine(self.open_date, datetime.min.time()),
-                    services,
-                    NotificationTimers.OPEN
-                )
-
-            if self.close_date:
-                self._set_activity_timed_notification(
-                    course_id,
-                    NotificationMessageTypes.STAGE_DUE,
-                    datetime.combine(self.close_date, datetime.min.time()),
-                    datetime.combine(self.close_date, datetime.min.time()),
-                    services,
-                    NotificationTimers.DUE
-                )
-
-                # send a notice 3 days prior to closing stage
-                self._set_activity_timed_notification(
-                    course_id,
-                    NotificationMessageTypes.STAGE_DUE,
-                    datetime.combine(self.close_date, datetime.min.time()),
-                    datetime.combine(self.close_date, datetime.min.time()) - timedelta(days=3),
-                    services,
-                    NotificationTimers.COMING_DUE
-                )
+        if not notifications_service:
+            return
+
+        if self._get_setting(self.BATCH_NOTIFICATION_TIMERS_KEY, False):
+            log.debug("Notification timers of %s are registered in batch by the project", self.location)
+            return
+
+        register_timed_notifications(self.get_notification_timers(course_id))
 
     @log_and_suppress_exceptions
     def on_before_studio_delete(self, _course_id, services):
@@ -142,41 +381,21 @@ class StageNotificationsMixin(object):
         if notifications_service:
             # If stage is being deleted, then it should remove any NotificationTimers that
             # may have been registered before
-            for timer_suffix in (NotificationTimers.OPEN, NotificationTimers.DUE, NotificationTimers.COMING_DUE):
-                notifications_service.cancel_timed_notification(self._get_stage_timer_name(timer_suffix))
+            timer_names = [self._get_stage_timer_name(timer_suffix) for timer_suffix in self.STAGE_TIMERS]
+            for timer_name in timer_names:
+                notifications_service.cancel_timed_notification(timer_name)
+            forget_timed_notifications(timer_names)
 
     @log_and_suppress_exceptions
-    def fire_file_upload_notification(self, notifications_service):
-
-        log.info('{}.fire_file_upload_notification on location = {}'.format(self.__class__.__name__, self.location))
-
-        # this NotificationType is registered in the list of default Open edX Notifications
-        msg_type = notifications_service.get_notification_type(NotificationMessageTypes.FILE_UPLOADED)
-
-        workgroup_user_ids = []
-        uploader_username = ''
-        for user in self.workgroup.users:
-            # don't send to ourselves
-            if user.id != self.user_id:
-                workgroup_user_ids.append(user.id)
-            else:
-                uploader_username = user.username
-
-        msg = NotificationMessage(
-            msg_type=msg_type,
-            namespace=unicode(self.course_id),
-            payload={
-                '_schema_version': 1,
-                'action_username': uploader_username,
-                'activity_name': self.activity.display_name,
-            }
-        )
-        location = unicode(self.location) if self.location else ''
-        add_click_link_params(msg, unicode(self.course_id), location)
-
-        # NOTE: We're not using Celery here since we are expecting that we
-        # will have only a very small handful of workgroup users
-        notifications_service.bulk_publish_notification_to_users(workgroup_user_ids, msg)
+    def dispatch_file_upload_notification(self, workgroup, user_id, delay=0):
+        """
+        Notifies other workgroup members of uploaded file in background, see
+        :class:`FileUploadNotificationDispatcher`. Callers check that notifications service is available.
+        :param group_project_v2.project_api.dtos.WorkgroupDetails workgroup: Uploader's workgroup
+        :param int user_id: Uploader ID
+        :param float delay: Digest window, in seconds
+        """
+        upload_notification_dispatcher.dispatch(self, workgroup, user_id, delay)
 
     @log_and_suppress_exceptions
     def fire_grades_posted_notification(self, group_id, notifications_service):
@@ -0,0 +1,141 @@
+"""
+Deferred processing of uploaded submissions.
+
+When `async_upload_processing` key of `group_project_v2` XBlock settings bucket (`XBLOCK_SETTINGS` Django setting) is
+set, upload request only stores the file and creates a post-upload job holding the data needed to record the
+submission. Recording the submission, analytics events, notifications and stage completion are done by the requests
+the client sends to poll job status: XBlock runtime builds the block for each of them as usual, and the request that
+claims the job processes it. Jobs only hold plain data and are kept in Django cache, so they can be processed by
+any process using the same cache backend. If a process exits while processing a job, the claim expires and the job
+is processed by a later request - status poll, or the next render of the submission by the uploader.
+"""
+import hashlib
+import logging
+import uuid
+
+from django.core.cache import caches
+
+log = logging.getLogger(__name__)
+
+JOBS_CACHE_ALIAS = 'default'
+JOB_KEY_PREFIX = 'group_project_v2:post_upload:'
+PENDING_JOB_KEY_PREFIX = 'group_project_v2:post_upload:pending:'
+CLAIM_KEY_PREFIX = 'group_project_v2:post_upload:claim:'
+JOB_TIMEOUT = 24 * 60 * 60
+CLAIM_TIMEOUT = 60
+
+
+class PostUploadState(object):
+    PENDING = 'pending'
+    COMPLETE = 'complete'
+    FAILED = 'failed'
+    UNKNOWN = 'unknown'
+
+
+def _make_job_key(job_id):
+    return JOB_KEY_PREFIX + job_id
+
+
+def _make_pending_job_key(upload_key, user_id):
+    return PENDING_JOB_KEY_PREFIX + hashlib.md5(u"{}:{}".format(upload_key, user_id).encode('utf-8')).hexdigest()
+
+
+def _make_claim_key(job_id):
+    return CLAIM_KEY_PREFIX + job_id
+
+
+def _get_job(job_id, user_id):
+    job = caches[JOBS_CACHE_ALIAS].get(_make_job_key(job_id))
+    if job is None or job['user_id'] != user_id:
+        return None
+    return job
+
+
+def _get_status(job):
+    if job is None:
+        return {'state': PostUploadState.UNKNOWN, 'data': {}}
+    return {'state': job['state'], 'data': job['data']}
+
+
+def _set_job_state(job_id, job, state, data):
+    job = dict(job, state=state, data=data)
+    caches[JOBS_CACHE_ALIAS].set(_make_job_key(job_id), job, JOB_TIMEOUT)
+    return job
+
+
+def create_job(upload_key, user_id, job_data):
+    """
+    Creates pending post-upload job. Only the latest job of a user for an upload is kept pending for recovery, as
+    it supersedes the earlier ones.
+    :param unicode upload_key: Upload identifier - i.e. submission block usage ID
+    :param int|str user_id: ID of the user who uploaded the file - only they can see the status
+    :param dict job_data: Plain data needed to process the job
+    :rtype: str
+    :returns: Job ID
+    """
+    job_id = uuid.uuid4().hex
+    cache = caches[JOBS_CACHE_ALIAS]
+    job = {'user_id': user_id, 'upload_key': upload_key, 'job_data': job_data}
+    _set_job_state(job_id, job, PostUploadState.PENDING, {})
+    cache.set(_make_pending_job_key(upload_key, user_id), job_id, JOB_TIMEOUT)
+    return job_id
+
+
+def get_job_status(job_id, user_id):
+    """
+    :param str job_id: Job ID
+    :param int|str user_id: ID of the user asking for the status
+    :rtype: dict
+    """
+    return _get_status(_get_job(job_id, user_id))
+
+
+def get_pending_job_id(upload_key, user_id):
+    """
+    :param unicode upload_key: Upload identifier
+    :param int|str user_id: Uploader ID
+    :rtype: str|None
+    :returns: ID of user's latest job for the upload, if it is not processed yet
+    """
+    return caches[JOBS_CACHE_ALIAS].get(_make_pending_job_key(upload_key, user_id))
+
+
+def process_job(job_id, user_id, processor):
+    """
+    Processes pending job, unless it is already processed or being processed by another request
+    :param str job_id: Job ID
+    :param int|str user_id: ID of the user asking for the status
+    :param callable processor: Callable receiving job data and returning response data for the client; errors are
+        reported by raising
+    :rtype: dict
+    :returns: Job status
+    """
+    cache = caches[JOBS_CACHE_ALIAS]
+    job = _get_job(job_id, user_id)
+    if job is None or job['state'] != PostUploadState.PENDING:
+        return _get_status(job)
+
+    claim_key = _make_claim_key(job_id)
+    if not cache.add(claim_key, True, CLAIM_TIMEOUT):
+        return _get_status(job)
+
+    try:
+        # job might have been completed by the previous claim holder since it was read
+        job = _get_job(job_id, user_id)
+        if job is None or job['state'] != PostUploadState.PENDING:
+            return _get_status(job)
+
+        try:
+            job = _set_job_state(job_id, job, PostUploadState.COMPLETE, processor(job['job_data']))
+        except Exception as exception:  # pylint: disable=broad-except
+            log.exception("Post-upload processing %s failed", job_id)
+            job = _set_job_state(
+                job_id, job, PostUploadState.FAILED, {'message': getattr(exception, 'message', '')}
+            )
+
+        pending_job_key = _make_pending_job_key(job['upload_key'], user_id)
+        if cache.get(pending_job_key) == job_id:
+            cache.delete(pending_job_key)
+        return _get_status(job)
+    finally:
+        cache.delete(claim_key)
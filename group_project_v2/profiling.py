@@ -0,0 +1,143 @@
+"""
+Opt-in profiling of XBlock views and handlers.
+
+Configured by `profiling` key of `group_project_v2` XBlock settings bucket (`XBLOCK_SETTINGS` Django setting). The
+bucket is read from Django settings directly, so that blocks that do not use settings service can be profiled too.
+When enabled, a request is profiled if it has the profiling header matching the configured token or is picked by the
+sampling rate; without a token, the header is ignored, so that clients cannot trigger profiling at will. cProfile
+stats are dumped to the output directory, one file per request, and only the most recent files are kept. Stats can
+be inspected with `pstats` or any tool reading cProfile output.
+
+Views render child blocks' views, so only the outermost profiled call in a thread is profiled.
+"""
+import cProfile
+import functools
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from webob import Request
+
+from group_project_v2.utils import get_xblock_settings_bucket
+
+try:
+    from crum import get_current_request  # pylint: disable=import-error
+except ImportError:
+    # django-crum is installed in Open edX, but not otherwise required - views can only be sampled without it
+    def get_current_request():
+        return None
+
+log = logging.getLogger(__name__)
+
+PROFILING_KEY = 'profiling'
+DEFAULT_HEADER = 'X-Group-Project-Profile'
+DEFAULT_MAX_PROFILES = 100
+DEFAULT_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), 'group_project_v2_profiles')
+PROFILE_FILE_EXTENSION = '.prof'
+
+_state = threading.local()  # pylint: disable=invalid-name
+_cleanup_lock = threading.Lock()  # pylint: disable=invalid-name
+
+
+def get_profiling_settings():
+    """
+    :rtype: dict
+    """
+    return get_xblock_settings_bucket().get(PROFILING_KEY) or {}
+
+
+def _get_header(request, header):
+    if isinstance(request, Request):
+        return request.headers.get(header)
+    if request is not None and hasattr(request, 'META'):
+        # Django request
+        return request.META.get('HTTP_' + header.upper().replace('-', '_'))
+    return None
+
+
+def should_profile(profiling_settings, request):
+    """
+    :param dict profiling_settings: Profiling settings
+    :param webob.Request|django.http.HttpRequest|None request: Current request, if known
+    :rtype: bool
+    """
+    if not profiling_settings.get('enabled', False):
+        return False
+
+    token = profiling_settings.get('token')
+    if token and _get_header(request, profiling_settings.get('header', DEFAULT_HEADER)) == token:
+        return True
+
+    return random.random() < profiling_settings.get('sample_rate', 0)
+
+
+def _cleanup(output_dir, max_profiles):
+    with _cleanup_lock:
+        file_names = sorted(
+            file_name for file_name in os.listdir(output_dir) if file_name.endswith(PROFILE_FILE_EXTENSION)
+        )
+        for file_name in file_names[:-max(max_profiles, 1)]:
+            try:
+                os.remove(os.path.join(output_dir, file_name))
+            except OSError:  # removed by other process
+                pass
+
+
+def save_profile(profile, profiling_settings, name):
+    """
+    Dumps profile stats to the output directory and removes the oldest profiles over the limit
+    :param cProfile.Profile profile: Profile
+    :param dict profiling_settings: Profiling settings
+    :param str name: Profiled block and method name
+    :rtype: str
+    :returns: Profile file path
+    """
+    output_dir = profiling_settings.get('output_dir', DEFAULT_OUTPUT_DIR)
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    # names start with timestamp, so sorting them sorts profiles by time
+    file_name = "{timestamp}-{name}-{unique_id}{extension}".format(
+        timestamp=time.strftime("%Y%m%d%H%M%S"), name=name, unique_id=uuid.uuid4().hex[:8],
+        extension=PROFILE_FILE_EXTENSION
+    )
+    path = os.path.join(output_dir, file_name)
+    profile.dump_stats(path)
+    _cleanup(output_dir, profiling_settings.get('max_profiles', DEFAULT_MAX_PROFILES))
+    return path
+
+
+def profiled(func):
+    """
+    Decorator for XBlock views and handlers, profiling them if profiling is enabled and requested. Handlers get
+    request as the first argument; for views, current Django request is used, if available. Must be applied on
+    top of `XBlock.handler` and `XBlock.json_handler` decorators, so that it receives the request.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if getattr(_state, 'active', False):
+            return func(self, *args, **kwargs)
+
+        profiling_settings = get_profiling_settings()
+        request = args[0] if args and isinstance(args[0], Request) else get_current_request()
+        if not should_profile(profiling_settings, request):
+            return func(self, *args, **kwargs)
+
+        profile = cProfile.Profile()
+        _state.active = True
+        try:
+            return profile.runcall(func, self, *args, **kwargs)
+        finally:
+            _state.active = False
+            name = "{}.{}".format(self.__class__.__name__, func.__name__)
+            try:
+                path = save_profile(profile, profiling_settings, name)
+                log.info("Saved profile of %s to %s", name, path)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Failed to save profile of %s", name)
+
+    return wrapper
@@ -1,14 +1,18 @@
+import functools
 import json
+import logging
+from collections import defaultdict
 from urllib import urlencode
 
 import itertools
 
-from group_project_v2.api_error import api_error_protect
+from group_project_v2.api_error import ApiError, api_error_protect
 from group_project_v2.json_requests import DELETE, GET, PUT, POST
-from group_project_v2.utils import memoize_with_expiration, build_date_field, is_absolute
+from group_project_v2.utils import is_absolute, map_concurrently
+from group_project_v2.project_api.cache_policies import memoize_api_call
 from group_project_v2.project_api.dtos import (
     UserDetails, ProjectDetails, WorkgroupDetails, CompletionDetails,
-    OrganisationDetails, UserGroupDetails
+    OrganisationDetails, UserGroupDetails, ReducedUserDetails, SubmissionDetails
 )
 
 API_PREFIX = '/'.join(['api', 'server'])
@@ -22,6 +26,11 @@ COURSES_API = '/'.join([API_PREFIX, 'courses'])
 PROJECTS_API = '/'.join([API_PREFIX, 'projects'])
 ORGANIZATIONS_API = '/'.join([API_PREFIX, 'organizations'])
 
+log = logging.getLogger(__name__)
+
+# Maximum number of API requests sent concurrently by methods that fan out to multiple endpoints
+MAX_CONCURRENT_REQUESTS = 4
+
 
 # TODO: this class crosses service boundary, but some methods post-process responses, while other do not
 # There're two things to improve:
@@ -37,6 +46,10 @@ class ProjectAPI(object):
         self._api_server_address = address
         self.dry_run = dry_run
 
+    def __repr__(self):
+        # used in memoized methods cache keys, so must be the same in all processes
+        return "{}({!r}, dry_run={})".format(type(self).__name__, self._api_server_address, self.dry_run)
+
     def build_url(self, url_parts, query_params=None, no_trailing_slash=False):
         url = "/".join([str(url_part) for url_part in url_parts])
         if not is_absolute(url):
@@ -67,12 +80,12 @@ class ProjectAPI(object):
         url = self.build_url(url_parts, query_params, no_trailing_slash)
         return self._do_send_request(method, url, data)
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_user_organizations(self, user_id):
         qs_params = {'page_size': 0}
         return self.send_request(GET, (USERS_API, user_id, 'organizations'), query_params=qs_params)
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_user_preferences(self, user_id):
         """ gets users preferences information """
         return self.send_request(GET, (USERS_API, user_id, 'preferences'), no_trailing_slash=True)
@@ -119,14 +132,11 @@ class ProjectAPI(object):
 
         return self.send_request(POST, (WORKGROUP_API, group_id, 'grades'), data=grade_data)
 
-    def create_submission(self, submit_hash):
-        return self.send_request(POST, (SUBMISSION_API, ), data=submit_hash)
-
-    # Do not cache - Upload submission handler updates a list of submissions, than queries which submissions are there
+    # Do not cache - see TypedProjectAPI.get_latest_workgroup_submissions_by_id for cached submissions
     def get_workgroup_submissions(self, group_id):
         return self.send_request(GET, (WORKGROUP_API, group_id, 'submissions'))
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_review_assignment_groups(self, user_id, course_id, xblock_id):
         qs_params = {
             "course": course_id,
@@ -177,64 +187,6 @@ class ProjectAPI(object):
             if gri['reviewer'] == reviewer_id and gri['content_id'] == content_id
         ]
 
-    def submit_peer_review_items(self, reviewer_id, peer_id, group_id, content_id, data):
-        # get any data already there
-        current_data = {pi['question']: pi for pi in
-                        self.get_peer_review_items(reviewer_id, peer_id, group_id, content_id)}
-        for question_id, answer in data.iteritems():
-            if question_id in current_data:
-                question_data = current_data[question_id]
-
-                if question_data['answer'] != answer:
-                    if len(answer) > 0:
-                        # update with relevant data
-                        del question_data['created']
-                        del question_data['modified']
-                        question_data['answer'] = answer
-
-                        self.update_peer_review_assessment(question_data)
-                    else:
-                        self.delete_peer_review_assessment(question_data['id'])
-
-            elif len(answer) > 0:
-                question_data = {
-                    "question": question_id,
-                    "answer": answer,
-                    "workgroup": group_id,
-                    "user": peer_id,
-                    "reviewer": reviewer_id,
-                    "content_id": content_id,
-                }
-                self.create_peer_review_assessment(question_data)
-
-    def submit_workgroup_review_items(self, reviewer_id, group_id, content_id, data):
-        # get any data already there
-        current_data = {ri['question']: ri for ri in self.get_workgroup_review_items(reviewer_id, group_id, content_id)}
-        for question_id, answer in data.iteritems():
-            if question_id in current_data:
-                question_data = current_data[question_id]
-
-                if question_data['answer'] != answer:
-                    if len(answer) > 0:
-                        # update with relevant data
-                        del question_data['created']
-                        del question_data['modified']
-                        question_data['answer'] = answer
-
-                        self.update_workgroup_review_assessment(question_data)
-                    else:
-                        self.delete_workgroup_review_assessment(question_data['id'])
-
-            elif len(answer) > 0:
-                question_data = {
-                    "question": question_id,
-                    "answer": answer,
-                    "workgroup": group_id,
-                    "reviewer": reviewer_id,
-                    "content_id": content_id,
-                }
-                self.create_workgroup_review_assessment(question_data)
-
 
 class TypedProjectAPI(ProjectAPI):
     """
@@ -242,6 +194,37 @@ class TypedProjectAPI(ProjectAPI):
     Some of the methods may return non-reentrant iterables (i.e. generators) - clients are responsible to
     convert them to reentrant collection if need more than one pass over the response
     """
+    # HTTP error codes meaning the server does not support bulk review items endpoint
+    BULK_ENDPOINT_MISSING_CODES = (404, 405, 501)
+
+    def __init__(self, address, dry_run=False):
+        super(TypedProjectAPI, self).__init__(address, dry_run)
+        self._missing_bulk_endpoints = set()
+
+    @classmethod
+    def get_coalescing_stats(cls):
+        """
+        Reports how many calls to memoized methods were coalesced with identical in-flight calls.
+        :rtype: dict[str, dict[str, int]]
+        :returns: Total and coalesced calls count by method name
+        """
+        stats = {}
+        for name in dir(cls):
+            single_flight = getattr(getattr(cls, name), 'single_flight', None)
+            if single_flight is not None:
+                stats[name] = {'calls': single_flight.calls, 'coalesced': single_flight.coalesced}
+        return stats
+
+    @classmethod
+    def clear_local_caches(cls):
+        """
+        Drops values cached in process memory by memoized methods.
+        """
+        for name in dir(cls):
+            cache = getattr(getattr(cls, name), 'cache', None)
+            if cache is not None:
+                cache.clear()
+
     def _consume_paged_response(self, method, entry_url, data=None):
         next_page_url = entry_url
 
@@ -252,16 +235,16 @@ class TypedProjectAPI(ProjectAPI):
 
             next_page_url = response.get('next')
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_user_details(self, user_id):
         """
         :param int user_id: User ID
         :rtype: UserDetails
         """
         response = self.send_request(GET, (USERS_API, user_id), no_trailing_slash=True)
-        return UserDetails(**response)  # pylint: disable=star-args
+        return UserDetails.from_dict(response)
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_project_by_content_id(self, course_id, content_id):
         """
         :param str course_id: Course ID
@@ -278,27 +261,37 @@ class TypedProjectAPI(ProjectAPI):
             return None
 
         project = response['results'][0]
-        return ProjectDetails(**project)
+        return ProjectDetails.from_dict(project)
 
-    @memoize_with_expiration()
+    def get_projects_for_course(self, course_id):
+        """
+        :param str course_id: Course ID
+        :rtype: collections.Iterable[ProjectDetails]
+        """
+        url = self.build_url((PROJECTS_API,), query_params={'course_id': course_id})
+
+        for item in self._consume_paged_response(GET, url):
+            yield ProjectDetails.from_dict(item)
+
+    @memoize_api_call
     def get_project_details(self, project_id):
         """
         :param int project_id: Project ID
         :rtype: ProjectDetails
         """
         response = self.send_request(GET, (PROJECTS_API, project_id), no_trailing_slash=True)
-        return ProjectDetails(**response)  # pylint: disable=star-args
+        return ProjectDetails.from_dict(response)
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_workgroup_by_id(self, group_id):
         """
         :param int group_id: Group ID
         :rtype: WorkgroupDetails
         """
         response = self.send_request(GET, (WORKGROUP_API, group_id))
-        return WorkgroupDetails(**response)
+        return WorkgroupDetails.from_dict(response)
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_user_workgroup_for_course(self, user_id, course_id):
         """
         :param int user_id: User ID
@@ -326,17 +319,17 @@ class TypedProjectAPI(ProjectAPI):
         url = self.build_url((COURSES_API, course_id, 'completions'), query_params=query_parameters)
 
         for item in self._consume_paged_response(GET, url):
-            yield CompletionDetails(**item)
+            yield CompletionDetails.from_dict(item)
 
     # TODO: add tests
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_workgroups_for_assignment(self, assignment_id):
         """
         :param int assignment_id: Assignment ID
         :rtype: list[WorkgroupDetails]
         """
         workgroups = self.send_request(GET, (GROUP_API, assignment_id, 'workgroups'), no_trailing_slash=True)
-        return [WorkgroupDetails(**item) for item in workgroups["results"]]
+        return [WorkgroupDetails.from_dict(item) for item in workgroups["results"]]
 
     # TODO: add tests
     def get_workgroups_to_review(self, user_id, course_id, xblock_id):
@@ -355,29 +348,353 @@ class TypedProjectAPI(ProjectAPI):
             )
         )
 
+    def _get_review_assignment_urls(self, group_id, content_id):
+        review_assignments = self.send_request(GET, (WORKGROUP_API, group_id, 'groups'), no_trailing_slash=True)
+        return [
+            # stripping slashes as we're adding it in send_request anyway
+            review_assignment["url"].strip("/")
+            for review_assignment in review_assignments
+            if review_assignment["data"]["xblock_id"] == content_id
+        ]
+
+    def _get_review_assignment_users(self, *review_assignment_url_parts):
+        review_assignment_details = self.send_request(GET, review_assignment_url_parts + ('users',))
+        return [ReducedUserDetails.from_dict(user) for user in review_assignment_details["users"]]
+
+    @memoize_api_call
+    def get_reviewers_for_workgroup(self, group_id, content_id):
+        """
+        :param int group_id: Workgroup ID
+        :param str content_id: Activity content ID
+        :rtype: list[ReducedUserDetails]
+        """
+        return self.get_reviewers_for_workgroups([group_id], content_id)[group_id]
+
+    def get_reviewers_for_workgroups(self, group_ids, content_id):
+        """
+        Resolves reviewers for multiple workgroups at once. Review assignments and their users are fetched
+        concurrently; review assignments shared by multiple workgroups are fetched only once.
+        :param collections.Iterable[int] group_ids: Workgroup IDs
+        :param str content_id: Activity content ID
+        :rtype: dict[int, list[ReducedUserDetails]]
+        :returns: Reviewers (without duplicates) by workgroup ID
+        """
+        group_ids = list(group_ids)
+        assignment_urls = map_concurrently(
+            lambda group_id: self._get_review_assignment_urls(group_id, content_id), group_ids, MAX_CONCURRENT_REQUESTS
+        )
+        unique_urls = sorted(set(itertools.chain.from_iterable(assignment_urls)))
+        users_by_url = dict(zip(
+            unique_urls, map_concurrently(self._get_review_assignment_users, unique_urls, MAX_CONCURRENT_REQUESTS)
+        ))
+
+        reviewers = {}
+        for group_id, urls in zip(group_ids, assignment_urls):
+            reviewer_ids, group_reviewers = set(), []
+            for user in itertools.chain.from_iterable(users_by_url[url] for url in urls):
+                if user.id not in reviewer_ids:
+                    reviewer_ids.add(user.id)
+                    group_reviewers.append(user)
+            reviewers[group_id] = group_reviewers
+        return reviewers
+
+    @staticmethod
+    def _get_review_item_changes(current_items, data, new_item_data):
+        """
+        Diffs submitted answers against existing review items
+        :param list[dict] current_items: Existing review items
+        :param dict data: Submitted answers by question ID
+        :param dict new_item_data: Data to populate created review items with
+        :rtype: (list[dict], list[dict], list[int])
+        :returns: Review items to create, review items to update, IDs of review items to delete
+        """
+        current_data = {item['question']: item for item in current_items}
+        created, updated, deleted = [], [], []
+        for question_id, answer in data.iteritems():
+            if question_id in current_data:
+                question_data = current_data[question_id]
+                if question_data['answer'] == answer:
+                    continue
+                if len(answer) > 0:
+                    item = {
+                        key: value for key, value in question_data.iteritems() if key not in ('created', 'modified')
+                    }
+                    item['answer'] = answer
+                    updated.append(item)
+                else:
+                    deleted.append(question_data['id'])
+            elif len(answer) > 0:
+                item = dict(new_item_data, question=question_id, answer=answer)
+                created.append(item)
+
+        return created, updated, deleted
+
+    def _submit_review_item_changes(self, api_url, changes, create, update, delete):
+        """
+        Submits review item changes in a single request to bulk endpoint at `api_url`. If server does not support
+        bulk endpoint, falls back to concurrent per-item requests. Each change targets a different review item, so
+        they do not depend on each other; if some of them fail, the rest are still saved, and resubmitting the review
+        only sends the changes that failed.
+        :param str api_url: Review items API URL
+        :param (list[dict], list[dict], list[int]) changes: Review item changes - see _get_review_item_changes
+        :param callable create: Creates single review item
+        :param callable update: Updates single review item
+        :param callable delete: Deletes single review item
+        """
+        created, updated, deleted = changes
+        if not (created or updated or deleted):
+            return
+
+        if api_url not in self._missing_bulk_endpoints:
+            bulk_data = {'create': created, 'update': updated, 'delete': deleted}
+            try:
+                self.send_request(POST, (api_url, 'bulk'), data=bulk_data)
+                return
+            except ApiError as exception:
+                if exception.code not in self.BULK_ENDPOINT_MISSING_CODES:
+                    raise
+                log.warning("Bulk endpoint is not available at %s, falling back to per-item requests", api_url)
+                self._missing_bulk_endpoints.add(api_url)
+
+        # changes are identified by question ID (review item ID for deletes) - answers are not logged
+        operations = (
+            [(u"question {}".format(item['question']), functools.partial(create, item)) for item in created] +
+            [(u"question {}".format(item['question']), functools.partial(update, item)) for item in updated] +
+            [(u"review item {}".format(item_id), functools.partial(delete, item_id)) for item_id in deleted]
+        )
+
+        def apply_change(operation):
+            change_label, change = operation
+            try:
+                change()
+                return None
+            except ApiError as exception:
+                return change_label, exception
+
+        failures = [
+            failure for failure in map_concurrently(apply_change, operations, MAX_CONCURRENT_REQUESTS) if failure
+        ]
+        if failures:
+            log.error(
+                "%d of %d review item changes failed at %s, the rest are saved. Failed changes: %s",
+                len(failures), len(operations), api_url, u", ".join(change_label for change_label, _ in failures)
+            )
+            raise failures[0][1]
+
+    def submit_peer_review_items(self, reviewer_id, peer_id, group_id, content_id, data):
+        """
+        Creates, updates and deletes peer review items to match submitted answers
+        :param str reviewer_id: Reviewer anonymous ID
+        :param int peer_id: Reviewed user ID
+        :param int group_id: Workgroup ID
+        :param str content_id: Activity content ID
+        :param dict data: Answers by question ID; empty answer deletes review item
+        """
+        current_items = self.get_peer_review_items(reviewer_id, peer_id, group_id, content_id)
+        new_item_data = {"workgroup": group_id, "user": peer_id, "reviewer": reviewer_id, "content_id": content_id}
+        self._submit_review_item_changes(
+            PEER_REVIEW_API, self._get_review_item_changes(current_items, data, new_item_data),
+            self.create_peer_review_assessment, self.update_peer_review_assessment,
+            self.delete_peer_review_assessment
+        )
+
+    def submit_workgroup_review_items(self, reviewer_id, group_id, content_id, data):
+        """
+        Creates, updates and deletes workgroup review items to match submitted answers
+        :param str reviewer_id: Reviewer anonymous ID
+        :param int group_id: Workgroup ID
+        :param str content_id: Activity content ID
+        :param dict data: Answers by question ID; empty answer deletes review item
+        """
+        current_items = self.get_workgroup_review_items(reviewer_id, group_id, content_id)
+        new_item_data = {"workgroup": group_id, "reviewer": reviewer_id, "content_id": content_id}
+        self._submit_review_item_changes(
+            WORKGROUP_REVIEW_API, self._get_review_item_changes(current_items, data, new_item_data),
+            self.create_workgroup_review_assessment, self.update_workgroup_review_assessment,
+            self.delete_workgroup_review_assessment
+        )
+
+    @memoize_api_call
+    def get_workgroups_to_review_by_user(self, course_id, xblock_id):
+        """
+        Builds activity-wide mapping of users to workgroups they should review. Lists activity review assignments
+        (paged), then fetches users and workgroups of each assignment concurrently - much cheaper than calling
+        get_workgroups_to_review for every user.
+        :param str course_id: Course ID
+        :param str xblock_id: Block ID
+        :rtype: dict[int, list[WorkgroupDetails]]
+        """
+        query_params = {
+            "course": course_id,
+            "type": "reviewassignment",
+            "data__xblock_id": xblock_id,
+        }
+        assignments_url = self.build_url((GROUP_API,), query_params=query_params)
+        assignment_ids = [assignment["id"] for assignment in self._consume_paged_response(GET, assignments_url)]
+
+        def get_assignment_users_and_workgroups(assignment_id):
+            return (
+                self._get_review_assignment_users(GROUP_API, assignment_id),
+                self.get_workgroups_for_assignment(assignment_id)
+            )
+
+        workgroups_by_user = defaultdict(list)
+        for users, workgroups in map_concurrently(
+                get_assignment_users_and_workgroups, assignment_ids, MAX_CONCURRENT_REQUESTS
+        ):
+            for user in users:
+                workgroups_by_user[user.id].extend(workgroups)
+        return dict(workgroups_by_user)
+
     # TODO: make typed + add tests
+    def create_submission(self, submit_hash):
+        """
+        :param dict submit_hash: Submission data
+        """
+        response = self.send_request(POST, (SUBMISSION_API, ), data=submit_hash)
+        # upload submission handler queries submissions right after creating one
+        group_id = submit_hash['workgroup']
+        TypedProjectAPI.get_latest_workgroup_submissions_by_id.invalidate(self, group_id)
+        try:
+            project_id = self.get_workgroup_by_id(group_id).project
+        except ApiError:
+            log.exception(
+                "Failed to get project of workgroup %s, cached project submissions are kept until expiry", group_id
+            )
+        else:
+            TypedProjectAPI.get_latest_project_submissions_by_group.invalidate(self, project_id)
+        return response
+
+    @memoize_api_call
     def get_latest_workgroup_submissions_by_id(self, group_id):
         """
+        Gets latest submission for each upload (document ID) of the workgroup. User details are only fetched for
+        the latest submissions.
         :param int group_id: Group ID
-        :rtype: dict[dict]
+        :rtype: dict[str, SubmissionDetails]
         """
-        submission_list = self.get_workgroup_submissions(group_id)
+        submissions_by_id = self._get_latest_submissions(
+            SubmissionDetails.from_dict(submission_data)
+            for submission_data in self.get_workgroup_submissions(group_id)
+        )
 
-        submissions_by_id = {}
-        for submission in submission_list:
-            submission_id = submission['document_id']
-            if submission['user']:
-                submission[u'user_details'] = self.get_user_details(submission['user'])
-            if submission_id in submissions_by_id:
-                last_modified = build_date_field(submissions_by_id[submission_id]["modified"])
-                this_modified = build_date_field(submission["modified"])
-                if this_modified > last_modified:
-                    submissions_by_id[submission["document_id"]] = submission
-            else:
-                submissions_by_id[submission["document_id"]] = submission
+        user_ids = sorted(set(submission.user for submission in submissions_by_id.itervalues() if submission.user))
+        user_details = dict(zip(
+            user_ids, map_concurrently(self.get_user_details, user_ids, MAX_CONCURRENT_REQUESTS)
+        ))
+        for submission in submissions_by_id.itervalues():
+            submission.user_details = user_details.get(submission.user)
 
         return submissions_by_id
 
+    @staticmethod
+    def _get_latest_submissions(submissions):
+        """
+        Picks latest submission for each upload (document ID)
+        :param collections.Iterable[SubmissionDetails] submissions: Submissions
+        :rtype: dict[str, SubmissionDetails]
+        """
+        submissions_by_id = {}
+        for submission in submissions:
+            latest_submission = submissions_by_id.get(submission.document_id)
+            if latest_submission is None or submission.modified_date > latest_submission.modified_date:
+                submissions_by_id[submission.document_id] = submission
+        return submissions_by_id
+
+    @memoize_api_call
+    def get_latest_project_submissions_by_group(self, project_id):
+        """
+        Gets latest submission for each upload (document ID) of each workgroup of the project. Lists submissions of
+        all the project workgroups at once (paged). User details are not fetched.
+        If server ignores project filter - i.e. lists a submission of a workgroup that is not in the project - listing
+        is stopped and bulk endpoint is marked as missing.
+        :param int project_id: Project ID
+        :rtype: dict[int, dict[str, SubmissionDetails]] | None
+        :returns: Latest submissions by group, or None if server does not support listing submissions by project
+        """
+        project_group_ids = set(self.get_project_details(project_id).workgroups or ())
+        submissions_url = self.build_url((SUBMISSION_API,), query_params={'workgroup__project': project_id})
+        submissions_by_group = defaultdict(list)
+        for submission_data in self._consume_paged_response(GET, submissions_url):
+            submission = SubmissionDetails.from_dict(submission_data)
+            if submission.workgroup not in project_group_ids:
+                log.warning(
+                    "%s listed submission of workgroup %s outside of project %s - project filter is not supported, "
+                    "falling back to per-group requests", SUBMISSION_API, submission.workgroup, project_id
+                )
+                self._missing_bulk_endpoints.add(SUBMISSION_API)
+                return None
+            submissions_by_group[submission.workgroup].append(submission)
+
+        return {
+            group_id: self._get_latest_submissions(submissions)
+            for group_id, submissions in submissions_by_group.iteritems()
+        }
+
+    def get_latest_submissions_for_workgroups(self, group_ids, project_id):
+        """
+        Gets latest submission for each upload (document ID) of multiple workgroups of the project. Lists project
+        submissions in bulk; if server does not support listing submissions by project, falls back to fetching
+        submissions of each workgroup concurrently.
+        :param collections.Iterable[int] group_ids: Group IDs
+        :param int|None project_id: Project ID
+        :rtype: dict[int, dict[str, SubmissionDetails]]
+        """
+        group_ids = list(group_ids)
+        submissions_by_group = self._get_latest_project_submissions_if_available(project_id)
+        if submissions_by_group is not None:
+            return {group_id: submissions_by_group.get(group_id, {}) for group_id in group_ids}
+
+        return dict(zip(
+            group_ids,
+            map_concurrently(self.get_latest_workgroup_submissions_by_id, group_ids, MAX_CONCURRENT_REQUESTS)
+        ))
+
+    def get_submitted_document_urls(self, group_id, project_id):
+        """
+        Gets URLs of documents referred to by the latest submissions of all the project workgroups - or, if server
+        does not support listing submissions by project, of the workgroup alone.
+        :param int group_id: Group ID
+        :param int|None project_id: Project ID
+        :rtype: set[unicode]
+        """
+        submissions_by_group = self._get_latest_project_submissions_if_available(project_id)
+        if submissions_by_group is None:
+            submissions_by_group = {group_id: self.get_latest_workgroup_submissions_by_id(group_id)}
+
+        return set(
+            submission.document_url
+            for submissions in submissions_by_group.itervalues()
+            for submission in submissions.itervalues()
+        )
+
+    def _get_latest_project_submissions_if_available(self, project_id):
+        """
+        :param int|None project_id: Project ID
+        :rtype: dict[int, dict[str, SubmissionDetails]] | None
+        :returns: Latest submissions by group, see :meth:`get_latest_project_submissions_by_group`, or None if server
+            does not support listing submissions by project
+        """
+        if project_id is None or SUBMISSION_API in self._missing_bulk_endpoints:
+            return None
+
+        try:
+            submissions_by_group = self.get_latest_project_submissions_by_group(project_id)
+        except ApiError as exception:
+            if exception.code not in self.BULK_ENDPOINT_MISSING_CODES:
+                raise
+            log.warning(
+                "Listing submissions by project is not available at %s, falling back to per-group requests",
+                SUBMISSION_API
+            )
+            self._missing_bulk_endpoints.add(SUBMISSION_API)
+            return None
+
+        if submissions_by_group is None:
+            # result might come from shared cache, filled by another process
+            self._missing_bulk_endpoints.add(SUBMISSION_API)
+        return submissions_by_group
+
     # TODO: add tests + do something about different type of user_details.organization attribute
     def get_member_data(self, user_id):
         """
@@ -390,7 +707,7 @@ class TypedProjectAPI(ProjectAPI):
             user_details.organization = user_organizations[0]['display_name']  # and a string here
         return user_details
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_user_roles_for_course(self, user_id, course_id):
         """
         Returns role names user has for a given course.
@@ -407,19 +724,19 @@ class TypedProjectAPI(ProjectAPI):
         response = self.send_request(GET, (COURSES_API, course_id, 'roles'), query_params=qs_params)
         return set(role['role'] for role in response)
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_organization_by_id(self, org_id):
         """
         :param org_id:
         :return: Requested organization
         :rtype: OrganisationDetails
         """
-        return OrganisationDetails(**self.send_request(GET, (ORGANIZATIONS_API, org_id)))
+        return OrganisationDetails.from_dict(self.send_request(GET, (ORGANIZATIONS_API, org_id)))
 
     def get_user_permissions(self, user_id):
         return self.get_user_groups(user_id, "permission")
 
-    @memoize_with_expiration()
+    @memoize_api_call
     def get_user_groups(self, user_id, group_type=None):
         """
         :param user_id: User id
@@ -436,4 +753,4 @@ class TypedProjectAPI(ProjectAPI):
 
         response_json = self.send_request(GET, (USERS_API, user_id, 'groups'), query_params=data)
         list_of_groups = response_json['groups']
-        return list(UserGroupDetails(**group_dict) for group_dict in list_of_groups)
+        return [UserGroupDetails.from_dict(group_dict) for group_dict in list_of_groups]
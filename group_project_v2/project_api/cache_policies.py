@@ -0,0 +1,110 @@
+"""
+Per-method cache policies for memoized project API calls.
+
+Policies can be overridden via `api_cache_policies` key of `group_project_v2` XBlock settings bucket
+(`XBLOCK_SETTINGS` Django setting), e.g.:
+
+    "api_cache_policies": {
+        "default": {"ttl": 10, "max_size": 5000},
+        "get_user_roles_for_course": {"ttl": 600, "shared": true}
+    }
+
+`default` entry applies to all the methods; method-specific entries take precedence over it. Policies are built once
+and rebuilt only when `XBLOCK_SETTINGS` setting changes.
+"""
+import functools
+from datetime import timedelta
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from group_project_v2.utils import (
+    CachePolicy, get_xblock_settings_bucket, memoize_with_expiration, DEFAULT_EXPIRATION_TIME,
+    DEFAULT_STALE_GRACE_PERIOD
+)
+
+CACHE_POLICIES_KEY = 'api_cache_policies'
+DEFAULT_POLICY_NAME = 'default'
+
+DEFAULT_MAX_SIZE = 10000
+RARELY_CHANGED_DATA_EXPIRATION_TIME = timedelta(minutes=5)
+ACTIVITY_WIDE_DATA_EXPIRATION_TIME = timedelta(minutes=1)
+
+# Policy parameters (in settings format) used unless overridden by settings
+DEFAULT_POLICIES = {
+    DEFAULT_POLICY_NAME: {
+        'ttl': DEFAULT_EXPIRATION_TIME.total_seconds(),
+        'stale_grace_period': 0,
+        'max_size': DEFAULT_MAX_SIZE,
+        'shared': False,
+    },
+    'get_user_details': {'stale_grace_period': DEFAULT_STALE_GRACE_PERIOD.total_seconds()},
+    'get_project_by_content_id': {'stale_grace_period': DEFAULT_STALE_GRACE_PERIOD.total_seconds()},
+    'get_project_details': {'stale_grace_period': DEFAULT_STALE_GRACE_PERIOD.total_seconds()},
+    'get_workgroup_by_id': {'stale_grace_period': DEFAULT_STALE_GRACE_PERIOD.total_seconds()},
+    'get_organization_by_id': {
+        'ttl': RARELY_CHANGED_DATA_EXPIRATION_TIME.total_seconds(),
+        'stale_grace_period': DEFAULT_STALE_GRACE_PERIOD.total_seconds(),
+    },
+    'get_user_organizations': {'ttl': RARELY_CHANGED_DATA_EXPIRATION_TIME.total_seconds()},
+    'get_user_roles_for_course': {'ttl': RARELY_CHANGED_DATA_EXPIRATION_TIME.total_seconds()},
+    'get_workgroups_to_review_by_user': {
+        'ttl': ACTIVITY_WIDE_DATA_EXPIRATION_TIME.total_seconds(),
+        'stale_grace_period': DEFAULT_STALE_GRACE_PERIOD.total_seconds(),
+    },
+    # invalidated on upload, so must be shared - otherwise other processes would keep serving outdated submissions
+    'get_latest_workgroup_submissions_by_id': {'shared': True},
+    'get_latest_project_submissions_by_group': {'shared': True},
+}
+
+
+# Built policies by method name
+_policies = {}  # pylint: disable=invalid-name
+
+
+@receiver(setting_changed)
+def _reset_policies(setting, **kwargs):  # pylint: disable=unused-argument
+    if setting == 'XBLOCK_SETTINGS':
+        _policies.clear()
+
+
+def _get_configured_policies():
+    return get_xblock_settings_bucket().get(CACHE_POLICIES_KEY) or {}
+
+
+def _build_cache_policy(method_name):
+    configured_policies = _get_configured_policies()
+    parameters = {}
+    for policies in (DEFAULT_POLICIES, configured_policies):
+        parameters.update(policies.get(DEFAULT_POLICY_NAME, {}))
+    for policies in (DEFAULT_POLICIES, configured_policies):
+        parameters.update(policies.get(method_name, {}))
+
+    kwargs = {
+        'expires_after': timedelta(seconds=parameters['ttl']),
+        'stale_grace_period': timedelta(seconds=parameters['stale_grace_period']),
+        'max_size': parameters['max_size'],
+        'shared': parameters['shared'],
+    }
+    if 'cache_alias' in parameters:
+        kwargs['cache_alias'] = parameters['cache_alias']
+    return CachePolicy(**kwargs)
+
+
+def get_cache_policy(method_name):
+    """
+    Gets cache policy for an API method: settings overrides applied on top of defaults.
+    :param str method_name: API method name
+    :rtype: CachePolicy
+    """
+    policy = _policies.get(method_name)
+    if policy is None:
+        policy = _policies[method_name] = _build_cache_policy(method_name)
+    return policy
+
+
+def memoize_api_call(func):
+    """
+    Memoizes API method using cache policy configured for it, see :func:`get_cache_policy`
+    """
+    return memoize_with_expiration(policy=functools.partial(get_cache_policy, func.__name__))(func)
@@ -0,0 +1,96 @@
+"""
+Preloads project API caches with course-level project data.
+
+Warming up only helps if preloaded values are seen by other processes and live long enough to be used, so it is only
+done when all the preloaded API methods use shared cache policies with TTL of at least `MIN_USEFUL_TTL` (see
+`api_cache_policies` setting in :mod:`group_project_v2.project_api.cache_policies`).
+"""
+import itertools
+import logging
+from datetime import timedelta
+
+from group_project_v2.project_api.cache_policies import get_cache_policy
+from group_project_v2.utils import log_and_suppress_exceptions, map_concurrently
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+MIN_USEFUL_TTL = timedelta(minutes=5)
+WARMED_UP_METHODS = (
+    'get_project_by_content_id', 'get_workgroup_by_id', 'get_user_details', 'get_user_roles_for_course',
+    'get_user_organizations', 'get_organization_by_id',
+)
+
+
+def get_unsuitable_cache_policies():
+    """
+    Finds preloaded API methods which cache policies make warming them up pointless: values kept in process memory
+    or expiring sooner than `MIN_USEFUL_TTL`.
+    :rtype: list[str]
+    :returns: API method names
+    """
+    unsuitable = []
+    for method_name in WARMED_UP_METHODS:
+        policy = get_cache_policy(method_name)
+        if not policy.shared or policy.expires_after < MIN_USEFUL_TTL:
+            unsuitable.append(method_name)
+    return unsuitable
+
+
+class ProjectAPICacheWarmer(object):
+    """
+    Preloads memoized TypedProjectAPI methods with the data group project views and dashboards need for a course:
+    projects, workgroups, user details, user course roles, user organizations and organizations.
+
+    Individual failures are logged and skipped, so a single broken user or workgroup does not prevent warming up
+    the rest of the course.
+    """
+    def __init__(self, project_api, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        :param group_project_v2.project_api.TypedProjectAPI project_api: Project API instance which caches to warm up
+        :param int max_workers: Maximum number of concurrent API requests
+        """
+        self.project_api = project_api
+        self.max_workers = max_workers
+
+    def _preload(self, func, items):
+        @log_and_suppress_exceptions
+        def preload_item(item):
+            return func(item)
+
+        results = map_concurrently(preload_item, sorted(items), self.max_workers)
+        return [result for result in results if result is not None]
+
+    def warm_up_course(self, course_id, content_ids=None):
+        """
+        :param str course_id: Course ID
+        :param collections.Iterable[str] content_ids: Project content IDs. Defaults to all projects in the course
+        :rtype: dict[str, int]
+        :returns: Number of preloaded records by record type
+        """
+        api = self.project_api
+        if content_ids is None:
+            content_ids = [project.content_id for project in api.get_projects_for_course(course_id)]
+
+        projects = self._preload(lambda content_id: api.get_project_by_content_id(course_id, content_id), content_ids)
+
+        workgroup_ids = set(itertools.chain.from_iterable(project.workgroups or () for project in projects))
+        workgroups = self._preload(api.get_workgroup_by_id, workgroup_ids)
+
+        user_ids = set(user.id for workgroup in workgroups for user in workgroup.users)
+        users = self._preload(api.get_user_details, user_ids)
+        roles = self._preload(lambda user_id: api.get_user_roles_for_course(user_id, course_id), user_ids)
+        user_organizations = self._preload(api.get_user_organizations, user_ids)
+
+        organization_ids = set(org['id'] for organizations in user_organizations for org in organizations)
+        organizations = self._preload(api.get_organization_by_id, organization_ids)
+
+        stats = {
+            'projects': len(projects),
+            'workgroups': len(workgroups),
+            'users': len(users),
+            'roles': len(roles),
+            'organizations': len(organizations),
+        }
+        log.info("Warmed up project API caches for course %s: %s", course_id, stats)
+        return stats
@@ -1,17 +1,57 @@
 """ Contains DTOs used in Typed API. DTOs mostly follow structure of API responses """
-from group_project_v2.utils import make_user_caption
+from group_project_v2.utils import build_date_field, make_user_caption
 
 
-class ReducedUserDetails(object):
-    """ User data embedded in a workgroup detail response """
+class BaseDTO(object):
+    """
+    Base class for compact DTOs.
+
+    DTOs are created in large quantities (i.e. dashboards hold every user and workgroup of a project), so they use
+    ``__slots__`` instead of per-instance ``__dict__``. Subclasses list attributes copied verbatim from API response
+    in ``FIELDS`` and can override ``_populate`` to perform additional conversions.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
     def __init__(self, **kwargs):
-        self.id = kwargs.get('id')
-        self.url = kwargs.get('url')
-        self.username = kwargs.get('username')
-        self.email = kwargs.get('email')
-        self.first_name = kwargs.get('first_name')
-        self.last_name = kwargs.get('last_name')
-        self._full_name = kwargs.get('full_name', None)
+        self._populate(kwargs)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds DTO from parsed API response without unpacking it into keyword arguments.
+        :param dict data: Parsed API response
+        """
+        instance = cls.__new__(cls)
+        instance._populate(data)  # pylint: disable=protected-access
+        return instance
+
+    def _populate(self, data):
+        get = data.get
+        for field in self.FIELDS:
+            setattr(self, field, get(field))
+
+    # slotted objects do not have __dict__, so default pickle protocols 0 and 1 can't handle them
+    def __getstate__(self):
+        return {
+            field: getattr(self, field, None)
+            for klass in type(self).__mro__
+            for field in getattr(klass, '__slots__', ())
+        }
+
+    def __setstate__(self, state):
+        for field, value in state.iteritems():
+            setattr(self, field, value)
+
+
+class ReducedUserDetails(BaseDTO):
+    """ User data embedded in a workgroup detail response """
+    FIELDS = ('id', 'url', 'username', 'email', 'first_name', 'last_name')
+    __slots__ = FIELDS + ('_full_name',)
+
+    def _populate(self, data):
+        super(ReducedUserDetails, self)._populate(data)
+        self._full_name = data.get('full_name', None)
 
     @property
     def full_name(self):
@@ -20,76 +60,73 @@ class ReducedUserDetails(object):
         return u" ".join([unicode(part) for part in (self.first_name, self.last_name) if part is not None])
 
 
-# pylint:disable=too-many-instance-attributes
 class UserDetails(ReducedUserDetails):
-    def __init__(self, **kwargs):
-        super(UserDetails, self).__init__(**kwargs)
-        self.gender = kwargs.get('gender', None)
-        self.profile_image_url = kwargs.get('profile_image', {}).get('image_url_medium', None)
-        self.city = kwargs.get('city', None)
-        self.country = kwargs.get('country', None)
-        self.is_active = kwargs.get('is_active', None)
-        self.level_of_education = kwargs.get('level_of_education', None)
-        self.organization = kwargs.get('organization', None)
+    FIELDS = ReducedUserDetails.FIELDS + (
+        'gender', 'city', 'country', 'is_active', 'level_of_education', 'organization'
+    )
+    __slots__ = ('gender', 'city', 'country', 'is_active', 'level_of_education', 'organization', 'profile_image_url')
+
+    def _populate(self, data):
+        super(UserDetails, self)._populate(data)
+        self.profile_image_url = (data.get('profile_image') or {}).get('image_url_medium', None)
 
     @property
     def user_label(self):
         return make_user_caption(self)
 
 
-class ProjectDetails(object):
-    def __init__(self, **kwargs):
-        self.id = kwargs.get('id')
-        self.url = kwargs.get('url')
-        self.created = kwargs.get('created')
-        self.modified = kwargs.get('modified')
-        self.course_id = kwargs.get('course_id')
-        self.content_id = kwargs.get('content_id')
-        self.organization = kwargs.get('organization')
-        self.workgroups = kwargs.get('workgroups')
+class ProjectDetails(BaseDTO):
+    FIELDS = ('id', 'url', 'created', 'modified', 'course_id', 'content_id', 'organization', 'workgroups')
+    __slots__ = FIELDS
 
 
-class WorkgroupDetails(object):
+class WorkgroupDetails(BaseDTO):
     """
     :type users: list[ReducedUserDetails]
     """
-    def __init__(self, **kwargs):
-        self.id = kwargs.get('id')
-        self.url = kwargs.get('url')
-        self.created = kwargs.get('created')
-        self.modified = kwargs.get('modified')
-        self.name = kwargs.get('name')
-        self.project = kwargs.get('project')
-        self.groups = kwargs.get('groups')
-        self.workgroups = kwargs.get('workgroups')
-        users = kwargs.get('users')
-        self.users = []
-        if users:
-            self.users = [ReducedUserDetails(**user_detail) for user_detail in users]
-        self.submissions = kwargs.get('submissions')
-        self.workgroup_reviews = kwargs.get('workgroup_reviews')
-        self.peer_reviews = kwargs.get('peer_reviews')
-
-
-class CompletionDetails(object):
-    def __init__(self, **kwargs):
-        self.id = kwargs.get('id')
-        self.user_id = kwargs.get('user_id')
-        self.course_id = kwargs.get('course_id')
-        self.content_id = kwargs.get('content_id')
-        self.stage = kwargs.get('stage')
-        self.created = kwargs.get('created')
-        self.modified = kwargs.get('modified')
+    FIELDS = (
+        'id', 'url', 'created', 'modified', 'name', 'project', 'groups', 'workgroups',
+        'submissions', 'workgroup_reviews', 'peer_reviews'
+    )
+    __slots__ = FIELDS + ('users',)
 
+    def _populate(self, data):
+        super(WorkgroupDetails, self)._populate(data)
+        users = data.get('users')
+        self.users = [ReducedUserDetails.from_dict(user_detail) for user_detail in users] if users else []
 
-class OrganisationDetails(object):
-    def __init__(self, **kwargs):
-        self.name = kwargs.get('name')
-        self.display_name = kwargs.get('display_name')
-        self.user_ids = set(kwargs.get('users'))
 
+class CompletionDetails(BaseDTO):
+    FIELDS = ('id', 'user_id', 'course_id', 'content_id', 'stage', 'created', 'modified')
+    __slots__ = FIELDS
 
-class UserGroupDetails(object):
-    def __init__(self, **kwargs):
-        self.id = kwargs.get('id')
-        self.name = kwargs.get('name')
+
+class OrganisationDetails(BaseDTO):
+    FIELDS = ('name', 'display_name')
+    __slots__ = FIELDS + ('user_ids',)
+
+    def _populate(self, data):
+        super(OrganisationDetails, self)._populate(data)
+        self.user_ids = set(data.get('users'))
+
+
+class UserGroupDetails(BaseDTO):
+    FIELDS = ('id', 'name')
+    __slots__ = FIELDS
+
+
+class SubmissionDetails(BaseDTO):
+    """
+    :type modified_date: datetime.datetime
+    :type user_details: UserDetails|None
+    """
+    FIELDS = (
+        'id', 'url', 'document_id', 'document_url', 'document_filename', 'document_mime_type', 'user', 'workgroup',
+        'created', 'modified'
+    )
+    __slots__ = FIELDS + ('modified_date', 'user_details')
+
+    def _populate(self, data):
+        super(SubmissionDetails, self)._populate(data)
+        self.modified_date = build_date_field(self.modified)
+        self.user_details = data.get('user_details')
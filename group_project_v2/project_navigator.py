@@ -26,9 +26,11 @@ from group_project_v2.mixins import (
     XBlockWithUrlNameDisplayMixin,
 )
 
+from group_project_v2.profiling import profiled
 from group_project_v2.utils import (
     DiscussionXBlockShim,
     add_resource,
+    add_resource_bundle,
     gettext as _,
     loader,
 )
@@ -90,7 +92,7 @@ class GroupProjectNavigatorXBlock(
     def _get_activated_view_type(self, target_block_id):
         try:
             if target_block_id:
-                block = self.runtime.get_block(target_block_id)
+                block = self.get_block_by_id(target_block_id)
                 if self.get_child_category(block) in PROJECT_NAVIGATOR_VIEW_TYPES:
                     return block.type
         except (InvalidKeyError, KeyError, NoSuchUsage) as exc:
@@ -99,15 +101,12 @@ class GroupProjectNavigatorXBlock(
         return ViewTypes.NAVIGATION
 
     def _sorted_child_views(self):
-        all_views = []
-        for child_id in self.children:
-            view = self.runtime.get_block(child_id)
-            if view.available_to_current_user and view.is_view_available:
-                all_views.append(view)
+        all_views = [view for view in self._children if view.available_to_current_user and view.is_view_available]
 
         all_views.sort(key=lambda view_instance: view_instance.SORT_ORDER)
         return all_views
 
+    @profiled
     def student_view(self, context):
         """
         Student view
@@ -148,8 +147,7 @@ class GroupProjectNavigatorXBlock(
                 {'children': children_items}
             )
         )
-        add_resource(self, 'css', 'public/css/project_navigator/project_navigator.css', fragment)
-        add_resource(self, 'javascript', 'public/js/project_navigator/project_navigator.js', fragment)
+        add_resource_bundle(self, 'project_components', fragment)
         fragment.initialize_js("GroupProjectNavigatorBlock", js_parameters)
 
         return fragment
@@ -166,7 +164,7 @@ class GroupProjectNavigatorXBlock(
             "templates/html/project_navigator/project_navigator_author_view.html",
             {'navigator': self, 'children_contents': children_contents}
         ))
-        add_resource(self, 'css', 'public/css/project_navigator/project_navigator.css', fragment)
+        add_resource_bundle(self, 'project_components', fragment)
         return fragment
 
     def validate(self):
@@ -249,11 +247,8 @@ class ProjectNavigatorViewXBlockBase(
         fragment = Fragment()
         fragment.add_content(loader.render_template(self.TEMPLATE_BASE + self.template, context))
 
-        if self.css_file:
-            add_resource(self, 'css', self.CSS_BASE + self.css_file, fragment)
-
-        if self.js_file:
-            add_resource(self, 'javascript', self.JS_BASE + self.js_file, fragment)
+        if self.css_file or self.js_file:
+            add_resource_bundle(self, 'project_components', fragment)
 
         if self.initialize_js_function:
             fragment.initialize_js(self.initialize_js_function)
@@ -317,6 +312,7 @@ class NavigationViewXBlock(ProjectNavigatorViewXBlockBase):
     js_file = "navigation_view.js"
     initialize_js_function = "GroupProjectNavigatorNavigationView"
 
+    @profiled
     def student_view(self, context):
         """
         Student view
@@ -348,6 +344,7 @@ class ResourcesViewXBlock(ProjectNavigatorViewXBlockBase):
     js_file = "resources_view.js"
     initialize_js_function = "GroupProjectNavigatorResourcesView"
 
+    @profiled
     def student_view(self, context):
         """
         Student view
@@ -390,6 +387,7 @@ class SubmissionsViewXBlock(ProjectNavigatorViewXBlockBase):
     def allow_admin_grader_access(self):
         return True
 
+    @profiled
     def student_view(self, context):
         """
         Student view
@@ -431,6 +429,7 @@ class AskTAViewXBlock(ProjectNavigatorViewXBlockBase):
         # TODO: LMS support - check if TAs are available at all
         return True
 
+    @profiled
     def student_view(self, context):
         """
         Student view
@@ -465,7 +464,7 @@ class PrivateDiscussionViewXBlock(ProjectNavigatorViewXBlockBase):
         Selector view - this view is used by GroupProjectNavigatorXBlock to render selector buttons
         """
         fragment = super(PrivateDiscussionViewXBlock, self).selector_view(context)
-        add_resource(self, 'javascript', self.JS_BASE + self.js_file, fragment)
+        add_resource_bundle(self, 'project_components', fragment)
         fragment.initialize_js(self.initialize_js_function)
         return fragment
 
@@ -0,0 +1,899 @@
+/* Generated by `make bundles` - do not edit. Sources:
+ * public/js/project_navigator/project_navigator.js
+ * public/js/project_navigator/navigation_view.js
+ * public/js/project_navigator/resources_view.js
+ * public/js/project_navigator/submissions_view.js
+ * public/js/project_navigator/ask_ta_view.js
+ * public/js/project_navigator/private_discussion_view.js
+ * public/js/stages/completion.js
+ * public/js/stages/review_stage.js
+ * public/js/components/submission.js
+ * public/js/components/review_subject_selector.js
+ * public/js/components/project_team.js
+ */
+/* global GroupProjectCommon */
+/* exported GroupProjectNavigatorBlock */
+function GroupProjectNavigatorBlock(runtime, element, initialization_args) {
+    "use strict";
+    var initial_view = 'navigation';
+    var selector_item_query = ".group-project-navigator-view-selector .view-selector-item";
+    var view_elements = $(".group-project-navigator-view", element),
+        views = {},
+        selected_view = null,
+        initial_selected_view = initialization_args.selected_view;
+
+    function switch_to_view(target_view, skip_content_switching) {
+        var view_data = views[target_view];
+        $(document).trigger(
+            GroupProjectCommon.ProjectNavigator.events.switch_view, {new_view: target_view, old_view: selected_view}
+        );
+
+        selected_view = target_view;
+
+        $(selector_item_query, element).removeClass('active');
+        view_data.selector.addClass('active');
+
+        if (!skip_content_switching) {
+            $(".group-project-navigator-view", element).hide();
+            view_data.view.show();
+        }
+    }
+
+    $(selector_item_query, element).click(function(e){
+        e.preventDefault();
+        var view_type = $(this).data("view-type");
+
+        if (!views.hasOwnProperty(view_type)) {
+            // Unknown view
+            return;
+        }
+
+        switch_to_view(view_type, $(this).data('skip-content'));
+    });
+
+    $(".group-project-navigator-view-close").click(function(){
+        switch_to_view(initial_view);
+    });
+
+    $(document).on(GroupProjectCommon.ProjectNavigator.events.activate_view, function(target, target_block_id) {
+        var escaped_block_id = target_block_id.replace(/\//g, ";_");
+        var target_block = $("[data-view-id='"+escaped_block_id+"']");
+        if (target_block) {
+            switch_to_view(target_block.data('view-type'));
+        }
+    });
+
+    $(document).on(GroupProjectCommon.Discussion.events.hide_discussion, function(){
+        switch_to_view(initial_view);
+    });
+
+    for (var i=0; i<=view_elements.length; i++) {
+        var view_element = $(view_elements[i]),
+            view_type = view_element.data("view-type");
+
+        views[view_type] = {
+            view: view_element,
+            selector: $(selector_item_query+"[data-view-type="+view_type+"]", element)
+        };
+    }
+
+    switch_to_view(initial_selected_view);
+}
+
+;
+/* global GroupProjectCommon */
+/* exported GroupProjectNavigatorNavigationView */
+function GroupProjectNavigatorNavigationView(runtime, element) {
+    "use strict";
+    $(document).on(
+        GroupProjectCommon.ProjectNavigator.events.stage_status_update,
+        function(target, activity_id, stage_id, new_state) {
+            var activity_wrapper = $(".group-project-activity-wrapper[data-activity-id='"+activity_id+"']", element),
+                stage_item = $(".group-project-stage[data-stage-id='"+stage_id+"']", activity_wrapper);
+
+            if (!stage_item) {
+                return;
+            }
+
+            var status_icon = $(".group-project-stage-state", stage_item);
+            status_icon.removeClass("not-started incomplete completed");
+            status_icon.addClass(new_state);
+        }
+    );
+}
+
+;
+/* global OO */
+/* exported GroupProjectNavigatorResourcesView */
+function GroupProjectNavigatorResourcesView(runtime, element) {
+    "use strict";
+    var ooyala_player_target_element_id = 'group-project-resources-view-ooyala-player';
+
+    var modal = $('.player-modal', element),
+        player = $('.player-wrapper', modal),
+        modal_bg = $(".player-modal-bg");
+
+    function showPlayer() {
+        modal.show();
+        modal_bg.show();
+    }
+
+    function hidePlayer() {
+        modal.hide();
+        modal_bg.hide();
+    }
+
+    $('a[data-video-id]', element).on('click', function (e) {
+        e.preventDefault();
+        var video = $(e.currentTarget).data('video-id');
+
+        player.append($('<div id="'+ooyala_player_target_element_id+'"/>'));
+
+        if (typeof OO === 'undefined') {
+            return;
+        }
+        // TODO: manually using ooyala - replace with Ooyala player XBlock when it's autostart setting is fixed
+        // and play-stop-destroy events are exposed.
+        var parameters = {width: '100%', height: '100%', autoplay: true};
+
+        var  ooyala = OO.Player.create(ooyala_player_target_element_id, video, parameters);
+        modal.data('ooyala', ooyala);
+        showPlayer();
+    });
+
+    $('.close-reveal-modal', element).add('.player-modal-bg', element).on('click', function () {
+        var ooyala = modal.data('ooyala');
+        if (ooyala) {
+            ooyala.destroy();
+            modal.removeData('ooyala');
+        }
+        player.empty();
+        hidePlayer();
+    });
+}
+
+;
+/* global GroupProjectCommon */
+/* exported GroupProjectNavigatorSubmissionsView */
+function GroupProjectNavigatorSubmissionsView(runtime, element) {
+    "use strict";
+    var $action_buttons = $(".action_buttons", element);
+
+    var running_uploads = [];
+
+    function handle_upload_end(e, uploadXHR) {
+        var index = $.inArray(uploadXHR, running_uploads);
+        if (index > -1) {
+            running_uploads.splice(index, 1);
+        }
+
+        if (running_uploads.length === 0) {
+            $action_buttons.css('visibility', 'hidden');
+        }
+    }
+
+    $(document).on(GroupProjectCommon.Submission.events.upload_started, function(e, uploadXHR){
+        running_uploads.push(uploadXHR);
+        $action_buttons.css('visibility', 'visible');
+    });
+
+    $(document).on(GroupProjectCommon.Submission.events.upload_failed, handle_upload_end);
+    $(document).on(GroupProjectCommon.Submission.events.upload_complete, handle_upload_end);
+
+    $('.cancel_upload', element).on('click', function () {
+        for (var i=0; i<running_uploads.length; i++) {
+            var uploadXHR = running_uploads[i];
+            uploadXHR.abort();
+        }
+        running_uploads = [];
+        $action_buttons.css('visibility', 'hidden');
+    });
+}
+
+;
+/* global GroupProjectCommon */
+/* exported GroupProjectNavigatorAskTAView */
+function GroupProjectNavigatorAskTAView(runtime, element) {
+    "use strict";
+    var view_identifier = 'ask-ta';
+
+    var form = $(".contact-ta-form", element),
+        textarea = $("textarea", form);
+
+    $(textarea).on('keyup', function () {
+        if ($(this).val() === '') {
+            $(this).parent('form').find('input[type=submit]').prop('disabled', 'disabled');
+        }
+        else {
+            $(this).parent('form').find('input[type=submit]').prop('disabled', false);
+        }
+    });
+
+    $(form).on('submit', function(e){
+        e.preventDefault();
+        $(".csrfmiddlewaretoken", $(this)).val($.cookie('apros_csrftoken'));
+        var data = $(this).serialize();
+        $.ajax(
+            {
+                url: $(this).attr('action'),
+                method: 'POST',
+                data: data
+            }).done(function (data) {
+                var modal = $('#generalModal');
+                modal.find('.title').html('Notification');
+                modal.find('.description').html(data.message);
+                if (modal.foundation === undefined){
+                    setTimeout(function(){modal.modal('show');}, 350);
+                } else{
+                    setTimeout(function () {modal.foundation('reveal', 'open');}, 350);
+                }
+            });
+    });
+
+    $(document).on(GroupProjectCommon.ProjectNavigator.events.switch_view, function(target, event_data) {
+        if (event_data.old_view === view_identifier) {
+            $(textarea).val('');
+        }
+    });
+}
+
+;
+/* global GroupProjectCommon */
+/* exported GroupProjectPrivateDiscussionView */
+function GroupProjectPrivateDiscussionView(runtime, element) {
+    "use strict";
+    $(".view-selector-item", element).click(function(){
+        GroupProjectCommon.Discussion.show_discussion();
+    });
+}
+
+;
+/* global GroupProjectCommon */
+/* exported GroupProjectCompletionStage */
+function GroupProjectCompletionStage(runtime, element) {
+    "use strict";
+    var $form = $(".group-project-completion-form", element);
+
+    $(".group-project-completion-checkmark", element).click(function(ev) {
+        var checkbox = this;
+        ev.preventDefault();
+        if (!$(this)[0].checked) {
+            return false;
+        }
+
+        $.ajax({
+            type: $form.attr('method'),
+            url: runtime.handlerUrl(element, $form.attr('action')),
+            data: JSON.stringify({}),
+            success: function (data) {
+                var msg = (data.msg) ? data.msg : GroupProjectCommon.CompletionStage.messages.MARKED_AS_COMPLETE;
+                GroupProjectCommon.Messages.show_message(msg);
+
+                if (data.result === 'error'){
+                    return;
+                }
+
+                $(checkbox).prop('checked', true);
+                $(checkbox).prop('disabled', true);
+
+                if (data.new_stage_states) {
+                    for (var i = 0; i < data.new_stage_states.length; i++) {
+                        var new_state = data.new_stage_states[i];
+                        $(document).trigger(
+                            GroupProjectCommon.ProjectNavigator.events.stage_status_update,
+                            [new_state.activity_id, new_state.stage_id, new_state.state]
+                        );
+                    }
+                }
+            },
+            error: function (data) {
+                var msg = (data.msg) ? data.msg : GroupProjectCommon.CompletionStage.messages.ERROR_SAVING_PROGRESS;
+                GroupProjectCommon.Messages.show_message(msg);
+            }
+        });
+    });
+}
+
+;
+/* global GroupProjectCommon */
+/* exported GroupProjectReviewStage */
+function GroupProjectReviewStage(runtime, element) {
+    "use strict";
+    var DATA_PRESENT_SUBMIT = GroupProjectCommon.gettext('Resubmit');
+    var NO_DATA_PRESENT_SUBMIT = GroupProjectCommon.gettext('Submit');
+    var GRADING_STATUS_POLL_INTERVAL = 1000;
+
+    var $form = $(".review",  element);
+    var $submit_btn = $form.find('button.submit');
+    var is_peer_review = $form.data('review-type') === 'peer_review';
+
+    var messages = GroupProjectCommon.Review.messages;
+    var show_message = GroupProjectCommon.Messages.show_message;
+
+    function wait_for_grading(grading) {
+        // deferred grading: grade is calculated by grading_status request once grading job is due
+        function poll() {
+            $.ajax({
+                type: 'POST',
+                url: runtime.handlerUrl(element, "grading_status"),
+                data: JSON.stringify({group_id: grading.group_id})
+            }).done(function (response) {
+                if (response.state === 'pending') {
+                    setTimeout(poll, Math.max(response.due_in * 1000, GRADING_STATUS_POLL_INTERVAL));
+                }
+            });
+        }
+
+        setTimeout(poll, grading.due_in * 1000);
+    }
+
+    function validate_form_answers() {
+        var answers = $form.find('.required .answer');
+        var submitButton = $form.find('button.submit');
+
+        function check_answered_total(answers, submitButton) {
+            var answers_total, answers_checked;
+            answers_total = answers_checked = 0;
+            submitButton.attr('disabled', 'disabled');
+            $.each(answers, function () {
+                if ($(this).is('textarea')) {
+                    answers_total += 1;
+                    if ($(this).val() !== '') {
+                        answers_checked += 1;
+                    }
+                }
+                else if ($(this).is('select')) {
+                    answers_total += 1;
+                    if ($(this).find('option:selected').attr('value') !== '') {
+                        answers_checked += 1;
+                    }
+                }
+            });
+            if (answers_total === answers_checked) {
+                submitButton.attr('disabled', false);
+            }
+        }
+
+        check_answered_total(answers, submitButton);
+
+        answers.on('change keyup paste', function () {
+            check_answered_total(answers, submitButton);
+        });
+    }
+
+    function load_data_into_form(data_for_form) {
+        $form.find('.answer').val(null);
+        for (var data_item in data_for_form) {
+            if (data_for_form.hasOwnProperty(data_item)) {
+                $form.find('button.submit').html(DATA_PRESENT_SUBMIT);
+                // NOTE: use of ids specified by designer here
+                var $form_item = $form.find("#" + data_item);
+                $form_item.val(data_for_form[data_item]);
+            }
+        }
+        validate_form_answers();
+    }
+
+    function load_data_for_peer(peer_id) {
+        _load_data('load_peer_feedback', 'peer_id=' + peer_id, $('.peer_review', element));
+    }
+
+    function load_data_for_other_group(group_id) {
+        _load_data('load_other_group_feedback', 'group_id=' + group_id, $('.other_group_review', element));
+    }
+
+    function _load_data(handler_name, args) {
+        $('.group-project-xblock-wrapper', element).addClass('waiting');
+        $form.find('.editable').attr('disabled', 'disabled');
+        $form.find('.answer').val(null);
+        $form.find('button.submit').html(NO_DATA_PRESENT_SUBMIT).attr('disabled', 'disabled');
+        $.ajax({
+            url: runtime.handlerUrl(element, handler_name),
+            data: args,
+            dataType: 'json',
+            success: function (data) {
+                if (data.result && data.result === "error") {
+                    if (data.msg) {
+                        show_message(data.msg);
+                    }
+                    else {
+                        show_message(messages.ERROR_LOADING_FEEDBACK);
+                    }
+                }
+                else {
+                    load_data_into_form(data);
+                }
+            },
+            error: function () {
+                show_message(messages.ERROR_LOADING_FEEDBACK);
+            }
+        }).done(function () {
+            $('.group-project-xblock-wrapper', element).removeClass('waiting');
+            $form.find('.editable').removeAttr('disabled');
+        });
+    }
+
+    $('.select_peer,.select_group', element).on('click', function (ev) {
+        var $this = $(this);
+        var is_peer = $this.hasClass('select_peer');
+        // removing selection from other peers/groups. NOT a bug
+        $('.select_peer,.select_group').removeClass('selected');
+        $this.addClass('selected');
+
+        var load_operation = load_data_for_peer;
+        var operation_name = 'load_data_for_peer';
+        if (is_peer) {
+            $('.username', element).text($this.data('username'));
+        }
+        else {
+            load_operation = load_data_for_other_group;
+            operation_name = 'load_data_for_other_group';
+            $('.other_submission_links', element).empty().hide();
+        }
+
+        load_operation($this.data('id'));
+
+        $(document).trigger('data_loaded', {operation: operation_name, data_for: $this.data('id')});
+        ev.preventDefault();
+        return false;
+    });
+
+    $submit_btn.on('click', function (ev) {
+        ev.preventDefault();
+
+        $form.find(':submit').prop('disabled', true);
+        var items = $form.find('input, select, textarea').serializeArray();
+        var data = {};
+        $.each(items, function (i, v) {
+            data[v.name] = v.value;
+        });
+        data.review_subject_id = $("ul.review_subjects li.selected", $form).data('id');
+
+        if (!data.review_subject_id) {
+            var message = is_peer_review ? messages.SELECT_PEER_TO_REVIEW : messages.SELECT_GROUP_TO_REVIEW;
+            show_message(message);
+            return;
+        }
+
+        $.ajax({
+            type: $form.data('method'),
+            url: runtime.handlerUrl(element, $form.data('action')),
+            data: JSON.stringify(data),
+            success: function (data) {
+                var msg = (data.msg) ? data.msg : messages.THANKS_FOR_FEEDBACK;
+                show_message(msg);
+
+                if (data.new_stage_states) {
+                    for (var i=0; i<data.new_stage_states.length; i++) {
+                        var new_state = data.new_stage_states[i];
+                        $(document).trigger(
+                            "group_project_v2.project_navigator.stage_status_update",
+                            [new_state.activity_id, new_state.stage_id, new_state.state]
+                        );
+                    }
+                }
+
+                if (data.grading) {
+                    wait_for_grading(data.grading);
+                }
+            },
+            error: function () {
+                show_message(messages.ERROR_SAVING_FEEDBACK);
+            },
+            complete: function () {
+                $form.find(':submit').prop('disabled', false).html(DATA_PRESENT_SUBMIT);
+                $(document).trigger(GroupProjectCommon.Review.events.refresh_status);
+            }
+        });
+
+        return false;
+    });
+
+    var review_submissions_dialog = $('.review_submissions_dialog', element);
+    $('.view_other_submissions', element).on('click', function () {
+        var $content = $('.other_submission_links', review_submissions_dialog);
+        $content.empty().hide();
+        var selected_group_id = $(this).parents(".select_group").data("id");
+        if (!selected_group_id) {
+            return;
+        }
+        $.ajax({
+            url: runtime.handlerUrl(element, "other_submission_links"),
+            data: {group_id: selected_group_id},
+            dataType: 'json',
+            success: function (data) {
+                $content.html(data.html).show();
+                review_submissions_dialog.show();
+            },
+            error: function () {
+                show_message(messages.ERROR_LOADING_SUBMISSIONS);
+            }
+        });
+    });
+
+    $('.close_review_dialog', review_submissions_dialog).on('click', function () {
+        review_submissions_dialog.hide();
+    });
+
+    if ($('.select_peer.selected,.select_group.selected', element).length === 0) {
+        $form.find('.editable').attr('disabled', 'disabled');
+        $form.find('.answer').val(null);
+        $submit_btn.attr('disabled', 'disabled');
+    }
+    $(element).ready(function () {
+        var options = $('.select_peer,.select_group', element);
+        if (options.length) {
+            options[0].click();
+        }
+    });
+}
+
+;
+/* global GroupProjectCommon */
+/* exported GroupProjectSubmissionBlock */
+function GroupProjectSubmissionBlock(runtime, element) {
+    "use strict";
+
+    var UPLOAD_STATUS_POLL_INTERVAL = 1000;
+
+    /**
+     * This function is responsible for formatting the modal dialog for user.
+     */
+    function prepareMessageObject(jqXHR, default_title){
+
+        function getMessageFromJson(jqXHR){
+            return jqXHR.responseJSON ? jqXHR.responseJSON.message : jqXHR.responseText;
+        }
+
+        function getMessageTitleFromJson(jqXHR, default_title) {
+            return (jqXHR.responseJSON && jqXHR.responseJSON.title) ? jqXHR.responseJSON.title : default_title;
+        }
+
+        function filterMessageObject(message){
+            function htmlencode(html) {
+                return document.createElement('span')
+                    .appendChild(document.createTextNode(html))
+                    .parentNode.innerHTML;
+            }
+
+            if(message.status === 0 && message.statusText === 'abort') {
+                message.title = GroupProjectCommon.gettext('Upload cancelled.');
+                message.content = GroupProjectCommon.gettext('Upload cancelled by user.');
+            }
+            if (message.status === 400) {
+                // Hotfix for XSS reflection through the file validator error messages
+                message.title = htmlencode(message.title);
+                message.content = htmlencode(message.content);
+            }
+            if (message.status === 403) {
+                var base_message = GroupProjectCommon.gettext(
+                    "An error occurred while uploading your file. Please " +
+                    "refresh the page and try again. If it still does not " +
+                    "upload, please contact your Course TA."
+                );
+                var technical_details = '';
+                // Exact CSRF response message may vary, and may be different
+                // between different environments. We can assume that it should
+                // contain CSRF string.
+                if (message.content.indexOf('CSRF') !== -1){
+                    technical_details += GroupProjectCommon.gettext(' Technical details: CSRF verification failed.');
+                }else{
+                    technical_details += GroupProjectCommon.gettext(' Technical details: 403 error.');
+                }
+
+                message.content = "<p>" + base_message + "</p><p>" + technical_details + "</p>";
+            }
+            return message;
+        }
+
+        if (typeof jqXHR.responseJSON === 'undefined'){
+            // This is inconsistency between Apros and Workbench, in Apros
+            // requests have responseJSON and in Workbench do not.
+            try {
+                jqXHR.responseJSON = $.parseJSON(jqXHR.responseText);
+            } catch (e){
+                jqXHR.responseJSON = null;
+            }
+        }
+
+        var message = {
+            "status": jqXHR.status,
+            "statusText": jqXHR.statusText,
+            "content": getMessageFromJson(jqXHR),
+            "title": getMessageTitleFromJson(jqXHR, default_title)
+        };
+
+        message = filterMessageObject(message);
+
+        return message;
+    }
+
+    /**
+     * Asks the server how much of the file is already uploaded and what chunk size to use, so that large files are
+     * uploaded in chunks and an interrupted upload of the same file resumes instead of starting from zero.
+     * If the server can not tell, the file is uploaded in a single request.
+     */
+    function prepareChunkedUpload(data) {
+        var file = data.files[0],
+            last_modified = file.lastModified || '';
+        return $.ajax({
+            type: 'POST',
+            url: runtime.handlerUrl(element, "upload_session"),
+            data: JSON.stringify({file_name: file.name, size: file.size, last_modified: last_modified})
+        }).done(function (response) {
+            if (response.result === 'success') {
+                data.maxChunkSize = response.chunk_size;
+                data.uploadedBytes = response.uploaded_bytes;
+                // chunks are matched to the session by file modification time, along with file name and size
+                data.formData = upload_data.formData.concat([{name: 'last_modified', value: last_modified}]);
+            }
+        });
+    }
+
+    /**
+     * Waits until the server finishes processing of an uploaded file: recording the submission and marking the
+     * stage as complete, done by the status requests. Resolves with the same data a synchronous upload responds with.
+     */
+    function waitForUploadProcessing(job_id) {
+        var result = $.Deferred();
+
+        function poll() {
+            $.ajax({
+                type: 'POST',
+                url: runtime.handlerUrl(element, "upload_status"),
+                data: JSON.stringify({job_id: job_id})
+            }).done(function (response) {
+                if (response.state === 'pending') {
+                    setTimeout(poll, UPLOAD_STATUS_POLL_INTERVAL);
+                } else if (response.state === 'complete') {
+                    result.resolve(response.data);
+                } else {
+                    result.reject(response.data || {});
+                }
+            }).fail(function () {
+                result.reject({});
+            });
+        }
+
+        poll();
+        return result.promise();
+    }
+
+    function showUploadProcessingError(data) {
+        GroupProjectCommon.Messages.show_message(
+            data.message || GroupProjectCommon.gettext("Your file was stored, but recording the submission failed."),
+            data.title || GroupProjectCommon.gettext("Error"),
+            'error'
+        );
+    }
+
+    var upload_data = {
+        dataType: 'json',
+        url: runtime.handlerUrl(element, "upload_submission"),
+        formData: [
+            {
+                name: 'csrfmiddlewaretoken',
+                value: $.cookie('csrftoken')
+            }
+        ],
+        pasteZone: null,
+        add: function (e, data) {
+            var target_form = $(e.target),
+                parentData = data;
+            $('.' + data.paramName + '_name', target_form).val(data.files[0].name);
+            $('.' + data.paramName + '_progress', target_form).css({width: '0%'}).removeClass('complete failed');
+            $('.' + data.paramName + '_progress_box', target_form).css({visibility: 'visible'});
+
+            function showNewStageStates(data) {
+                if (data.new_stage_states) {
+                    for (var i=0; i<data.new_stage_states.length; i++) {
+                        var new_state = data.new_stage_states[i];
+                        $(document).trigger(
+                            "group_project_v2.project_navigator.stage_status_update",
+                            [new_state.activity_id, new_state.stage_id, new_state.state]
+                        );
+                        $('.' + parentData.paramName + '_uploaded_by', element).html(
+                            'Uploaded by ' + data.user_label + ' on ' + data.submission_date);
+                    }
+                }
+            }
+
+            $(document).one('perform_uploads', function () {
+                prepareChunkedUpload(data).always(function () {
+                    var uploadXHR = data.submit();
+
+                    uploadXHR
+                        .success(function (data) {
+                            if (data.upload_job_id) {
+                                waitForUploadProcessing(data.upload_job_id)
+                                    .done(showNewStageStates)
+                                    .fail(showUploadProcessingError);
+                            } else {
+                                showNewStageStates(data);
+                            }
+
+                            if (data.submissions) {
+                                for (var submission_id in data.submissions) {
+                                    if (data.submissions.hasOwnProperty(submission_id)) {
+                                        var location = data.submissions[submission_id];
+                                        $('.' + submission_id + '_name', target_form).parent(".upload_item_wrapper")
+                                            .data('location', location)
+                                            .attr('data-location', location); // need to set attr as there are css rule
+                                    }
+                                }
+                            }
+
+                            $(document).trigger(GroupProjectCommon.Submission.events.upload_complete, uploadXHR);
+                        })
+                        .fail(function () {
+                            $(document).trigger(GroupProjectCommon.Submission.events.upload_failed, uploadXHR);
+                        });
+
+                    $(document).trigger(GroupProjectCommon.Submission.events.upload_started, uploadXHR);
+                });
+            });
+
+            $(document).trigger('perform_uploads');
+        },
+        progress: function (e, data) {
+            var target_form = $(e.target);
+            var percentage = parseInt(data.loaded / data.total * 100, 10);
+            $('.' + data.paramName + '_progress', target_form).css('width', percentage + '%');
+        },
+        done: function (e, data) {
+            var target_form = $(e.target);
+            $('.' + data.paramName + '_progress', target_form).css('width', '100%').addClass('complete');
+            var input = $('.' + data.paramName + '_name', target_form);
+            input.attr('data-original-value', input.val());
+            var message = prepareMessageObject(data.jqXHR, GroupProjectCommon.gettext("Error"));
+            GroupProjectCommon.Messages.show_message(message.content, message.title);
+        },
+        fail: function (e, data) {
+            var target_form = $(e.target);
+            $('.' + data.paramName[0] + '_progress', target_form).css('width', '100%').addClass('failed');
+            var message = prepareMessageObject(data.jqXHR, GroupProjectCommon.gettext("Error"));
+            target_form.prop('title', message.message);
+            GroupProjectCommon.Messages.show_message(message.content, message.title, 'error');
+        }
+    };
+
+    $(".upload_item_wrapper", element).click(function(){
+        var location = $(this).data('location');
+        if (location) {
+            window.open(location);
+        }
+    });
+
+    if ($.fn.fileupload) {
+        $('.uploader', element).fileupload(upload_data);
+    }
+}
+
+;
+/* global GroupProjectCommon */
+/* exported ReviewSubjectSelectorXBlock, ReviewSubjectSelectorConstants */
+var ReviewSubjectSelectorConstants = {
+    status_icon_class: "group-project-review-state"
+};
+
+function ReviewSubjectSelectorXBlock(runtime, element) {
+    "use strict";
+    var ERROR_REFRESHING_STATUSES = GroupProjectCommon.gettext("Error refreshing statuses");
+
+    var get_statuses_endpoint = runtime.handlerUrl(element, "get_statuses");
+    var status_icon_class = ReviewSubjectSelectorConstants.status_icon_class;
+
+    function show_message(msg, title, title_css_class) {
+        GroupProjectCommon.Messages.show_message(msg, title, title_css_class);
+    }
+
+    function resetCssClasses() {
+        $("."+status_icon_class, element).removeClass().addClass(status_icon_class).addClass('fa');
+    }
+
+    function displaySpinners() {
+        $("."+status_icon_class, element).addClass('fa-spin fa-spinner');
+    }
+
+    function setStatus(review_subject_id, status_css_class) {
+        var $review_subject_wrapper = $(".review_subject[data-id="+review_subject_id+"]");
+        $("."+status_icon_class, $review_subject_wrapper).removeClass('fa-spin fa-spinner').addClass(status_css_class);
+    }
+
+    $(document).on(GroupProjectCommon.Review.events.refresh_status, function() {
+        resetCssClasses();
+        displaySpinners();
+        $.ajax({
+            dataType: 'json', url: get_statuses_endpoint,  method: 'GET'
+        }).done(function(data){
+            for (var review_subject_id in data) {
+                if (!data.hasOwnProperty(review_subject_id)) {
+                    continue;
+                }
+
+                setStatus(review_subject_id, data[review_subject_id]);
+            }
+        }).fail(function() {
+            show_message(ERROR_REFRESHING_STATUSES);
+        });
+    });
+
+    $(document).trigger(GroupProjectCommon.Review.events.refresh_status);
+}
+
+;
+/* global GroupProjectCommon */
+/* exported ProjectTeamXBlock, ProjectTeamXBlockConstants */
+var ProjectTeamXBlockConstants = {
+    teammate: {
+        modal: ".group-project-team-email-member-modal",
+        anchor: ".group-project-team-member-email a[data-email]"
+    },
+    group: {
+        modal: ".group-project-team-email-group-modal",
+        anchor: ".group-project-team-email-group"
+    }
+};
+
+function ProjectTeamXBlock(runtime, element) {
+    "use strict";
+    var group_project_dom = GroupProjectCommon.get_root_element(element);
+
+    function show_message(msg, title, title_css_class) {
+        GroupProjectCommon.Messages.show_message(msg, title, title_css_class);
+    }
+
+    function showModal(target_modal){
+        $(target_modal, group_project_dom).show();
+    }
+
+    function clearText(target_modal) {
+        $(target_modal, group_project_dom).find('textarea').val('');
+    }
+
+    $(ProjectTeamXBlockConstants.group.anchor, element).click(function(ev){
+        ev.preventDefault();
+        showModal(ProjectTeamXBlockConstants.group.modal);
+    });
+
+    $(ProjectTeamXBlockConstants.teammate.anchor, element).click(function(ev){
+        ev.preventDefault();
+        var form = $(ProjectTeamXBlockConstants.teammate.modal, group_project_dom).find('form'),
+            member_email = $(this).data('email');
+        $(".member-email", form).val(member_email);
+        showModal(ProjectTeamXBlockConstants.teammate.modal);
+    });
+
+    var modal_dialogs = $(ProjectTeamXBlockConstants.teammate.modal, group_project_dom)
+        .add(ProjectTeamXBlockConstants.group.modal, group_project_dom);
+
+    modal_dialogs.find('form').submit(function(ev){
+        var $this = this;
+        ev.preventDefault();
+        $(".csrfmiddlewaretoken", $this).val($.cookie('apros_csrftoken'));
+        var data = $(this).serialize();
+        $.ajax({
+            url: $(this).attr('action'),
+            method: 'POST',
+            data: data
+        }).done(function (data) {
+            show_message(data.message, '');
+            clearText($this);
+        }).fail(function (data) {
+            show_message(data.message, 'Error', 'error');
+        });
+    });
+
+    modal_dialogs.find(".button, .close-box, .modal-bg").click(function(){
+        $(this).parents(".group-project-team-email-dialog").hide();
+    });
+
+    modal_dialogs.find('textarea').on('keyup', function () {
+        if ($(this).val() === '') {
+            $(this).parent('form').find('input[type=submit]').prop('disabled', 'disabled');
+        }
+        else {
+            $(this).parent('form').find('input[type=submit]').prop('disabled', false);
+        }
+    });
+}
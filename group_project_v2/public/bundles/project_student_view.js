@@ -0,0 +1,135 @@
+/* Generated by `make bundles` - do not edit. Sources:
+ * public/js/group_project.js
+ * public/js/group_project_common.js
+ */
+/* global GroupProjectCommon */
+/* exported GroupProjectBlock */
+function GroupProjectBlock(runtime, element) {
+    "use strict";
+    var message_box = $('.message', element);
+    var discussion_box = $("#group-project-discussion", element);
+
+    message_box.on('click', '.button, .close-box', function () {
+        message_box.hide();
+        message_box.find('.message_text').html("");
+        message_box.find('.message_title').html("");
+        message_box.find('.message_title').removeClass().addClass("message_title");
+    });
+
+    function show_message(msg, title, title_css_class) {
+        message_box.find('.message_text').html(msg);
+        message_box.find('.message_title').html(title);
+        if (title_css_class) {
+            message_box.find('.message_title').addClass(title_css_class);
+        }
+        message_box.show();
+    }
+
+    $(".group-project-static-content-block .block-link").click(function(ev) {
+        // intercepting local jumps to PN Views - they should be rendered already,
+        // so it's better to just activate them rather do a full-page reload (and navigate away from stage)
+        ev.preventDefault();
+        var target_block_id = $(this).data("target-block-id");
+
+        $(document).trigger(GroupProjectCommon.ProjectNavigator.events.activate_view, target_block_id);
+    });
+
+    $(document).on(GroupProjectCommon.Discussion.events.show_discussion, function(){
+        discussion_box.show();
+    });
+
+    $(document).on(GroupProjectCommon.Messages.events.show_message, function(event, event_data) {
+        show_message(event_data.message, event_data.title, event_data.title_css_class);
+    });
+
+    discussion_box.find('.close-box, .modal-bg').click(function(){
+        $(this).parents("#group-project-discussion").hide();
+        $(document).trigger(GroupProjectCommon.Discussion.events.hide_discussion);
+    });
+}
+
+;
+/* exported GroupProjectCommon */
+// Set up gettext in case it isn't available in the client runtime:
+if (typeof gettext === "undefined") {
+    window.gettext = function gettext_stub(string) {
+        'use strict';
+        return string;
+    };
+}
+
+var GroupProjectEvents = {
+    ProjectNavigator: {
+        activate_view: 'group_project_v2.project_navigator.activate_view',
+        switch_view: 'group_project_v2.project_navigator.switch_view',
+        stage_status_update: 'group_project_v2.project_navigator.stage_status_update'
+    },
+    Discussion: {
+        show_discussion: 'group_project_v2.discussion.show',
+        hide_discussion: 'group_project_v2.discussion.hide'
+    },
+    Submission: {
+        upload_started: 'group_project_v2.submission.upload_started',
+        upload_failed: 'group_project_v2.submission.upload_failed',
+        upload_complete: 'group_project_v2.submission.upload_complete'
+    },
+    Review: {
+        refresh_status: "group_project_v2.review.refresh_status"
+    },
+    Messages: {
+        show_message: 'group_project_v2.messages.show'
+    }
+};
+
+var GroupProjectCommon = {
+    get_root_element: function(element) {
+        'use strict';
+        return $(element).parents(".group-project-xblock-wrapper");
+    },
+    gettext: gettext,
+    ProjectNavigator: {
+        events: GroupProjectEvents.ProjectNavigator
+    },
+    Discussion: {
+        events: GroupProjectEvents.Discussion,
+        show_discussion: function() {
+            'use strict';
+            $(document).trigger(GroupProjectEvents.Discussion.show_discussion);
+        },
+        hide_discussion: function() {
+            'use strict';
+            $(document).trigger(GroupProjectEvents.Discussion.hide_discussion);
+        }
+    },
+    Submission: {
+        events: GroupProjectEvents.Submission
+    },
+    Review: {
+        events: GroupProjectEvents.Review,
+        messages: {
+            SELECT_PEER_TO_REVIEW: gettext('Please select Teammate to review'),
+            SELECT_GROUP_TO_REVIEW: gettext('Please select Group to review'),
+
+            THANKS_FOR_FEEDBACK: gettext('Thanks for your feedback!'),
+            ERROR_LOADING_FEEDBACK: gettext('We encountered an error loading your feedback.'),
+            ERROR_SAVING_FEEDBACK: gettext('We encountered an error saving your feedback.'),
+            ERROR_LOADING_SUBMISSIONS: gettext('We encountered an error.')
+        }
+    },
+    CompletionStage: {
+        messages: {
+            MARKED_AS_COMPLETE: gettext('This task has been marked as complete.'),
+            ERROR_SAVING_PROGRESS: gettext('We encountered an error saving your progress.')
+        }
+    },
+    Messages: {
+        events: GroupProjectEvents.Messages,
+        show_message: function(message, title, title_css_class) {
+            'use strict';
+            $(document).trigger(
+                GroupProjectEvents.Messages.show_message,
+                {message: message, title: title, title_css_class: title_css_class}
+            );
+        }
+    }
+};
\ No newline at end of file
@@ -3,6 +3,8 @@
 function GroupProjectSubmissionBlock(runtime, element) {
     "use strict";
 
+    var UPLOAD_STATUS_POLL_INTERVAL = 1000;
+
     /**
      * This function is responsible for formatting the modal dialog for user.
      */
@@ -75,6 +77,65 @@ function GroupProjectSubmissionBlock(runtime, element) {
         return message;
     }
 
+    /**
+     * Asks the server how much of the file is already uploaded and what chunk size to use, so that large files are
+     * uploaded in chunks and an interrupted upload of the same file resumes instead of starting from zero.
+     * If the server can not tell, the file is uploaded in a single request.
+     */
+    function prepareChunkedUpload(data) {
+        var file = data.files[0],
+            last_modified = file.lastModified || '';
+        return $.ajax({
+            type: 'POST',
+            url: runtime.handlerUrl(element, "upload_session"),
+            data: JSON.stringify({file_name: file.name, size: file.size, last_modified: last_modified})
+        }).done(function (response) {
+            if (response.result === 'success') {
+                data.maxChunkSize = response.chunk_size;
+                data.uploadedBytes = response.uploaded_bytes;
+                // chunks are matched to the session by file modification time, along with file name and size
+                data.formData = upload_data.formData.concat([{name: 'last_modified', value: last_modified}]);
+            }
+        });
+    }
+
+    /**
+     * Waits until the server finishes processing of an uploaded file: recording the submission and marking the
+     * stage as complete, done by the status requests. Resolves with the same data a synchronous upload responds with.
+     */
+    function waitForUploadProcessing(job_id) {
+        var result = $.Deferred();
+
+        function poll() {
+            $.ajax({
+                type: 'POST',
+                url: runtime.handlerUrl(element, "upload_status"),
+                data: JSON.stringify({job_id: job_id})
+            }).done(function (response) {
+                if (response.state === 'pending') {
+                    setTimeout(poll, UPLOAD_STATUS_POLL_INTERVAL);
+                } else if (response.state === 'complete') {
+                    result.resolve(response.data);
+                } else {
+                    result.reject(response.data || {});
+                }
+            }).fail(function () {
+                result.reject({});
+            });
+        }
+
+        poll();
+        return result.promise();
+    }
+
+    function showUploadProcessingError(data) {
+        GroupProjectCommon.Messages.show_message(
+            data.message || GroupProjectCommon.gettext("Your file was stored, but recording the submission failed."),
+            data.title || GroupProjectCommon.gettext("Error"),
+            'error'
+        );
+    }
+
     var upload_data = {
         dataType: 'json',
         url: runtime.handlerUrl(element, "upload_submission"),
@@ -92,41 +153,53 @@ function GroupProjectSubmissionBlock(runtime, element) {
             $('.' + data.paramName + '_progress', target_form).css({width: '0%'}).removeClass('complete failed');
             $('.' + data.paramName + '_progress_box', target_form).css({visibility: 'visible'});
 
+            function showNewStageStates(data) {
+                if (data.new_stage_states) {
+                    for (var i=0; i<data.new_stage_states.length; i++) {
+                        var new_state = data.new_stage_states[i];
+                        $(document).trigger(
+                            "group_project_v2.project_navigator.stage_status_update",
+                            [new_state.activity_id, new_state.stage_id, new_state.state]
+                        );
+                        $('.' + parentData.paramName + '_uploaded_by', element).html(
+                            'Uploaded by ' + data.user_label + ' on ' + data.submission_date);
+                    }
+                }
+            }
+
             $(document).one('perform_uploads', function () {
-                var uploadXHR = data.submit();
-
-                uploadXHR
-                    .success(function (data, textStatus, jqXHR) {
-                        if (data.new_stage_states) {
-                            for (var i=0; i<data.new_stage_states.length; i++) {
-                                var new_state = data.new_stage_states[i];
-                                $(document).trigger(
-                                    "group_project_v2.project_navigator.stage_status_update",
-                                    [new_state.activity_id, new_state.stage_id, new_state.state]
-                                );
-                                $('.' + parentData.paramName + '_uploaded_by', element).html(
-                                    'Uploaded by ' + data.user_label + ' on ' + data.submission_date);
+                prepareChunkedUpload(data).always(function () {
+                    var uploadXHR = data.submit();
+
+                    uploadXHR
+                        .success(function (data) {
+                            if (data.upload_job_id) {
+                                waitForUploadProcessing(data.upload_job_id)
+                                    .done(showNewStageStates)
+                                    .fail(showUploadProcessingError);
+                            } else {
+                                showNewStageStates(data);
                             }
-                        }
-
-                        if (data.submissions) {
-                            for (var submission_id in data.submissions) {
-                                if (data.submissions.hasOwnProperty(submission_id)) {
-                                    var location = data.submissions[submission_id];
-                                    $('.' + submission_id + '_name', target_form).parent(".upload_item_wrapper")
-                                        .data('location', location)
-                                        .attr('data-location', location); // need to set attr as there are css rule
+
+                            if (data.submissions) {
+                                for (var submission_id in data.submissions) {
+                                    if (data.submissions.hasOwnProperty(submission_id)) {
+                                        var location = data.submissions[submission_id];
+                                        $('.' + submission_id + '_name', target_form).parent(".upload_item_wrapper")
+                                            .data('location', location)
+                                            .attr('data-location', location); // need to set attr as there are css rule
+                                    }
                                 }
                             }
-                        }
 
-                        $(document).trigger(GroupProjectCommon.Submission.events.upload_complete, jqXHR);
-                    })
-                    .fail(function (jqXHR) {
-                        $(document).trigger(GroupProjectCommon.Submission.events.upload_failed, jqXHR);
-                    });
+                            $(document).trigger(GroupProjectCommon.Submission.events.upload_complete, uploadXHR);
+                        })
+                        .fail(function () {
+                            $(document).trigger(GroupProjectCommon.Submission.events.upload_failed, uploadXHR);
+                        });
 
-                $(document).trigger(GroupProjectCommon.Submission.events.upload_started, uploadXHR);
+                    $(document).trigger(GroupProjectCommon.Submission.events.upload_started, uploadXHR);
+                });
             });
 
             $(document).trigger('perform_uploads');
@@ -4,6 +4,7 @@ function GroupProjectReviewStage(runtime, element) {
     "use strict";
     var DATA_PRESENT_SUBMIT = GroupProjectCommon.gettext('Resubmit');
     var NO_DATA_PRESENT_SUBMIT = GroupProjectCommon.gettext('Submit');
+    var GRADING_STATUS_POLL_INTERVAL = 1000;
 
     var $form = $(".review",  element);
     var $submit_btn = $form.find('button.submit');
@@ -12,6 +13,23 @@ function GroupProjectReviewStage(runtime, element) {
     var messages = GroupProjectCommon.Review.messages;
     var show_message = GroupProjectCommon.Messages.show_message;
 
+    function wait_for_grading(grading) {
+        // deferred grading: grade is calculated by grading_status request once grading job is due
+        function poll() {
+            $.ajax({
+                type: 'POST',
+                url: runtime.handlerUrl(element, "grading_status"),
+                data: JSON.stringify({group_id: grading.group_id})
+            }).done(function (response) {
+                if (response.state === 'pending') {
+                    setTimeout(poll, Math.max(response.due_in * 1000, GRADING_STATUS_POLL_INTERVAL));
+                }
+            });
+        }
+
+        setTimeout(poll, grading.due_in * 1000);
+    }
+
     function validate_form_answers() {
         var answers = $form.find('.required .answer');
         var submitButton = $form.find('button.submit');
@@ -157,6 +175,10 @@ function GroupProjectReviewStage(runtime, element) {
                         );
                     }
                 }
+
+                if (data.grading) {
+                    wait_for_grading(data.grading);
+                }
             },
             error: function () {
                 show_message(messages.ERROR_SAVING_FEEDBACK);
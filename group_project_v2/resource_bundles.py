@@ -0,0 +1,125 @@
+"""
+Static resource bundles.
+
+Each view adds its CSS and JS as a single CSS and a single JS file per bundle, referenced by URL, so browsers fetch
+them once and cache them afterwards. Bundle files are concatenations of the source files listed in `RESOURCE_BUNDLES`,
+built ahead of time and shipped under `public/bundles` - run `make bundles` after changing any of the source files.
+Unit tests check that bundle files are up to date.
+"""
+import io
+import os
+
+import pkg_resources
+
+PACKAGE_NAME = 'group_project_v2'
+BUNDLES_PATH = 'public/bundles'
+
+# Vendor CSS is not bundled, as it refers to fonts and images by relative URLs. Studio editor resources are not
+# bundled either, as each editor is rendered on its own.
+RESOURCE_BUNDLES = {
+    'project_student_view': {
+        'css': ('public/css/group_project.css', 'public/css/group_project_common.css'),
+        'javascript': ('public/js/group_project.js', 'public/js/group_project_common.js'),
+    },
+    # project navigator, stages and stage components - added by each of them, so that the page gets them once
+    'project_components': {
+        'css': (
+            'public/css/project_navigator/project_navigator.css',
+            'public/css/project_navigator/navigation_view.css',
+            'public/css/project_navigator/resources_view.css',
+            'public/css/project_navigator/submissions_view.css',
+            'public/css/project_navigator/ask_ta_view.css',
+            'public/css/components/review_subject_selector.css',
+            'public/css/components/project_team.css',
+        ),
+        'javascript': (
+            'public/js/project_navigator/project_navigator.js',
+            'public/js/project_navigator/navigation_view.js',
+            'public/js/project_navigator/resources_view.js',
+            'public/js/project_navigator/submissions_view.js',
+            'public/js/project_navigator/ask_ta_view.js',
+            'public/js/project_navigator/private_discussion_view.js',
+            'public/js/stages/completion.js',
+            'public/js/stages/review_stage.js',
+            'public/js/components/submission.js',
+            'public/js/components/review_subject_selector.js',
+            'public/js/components/project_team.js',
+        ),
+    },
+    'project_dashboard_view': {
+        'css': ('public/css/group_project_common.css', 'public/css/group_project_dashboard.css'),
+    },
+    'project_dashboard_detail_view': {
+        'css': ('public/css/group_project_common.css', 'public/css/group_project_dashboard.css'),
+        'javascript': ('public/js/group_project_dashboard_detail.js', ),
+    },
+    'author_view': {
+        'css': ('public/css/group_project.css', ),
+    },
+    'author_edit_view': {
+        'base': 'author_view',
+        'css': ('public/css/group_project_edit.css', ),
+    },
+    'author_preview_view': {
+        'base': 'author_view',
+        'css': ('public/css/group_project_preview.css', ),
+    },
+}
+RESOURCE_TYPES = ('css', 'javascript')
+RESOURCE_EXTENSIONS = {'css': 'css', 'javascript': 'js'}
+# newline guards against a resource ending with a comment, semicolon - against missing semicolon at the end of script
+RESOURCE_SEPARATORS = {'css': u"\n", 'javascript': u"\n;\n"}
+HEADER_TEMPLATE = u"/* Generated by `make bundles` - do not edit. Sources:\n{sources}\n */\n"
+
+
+def get_bundle_path(bundle_name, resource_type):
+    """
+    :param str bundle_name: Bundle name
+    :param str resource_type: Resource type - 'css' or 'javascript'
+    :rtype: str
+    :returns: Path of the bundle file, relative to the package
+    """
+    return "{}/{}.{}".format(BUNDLES_PATH, bundle_name, RESOURCE_EXTENSIONS[resource_type])
+
+
+def build_bundle(bundle_name, resource_type):
+    """
+    :param str bundle_name: Bundle name
+    :param str resource_type: Resource type - 'css' or 'javascript'
+    :rtype: unicode
+    :returns: Content of the bundle file
+    """
+    source_paths = RESOURCE_BUNDLES[bundle_name][resource_type]
+    sources = [pkg_resources.resource_string(PACKAGE_NAME, path).decode('utf-8') for path in source_paths]
+    header = HEADER_TEMPLATE.format(sources=u"\n".join(u" * " + path for path in source_paths))
+    return header + RESOURCE_SEPARATORS[resource_type].join(sources)
+
+
+def get_bundle_files():
+    """
+    :rtype: list[(str, str)]
+    :returns: Names and resource types of all the bundle files
+    """
+    return [
+        (bundle_name, resource_type)
+        for bundle_name, bundle in sorted(RESOURCE_BUNDLES.items())
+        for resource_type in RESOURCE_TYPES
+        if resource_type in bundle
+    ]
+
+
+def write_bundles():
+    """
+    Builds all the bundle files
+    """
+    bundles_dir = pkg_resources.resource_filename(PACKAGE_NAME, BUNDLES_PATH)
+    if not os.path.isdir(bundles_dir):
+        os.makedirs(bundles_dir)
+    for bundle_name, resource_type in get_bundle_files():
+        bundle_path = pkg_resources.resource_filename(PACKAGE_NAME, get_bundle_path(bundle_name, resource_type))
+        with io.open(bundle_path, 'w', encoding='utf-8') as bundle_file:
+            bundle_file.write(build_bundle(bundle_name, resource_type))
+
+
+if __name__ == '__main__':
+    write_bundles()
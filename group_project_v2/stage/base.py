@@ -16,12 +16,13 @@ from group_project_v2.mixins import (
     DashboardXBlockMixin, AuthXBlockMixin
 )
 from group_project_v2.notifications import StageNotificationsMixin
+from group_project_v2.profiling import profiled
 from group_project_v2.stage_components import (
     GroupProjectResourceXBlock, GroupProjectVideoResourceXBlock, ProjectTeamXBlock
 )
 from group_project_v2.utils import (
     gettext as _, HtmlXBlockShim, format_date, Constants, loader,
-    groupwork_protected_view, add_resource, MUST_BE_OVERRIDDEN, get_link_to_block, get_block_content_id,
+    groupwork_protected_view, add_resource_bundle, MUST_BE_OVERRIDDEN, get_link_to_block, get_block_content_id,
 )
 from group_project_v2.stage.utils import StageState
 
@@ -224,6 +225,7 @@ class BaseGroupActivityStage(
 
         return fragment
 
+    @profiled
     @groupwork_protected_view
     def student_view(self, context):
         return self._view_render(context)
@@ -268,7 +270,7 @@ class BaseGroupActivityStage(
         fragment.add_content(loader.render_template(self.STAGE_CONTENT_TEMPLATE, render_context))
 
         if self.js_file:
-            add_resource(self, 'javascript', self.js_file, fragment)
+            add_resource_bundle(self, 'project_components', fragment)
 
         if self.js_init:
             fragment.initialize_js(self.js_init)
@@ -352,6 +354,15 @@ class BaseGroupActivityStage(
         """
         return StageState.NOT_AVAILABLE
 
+    def get_external_group_statuses(self, groups):
+        """
+        Calculates external group statuses for multiple groups. Stages can override it to fetch data for all the
+        groups at once.
+        :param collections.Iterable[group_project_v2.project_api.dtos.WorkgroupDetails] groups: workgroups
+        :rtype: dict[int, StageState]
+        """
+        return {group.id: self.get_external_group_status(group) for group in groups}
+
     def get_external_status_label(self, status):
         """
         Gets human-friendly label for external status.
@@ -393,6 +404,7 @@ class BaseGroupActivityStage(
             for stage in (StageState.NOT_STARTED, StageState.INCOMPLETE, StageState.COMPLETED)
         ])
 
+    @profiled
     @AuthXBlockMixin.check_dashboard_access_for_current_user
     def dashboard_view(self, context):
         """
@@ -417,6 +429,7 @@ class BaseGroupActivityStage(
         fragment.add_content(self.render_template('dashboard_view', render_context))
         return fragment
 
+    @profiled
     @AuthXBlockMixin.check_dashboard_access_for_current_user
     def dashboard_detail_view(self, context):
         """
@@ -425,9 +438,11 @@ class BaseGroupActivityStage(
         :rtype: Fragment
         """
         fragment = Fragment()
+        client_filter_id = context.get(Constants.CURRENT_CLIENT_FILTER_ID_PARAMETER_NAME)
         render_context = {
             'stage': self, 'ta_graded': self.activity.is_ta_graded,
-            'download_incomplete_emails_handler_url': self.get_incomplete_emails_handler_url()
+            'download_incomplete_emails_handler_url': self.get_incomplete_emails_handler_url(),
+            'download_submissions_handler_url': self.get_submissions_archive_handler_url(client_filter_id),
         }
         fragment.add_content(self.render_template('dashboard_detail_view', render_context))
         return fragment
@@ -439,6 +454,14 @@ class BaseGroupActivityStage(
         }
         return base_url + '?' + urlencode(query_params)
 
+    def get_submissions_archive_handler_url(self, client_filter_id=None):  # pylint: disable=no-self-use,unused-argument
+        """
+        :param int|None client_filter_id: Only download submissions of workgroups with users of this organization
+        :rtype: str|None
+        :returns: URL to download all workgroups' submissions of the stage, if stage has any
+        """
+        return None
+
     def get_new_stage_state_data(self):
         return {
             "activity_id": str(self.activity.id),
@@ -1,4 +1,9 @@
 import logging
+from datetime import datetime
+from urllib import urlencode
+
+import webob
+from django.core.files.storage import default_storage
 from xblock.core import XBlock
 from xblock.fields import String, Scope
 from xblock.fragment import Fragment
@@ -6,11 +11,14 @@ from xblock.validation import ValidationMessage
 
 from group_project_v2 import messages
 from group_project_v2.api_error import ApiError
+from group_project_v2.profiling import profiled
 from group_project_v2.stage.base import BaseGroupActivityStage
 from group_project_v2.stage.mixins import SimpleCompletionStageMixin
 from group_project_v2.stage_components import SubmissionsStaticContentXBlock, GroupProjectSubmissionXBlock
-from group_project_v2.utils import gettext as _, groupwork_protected_handler, loader
+from group_project_v2.upload_file import get_storage_path
+from group_project_v2.utils import gettext as _, groupwork_protected_handler, loader, Constants
 from group_project_v2.stage.utils import StageState, DISPLAY_NAME_NAME, DISPLAY_NAME_HELP
+from group_project_v2.zip_stream import ZipStream, fits_without_zip64
 
 log = logging.getLogger(__name__)
 
@@ -29,6 +37,7 @@ class BasicStage(SimpleCompletionStageMixin, BaseGroupActivityStage):
     NAVIGATION_LABEL = _(u'Overview')
     STUDIO_LABEL = _(u"Text")
 
+    @profiled
     def student_view(self, context):
         fragment = super(BasicStage, self).student_view(context)
 
@@ -57,6 +66,7 @@ class CompletionStage(SimpleCompletionStageMixin, BaseGroupActivityStage):
 
     STAGE_ACTION = _(u"mark stage as complete")
 
+    @profiled
     @XBlock.json_handler
     @groupwork_protected_handler
     def stage_completed(self, _data, _suffix=''):
@@ -114,6 +124,9 @@ class SubmissionStage(BaseGroupActivityStage):
 
     STAGE_ACTION = _(u"upload submission")
 
+    ARCHIVE_FILENAME = u"{stage_name}_submissions_{timestamp}.zip"
+    ARCHIVE_TIMESTAMP_FORMAT = "%Y_%m_%d_%H_%M_%S"
+
     @property
     def allowed_nested_blocks(self):
         blocks = super(SubmissionStage, self).allowed_nested_blocks
@@ -204,10 +217,12 @@ class SubmissionStage(BaseGroupActivityStage):
         :param collections.Iterable[group_project_v2.project_api.dtos.ReducedUserDetails] target_users:
         :rtype: (set[int], set[int])
         """
+        target_workgroups = list(target_workgroups)
+        group_statuses = self.get_external_group_statuses(target_workgroups)
         completed_users = []
         partially_completed_users = []
         for group in target_workgroups:
-            group_stage_state = self.get_external_group_status(group)
+            group_stage_state = group_statuses[group.id]
             workgroup_user_ids = [user.id for user in group.users]
 
             if group_stage_state == StageState.COMPLETED:
@@ -226,8 +241,39 @@ class SubmissionStage(BaseGroupActivityStage):
         """
         upload_ids = set(submission.upload_id for submission in self.submissions)
         group_submissions = self.project_api.get_latest_workgroup_submissions_by_id(group.id)
-        uploaded_submissions = set(group_submissions.keys())
+        return self._get_submissions_status(upload_ids, set(group_submissions.keys()))
+
+    def get_external_group_statuses(self, groups):
+        """
+        Calculates external group statuses for multiple groups, fetching latest submissions of all of them at once.
+        :param collections.Iterable[group_project_v2.project_api.dtos.WorkgroupDetails] groups: workgroups
+        :rtype: dict[int, StageState]
+        """
+        groups = list(groups)
+        upload_ids = set(submission.upload_id for submission in self.submissions)
+        submissions_by_group = self._get_latest_submissions_by_group(groups)
+        return {
+            group.id: self._get_submissions_status(upload_ids, set(submissions_by_group[group.id].keys()))
+            for group in groups
+        }
+
+    def _get_latest_submissions_by_group(self, groups):
+        """
+        :param list[group_project_v2.project_api.dtos.WorkgroupDetails] groups: workgroups
+        :rtype: dict[int, dict[str, group_project_v2.project_api.dtos.SubmissionDetails]]
+        """
+        project_details = self.activity.project.project_details
+        return self.project_api.get_latest_submissions_for_workgroups(
+            [group.id for group in groups], project_details.id if project_details else None
+        )
 
+    @staticmethod
+    def _get_submissions_status(upload_ids, uploaded_submissions):
+        """
+        :param set[str] upload_ids: IDs of stage uploads
+        :param set[str] uploaded_submissions: IDs of uploads submitted by workgroup
+        :rtype: StageState
+        """
         has_all = uploaded_submissions >= upload_ids
         has_some = bool(uploaded_submissions & upload_ids)
 
@@ -237,3 +283,117 @@ class SubmissionStage(BaseGroupActivityStage):
             return StageState.INCOMPLETE
         else:
             return StageState.NOT_STARTED
+
+    def get_submissions_archive_handler_url(self, client_filter_id=None):
+        url = self.runtime.handler_url(self, 'download_submissions')
+        if client_filter_id is not None:
+            url += '?' + urlencode({Constants.CURRENT_CLIENT_FILTER_ID_PARAMETER_NAME: client_filter_id})
+        return url
+
+    @profiled
+    @XBlock.handler
+    def download_submissions(self, request, _suffix=''):
+        """
+        Streams ZIP archive of the latest stage submissions of project workgroups the user can see on the dashboard,
+        with a folder per workgroup. Stored files are read in chunks and archive is sent while being written, so
+        neither files nor archive are kept in memory.
+        """
+        if not (self.is_admin_grader or self.can_access_dashboard(self.user_id)):
+            return webob.response.Response(messages.SUBMISSIONS_DOWNLOAD_NOT_ALLOWED, status=403)
+
+        raw_client_filter_id = request.GET.get(Constants.CURRENT_CLIENT_FILTER_ID_PARAMETER_NAME, u'').strip()
+        if raw_client_filter_id and not raw_client_filter_id.isdigit():
+            return webob.response.Response(messages.INVALID_CLIENT_FILTER, status=400)
+        client_filter_id = int(raw_client_filter_id) if raw_client_filter_id else None
+
+        entries = self._get_archive_entries(self._get_accessible_workgroups(client_filter_id))
+        if not fits_without_zip64((archive_path, size) for archive_path, _storage_path, size, _date in entries):
+            return webob.response.Response(messages.SUBMISSIONS_ARCHIVE_TOO_LARGE, status=413)
+
+        filename = self.ARCHIVE_FILENAME.format(
+            stage_name=self.display_name, timestamp=datetime.utcnow().strftime(self.ARCHIVE_TIMESTAMP_FORMAT)
+        )
+        response = webob.response.Response(content_type='application/zip', app_iter=self._write_archive(entries))
+        response.headers['Content-Disposition'] = u'attachment; filename="{filename}"'.format(
+            filename=filename.replace(u'"', u"'")
+        ).encode('utf-8')
+        return response
+
+    def _get_accessible_workgroups(self, client_filter_id):
+        """
+        Lists project workgroups that have users visible to the current user on the dashboard, see
+        :meth:`DashboardRootXBlockMixin._add_students_and_workgroups_to_context`
+        :param int|None client_filter_id: Only list workgroups with users of this organization
+        :rtype: list[group_project_v2.project_api.dtos.WorkgroupDetails]
+        """
+        org_filter = self.get_organization_filter_for_user(
+            self.user_id, [client_filter_id] if client_filter_id is not None else None
+        )
+        return [
+            group for group in self.activity.project.workgroups
+            if any(org_filter.can_access_other_user(user.id) for user in group.users)
+        ]
+
+    def _get_archive_entries(self, groups):
+        """
+        Lists submitted files to archive. Submissions and file sizes are fetched before the archive is streamed, so
+        that API errors and archive size limit are reported as a failed request rather than as a truncated archive.
+        Files missing from storage are skipped.
+        :param list[group_project_v2.project_api.dtos.WorkgroupDetails] groups: workgroups
+        :rtype: list[(unicode, unicode, int, datetime)]
+        :returns: Archive path, storage path, size and modification time of each file
+        """
+        upload_ids = [submission.upload_id for submission in self.submissions]
+        submissions_by_group = self._get_latest_submissions_by_group(groups)
+
+        entries = []
+        for group in groups:
+            group_folder = u"{name} ({id})".format(name=group.name or _(u"Group"), id=group.id).replace(u"/", u"_")
+            group_submissions = submissions_by_group.get(group.id, {})
+            archive_paths = set()
+            for upload_id in upload_ids:
+                submission = group_submissions.get(upload_id)
+                if submission is None:
+                    continue
+
+                storage_path = get_storage_path(submission.document_url)
+                if storage_path is None:
+                    log.warning("Submission %s is not kept in storage, skipping", submission.document_url)
+                    continue
+                try:
+                    size = default_storage.size(storage_path)
+                except EnvironmentError:
+                    log.warning("Submitted file %s is missing from storage, skipping", storage_path)
+                    continue
+
+                file_name = submission.document_filename.replace(u"/", u"_")
+                archive_path = u"{}/{}".format(group_folder, file_name)
+                if archive_path in archive_paths:
+                    archive_path = u"{}/{}_{}".format(group_folder, upload_id, file_name)
+                archive_paths.add(archive_path)
+                entries.append((archive_path, storage_path, size, submission.modified_date))
+
+        return entries
+
+    @staticmethod
+    def _write_archive(entries):
+        """
+        :param list[(unicode, unicode, int, datetime)] entries: Files to archive, see :meth:`_get_archive_entries`
+        :rtype: collections.Iterable[bytes]
+        """
+        archive = ZipStream()
+        for archive_path, storage_path, _size, modified_date in entries:
+            try:
+                stored_file = default_storage.open(storage_path)
+            except EnvironmentError:
+                log.warning("Submitted file %s is missing from storage, skipping", storage_path)
+                continue
+
+            try:
+                for data in archive.add_file(archive_path, stored_file.chunks(), modified_date):
+                    yield data
+            finally:
+                stored_file.close()
+
+        for data in archive.close():
+            yield data
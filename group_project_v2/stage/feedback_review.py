@@ -5,6 +5,7 @@ from xblock.fields import String, Scope
 from xblock.validation import ValidationMessage
 
 from group_project_v2 import messages
+from group_project_v2.profiling import profiled
 from group_project_v2.stage.utils import DISPLAY_NAME_NAME, DISPLAY_NAME_HELP
 from group_project_v2.stage.base import BaseGroupActivityStage
 from group_project_v2.stage.mixins import SimpleCompletionStageMixin
@@ -54,6 +55,7 @@ class FeedbackDisplayBaseStage(SimpleCompletionStageMixin, BaseGroupActivityStag
 
         return violations
 
+    @profiled
     def student_view(self, context):
         fragment = super(FeedbackDisplayBaseStage, self).student_view(context)
 
@@ -141,7 +143,7 @@ class GradeDisplayStage(FeedbackDisplayBaseStage):
 
     def get_reviewer_ids(self):
         return [
-            user['id'] for user in self.project_api.get_workgroup_reviewers(self.group_id, self.activity_content_id)
+            user.id for user in self.project_api.get_reviewers_for_workgroup(self.group_id, self.activity_content_id)
         ]
 
     def get_reviews(self):
@@ -12,6 +12,8 @@ from xblock.validation import ValidationMessage
 
 from group_project_v2 import messages
 from group_project_v2.api_error import ApiError
+from group_project_v2.deferred_grading import GradingState
+from group_project_v2.profiling import profiled
 from group_project_v2.stage.base import BaseGroupActivityStage
 from group_project_v2.stage_components import (
     GradeRubricStaticContentXBlock, GroupProjectReviewQuestionXBlock, PeerSelectorXBlock, GroupSelectorXBlock
@@ -163,6 +165,7 @@ class ReviewBaseStage(BaseGroupActivityStage):
             if self.real_user_id(item['reviewer']) == user_id
         ]
 
+    @profiled
     @XBlock.json_handler
     @groupwork_protected_handler
     @key_error_protected_handler
@@ -177,7 +180,7 @@ class ReviewBaseStage(BaseGroupActivityStage):
             return {'result': 'error', 'msg': reason.format(action=self.STAGE_ACTION)}
 
         try:
-            self.do_submit_review(submissions)
+            response_data = self.do_submit_review(submissions) or {}
 
             if self.can_mark_complete and self.review_status() == ReviewState.COMPLETED:
                 self.mark_complete()
@@ -185,15 +188,23 @@ class ReviewBaseStage(BaseGroupActivityStage):
             log.exception(exception.message)
             return {'result': 'error', 'msg': exception.message}
 
-        return {
+        response_data.update({
             'result': 'success',
             'msg': messages.FEEDBACK_SAVED_MESSAGE,
             'new_stage_states': [self.get_new_stage_state_data()]
-        }
+        })
+        return response_data
 
     def do_submit_review(self, submissions):
+        """
+        Saves review answers
+        :param dict submissions: Review answers
+        :rtype: dict|None
+        :returns: Additional response data, if any
+        """
         raise NotImplementedError(MUST_BE_OVERRIDDEN)
 
+    @profiled
     def student_view(self, context):
         if self.can_mark_complete:
             self.visited = True
@@ -280,6 +291,7 @@ class TeamEvaluationStage(ReviewBaseStage):
 
         return violations
 
+    @profiled
     @XBlock.handler
     @groupwork_protected_handler
     @key_error_protected_handler
@@ -388,6 +400,15 @@ class PeerReviewStage(ReviewBaseStage):
         """
         return self.project_api.get_workgroups_to_review(user_id, self.course_id, self.activity_content_id)
 
+    @lazy
+    def review_subjects_by_user(self):
+        """
+        Activity-wide mapping of users to workgroups they review - cheaper than `get_review_subjects` when
+        review subjects of many users are needed (i.e. in dashboards)
+        :rtype: dict[int, list[group_project_v2.project_api.dtos.WorkgroupDetails]]
+        """
+        return self.project_api.get_workgroups_to_review_by_user(self.course_id, self.activity_content_id)
+
     def _get_review_items(self, review_groups, with_caching=False):
         """
         Gets review items for a list of groups
@@ -442,29 +463,51 @@ class PeerReviewStage(ReviewBaseStage):
         :param group_project_v2.project_api.dtos.WorkgroupDetails group: workgroup
         :rtype: StageState
         """
-        if not self.activity.is_ta_graded:
-            reviewer_ids = [
-                user['id'] for user in self.project_api.get_workgroup_reviewers(group.id, self.activity_content_id)
-            ]
-            reviews_for_group = self._get_review_items([group], with_caching=True)
-            review_results = [
-                self._calculate_review_status([group.id], self._get_reviews_by_user(reviews_for_group, reviewer_id))
-                for reviewer_id in reviewer_ids
-            ]
-            # if review_results is empty (e.g. no reviewers are configured) all will return True, and any will return
-            # False. It would result in a "broken" state (has_all, but not has_some) - it is cleared later
-            has_some = any(status != ReviewState.NOT_STARTED for status in review_results)
-            has_all = all(status == ReviewState.COMPLETED for status in review_results)
-        else:
-            ta_reviews = self._get_ta_reviews(group)
-            review_results = [
-                self._calculate_review_status([group.id], ta_review_items)
-                for ta_review_items in ta_reviews.values()
-            ]
-            has_some = any(status != ReviewState.NOT_STARTED for status in review_results)
-            # any completed TA review counts as "stage completed"
-            has_all = any(status == ReviewState.COMPLETED for status in review_results)
+        if self.activity.is_ta_graded:
+            return self._get_ta_graded_group_status(group)
+
+        reviewers = self.project_api.get_reviewers_for_workgroup(group.id, self.activity_content_id)
+        return self._get_peer_graded_group_status(group, reviewers)
+
+    def get_external_group_statuses(self, groups):
+        """
+        Calculates external group statuses for multiple groups, resolving reviewers for all of them at once.
+        :param collections.Iterable[group_project_v2.project_api.dtos.WorkgroupDetails] groups: workgroups
+        :rtype: dict[int, StageState]
+        """
+        if self.activity.is_ta_graded:
+            return super(PeerReviewStage, self).get_external_group_statuses(groups)
+
+        groups = list(groups)
+        reviewers = self.project_api.get_reviewers_for_workgroups(
+            [group.id for group in groups], self.activity_content_id
+        )
+        return {group.id: self._get_peer_graded_group_status(group, reviewers[group.id]) for group in groups}
 
+    def _get_peer_graded_group_status(self, group, reviewers):
+        reviews_for_group = self._get_review_items([group], with_caching=True)
+        review_results = [
+            self._calculate_review_status([group.id], self._get_reviews_by_user(reviews_for_group, reviewer.id))
+            for reviewer in reviewers
+        ]
+        # if review_results is empty (e.g. no reviewers are configured) all will return True, and any will return
+        # False. It would result in a "broken" state (has_all, but not has_some) - it is cleared later
+        has_some = any(status != ReviewState.NOT_STARTED for status in review_results)
+        has_all = all(status == ReviewState.COMPLETED for status in review_results)
+        return self._get_external_status(has_some, has_all)
+
+    def _get_ta_graded_group_status(self, group):
+        ta_reviews = self._get_ta_reviews(group)
+        review_results = [
+            self._calculate_review_status([group.id], ta_review_items)
+            for ta_review_items in ta_reviews.values()
+        ]
+        has_some = any(status != ReviewState.NOT_STARTED for status in review_results)
+        # any completed TA review counts as "stage completed"
+        has_all = any(status == ReviewState.COMPLETED for status in review_results)
+        return self._get_external_status(has_some, has_all)
+
+    def _get_external_status(self, has_some, has_all):
         has_all = has_some and has_all  # has_all should never be True if has_some is False
         review_state = self.REVIEW_STATE_CONDITIONS.get((has_some, has_all))
         return self.STAGE_STATE_REVIEW_STATE_MAPPING.get(review_state)
@@ -474,7 +517,7 @@ class PeerReviewStage(ReviewBaseStage):
         :param int user_id:
         :rtype: (set[int], dict)
         """
-        review_subjects = self.get_review_subjects(user_id)
+        review_subjects = self.review_subjects_by_user.get(user_id, [])
         review_items = self._get_review_items(review_subjects, with_caching=True)
         reviews_by_user = self._get_reviews_by_user(review_items, user_id)
         return set(group.id for group in review_subjects), reviews_by_user
@@ -512,6 +555,29 @@ class PeerReviewStage(ReviewBaseStage):
 
         return super(PeerReviewStage, self).get_stage_state()
 
+    @profiled
+    def student_view(self, context):
+        self.activity.process_due_grading_jobs([group.id for group in self.review_groups])
+        return super(PeerReviewStage, self).student_view(context)
+
+    @profiled
+    @XBlock.json_handler
+    @groupwork_protected_handler
+    @key_error_protected_handler
+    @conversion_protected_handler
+    def grading_status(self, data, _suffix=''):
+        """
+        Calculates and sends group grade if grading job of the group is due, and reports grading status,
+        see :mod:`group_project_v2.deferred_grading`
+        :param dict data: Group ID
+        :param str _suffix:
+        """
+        group_id = int(data['group_id'])
+        if group_id not in [group.id for group in self.review_groups]:
+            return {'state': GradingState.UNKNOWN, 'due_in': 0}
+        return self.activity.process_grading_job(group_id)
+
+    @profiled
     @XBlock.handler
     @groupwork_protected_handler
     @key_error_protected_handler
@@ -533,6 +599,7 @@ class PeerReviewStage(ReviewBaseStage):
 
         return webob.response.Response(body=json.dumps({"html": html_output}))
 
+    @profiled
     @XBlock.handler
     @groupwork_protected_handler
     @key_error_protected_handler
@@ -572,4 +639,6 @@ class PeerReviewStage(ReviewBaseStage):
                     }
                 )
 
-        self.activity.calculate_and_send_grade(group_id)
+        grading_status = self.activity.schedule_grade_calculation(group_id)
+        if grading_status is not None:
+            return {'grading': dict(grading_status, group_id=group_id)}
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 from collections import namedtuple
@@ -18,24 +19,32 @@ from xblockutils.studio_editable import StudioEditableXBlockMixin, XBlockWithPre
 
 from group_project_v2 import messages
 from group_project_v2.api_error import ApiError
+from group_project_v2.chunked_upload import ChunkedUpload, ChunkOffsetError, parse_content_range
 from group_project_v2.mixins import (
     CompletionMixin,
     NoStudioEditableSettingsMixin,
+    SettingsMixin,
     UserAwareXBlockMixin,
     WorkgroupAwareXBlockMixin,
 )
+from group_project_v2.post_upload import PostUploadState, create_job, get_pending_job_id, process_job
+from group_project_v2.profiling import profiled
 from group_project_v2.project_api import ProjectAPIXBlockMixin
 from group_project_v2.project_navigator import ResourcesViewXBlock, SubmissionsViewXBlock
 from group_project_v2.upload_file import UploadFile
 from group_project_v2.utils import (
+    CachePolicy,
     FieldValuesContextManager,
+    LocalCacheStorage,
     MUST_BE_OVERRIDDEN,
     add_resource,
+    add_resource_bundle,
+    get_block_content_id,
     get_link_to_block,
     make_user_caption,
+    render_content_scoped_template,
 )
 from group_project_v2.utils import (
-    build_date_field,
     format_date,
     gettext as _,
     groupwork_protected_view,
@@ -71,14 +80,24 @@ class BaseGroupProjectResourceXBlock(BaseStageComponentXBlock, StudioEditableXBl
 
     editable_fields = ('display_name', 'description')
 
+    @profiled
     def student_view(self, _context):  # pylint: disable=no-self-use
         return Fragment()
 
+    def get_resources_view_key_values(self):
+        """
+        :rtype: tuple
+        :returns: Values resources view output depends on
+        """
+        return self.display_name, self.description
+
     def resources_view(self, context):
         fragment = Fragment()
         render_context = {'resource': self}
         render_context.update(context)
-        fragment.add_content(loader.render_template(self.PROJECT_NAVIGATOR_VIEW_TEMPLATE, render_context))
+        fragment.add_content(render_content_scoped_template(
+            self, self.PROJECT_NAVIGATOR_VIEW_TEMPLATE, render_context, self.get_resources_view_key_values()
+        ))
         return fragment
 
 
@@ -103,6 +122,9 @@ class GroupProjectResourceXBlock(BaseGroupProjectResourceXBlock):
 
     editable_fields = ('display_name', 'description', 'resource_location', )
 
+    def get_resources_view_key_values(self):
+        return super(GroupProjectResourceXBlock, self).get_resources_view_key_values() + (self.resource_location,)
+
     def author_view(self, context):
         return self.resources_view(context)
 
@@ -125,6 +147,9 @@ class GroupProjectVideoResourceXBlock(BaseGroupProjectResourceXBlock):
     def is_available(cls):
         return True  # TODO: restore conditional availability when switched to use actual Ooyala XBlock
 
+    def get_resources_view_key_values(self):
+        return super(GroupProjectVideoResourceXBlock, self).get_resources_view_key_values() + (self.video_id,)
+
     def resources_view(self, context):
         render_context = {'video_id': self.video_id}
         render_context.update(context)
@@ -146,6 +171,7 @@ class StaticContentBaseXBlock(BaseStageComponentXBlock, XBlockWithPreviewMixin,
     TEXT_TEMPLATE = None
     TEMPLATE_PATH = "templates/html/components/static_content.html"
 
+    @profiled
     def student_view(self, context):
         try:
             activity = self.stage.activity
@@ -165,9 +191,12 @@ class StaticContentBaseXBlock(BaseStageComponentXBlock, XBlockWithPreviewMixin,
             'view_icon': target_block.icon
         }
         render_context.update(context)
+        key_values = tuple(
+            render_context[key] for key in ('block_link', 'block_text', 'target_block_id', 'view_icon')
+        )
 
         fragment = Fragment()
-        fragment.add_content(loader.render_template(self.TEMPLATE_PATH, render_context))
+        fragment.add_content(render_content_scoped_template(self, self.TEMPLATE_PATH, render_context, key_values))
         return fragment
 
 
@@ -201,8 +230,10 @@ SubmissionUpload = namedtuple("SubmissionUpload", "location file_name submission
 
 @XBlock.needs('user')
 @XBlock.wants('notifications')
+@XBlock.wants('settings')
 class GroupProjectSubmissionXBlock(
-    BaseStageComponentXBlock, ProjectAPIXBlockMixin, StudioEditableXBlockMixin, XBlockWithPreviewMixin
+    BaseStageComponentXBlock, ProjectAPIXBlockMixin, StudioEditableXBlockMixin, XBlockWithPreviewMixin,
+    SettingsMixin
 ):
     CATEGORY = "gp-v2-submission"
     STUDIO_LABEL = _(u"Submission")
@@ -231,6 +262,12 @@ class GroupProjectSubmissionXBlock(
 
     SUBMISSION_RECEIVED_EVENT = "activity.received_submission"
 
+    block_settings_key = 'group_project_v2'
+    UPLOAD_CHUNK_SIZE_KEY = 'upload_chunk_size'
+    ASYNC_UPLOAD_PROCESSING_KEY = 'async_upload_processing'
+    UPLOAD_NOTIFICATION_DIGEST_WINDOW_KEY = 'upload_notification_digest_window'
+    DEFAULT_UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024
+
     # TODO: Make configurable via XBlock settings
     DEFAULT_FILE_FILTERS = {
         "mime-types": (
@@ -256,32 +293,34 @@ class GroupProjectSubmissionXBlock(
 
     def get_upload(self, group_id):
         submission_map = self.project_api.get_latest_workgroup_submissions_by_id(group_id)
-        submission_data = submission_map.get(self.upload_id, None)
+        submission = submission_map.get(self.upload_id, None)
 
-        if submission_data is None:
+        if submission is None:
             return None
 
         return SubmissionUpload(
-            submission_data["document_url"],
-            submission_data["document_filename"],
-            format_date(build_date_field(submission_data["modified"])),
-            submission_data.get("user_details", None)
+            submission.document_url,
+            submission.document_filename,
+            format_date(submission.modified_date),
+            submission.user_details
         )
 
     @property
     def upload(self):
         return self.get_upload(self.stage.activity.workgroup.id)
 
+    @profiled
     def student_view(self, _context):  # pylint: disable=no-self-use
         return Fragment()
 
     def submissions_view(self, context):
+        self._process_pending_upload_job()
         fragment = Fragment()
         uploading_allowed = (self.stage.available_now and self.stage.is_group_member) or self.stage.is_admin_grader
         render_context = {'submission': self, 'upload': self.upload, 'disabled': not uploading_allowed}
         render_context.update(context)
         fragment.add_content(loader.render_template(self.PROJECT_NAVIGATOR_VIEW_TEMPLATE, render_context))
-        add_resource(self, 'javascript', 'public/js/components/submission.js', fragment)
+        add_resource_bundle(self, 'project_components', fragment)
         fragment.initialize_js("GroupProjectSubmissionBlock")
         return fragment
 
@@ -295,7 +334,25 @@ class GroupProjectSubmissionXBlock(
         # element
         return fragment
 
-    def _validate_upload(self, request):
+    def _validate_upload(self, request, content_range=None):
+        failure_code, response_data = self._validate_upload_permissions()
+        if failure_code is not None:
+            return failure_code, response_data
+
+        # file type can only be detected from the beginning of the file, so only first chunk is checked
+        if content_range is not None and content_range.start > 0:
+            return None, None
+
+        try:
+            self.validator(request.params[self.upload_id].file)
+        except ValidationError as validationError:
+            message = validationError.message % validationError.params
+            # 400 - BAD REQUEST
+            return 400, {'result': 'error', 'message': message}
+
+        return None, None
+
+    def _validate_upload_permissions(self):
         if not self.stage.available_now:
             template = messages.STAGE_NOT_OPEN_TEMPLATE if not self.stage.is_open else messages.STAGE_CLOSED_TEMPLATE
             # 422 = unprocessable entity
@@ -305,26 +362,99 @@ class GroupProjectSubmissionXBlock(
             # 403 - forbidden
             return 403, {'result': 'error', 'message': messages.NON_GROUP_MEMBER_UPLOAD}
 
+        return None, None
+
+    def _get_chunked_upload(self, workgroup, file_name, total_size, last_modified):
+        return ChunkedUpload.for_submission(
+            self.stage.activity.user_id, workgroup.id, self.upload_id, file_name, total_size, last_modified
+        )
+
+    @staticmethod
+    def _save_chunk(chunked_upload, chunk_file, content_range):
+        """
+        Stores uploaded chunk. Returns a response for chunks that do not complete the upload.
+        :param ChunkedUpload chunked_upload: Upload session
+        :param file chunk_file: Chunk content
+        :param group_project_v2.chunked_upload.ContentRange content_range: Chunk position
+        :rtype: (int|None, dict|None)
+        """
         try:
-            self.validator(request.params[self.upload_id].file)
-        except ValidationError as validationError:
-            message = validationError.message % validationError.params
+            uploaded_bytes = chunked_upload.save_chunk(chunk_file, content_range)
+        except ChunkOffsetError as exception:
+            # 416 - REQUESTED RANGE NOT SATISFIABLE
+            return 416, {
+                'result': 'error', 'message': messages.UPLOAD_CHUNK_OUT_OF_ORDER,
+                'uploaded_bytes': exception.uploaded_bytes
+            }
+        except ValueError as exception:
             # 400 - BAD REQUEST
-            return 400, {'result': 'error', 'message': message}
+            return 400, {'result': 'error', 'message': exception.message}
 
+        if uploaded_bytes < content_range.total:
+            return None, {'result': 'success', 'uploaded_bytes': uploaded_bytes}
         return None, None
 
+    @profiled
+    @XBlock.json_handler
+    def upload_session(self, data, _suffix=''):
+        """
+        Starts or resumes chunked upload of a file. Returns number of bytes already received, so that client sends
+        only the rest of the file, and size of chunks to send it in. Expired sessions are started over.
+        :param dict data: Uploaded file name, size and modification time
+        :param str _suffix:
+        """
+        failure_code, response_data = self._validate_upload_permissions()
+        if failure_code is not None:
+            return response_data
+
+        try:
+            chunked_upload = self._get_chunked_upload(
+                self.stage.activity.workgroup, data['file_name'], int(data['size']), data.get('last_modified')
+            )
+        except (KeyError, TypeError, ValueError):
+            return {'result': 'error', 'message': messages.UPLOAD_SESSION_INVALID}
+
+        if chunked_upload.is_expired():
+            chunked_upload.discard()
+
+        return {
+            'result': 'success',
+            'session_id': chunked_upload.session_id,
+            'uploaded_bytes': chunked_upload.uploaded_bytes,
+            'chunk_size': self._get_setting(self.UPLOAD_CHUNK_SIZE_KEY, self.DEFAULT_UPLOAD_CHUNK_SIZE),
+        }
+
+    @profiled
     @XBlock.handler
     def upload_submission(self, request, _suffix=''):
         """
         Handles submission upload and marks stage as completed if all submissions in stage have uploads.
+        Large files are uploaded in chunks - requests with Content-Range header, see
+        :mod:`group_project_v2.chunked_upload`; submission is made once the last chunk is received.
         :param request: HTTP request
         :param str _suffix:
         """
-        failure_code, response_data = self._validate_upload(request)
+        try:
+            content_range = parse_content_range(request.headers.get('Content-Range'))
+        except ValueError as exception:
+            content_range = None
+            failure_code, response_data = 400, {'result': 'error', 'message': exception.message}
+        else:
+            failure_code, response_data = self._validate_upload(request, content_range)
+
+        target_activity = self.stage.activity
+        # workgroup is resolved once and passed down, as each resolution queries the project API
+        workgroup = target_activity.workgroup if failure_code is None and response_data is None else None
+
+        chunked_upload = None
+        if workgroup is not None and content_range is not None:
+            chunk_file = request.params[self.upload_id].file
+            chunked_upload = self._get_chunked_upload(
+                workgroup, chunk_file.name, content_range.total, request.params.get('last_modified')
+            )
+            failure_code, response_data = self._save_chunk(chunked_upload, chunk_file, content_range)
 
         if failure_code is None and response_data is None:
-            target_activity = self.stage.activity
             response_data = {
                 "title": messages.SUCCESSFUL_UPLOAD_TITLE,
                 "message": messages.SUCCESSFUL_UPLOAD_MESSAGE_TPL.format(icon='fa fa-paperclip')
@@ -333,23 +463,24 @@ class GroupProjectSubmissionXBlock(
             try:
                 context = {
                     "user_id": target_activity.user_id,
-                    "group_id": target_activity.workgroup.id,
+                    "group_id": workgroup.id,
+                    "project_id": workgroup.project,
                     "project_api": self.project_api,
                     "course_id": target_activity.course_id
                 }
 
-                uploaded_file = self.persist_and_submit_file(
-                    target_activity, context, request.params[self.upload_id].file
-                )
+                file_stream = chunked_upload.open() if chunked_upload else request.params[self.upload_id].file
+                if self._get_setting(self.ASYNC_UPLOAD_PROCESSING_KEY, False):
+                    uploaded_file = self.persist_file(context, file_stream)
+                    response_data["upload_job_id"] = create_job(
+                        get_block_content_id(self), target_activity.user_id, uploaded_file.submission_data
+                    )
+                else:
+                    uploaded_file = self.persist_and_submit_file(target_activity, workgroup, context, file_stream)
+                    response_data.update(self._complete_upload(target_activity))
 
                 response_data["submissions"] = {uploaded_file.submission_id: uploaded_file.file_url}
 
-                self.stage.check_submissions_and_mark_complete()
-                response_data["new_stage_states"] = [self.stage.get_new_stage_state_data()]
-
-                response_data['user_label'] = self.project_api.get_user_details(target_activity.user_id).user_label
-                response_data['submission_date'] = format_date(date.today())
-
             except Exception as exception:  # pylint: disable=broad-except
                 log.exception(exception)
                 failure_code = 500
@@ -361,17 +492,33 @@ class GroupProjectSubmissionXBlock(
                     "title": messages.FAILED_UPLOAD_TITLE,
                     "message": messages.FAILED_UPLOAD_MESSAGE_TPL.format(error_goes_here=error_message)
                 })
+            finally:
+                # complete session would only be resumed with nothing left to send, so file could not be uploaded again
+                if chunked_upload:
+                    chunked_upload.discard()
 
         response = webob.response.Response(body=json.dumps(response_data))
         if failure_code:
             response.status_code = failure_code
+        if response_data.get('uploaded_bytes'):
+            # jQuery File Upload resumes chunked upload from the end of the range
+            response.headers['Range'] = '0-{}'.format(response_data['uploaded_bytes'] - 1)
 
         return response
 
-    def persist_and_submit_file(self, activity, context, file_stream):
+    def persist_and_submit_file(self, activity, workgroup, context, file_stream):
         """
         Saves uploaded files to their permanent location, sends them to submissions backend and emits submission events
         """
+        uploaded_file = self.persist_file(context, file_stream)
+        self.submit_file(activity, workgroup, uploaded_file.submission_data)
+        return uploaded_file
+
+    def persist_file(self, context, file_stream):
+        """
+        Saves uploaded file to its permanent location
+        :rtype: UploadFile
+        """
         uploaded_file = UploadFile(file_stream, self.upload_id, context)
 
         # Save the files first
@@ -382,25 +529,34 @@ class GroupProjectSubmissionXBlock(
             save_file_error.message = _("Error storing file {} - {}").format(uploaded_file.file.name, original_message)
             raise
 
+        return uploaded_file
+
+    def submit_file(self, activity, workgroup, submission_data):
+        """
+        Sends saved file to submissions backend, emits submission events and notifies the workgroup
+        :param group_project_v2.group_project.GroupActivityXBlock activity: Activity
+        :param group_project_v2.project_api.dtos.WorkgroupDetails workgroup: Uploader's workgroup
+        :param dict submission_data: Submission record of the saved file, see :attr:`UploadFile.submission_data`
+        """
         # It have been saved... note the submission
         try:
-            uploaded_file.submit()
+            self.project_api.create_submission(submission_data)
             # Emit analytics event...
             self.runtime.publish(
                 self,
                 self.SUBMISSION_RECEIVED_EVENT,
                 {
-                    "submission_id": uploaded_file.submission_id,
-                    "filename": uploaded_file.file.name,
+                    "submission_id": submission_data["document_id"],
+                    "filename": submission_data["document_filename"],
                     "content_id": activity.content_id,
-                    "group_id": activity.workgroup.id,
-                    "user_id": activity.user_id,
+                    "group_id": submission_data["workgroup"],
+                    "user_id": submission_data["user"],
                 }
             )
         except Exception as save_record_error:  # pylint: disable=broad-except
             original_message = save_record_error.message if hasattr(save_record_error, "message") else ""
             save_record_error.message = _("Error recording file information {} - {}").format(
-                uploaded_file.file.name, original_message
+                submission_data["document_filename"], original_message
             )
             raise
 
@@ -410,9 +566,63 @@ class GroupProjectSubmissionXBlock(
         # in the list of services
         notifications_service = self.runtime.service(self, 'notifications')
         if notifications_service:
-            self.stage.fire_file_upload_notification(notifications_service)
+            self.stage.dispatch_file_upload_notification(
+                workgroup, activity.user_id,
+                self._get_setting(self.UPLOAD_NOTIFICATION_DIGEST_WINDOW_KEY, 0)
+            )
 
-        return uploaded_file
+    def _complete_upload(self, activity):
+        """
+        Marks stage as completed if all submissions in stage have uploads
+        :param group_project_v2.group_project.GroupActivityXBlock activity: Activity
+        :rtype: dict
+        :returns: Response data for the client
+        """
+        self.stage.check_submissions_and_mark_complete()
+        return {
+            "new_stage_states": [self.stage.get_new_stage_state_data()],
+            "user_label": self.project_api.get_user_details(activity.user_id).user_label,
+            "submission_date": format_date(date.today()),
+        }
+
+    def _process_upload_job(self, submission_data):
+        """
+        Records the submission of a file stored by an earlier upload request, see :mod:`group_project_v2.post_upload`
+        :param dict submission_data: Submission record of the saved file
+        :rtype: dict
+        :returns: Response data for the client
+        """
+        activity = self.stage.activity
+        self.submit_file(activity, activity.workgroup, submission_data)
+        return self._complete_upload(activity)
+
+    def _process_pending_upload_job(self):
+        """
+        Processes current user's upload job left pending - i.e. if client stopped polling its status
+        """
+        if not self._get_setting(self.ASYNC_UPLOAD_PROCESSING_KEY, False):
+            return
+        user_id = self.stage.activity.user_id
+        job_id = get_pending_job_id(get_block_content_id(self), user_id)
+        if job_id:
+            process_job(job_id, user_id, self._process_upload_job)
+
+    @profiled
+    @XBlock.json_handler
+    def upload_status(self, data, _suffix=''):
+        """
+        Processes an uploaded file stored by upload_submission handler, if not processed yet, and reports the status,
+        see :mod:`group_project_v2.post_upload`
+        :param dict data: Job ID, as returned by upload_submission handler
+        :param str _suffix:
+        """
+        status = process_job(data.get('job_id', ''), self.stage.activity.user_id, self._process_upload_job)
+        if status['state'] == PostUploadState.FAILED:
+            status['data'] = {
+                "title": messages.FAILED_UPLOAD_TITLE,
+                "message": messages.FAILED_UPLOAD_MESSAGE_TPL.format(error_goes_here=status['data']['message'])
+            }
+        return status
 
 
 class ReviewSubjectSeletorXBlockBase(BaseStageComponentXBlock, XBlockWithPreviewMixin, NoStudioEditableSettingsMixin):
@@ -423,6 +633,7 @@ class ReviewSubjectSeletorXBlockBase(BaseStageComponentXBlock, XBlockWithPreview
     def review_subjects(self):
         raise NotImplementedError(MUST_BE_OVERRIDDEN)
 
+    @profiled
     @XBlock.handler
     def get_statuses(self, _request, _suffix=''):
         response_data = {
@@ -431,12 +642,12 @@ class ReviewSubjectSeletorXBlockBase(BaseStageComponentXBlock, XBlockWithPreview
         }
         return webob.response.Response(body=json.dumps(response_data))
 
+    @profiled
     def student_view(self, context):
         fragment = Fragment()
         render_context = {'selector': self, 'review_subjects': self.get_review_subject_repr()}
         render_context.update(context)
-        add_resource(self, 'css', "public/css/components/review_subject_selector.css", fragment)
-        add_resource(self, 'javascript', "public/js/components/review_subject_selector.js", fragment)
+        add_resource_bundle(self, 'project_components', fragment)
         fragment.add_content(loader.render_template(self.STUDENT_TEMPLATE, render_context))
         fragment.initialize_js('ReviewSubjectSelectorXBlock')
         return fragment
@@ -572,11 +783,28 @@ class GroupProjectReviewQuestionXBlock(BaseStageComponentXBlock, StudioEditableX
     )
     has_author_view = True
 
+    # Rendered question content only depends on question fields and stage closed state, so it is shared by all
+    # the blocks (and renders) with equal values of those
+    RENDERED_CONTENT_CACHE_POLICY = CachePolicy(max_size=5000)
+    _rendered_content_cache = LocalCacheStorage()
+
     @lazy
     def stage(self):
         return self.get_parent()
 
     def render_content(self):
+        content = self.question_content or u""
+        cache_key = (
+            self.question_id, hashlib.md5(content.encode('utf-8')).hexdigest(), self.single_line, self.stage.is_closed
+        )
+        rendered_content = self._rendered_content_cache.get(cache_key, self.RENDERED_CONTENT_CACHE_POLICY)
+        if rendered_content is None:
+            rendered_content = self._render_content()
+            if rendered_content:
+                self._rendered_content_cache.set(cache_key, rendered_content, self.RENDERED_CONTENT_CACHE_POLICY)
+        return rendered_content
+
+    def _render_content(self):
         try:
             answer_node = ElementTree.fromstring(self.question_content)
         except ElementTree.ParseError:
@@ -601,6 +829,7 @@ class GroupProjectReviewQuestionXBlock(BaseStageComponentXBlock, StudioEditableX
 
         return outer_html(answer_node)
 
+    @profiled
     def student_view(self, context):
         question_classes = ["question"]
         if self.required:
@@ -682,6 +911,7 @@ class GroupProjectBaseFeedbackDisplayXBlock(
 
         return matching_questions[0]
 
+    @profiled
     @groupwork_protected_view
     def student_view(self, context):
         if self.question is None:
@@ -790,6 +1020,7 @@ class ProjectTeamXBlock(
 
     display_name_with_default = STUDIO_LABEL
 
+    @profiled
     def student_view(self, context):
         fragment = Fragment()
         # Could be a TA not in the group.
@@ -805,7 +1036,6 @@ class ProjectTeamXBlock(
         render_context.update(context)
 
         fragment.add_content(loader.render_template("templates/html/components/project_team.html", render_context))
-        add_resource(self, 'css', "public/css/components/project_team.css", fragment)
-        add_resource(self, 'javascript', "public/js/components/project_team.js", fragment)
+        add_resource_bundle(self, 'project_components', fragment)
         fragment.initialize_js("ProjectTeamXBlock")
         return fragment
@@ -0,0 +1,132 @@
+"""
+Resource loader keeping package resources and compiled Django templates in memory.
+
+Templates are compiled on first use. Setting `warm_up_templates` key of `group_project_v2` XBlock settings bucket
+(`XBLOCK_SETTINGS` Django setting) to true makes first use compile all the templates under `templates/html` at once,
+so that no template is compiled while rendering subsequent requests.
+"""
+import logging
+import posixpath
+import threading
+
+import django
+import pkg_resources
+from django.template import Context, Engine, Template
+from xblockutils.resources import ResourceLoader
+
+log = logging.getLogger(__name__)
+
+WARM_UP_TEMPLATES_KEY = 'warm_up_templates'
+TEMPLATES_ROOT = 'templates/html'
+TEMPLATE_EXTENSION = '.html'
+TEMPLATE_LIBRARIES = {
+    'i18n': 'xblockutils.templatetags.i18n',
+}
+
+
+def _warm_up_enabled():
+    from group_project_v2.utils import get_xblock_settings_bucket  # utils module imports this one
+    return bool(get_xblock_settings_bucket().get(WARM_UP_TEMPLATES_KEY, False))
+
+
+class CachingResourceLoader(ResourceLoader):
+    """
+    ResourceLoader that reads each package resource and compiles each Django template once.
+
+    xblock-utils ResourceLoader builds a template engine, reads template source from package resources and compiles it
+    on each render. Compiled templates keep no rendering state, so they are safely shared between renders and threads.
+    Django 1.8 needs template tag libraries to be registered globally for the duration of each render, so there
+    templates are rendered by ResourceLoader as is.
+    """
+    def __init__(self, module_name):
+        super(CachingResourceLoader, self).__init__(module_name)
+        self._lock = threading.RLock()
+        self._engine = None
+        self._resources = {}
+        self._templates = {}
+        self._warmed_up = False
+
+    def load_unicode(self, resource_path):
+        """
+        Gets the content of a resource. Package resources do not change at runtime, so content is read only once.
+        """
+        content = self._resources.get(resource_path)
+        if content is None:
+            content = super(CachingResourceLoader, self).load_unicode(resource_path)
+            self._resources[resource_path] = content
+        return content
+
+    @staticmethod
+    def supports_compiled_templates():
+        return django.VERSION[:2] != (1, 8)
+
+    def _get_engine(self):
+        if self._engine is None:
+            from django.template.backends.django import get_installed_libraries
+            libraries = get_installed_libraries()
+            libraries.update(TEMPLATE_LIBRARIES)
+            self._engine = Engine(libraries=libraries)
+        return self._engine
+
+    def _compile(self, template_path):
+        with self._lock:
+            template = self._templates.get(template_path)
+            if template is None:
+                template = Template(self.load_unicode(template_path), engine=self._get_engine())
+                self._templates[template_path] = template
+            return template
+
+    def get_template(self, template_path):
+        """
+        :param str template_path: Template path, relative to loader module
+        :rtype: django.template.Template
+        """
+        template = self._templates.get(template_path)
+        if template is not None:
+            return template
+
+        if not self._warmed_up and _warm_up_enabled():
+            self.warm_up()
+        return self._compile(template_path)
+
+    def warm_up(self, root=TEMPLATES_ROOT):
+        """
+        Compiles all the templates under root directory
+        :param str root: Templates directory, relative to loader module
+        :rtype: int
+        :returns: Number of compiled templates
+        """
+        with self._lock:
+            template_paths = list(self._iter_template_paths(root))
+            for template_path in template_paths:
+                self._compile(template_path)
+            self._warmed_up = True
+        log.debug("Compiled %s templates under %s", len(template_paths), root)
+        return len(template_paths)
+
+    def _iter_template_paths(self, directory):
+        for name in sorted(pkg_resources.resource_listdir(self.module_name, directory)):
+            path = posixpath.join(directory, name)
+            if pkg_resources.resource_isdir(self.module_name, path):
+                for template_path in self._iter_template_paths(path):
+                    yield template_path
+            elif name.endswith(TEMPLATE_EXTENSION):
+                yield path
+
+    def clear(self):
+        with self._lock:
+            self._resources.clear()
+            self._templates.clear()
+            self._warmed_up = False
+
+    def render_django_template(self, template_path, context=None, i18n_service=None):
+        if not self.supports_compiled_templates():
+            return super(CachingResourceLoader, self).render_django_template(template_path, context, i18n_service)
+
+        context = context or {}
+        context['_i18n_service'] = i18n_service
+        return self.get_template(template_path).render(Context(context))
+
+    def render_template(self, template_path, context=None):
+        # ResourceLoader.render_template is a deprecated alias that warns on each call
+        return self.render_django_template(template_path, context)
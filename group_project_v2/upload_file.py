@@ -1,15 +1,36 @@
 import logging
 import mimetypes
 import hashlib
+import urllib
+import urlparse
 from lazy.lazy import lazy
 
-from django.core.files import File
 from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
 from django.conf import settings
 
+from group_project_v2 import blob_storage
+from group_project_v2.api_error import ApiError
+
 
 log = logging.getLogger(__name__)
 
+STORAGE_ROOT = "group_work"
+
+
+def get_storage_path(file_url):
+    """
+    Gets storage path of a submitted file from its URL, as built by :attr:`UploadFile.file_url`
+    :param unicode file_url: Submitted file URL
+    :rtype: unicode|None
+    :returns: Storage path, or None if file is not kept in the storage
+    """
+    url_path = urllib.unquote(urlparse.urlsplit(file_url.encode('utf-8')).path).decode('utf-8')
+    _, separator, storage_path = url_path.partition(u"/{}/".format(STORAGE_ROOT))
+    if not separator:
+        return None
+    return u"{}/{}".format(STORAGE_ROOT, storage_path)
+
 
 class UploadFile(object):
     _sha1_hash = None
@@ -41,6 +62,10 @@ class UploadFile(object):
     def project_api(self):
         return self._get_project_context_key("project_api")
 
+    @property
+    def project_id(self):
+        return self._get_project_context_key("project_id")
+
     @lazy
     def sha1(self):
         if self._sha1_hash is None:
@@ -70,19 +95,62 @@ class UploadFile(object):
 
     @property
     def file_storage_path(self):
-        return "group_work/{}/{}/{}".format(self.group_id, self.sha1, self.file.name)
+        return blob_storage.get_blob_path(self.sha1, self.file.name)
 
     def save_file(self):
-        path = self.file_storage_path
-        if not default_storage.exists(path):
-            log.debug("Storing to %s", path)
-            default_storage.save(path, File(self.file))
-            log.debug("Successfully stored file to %s", path)
-        else:
-            log.debug("File already stored at %s", path)
+        """
+        Stores uploaded file at content-addressed path (see :mod:`group_project_v2.blob_storage`), reading it only
+        once: chunks are hashed while being written to a temporary file, which is then moved to the storage path.
+        Storages that keep files on local file system move the temporary file atomically (rename), so partially
+        written files are never visible at the storage path. If a file with the same content and name is already
+        stored, by this or any other workgroup, nothing is written.
+        """
+        temporary_file = TemporaryUploadedFile(self.file.name, self.mimetype, 0, None)
+        try:
+            self._spool_and_hash(temporary_file)
+
+            path = self.file_storage_path
+            if self._is_referenced(path):
+                log.debug("File at %s is referred to by a recorded submission, not storing it again", path)
+            elif blob_storage.save_blob(path, temporary_file):
+                log.debug("Successfully stored file to %s", path)
+        finally:
+            # file is already gone if storage moved it
+            temporary_file.close()
+
+    def _is_referenced(self, path):
+        """
+        Checks if latest submissions of the project refer to a file stored at the path. Submissions API records are the
+        durable index of stored files: stored files are never deleted, so a referred file is stored. Index misses are
+        checked in storage.
+        :param unicode path: Storage path
+        :rtype: bool
+        """
+        try:
+            document_urls = self.project_api.get_submitted_document_urls(self.group_id, self.project_id)
+        except ApiError:
+            log.exception("Failed to get submitted documents of workgroup %s, checking storage instead", self.group_id)
+            return False
+        return any(get_storage_path(document_url) == path for document_url in document_urls if document_url)
+
+    def _spool_and_hash(self, temporary_file):
+        hash_sha1 = hashlib.sha1()
+        for chunk in self.file.chunks():
+            hash_sha1.update(chunk)
+            temporary_file.write(chunk)
+
+        temporary_file.flush()
+        temporary_file.size = temporary_file.tell()
+        temporary_file.seek(0)
+        self._sha1_hash = hash_sha1.hexdigest()
 
-    def submit(self):
-        submit_hash = {
+    @property
+    def submission_data(self):
+        """
+        Submission record of the stored file, as sent to submissions API
+        :rtype: dict
+        """
+        return {
             "document_id": self.submission_id,
             "document_url": self.file_url,
             "document_filename": self.file.name,
@@ -90,4 +158,6 @@ class UploadFile(object):
             "user": self.user_id,
             "workgroup": self.group_id,
         }
-        self.project_api.create_submission(submit_hash)
+
+    def submit(self):
+        self.project_api.create_submission(self.submission_data)
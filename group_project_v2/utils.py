@@ -1,24 +1,38 @@
 # -*- coding: utf-8 -*-
 import csv
 import functools
+import hashlib
 import logging
+import Queue
+import threading
 import urlparse
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+from multiprocessing.pool import ThreadPool
 
 from datetime import date, datetime, timedelta
 import xml.etree.ElementTree as ET
 
+import pytz
 from dateutil import parser
+from django.conf import settings
+from django.core.cache import caches, DEFAULT_CACHE_ALIAS
 from django.template.defaulttags import register
 from django.utils.safestring import mark_safe
 from lazy.lazy import lazy
 from xblock.fragment import Fragment
-from xblockutils.resources import ResourceLoader
+
+from group_project_v2.resource_bundles import RESOURCE_BUNDLES, RESOURCE_TYPES, get_bundle_path
+from group_project_v2.template_loader import CachingResourceLoader
+
+XBLOCK_SETTINGS_BUCKET = 'group_project_v2'
 
 DEFAULT_EXPIRATION_TIME = timedelta(seconds=10)
+DEFAULT_STALE_GRACE_PERIOD = timedelta(seconds=60)
+REFRESH_MAX_WORKERS = 2
+REFRESH_MAX_QUEUE_SIZE = 1000
 
 log = logging.getLogger(__name__)
-loader = ResourceLoader(__name__)
+loader = CachingResourceLoader(__name__)
 
 
 # Make '_' a no-op so we can scrape strings
@@ -66,6 +80,16 @@ class GroupworkAccessDeniedError(Exception):
         return u"Outsider Denied Access: {}".format(self.value)
 
 
+def get_xblock_settings_bucket():
+    """
+    Gets `group_project_v2` bucket of `XBLOCK_SETTINGS` Django setting. Blocks read their settings via settings
+    service (see :class:`group_project_v2.mixins.SettingsMixin`) - this is for the code that has no block at hand.
+    :rtype: dict
+    """
+    xblock_settings = getattr(settings, 'XBLOCK_SETTINGS', None) or {}
+    return xblock_settings.get(XBLOCK_SETTINGS_BUCKET) or {}
+
+
 def parse_date(date_string):
     split_string = date_string.split('/')
     return date(int(split_string[2]), int(split_string[0]), int(split_string[1]))
@@ -82,6 +106,10 @@ def outer_html(node):
     return html
 
 
+# Formats of UTC timestamps returned by API - parsed without dateutil, which is considerably slower
+ISO_UTC_DATE_FORMATS = ('%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S.%fZ')
+
+
 def build_date_field(json_date_string_value):
     """ converts json date string to date object """
     # QUIRK: dateutil behaves slightly differently between 2.1 and 2.6. When empty string is parsed
@@ -91,6 +119,13 @@ def build_date_field(json_date_string_value):
     if not json_date_string_value:
         return None
 
+    if json_date_string_value.endswith('Z'):
+        for date_format in ISO_UTC_DATE_FORMATS:
+            try:
+                return datetime.strptime(json_date_string_value, date_format).replace(tzinfo=pytz.UTC)
+            except ValueError:
+                pass
+
     try:
         return parser.parse(json_date_string_value)
     except (ValueError, OverflowError):
@@ -230,38 +265,315 @@ def get_link_to_block(block):
     )
 
 
-def memoize_with_expiration(expires_after=DEFAULT_EXPIRATION_TIME):
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls with the same key: while a call is in flight, other callers asking for the same key
+    wait for it to complete and share its result (or exception) instead of issuing a duplicate call.
+    Keeps counters of total and coalesced calls.
+    """
+    class _InFlightCall(object):
+        __slots__ = ('done', 'result', 'error')
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def call(self, key, func, *args, **kwargs):
+        """
+        :param str key: Call key - calls with equal keys are coalesced
+        :param callable func: Function to call
+        :return: func(*args, **kwargs) result
+        """
+        with self._lock:
+            self.calls += 1
+            in_flight_call = self._in_flight.get(key)
+            is_leader = in_flight_call is None
+            if is_leader:
+                in_flight_call = self._in_flight[key] = self._InFlightCall()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            log.debug("Waiting for in-flight call for key %s", key)
+            in_flight_call.done.wait()
+            if in_flight_call.error is not None:
+                raise in_flight_call.error
+            return in_flight_call.result
+
+        try:
+            in_flight_call.result = func(*args, **kwargs)
+            return in_flight_call.result
+        except Exception as exc:
+            in_flight_call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight_call.done.set()
+
+
+class BoundedExecutor(object):
+    """
+    Runs calls in background by a fixed number of daemon worker threads. Calls submitted while the queue is full are
+    rejected, so bursts of submissions neither start extra threads nor pile up in memory.
+    """
+    def __init__(self, max_workers, max_queue_size, thread_name):
+        """
+        :param int max_workers: Number of worker threads
+        :param int max_queue_size: Maximum number of calls waiting for a worker
+        :param str thread_name: Worker threads name prefix
+        """
+        self.max_workers = max_workers
+        self.thread_name = thread_name
+        self._queue = Queue.Queue(max_queue_size)
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def submit(self, func, *args, **kwargs):
+        """
+        :param callable func: Function to call; exceptions it raises are logged
+        :rtype: bool
+        :returns: True if call is queued, False if it is rejected
+        """
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait((func, args, kwargs))
+        except Queue.Full:
+            return False
+        return True
+
+    def _ensure_workers(self):
+        # worker threads do not survive fork, so they are (re)started lazily
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            while len(self._workers) < self.max_workers:
+                worker = threading.Thread(
+                    target=self._work, name="{}-{}".format(self.thread_name, len(self._workers))
+                )
+                worker.daemon = True
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            func, args, kwargs = self._queue.get()
+            try:
+                func(*args, **kwargs)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Background call failed")
+            finally:
+                self._queue.task_done()
+
+
+# Refreshes stale values of all memoized functions, see :func:`memoize_with_expiration`
+refresh_executor = BoundedExecutor(  # pylint: disable=invalid-name
+    REFRESH_MAX_WORKERS, REFRESH_MAX_QUEUE_SIZE, "group-project-cache-refresh"
+)
+
+
+class CachePolicy(object):
+    """
+    Caching parameters of a memoized function, see :func:`memoize_with_expiration`
+    """
+    __slots__ = ('expires_after', 'stale_grace_period', 'max_size', 'shared', 'cache_alias')
+
+    def __init__(
+            self, expires_after=DEFAULT_EXPIRATION_TIME, stale_grace_period=None, max_size=None,
+            shared=False, cache_alias=DEFAULT_CACHE_ALIAS
+    ):  # pylint: disable=too-many-arguments
+        """
+        :param timedelta expires_after: Caching period
+        :param timedelta|None stale_grace_period: How long stale value can be served after expiration
+        :param int|None max_size: Maximum number of values kept in local cache; unlimited if not set
+        :param bool shared: Store values in Django cache shared between processes, instead of process memory
+        :param str cache_alias: Django cache to use for shared values
+        """
+        self.expires_after = expires_after
+        self.stale_grace_period = stale_grace_period
+        self.max_size = max_size
+        self.shared = shared
+        self.cache_alias = cache_alias
+
+
+class LocalCacheStorage(object):
+    """
+    Keeps cached values in process memory. When max size is reached, values are evicted in insertion order.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key, policy):  # pylint: disable=unused-argument
+        return self._values.get(key)
+
+    def set(self, key, entry, policy):
+        with self._lock:
+            self._values.pop(key, None)
+            while policy.max_size is not None and self._values and len(self._values) >= policy.max_size:
+                self._values.popitem(last=False)
+            self._values[key] = entry
+
+    def delete(self, key, policy):  # pylint: disable=unused-argument
+        with self._lock:
+            self._values.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class SharedCacheStorage(object):
+    """
+    Keeps cached values in Django cache, so they are shared between processes using the same cache backend.
+    Values must be picklable.
     """
-    This memoization decorator provides lightweight caching mechanism. It is not thread-safe and contain
-    no cache invalidation features except cache expiration - use only on data that are unlikely to be changed
-    within single request (i.e. workgroup and user data, assigned reviews, etc.)
+    KEY_PREFIX = 'group_project_v2:memoized:'
+
+    @classmethod
+    def _make_cache_key(cls, key):
+        return cls.KEY_PREFIX + hashlib.md5(key).hexdigest()
+
+    def get(self, key, policy):
+        return caches[policy.cache_alias].get(self._make_cache_key(key))
+
+    def set(self, key, entry, policy):
+        timeout = policy.expires_after + (policy.stale_grace_period or timedelta())
+        caches[policy.cache_alias].set(self._make_cache_key(key), entry, int(timeout.total_seconds()))
+
+    def delete(self, key, policy):
+        caches[policy.cache_alias].delete(self._make_cache_key(key))
+
+
+def memoize_with_expiration(expires_after=DEFAULT_EXPIRATION_TIME, stale_grace_period=None, policy=None):
+    """
+    This memoization decorator provides lightweight caching mechanism. Cached values expire after a while, and can be
+    dropped explicitly by calling `invalidate` attribute of decorated function with the same arguments - use only on
+    data that are unlikely to be changed within single request (i.e. workgroup and user data, assigned reviews, etc.),
+    or that are only changed by the code that can invalidate them.
+    Concurrent cache misses for the same arguments are coalesced into a single call, see :class:`SingleFlight`;
+    coalescing counters are available as `single_flight` attribute of decorated function.
+
+    If `stale_grace_period` is set, expired value is still returned for that long after expiration (stale while
+    revalidate), while fresh value is fetched in background, so callers do not wait for it. Refreshes of all memoized
+    functions share a small pool of worker threads, see `refresh_executor`.
+
+    Cache keys are built from string representation of arguments, so for shared caches arguments (including `self`
+    for methods) must have a stable string representation.
     :param timedelta expires_after: Caching period
+    :param timedelta|None stale_grace_period: How long stale value can be served after expiration
+    :param callable|None policy: Callable returning :class:`CachePolicy` - evaluated on each call, so that policy
+        could be configured via settings. Overrides `expires_after` and `stale_grace_period` if set.
     """
-    def decorator(func):
-        cache = func.cache = {}
+    if policy is None:
+        static_policy = CachePolicy(expires_after, stale_grace_period)
+        policy = lambda: static_policy
 
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
+    shared_storage = SharedCacheStorage()
+
+    def decorator(func):
+        local_storage = LocalCacheStorage()
+        single_flight = SingleFlight()
+        refreshing_keys = set()
+        refreshing_lock = threading.Lock()
+
+        def update_cache(key, storage, current_policy, *args, **kwargs):
+            result = single_flight.call(key, func, *args, **kwargs)
+            log.info("Updating cached value for key %s", key)
+            cached = {
+                'timestamp': datetime.now(),
+                'result': result
+            }
+            storage.set(key, cached, current_policy)
+            return cached
+
+        def refresh(key, storage, current_policy, *args, **kwargs):
+            try:
+                update_cache(key, storage, current_policy, *args, **kwargs)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Failed to refresh cached value for key %s", key)
+            finally:
+                with refreshing_lock:
+                    refreshing_keys.discard(key)
+
+        def schedule_refresh(key, storage, current_policy, *args, **kwargs):
+            with refreshing_lock:
+                if key in refreshing_keys:
+                    return
+                refreshing_keys.add(key)
+            log.info("Serving stale value for key %s, scheduling refresh", key)
+            if not refresh_executor.submit(refresh, key, storage, current_policy, *args, **kwargs):
+                log.warning("Too many pending cache refreshes, skipping refresh of key %s", key)
+                with refreshing_lock:
+                    refreshing_keys.discard(key)
+
+        def make_cache_key(*args, **kwargs):
             key_list = (
                 tuple([func.__name__]) + tuple(args) +
                 tuple("{}:{}".format(key, value) for key, value in kwargs.iteritems())
             )
-            key = make_key(key_list)
-            if key not in cache or cache[key]['timestamp'] + expires_after <= datetime.now():
-                result = func(*args, **kwargs)
-                log.info("Updating cached value for key %s", key)
-                cache[key] = {
-                    'timestamp': datetime.now(),
-                    'result': result
-                }
+            return make_key(key_list)
 
-            return cache[key]['result']
+        def invalidate(*args, **kwargs):
+            current_policy = policy()
+            storage = shared_storage if current_policy.shared else local_storage
+            storage.delete(make_cache_key(*args, **kwargs), current_policy)
 
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            current_policy = policy()
+            storage = shared_storage if current_policy.shared else local_storage
+            key = make_cache_key(*args, **kwargs)
+            cached = storage.get(key, current_policy)
+            if cached is not None:
+                now, expires_at = datetime.now(), cached['timestamp'] + current_policy.expires_after
+                if expires_at > now:
+                    return cached['result']
+                grace_period = current_policy.stale_grace_period
+                if grace_period and expires_at + grace_period > now:
+                    schedule_refresh(key, storage, current_policy, *args, **kwargs)
+                    return cached['result']
+
+            return update_cache(key, storage, current_policy, *args, **kwargs)['result']
+
+        wrapper.cache = local_storage
+        wrapper.single_flight = single_flight
+        wrapper.invalidate = invalidate
         return wrapper
 
     return decorator
 
 
+def map_concurrently(func, items, max_workers):
+    """
+    Applies `func` to every item using at most `max_workers` threads and returns results in the order of `items`.
+    Intended for I/O bound work, such as sending API requests. Exceptions raised by `func` are propagated to caller.
+    :param callable func: Function to apply
+    :param collections.Iterable items: Items to process
+    :param int max_workers: Concurrency limit
+    :rtype: list
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    pool = ThreadPool(min(max_workers, len(items)))
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
 def make_user_caption(user_details):
     context = {
         'id': user_details.id,
@@ -307,10 +619,60 @@ def add_resource(block, resource_type, path, fragment, via_url=False):
     action(action_parameter)
 
 
+def add_resource_bundle(block, bundle_name, fragment):
+    """
+    Adds resources of a bundle (see :mod:`group_project_v2.resource_bundles`) to the fragment by URL: base bundle
+    resources first, then CSS, then JS. Fragments do not keep duplicate resources, so bundles added by multiple blocks
+    rendered on the same page, or shared by multiple bundles via base bundle, are only added once.
+    :param xblock.core.XBlock block: Block adding the resources
+    :param str bundle_name: Bundle name
+    :param xblock.fragment.Fragment fragment: Fragment
+    """
+    bundle = RESOURCE_BUNDLES[bundle_name]
+    if 'base' in bundle:
+        add_resource_bundle(block, bundle['base'], fragment)
+
+    for resource_type in RESOURCE_TYPES:
+        if resource_type in bundle:
+            add_resource(block, resource_type, get_bundle_path(bundle_name, resource_type), fragment, via_url=True)
+
+
 def get_block_content_id(block):
     return unicode(block.scope_ids.usage_id)
 
 
+CONTENT_TEMPLATE_CACHE_POLICY = CachePolicy(max_size=10000)
+CONTENT_TEMPLATE_KEY_VALUE_TYPES = (basestring, int, long, float, bool, type(None))
+
+
+def render_content_scoped_template(block, template_path, render_context, key_values):
+    """
+    Renders a template which output only depends on block content and settings scoped field values.
+
+    Rendered output is cached by block usage id, template path and `key_values` - values the template output depends
+    on, e.g. field values it renders. Those must be primitive values, so that they have stable equality and hashes,
+    and the cache key does not keep references to blocks or other objects alive.
+    :param xblock.core.XBlock block: XBlock
+    :param str template_path: Template path
+    :param dict render_context: Template context
+    :param tuple key_values: Primitive values the template output depends on
+    :rtype: unicode
+    """
+    for value in key_values:
+        if not isinstance(value, CONTENT_TEMPLATE_KEY_VALUE_TYPES):
+            raise TypeError("Content template key values must be primitive values, got {}".format(type(value)))
+
+    cache_key = (get_block_content_id(block), template_path, tuple(key_values))
+    content = render_content_scoped_template.cache.get(cache_key, CONTENT_TEMPLATE_CACHE_POLICY)
+    if content is None:
+        content = loader.render_template(template_path, render_context)
+        render_content_scoped_template.cache.set(cache_key, content, CONTENT_TEMPLATE_CACHE_POLICY)
+    return content
+
+
+render_content_scoped_template.cache = LocalCacheStorage()
+
+
 @register.filter
 def get_item(dictionary, key):
     try:
@@ -0,0 +1,148 @@
+"""
+Streaming writer of ZIP archives.
+
+`zipfile.ZipFile` needs a seekable output and complete file content in memory (`writestr`) or on local disk
+(`write`). This writer produces archive bytes as they are ready instead: each entry is written with a data descriptor
+(CRC and sizes follow the content), so only the chunk being read is kept in memory, and archive can be sent to client
+while files are still read from storage. Entries are stored uncompressed - submissions are mostly office documents,
+PDFs and images that are compressed already, so deflating them costs CPU time for no gain.
+
+ZIP64 extensions are not written, so each file and the archive itself must be smaller than 4 GB, and archive can
+contain at most 65535 files - use `fits_without_zip64` to check that before writing the archive.
+"""
+import struct
+import time
+import zipfile
+import zlib
+
+DATA_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+STRUCT_DATA_DESCRIPTOR = "<4sLLL"
+
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8_FILE_NAME = 0x800
+ZIP_VERSION = 20
+MIN_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# sizes and offsets are 32-bit and number of entries is 16-bit unless ZIP64 extensions are used
+MAX_SIZE = 0xFFFFFFFF
+MAX_ENTRIES = 0xFFFF
+
+
+def _get_dos_date_time(date_time):
+    """
+    :param datetime.datetime|None date_time: Modification time
+    :rtype: (int, int)
+    """
+    if date_time is None:
+        time_tuple = time.localtime()[:6]
+    else:
+        time_tuple = max(date_time.timetuple()[:6], MIN_DATE_TIME)
+    year, month, day, hour, minute, second = time_tuple
+    dos_date = (year - 1980) << 9 | month << 5 | day
+    dos_time = hour << 11 | minute << 5 | second // 2
+    return dos_date, dos_time
+
+
+def fits_without_zip64(files):
+    """
+    Checks if archive of the files can be written without ZIP64 extensions
+    :param collections.Iterable[(unicode, int)] files: Path in archive and size of each file
+    :rtype: bool
+    """
+    offset, central_directory_size, entries = 0, 0, 0
+    for file_name, size in files:
+        if size > MAX_SIZE:
+            return False
+        name_length = len(file_name.encode('utf-8'))
+        offset += zipfile.sizeFileHeader + name_length + size + struct.calcsize(STRUCT_DATA_DESCRIPTOR)
+        central_directory_size += zipfile.sizeCentralDir + name_length
+        entries += 1
+    return entries <= MAX_ENTRIES and offset <= MAX_SIZE and central_directory_size <= MAX_SIZE
+
+
+class _ZipEntry(object):
+    def __init__(self, file_name, date_time, header_offset):
+        self.file_name = file_name
+        self.dos_date, self.dos_time = _get_dos_date_time(date_time)
+        self.header_offset = header_offset
+        self.crc = 0
+        self.size = 0
+
+    @property
+    def encoded_file_name(self):
+        return self.file_name.encode('utf-8')
+
+    @property
+    def flag_bits(self):
+        return FLAG_DATA_DESCRIPTOR | FLAG_UTF8_FILE_NAME
+
+    def local_header(self):
+        return struct.pack(
+            zipfile.structFileHeader, zipfile.stringFileHeader, ZIP_VERSION, 0, self.flag_bits, zipfile.ZIP_STORED,
+            self.dos_time, self.dos_date, 0, 0, 0, len(self.encoded_file_name), 0
+        ) + self.encoded_file_name
+
+    def data_descriptor(self):
+        return struct.pack(STRUCT_DATA_DESCRIPTOR, DATA_DESCRIPTOR_SIGNATURE, self.crc, self.size, self.size)
+
+    def central_directory_record(self):
+        return struct.pack(
+            zipfile.structCentralDir, zipfile.stringCentralDir, ZIP_VERSION, 0, ZIP_VERSION, 0, self.flag_bits,
+            zipfile.ZIP_STORED, self.dos_time, self.dos_date, self.crc, self.size, self.size,
+            len(self.encoded_file_name), 0, 0, 0, 0, 0o600 << 16, self.header_offset
+        ) + self.encoded_file_name
+
+
+class ZipStream(object):
+    """
+    Writes ZIP archive as a sequence of byte strings. Usage:
+
+        archive = ZipStream()
+        for data in archive.add_file(u"folder/file.txt", file_object.chunks()):
+            output.write(data)
+        for data in archive.close():
+            output.write(data)
+    """
+    def __init__(self):
+        self._entries = []
+        self._offset = 0
+
+    def _emit(self, data):
+        self._offset += len(data)
+        return data
+
+    def add_file(self, file_name, chunks, date_time=None):
+        """
+        Adds a file to the archive
+        :param unicode file_name: Path of the file in the archive
+        :param collections.Iterable[bytes] chunks: File content
+        :param datetime.datetime|None date_time: File modification time; current time if not set
+        :rtype: collections.Iterable[bytes]
+        :returns: Archive data
+        """
+        entry = _ZipEntry(file_name, date_time, self._offset)
+        yield self._emit(entry.local_header())
+
+        for chunk in chunks:
+            entry.crc = zlib.crc32(chunk, entry.crc) & 0xffffffff
+            entry.size += len(chunk)
+            yield self._emit(chunk)
+
+        yield self._emit(entry.data_descriptor())
+        self._entries.append(entry)
+
+    def close(self):
+        """
+        Finishes the archive
+        :rtype: collections.Iterable[bytes]
+        :returns: Archive data - central directory
+        """
+        central_directory_offset = self._offset
+        for entry in self._entries:
+            yield self._emit(entry.central_directory_record())
+
+        central_directory_size = self._offset - central_directory_offset
+        yield self._emit(struct.pack(
+            zipfile.structEndArchive, zipfile.stringEndArchive, 0, 0, len(self._entries), len(self._entries),
+            central_directory_size, central_directory_offset, 0
+        ))
@@ -0,0 +1,78 @@
+"""
+Memory and construction time benchmark for project API DTOs.
+
+Compares slotted DTOs from group_project_v2.project_api.dtos against equivalent ``__dict__``-based objects built
+from keyword arguments (the way DTOs used to be built). Run with:
+
+    python -m tests.benchmarks.dtos [instance_count]
+"""
+import sys
+import timeit
+
+from group_project_v2.project_api.dtos import UserDetails, WorkgroupDetails
+
+
+class DictBasedUserDetails(object):
+    """ Reference implementation - plain object with per-instance __dict__ """
+    def __init__(self, **kwargs):
+        for field in UserDetails.FIELDS:
+            setattr(self, field, kwargs.get(field))
+        self._full_name = kwargs.get('full_name', None)
+        self.profile_image_url = kwargs.get('profile_image', {}).get('image_url_medium', None)
+
+
+def make_user_data(user_id):
+    return {
+        'id': user_id, 'url': '/api/server/users/{}'.format(user_id), 'username': 'user{}'.format(user_id),
+        'email': 'user{}@example.com'.format(user_id), 'first_name': 'First', 'last_name': 'Last',
+        'gender': None, 'city': 'City', 'country': 'US', 'is_active': True, 'level_of_education': None,
+        'organization': 1, 'profile_image': {'image_url_medium': '/profile.png'},
+    }
+
+
+def make_workgroup_data(group_id, group_size=5):
+    return {
+        'id': group_id, 'url': '/api/server/workgroups/{}/'.format(group_id), 'name': 'Group {}'.format(group_id),
+        'project': 1, 'groups': [], 'submissions': [], 'workgroup_reviews': [], 'peer_reviews': [],
+        'users': [make_user_data(group_id * group_size + idx) for idx in range(group_size)],
+    }
+
+
+def instance_size(instance):
+    size = sys.getsizeof(instance)
+    instance_dict = getattr(instance, '__dict__', None)
+    if instance_dict is not None:
+        size += sys.getsizeof(instance_dict)
+    return size
+
+
+def report(label, count, seconds, size):
+    print "{label:<40} {per_call:>10.2f} us/instance {size:>8} bytes/instance".format(
+        label=label, per_call=seconds / count * 1e6, size=size
+    )
+
+
+def main(count):
+    user_data = [make_user_data(idx) for idx in range(count)]
+    workgroup_data = [make_workgroup_data(idx) for idx in range(count // 5)]
+
+    print "Constructing {} instances\n".format(count)
+
+    timer = timeit.Timer(lambda: [DictBasedUserDetails(**data) for data in user_data])
+    report("UserDetails (__dict__, **kwargs)", count, min(timer.repeat(3, 1)), instance_size(DictBasedUserDetails()))
+
+    timer = timeit.Timer(lambda: [UserDetails(**data) for data in user_data])
+    report("UserDetails (__slots__, **kwargs)", count, min(timer.repeat(3, 1)), instance_size(UserDetails()))
+
+    timer = timeit.Timer(lambda: [UserDetails.from_dict(data) for data in user_data])
+    report("UserDetails (__slots__, from_dict)", count, min(timer.repeat(3, 1)), instance_size(UserDetails()))
+
+    timer = timeit.Timer(lambda: [WorkgroupDetails.from_dict(data) for data in workgroup_data])
+    report(
+        "WorkgroupDetails (from_dict, 5 users)", len(workgroup_data), min(timer.repeat(3, 1)),
+        instance_size(WorkgroupDetails())
+    )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,75 @@
+"""
+Rendering time benchmark for Django templates loaded from package resources.
+
+Renders a typical peer review stage - stage wrapper, stage content and a rubric of review questions - with xblock-utils
+ResourceLoader (reads and compiles templates on each render) and with CachingResourceLoader from
+group_project_v2.template_loader (compiles each template once). Run with:
+
+    python -m tests.benchmarks.templates [render_count] [question_count]
+"""
+import sys
+import timeit
+
+import django
+from xblockutils.resources import ResourceLoader
+
+from group_project_v2.template_loader import CachingResourceLoader
+
+STAGE_WRAPPER_TEMPLATE = 'templates/html/stages/stage_wrapper.html'
+STAGE_CONTENT_TEMPLATE = 'templates/html/stages/default_view.html'
+QUESTION_TEMPLATE = 'templates/html/components/review_question.html'
+
+
+class DummyStage(object):
+    id = 'stage-1'
+    display_name = 'Peer Review'
+    is_open = True
+    is_closed = False
+    close_date = None
+    open_date = None
+
+
+class DummyQuestion(object):
+    def __init__(self, index):
+        self.question_id = 'question-{}'.format(index)
+        self.title = 'Question {}'.format(index)
+        self.single_line = index % 2 == 0
+
+
+def render_stage(loader, questions):
+    question_contents = [
+        loader.render_template(QUESTION_TEMPLATE, {
+            'question': question, 'question_classes': 'question required',
+            'question_content': '<input type="text" name="{0}" id="{0}"/>'.format(question.question_id),
+        })
+        for question in questions
+    ]
+    stage_content = loader.render_template(STAGE_CONTENT_TEMPLATE, {'children_contents': question_contents})
+    return loader.render_template(STAGE_WRAPPER_TEMPLATE, {'stage': DummyStage(), 'stage_content': stage_content})
+
+
+def report(label, count, seconds):
+    print "{label:<50} {per_call:>10.2f} ms/render".format(label=label, per_call=seconds / count * 1e3)
+
+
+def main(count, question_count):
+    django.setup()
+    questions = [DummyQuestion(idx) for idx in range(question_count)]
+    resource_loader = ResourceLoader('group_project_v2.utils')
+    caching_loader = CachingResourceLoader('group_project_v2.utils')
+    assert render_stage(resource_loader, questions) == render_stage(caching_loader, questions)
+
+    print "Rendering stage with {} questions {} times\n".format(question_count, count)
+
+    timer = timeit.Timer(lambda: render_stage(resource_loader, questions))
+    report("ResourceLoader (compile on each render)", count, min(timer.repeat(3, count)))
+
+    timer = timeit.Timer(lambda: render_stage(caching_loader, questions))
+    report("CachingResourceLoader (compiled once)", count, min(timer.repeat(3, count)))
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
@@ -14,9 +14,7 @@ class TestOtherGroupSubmissionLinks(SingleScenarioTestSuite):
     def setUp(self):
         super(TestOtherGroupSubmissionLinks, self).setUp()
         self.project_api_mock.get_workgroups_to_review = mock.Mock(return_value=OTHER_GROUPS.values())
-        self.project_api_mock.get_workgroup_reviewers = mock.Mock(return_value=[
-            {"id": user.id} for user in KNOWN_USERS.values()
-        ])
+        self.project_api_mock.get_reviewers_for_workgroup = mock.Mock(return_value=KNOWN_USERS.values())
 
     @freeze_time(datetime(2015, 01, 01))
     def test_submission_links(self):
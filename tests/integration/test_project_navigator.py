@@ -12,6 +12,7 @@ from datetime import datetime
 import os
 from freezegun import freeze_time
 
+from group_project_v2.project_api.dtos import SubmissionDetails
 from group_project_v2.project_navigator import (
     ViewTypes, ResourcesViewXBlock, SubmissionsViewXBlock, AskTAViewXBlock, PrivateDiscussionViewXBlock,
     NavigationViewXBlock)
@@ -42,11 +43,11 @@ class TestProjectNavigatorViews(SingleScenarioTestSuite, TestWithPatchesMixin):
         This property simulates single submission sent by first user in group
         """
         return {
-            "issue_tree": {
+            "issue_tree": SubmissionDetails.from_dict({
                 "id": "issue_tree", "document_url": self.live_server_url+"/issue_tree_location",
                 "document_filename": "issue_tree.doc", "modified": "2014-05-22T11:44:14Z",
                 "user_details": KNOWN_USERS[1]
-            }
+            })
         }
 
     def _assert_view_visibility(self, project_navigator, available_views, visible_view):
@@ -187,7 +188,7 @@ class TestProjectNavigatorViews(SingleScenarioTestSuite, TestWithPatchesMixin):
         if as_ta:
             switch_to_ta_grading(self.project_api_mock)
             student_id = 100
-        issue_tree_loc = self.submissions['issue_tree']['document_url']
+        issue_tree_loc = self.submissions['issue_tree'].document_url
         self.project_api_mock.get_latest_workgroup_submissions_by_id.return_value = self.submissions
 
         self._prepare_page(student_id=student_id)
@@ -216,7 +217,7 @@ class TestProjectNavigatorViews(SingleScenarioTestSuite, TestWithPatchesMixin):
         _assert_submission(budget, "Budget", None, '')
 
     def test_download_submission(self):
-        issue_tree_loc = self.submissions['issue_tree']['document_url']
+        issue_tree_loc = self.submissions['issue_tree'].document_url
         self.project_api_mock.get_latest_workgroup_submissions_by_id.return_value = self.submissions
 
         self._prepare_page()
@@ -281,11 +282,11 @@ class TestSubmissionUpload(SingleScenarioTestSuite, TestWithPatchesMixin):
         This property simulates single submission sent by first user in group
         """
         return {
-            "issue_tree": {
+            "issue_tree": SubmissionDetails.from_dict({
                 "id": "issue_tree", "document_url": self.live_server_url+"/issue_tree_location",
                 "document_filename": "issue_tree.doc", "modified": "2014-05-22T11:44:14Z",
                 "user_details": KNOWN_USERS[1]
-            }
+            })
         }
 
     def image_path(self, image="image.png"):  # pylint: disable=no-self-use
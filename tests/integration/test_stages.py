@@ -12,7 +12,7 @@ import mock
 from workbench.runtime import WorkbenchRuntime
 
 from group_project_v2.mixins import UserAwareXBlockMixin, AuthXBlockMixin
-from group_project_v2.project_api.dtos import WorkgroupDetails
+from group_project_v2.project_api.dtos import WorkgroupDetails, ReducedUserDetails
 from group_project_v2.stage import BasicStage, SubmissionStage, PeerReviewStage, TeamEvaluationStage
 from group_project_v2.stage.utils import ReviewState
 from tests.integration.base_test import BaseIntegrationTest
@@ -520,9 +520,7 @@ class BasePeerReviewStageTest(BaseReviewStageTest):
     def setUp(self):
         super(BasePeerReviewStageTest, self).setUp()
         self.project_api_mock.get_workgroups_to_review = mock.Mock(return_value=OTHER_GROUPS.values())
-        self.project_api_mock.get_workgroup_reviewers = mock.Mock(return_value=[
-            {"id": user.id} for user in KNOWN_USERS.values()
-        ])
+        self.project_api_mock.get_reviewers_for_workgroup = mock.Mock(return_value=KNOWN_USERS.values())
 
     def _setup_review_items_store(self, initial_items=None):
         store = defaultdict(list)
@@ -589,7 +587,7 @@ class PeerReviewStageTest(BasePeerReviewStageTest):
 
         self._setup_review_items_store(reviews)
 
-        self.project_api_mock.get_workgroup_reviewers = mock.Mock(return_value=[{"id": user_id}])
+        self.project_api_mock.get_reviewers_for_workgroup = mock.Mock(return_value=[ReducedUserDetails(id=user_id)])
         stage_element = self.get_stage(self.go_to_view(student_id=user_id))
 
         expected_statuses = {
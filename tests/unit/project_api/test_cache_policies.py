@@ -0,0 +1,58 @@
+from datetime import timedelta
+from unittest import TestCase
+
+import ddt
+from django.test.utils import override_settings
+
+from group_project_v2.project_api.cache_policies import get_cache_policy, DEFAULT_MAX_SIZE
+from group_project_v2.utils import DEFAULT_EXPIRATION_TIME
+
+
+def _xblock_settings(policies):
+    return {'group_project_v2': {'api_cache_policies': policies}}
+
+
+@ddt.ddt
+class TestCachePolicies(TestCase):
+    def _assert_policy(self, policy, expires_after, stale_grace_period, max_size, shared):
+        self.assertEqual(policy.expires_after, expires_after)
+        self.assertEqual(policy.stale_grace_period, stale_grace_period)
+        self.assertEqual(policy.max_size, max_size)
+        self.assertEqual(policy.shared, shared)
+
+    @ddt.data(None, {}, {'group_project_v2': {}}, _xblock_settings(None))
+    def test_defaults(self, xblock_settings):
+        with override_settings(XBLOCK_SETTINGS=xblock_settings):
+            self._assert_policy(
+                get_cache_policy('get_workgroups_for_assignment'),
+                DEFAULT_EXPIRATION_TIME, timedelta(), DEFAULT_MAX_SIZE, False
+            )
+            self.assertEqual(get_cache_policy('get_user_roles_for_course').expires_after, timedelta(minutes=5))
+            self.assertEqual(get_cache_policy('get_workgroup_by_id').stale_grace_period, timedelta(seconds=60))
+            self.assertTrue(get_cache_policy('get_latest_workgroup_submissions_by_id').shared)
+            self.assertTrue(get_cache_policy('get_latest_project_submissions_by_group').shared)
+
+    def test_settings_override_defaults(self):
+        xblock_settings = _xblock_settings({
+            'default': {'ttl': 30, 'max_size': 100},
+            'get_user_roles_for_course': {'ttl': 600, 'shared': True, 'cache_alias': 'api'},
+        })
+        with override_settings(XBLOCK_SETTINGS=xblock_settings):
+            self._assert_policy(
+                get_cache_policy('get_workgroups_for_assignment'), timedelta(seconds=30), timedelta(), 100, False
+            )
+            self._assert_policy(
+                get_cache_policy('get_workgroup_by_id'), timedelta(seconds=30), timedelta(seconds=60), 100, False
+            )
+            roles_policy = get_cache_policy('get_user_roles_for_course')
+            self._assert_policy(roles_policy, timedelta(seconds=600), timedelta(), 100, True)
+            self.assertEqual(roles_policy.cache_alias, 'api')
+
+    def test_policy_built_once_per_settings_change(self):
+        with override_settings(XBLOCK_SETTINGS=_xblock_settings({'default': {'ttl': 30}})):
+            policy = get_cache_policy('get_workgroup_by_id')
+            self.assertIs(get_cache_policy('get_workgroup_by_id'), policy)
+            self.assertEqual(policy.expires_after, timedelta(seconds=30))
+
+        with override_settings(XBLOCK_SETTINGS=_xblock_settings({'default': {'ttl': 40}})):
+            self.assertEqual(get_cache_policy('get_workgroup_by_id').expires_after, timedelta(seconds=40))
@@ -0,0 +1,101 @@
+from unittest import TestCase
+
+import ddt
+import mock
+from django.test.utils import override_settings
+
+from group_project_v2.project_api import TypedProjectAPI
+from group_project_v2.project_api.cache_warmer import (
+    ProjectAPICacheWarmer, WARMED_UP_METHODS, get_unsuitable_cache_policies
+)
+from group_project_v2.project_api.dtos import ProjectDetails, WorkgroupDetails
+from tests.utils import raise_api_error
+
+
+@ddt.ddt
+class TestProjectAPICacheWarmer(TestCase):
+    course_id = 'course1'
+
+    def setUp(self):
+        self.project_api_mock = mock.Mock(spec=TypedProjectAPI)
+        self.projects = {
+            'content1': ProjectDetails(id=1, content_id='content1', workgroups=[1, 2]),
+            'content2': ProjectDetails(id=2, content_id='content2', workgroups=[3]),
+        }
+        self.workgroups = {
+            1: WorkgroupDetails(id=1, users=[{'id': 1}, {'id': 2}]),
+            2: WorkgroupDetails(id=2, users=[{'id': 3}]),
+            3: WorkgroupDetails(id=3, users=[{'id': 4}, {'id': 5}]),
+        }
+        self.project_api_mock.get_projects_for_course.return_value = iter(self.projects.values())
+        self.project_api_mock.get_project_by_content_id.side_effect = lambda _course, content: self.projects[content]
+        self.project_api_mock.get_workgroup_by_id.side_effect = lambda group_id: self.workgroups[group_id]
+        self.project_api_mock.get_user_details.side_effect = lambda user_id: mock.Mock(id=user_id)
+        self.project_api_mock.get_user_roles_for_course.return_value = set()
+        self.project_api_mock.get_user_organizations.side_effect = lambda user_id: [{'id': user_id % 2}]
+        self.project_api_mock.get_organization_by_id.side_effect = lambda org_id: mock.Mock(id=org_id)
+
+    @ddt.data(1, 4)
+    def test_warm_up_all_projects_in_course(self, max_workers):
+        stats = ProjectAPICacheWarmer(self.project_api_mock, max_workers).warm_up_course(self.course_id)
+
+        self.assertEqual(
+            stats, {'projects': 2, 'workgroups': 3, 'users': 5, 'roles': 5, 'organizations': 2}
+        )
+        self.project_api_mock.get_projects_for_course.assert_called_once_with(self.course_id)
+        self.assertEqual(
+            sorted(self.project_api_mock.get_workgroup_by_id.call_args_list), [mock.call(1), mock.call(2), mock.call(3)]
+        )
+        self.assertEqual(
+            sorted(self.project_api_mock.get_user_roles_for_course.call_args_list),
+            [mock.call(user_id, self.course_id) for user_id in range(1, 6)]
+        )
+        self.assertEqual(
+            sorted(self.project_api_mock.get_organization_by_id.call_args_list), [mock.call(0), mock.call(1)]
+        )
+
+    def test_warm_up_selected_projects(self):
+        stats = ProjectAPICacheWarmer(self.project_api_mock).warm_up_course(self.course_id, ['content2'])
+
+        self.project_api_mock.get_projects_for_course.assert_not_called()
+        self.project_api_mock.get_project_by_content_id.assert_called_once_with(self.course_id, 'content2')
+        self.assertEqual(stats['workgroups'], 1)
+        self.assertEqual(stats['users'], 2)
+
+    def test_failures_are_skipped(self):
+        def get_workgroup(group_id):
+            if group_id == 2:
+                raise_api_error(500, "Internal server error")
+            return self.workgroups[group_id]
+
+        self.project_api_mock.get_workgroup_by_id.side_effect = get_workgroup
+
+        stats = ProjectAPICacheWarmer(self.project_api_mock).warm_up_course(self.course_id)
+
+        self.assertEqual(stats['workgroups'], 2)
+        self.assertEqual(stats['users'], 4)
+
+
+@ddt.ddt
+class TestGetUnsuitableCachePolicies(TestCase):
+    @staticmethod
+    def _xblock_settings(policies):
+        return {'group_project_v2': {'api_cache_policies': policies}}
+
+    def test_default_policies_unsuitable(self):
+        with override_settings(XBLOCK_SETTINGS=None):
+            self.assertEqual(get_unsuitable_cache_policies(), list(WARMED_UP_METHODS))
+
+    def test_shared_long_lived_policies_suitable(self):
+        policies = {'default': {'ttl': 600, 'shared': True}}
+        with override_settings(XBLOCK_SETTINGS=self._xblock_settings(policies)):
+            self.assertEqual(get_unsuitable_cache_policies(), [])
+
+    @ddt.data(
+        {'get_user_details': {'shared': False}},
+        {'get_user_details': {'ttl': 60}},
+    )
+    def test_unsuitable_method_policy(self, method_policies):
+        policies = dict(method_policies, default={'ttl': 600, 'shared': True})
+        with override_settings(XBLOCK_SETTINGS=self._xblock_settings(policies)):
+            self.assertEqual(get_unsuitable_cache_policies(), ['get_user_details'])
@@ -0,0 +1,73 @@
+import pickle
+from datetime import datetime
+from unittest import TestCase
+
+import ddt
+import pytz
+
+from group_project_v2.project_api.dtos import (
+    ReducedUserDetails, UserDetails, WorkgroupDetails, CompletionDetails, OrganisationDetails, SubmissionDetails
+)
+import tests.unit.project_api.canned_responses as canned_responses
+
+
+@ddt.ddt
+class TestDTOs(TestCase):
+    @ddt.data(ReducedUserDetails, UserDetails, WorkgroupDetails, CompletionDetails, SubmissionDetails)
+    def test_no_instance_dict(self, dto_class):
+        instance = dto_class(id=1)
+        self.assertFalse(hasattr(instance, '__dict__'))
+        with self.assertRaises(AttributeError):
+            instance.unknown_attribute = 'value'
+
+    def test_from_dict_matches_kwargs_constructor(self):
+        data = {
+            'id': 1, 'url': '/api/server/users/1', 'username': 'jane', 'email': 'jane@example.com',
+            'first_name': 'Jane', 'last_name': 'Doe', 'gender': 'F', 'city': 'Boston', 'country': 'US',
+            'is_active': True, 'level_of_education': 'M', 'organization': 7,
+            'profile_image': {'image_url_medium': '/image.png'}
+        }
+        from_kwargs = UserDetails(**data)
+        from_dict = UserDetails.from_dict(data)
+
+        self.assertEqual(from_kwargs.__getstate__(), from_dict.__getstate__())
+        self.assertEqual(from_dict.full_name, u"Jane Doe")
+        self.assertEqual(from_dict.profile_image_url, '/image.png')
+
+    def test_submission_details(self):
+        submission = SubmissionDetails.from_dict({
+            'id': 1, 'document_id': 'doc1', 'document_url': '/doc1.pdf', 'modified': '2017-01-02T03:04:05.678Z',
+            'user': 10,
+        })
+        self.assertEqual(submission.document_id, 'doc1')
+        self.assertEqual(submission.modified_date, datetime(2017, 1, 2, 3, 4, 5, 678000, tzinfo=pytz.UTC))
+        self.assertIsNone(submission.user_details)
+
+    def test_missing_fields_default_to_none(self):
+        user = UserDetails(id=1, full_name="Jane")
+        self.assertEqual(user.full_name, "Jane")
+        self.assertIsNone(user.email)
+        self.assertIsNone(user.profile_image_url)
+
+    def test_workgroup_users(self):
+        workgroup = WorkgroupDetails.from_dict(canned_responses.Workgroups.workgroup1)
+        self.assertEqual(
+            [user.id for user in workgroup.users],
+            [user['id'] for user in canned_responses.Workgroups.workgroup1['users']]
+        )
+        self.assertTrue(all(isinstance(user, ReducedUserDetails) for user in workgroup.users))
+        self.assertEqual(WorkgroupDetails(id=1).users, [])
+
+    def test_organization_user_ids(self):
+        organization = OrganisationDetails(name='org', display_name='Org', users=[1, 2, 2])
+        self.assertEqual(organization.user_ids, {1, 2})
+
+    @ddt.data(0, 1, 2)
+    def test_pickle(self, protocol):
+        user = UserDetails(id=1, username='jane', profile_image={'image_url_medium': '/image.png'})
+        restored = pickle.loads(pickle.dumps(user, protocol))
+        self.assertEqual(restored.__getstate__(), user.__getstate__())
+
+        workgroup = WorkgroupDetails(id=2, users=[{'id': 1}, {'id': 2}])
+        restored = pickle.loads(pickle.dumps(workgroup, protocol))
+        self.assertEqual([u.id for u in restored.users], [1, 2])
@@ -3,10 +3,16 @@ from unittest import TestCase
 
 import ddt
 import mock
-
-from group_project_v2.json_requests import GET
-from group_project_v2.project_api import TypedProjectAPI
-from group_project_v2.project_api.api_implementation import WORKGROUP_API, PROJECTS_API, COURSES_API
+from django.core.cache import caches
+
+from group_project_v2.api_error import ApiError
+from group_project_v2.json_requests import GET, POST
+from group_project_v2.project_api import TypedProjectAPI, api_implementation
+from group_project_v2.project_api.dtos import ProjectDetails, ReducedUserDetails
+from group_project_v2.project_api.api_implementation import (
+    WORKGROUP_API, PROJECTS_API, COURSES_API, GROUP_API, PEER_REVIEW_API, WORKGROUP_REVIEW_API, SUBMISSION_API,
+    USERS_API
+)
 from tests.utils import TestWithPatchesMixin, make_review_item as mri
 import tests.unit.project_api.canned_responses as canned_responses
 
@@ -17,6 +23,8 @@ class TestProjectApi(TestCase, TestWithPatchesMixin):
 
     def setUp(self):
         self.project_api = TypedProjectAPI(self.api_server_address, dry_run=False)
+        TypedProjectAPI.clear_local_caches()
+        caches['default'].clear()
 
     def _patch_send_request(self, calls_and_results, missing_callback=None):
         # pylint: disable=unused-argument
@@ -44,6 +52,20 @@ class TestProjectApi(TestCase, TestWithPatchesMixin):
 
         return mock.patch.object(self.project_api, '_do_send_request', mock.Mock(side_effect=side_effect))
 
+    def test_get_coalescing_stats(self):
+        stats = TypedProjectAPI.get_coalescing_stats()
+        self.assertIn('get_project_by_content_id', stats)
+        self.assertIn('get_workgroup_by_id', stats)
+        self.assertNotIn('get_projects_for_course', stats)
+
+        workgroup_stats = stats['get_workgroup_by_id']
+        with self._patch_send_request({'default': {'id': 1, 'users': []}}):
+            self.project_api.get_workgroup_by_id(1)
+
+        self.assertEqual(TypedProjectAPI.get_coalescing_stats()['get_workgroup_by_id'], {
+            'calls': workgroup_stats['calls'] + 1, 'coalesced': workgroup_stats['coalesced']
+        })
+
     @ddt.data(
         (["part1", "part2"], None, False, api_server_address+"/part1/part2/", {'error': True}),
         (["part1", "part2"], None, True, api_server_address+"/part1/part2", {'success': True}),
@@ -177,6 +199,386 @@ class TestProjectApi(TestCase, TestWithPatchesMixin):
 
             self.assertEqual(response, [1, 2, 3] * len(expected_urls))
 
+    def test_get_reviewers_for_workgroups(self):
+        def assignment(url, content_id='content1'):
+            return {'data': {'xblock_id': content_id}, 'url': url}
+
+        calls_and_results = {
+            (WORKGROUP_API, 1, 'groups'): [assignment('/url1/'), assignment('/url2/'), assignment('/url3/', 'other')],
+            (WORKGROUP_API, 2, 'groups'): [assignment('/url2/')],
+            (WORKGROUP_API, 3, 'groups'): [],
+            ('url1', 'users'): {'users': [{'id': 1, 'username': 'user1'}, {'id': 2, 'username': 'user2'}]},
+            ('url2', 'users'): {'users': [{'id': 2, 'username': 'user2'}, {'id': 3, 'username': 'user3'}]},
+        }
+
+        with self._patch_send_request(calls_and_results) as patched_send_request:
+            response = self.project_api.get_reviewers_for_workgroups([1, 2, 3], 'content1')
+
+        self.assertEqual(
+            {group_id: [user.id for user in users] for group_id, users in response.iteritems()},
+            {1: [1, 2, 3], 2: [2, 3], 3: []}
+        )
+        self.assertIsInstance(response[1][0], ReducedUserDetails)
+        self.assertEqual(response[1][0].username, 'user1')
+        self.assertEqual(len(patched_send_request.mock_calls), 5)  # url2 users are fetched once
+
+    def test_get_workgroups_to_review_by_user(self):
+        assignments_url = self.project_api.build_url(
+            (GROUP_API,), query_params={"course": 'course1', "type": "reviewassignment", "data__xblock_id": 'xblock1'}
+        )
+        urls_and_results = {
+            assignments_url: {'results': [{'id': 1}], 'next': 'page2'},
+            'page2': {'results': [{'id': 2}], 'next': None},
+        }
+        calls_and_results = {
+            (GROUP_API, 1, 'users'): {'users': [{'id': 10}, {'id': 11}]},
+            (GROUP_API, 2, 'users'): {'users': [{'id': 11}]},
+            (GROUP_API, 1, 'workgroups'): {'results': [{'id': 100}, {'id': 101}]},
+            (GROUP_API, 2, 'workgroups'): {'results': [{'id': 102}]},
+        }
+
+        with self._patch_do_send_request(urls_and_results), self._patch_send_request(calls_and_results):
+            response = self.project_api.get_workgroups_to_review_by_user('course1', 'xblock1')
+
+        self.assertEqual(
+            {user_id: [group.id for group in groups] for user_id, groups in response.iteritems()},
+            {10: [100, 101], 11: [100, 101, 102]}
+        )
+
+    def test_get_latest_workgroup_submissions_by_id(self):
+        calls_and_results = {
+            (WORKGROUP_API, 1, 'submissions'): [
+                {'document_id': 'doc1', 'document_url': 'url1', 'modified': '2017-01-01T00:00:00Z', 'user': 10},
+                {'document_id': 'doc1', 'document_url': 'url2', 'modified': '2017-01-02T00:00:00.5Z', 'user': 11},
+                {'document_id': 'doc1', 'document_url': 'url3', 'modified': '2017-01-01T12:00:00Z', 'user': 12},
+                {'document_id': 'doc2', 'document_url': 'url4', 'modified': '2017-01-01T00:00:00Z', 'user': None},
+            ],
+            (USERS_API, 11): {'id': 11, 'username': 'user11'},
+        }
+
+        with self._patch_send_request(calls_and_results) as patched_send_request:
+            self.project_api.get_latest_workgroup_submissions_by_id(1)
+            response = self.project_api.get_latest_workgroup_submissions_by_id(1)
+
+        self.assertEqual(
+            {document_id: submission.document_url for document_id, submission in response.iteritems()},
+            {'doc1': 'url2', 'doc2': 'url4'}
+        )
+        self.assertEqual(response['doc1'].user_details.username, 'user11')
+        self.assertIsNone(response['doc2'].user_details)
+        self.assertEqual(
+            patched_send_request.mock_calls,
+            [
+                mock.call(GET, (WORKGROUP_API, 1, 'submissions')),
+                mock.call(GET, (USERS_API, 11), no_trailing_slash=True),
+            ]
+        )
+
+    def test_get_latest_project_submissions_by_group(self):
+        submissions_url = self.project_api.build_url((SUBMISSION_API,), query_params={'workgroup__project': 100})
+        urls_and_results = {
+            submissions_url: {'results': [
+                {'document_id': 'doc1', 'document_url': 'url1', 'modified': '2017-01-01T00:00:00Z', 'workgroup': 1},
+                {'document_id': 'doc1', 'document_url': 'url2', 'modified': '2017-01-02T00:00:00Z', 'workgroup': 1},
+                {'document_id': 'doc1', 'document_url': 'url3', 'modified': '2017-01-01T00:00:00Z', 'workgroup': 2},
+            ], 'next': 'page2'},
+            'page2': {'results': [
+                {'document_id': 'doc2', 'document_url': 'url4', 'modified': '2017-01-01T00:00:00Z', 'workgroup': 2},
+            ], 'next': None},
+        }
+
+        with self._patch_do_send_request(urls_and_results) as patched_do_send_request, \
+                self._patch_project_details(100, [1, 2]):
+            response = self.project_api.get_latest_project_submissions_by_group(100)
+            self.project_api.get_latest_project_submissions_by_group(100)
+
+        self.assertEqual(
+            {
+                group_id: {document_id: submission.document_url for document_id, submission in submissions.iteritems()}
+                for group_id, submissions in response.iteritems()
+            },
+            {1: {'doc1': 'url2'}, 2: {'doc1': 'url3', 'doc2': 'url4'}}
+        )
+        self.assertEqual(len(patched_do_send_request.mock_calls), 2)
+
+    def test_get_latest_project_submissions_by_group_project_filter_ignored(self):
+        submissions_url = self.project_api.build_url((SUBMISSION_API,), query_params={'workgroup__project': 100})
+        urls_and_results = {
+            submissions_url: {'results': [
+                {'document_id': 'doc1', 'document_url': 'url1', 'modified': '2017-01-01T00:00:00Z', 'workgroup': 1},
+                {'document_id': 'doc1', 'document_url': 'url2', 'modified': '2017-01-01T00:00:00Z', 'workgroup': 3},
+            ], 'next': 'page2'},
+            'page2': {'results': [], 'next': None},
+        }
+
+        with self._patch_do_send_request(urls_and_results) as patched_do_send_request, \
+                self._patch_project_details(100, [1, 2]), \
+                mock.patch.object(self.project_api, 'get_latest_workgroup_submissions_by_id') as get_by_id:
+            get_by_id.side_effect = lambda group_id: {'doc': group_id}
+            self.assertIsNone(self.project_api.get_latest_project_submissions_by_group(100))
+            self.assertEqual(
+                self.project_api.get_latest_submissions_for_workgroups([1, 2], 100), {1: {'doc': 1}, 2: {'doc': 2}}
+            )
+
+        self.assertEqual(len(patched_do_send_request.mock_calls), 1)  # listing stopped at first foreign submission
+
+    def test_get_latest_submissions_for_workgroups_project_filter_ignored(self):
+        with mock.patch.object(self.project_api, 'get_latest_project_submissions_by_group') as get_bulk, \
+                mock.patch.object(self.project_api, 'get_latest_workgroup_submissions_by_id') as get_by_id:
+            get_bulk.return_value = None
+            get_by_id.side_effect = lambda group_id: {'doc': group_id}
+            self.assertEqual(
+                self.project_api.get_latest_submissions_for_workgroups([1, 2], 100), {1: {'doc': 1}, 2: {'doc': 2}}
+            )
+            self.assertEqual(self.project_api.get_latest_submissions_for_workgroups([3], 100), {3: {'doc': 3}})
+
+        get_bulk.assert_called_once_with(100)  # bulk listing is not tried again
+        self.assertEqual(sorted(get_by_id.mock_calls), [mock.call(1), mock.call(2), mock.call(3)])
+
+    def test_get_latest_submissions_for_workgroups(self):
+        submissions_by_group = {1: {'doc1': 'submission1'}, 3: {'doc2': 'submission2'}}
+        with mock.patch.object(self.project_api, 'get_latest_project_submissions_by_group') as get_bulk, \
+                mock.patch.object(self.project_api, 'get_latest_workgroup_submissions_by_id') as get_by_id:
+            get_bulk.return_value = submissions_by_group
+            response = self.project_api.get_latest_submissions_for_workgroups(iter([1, 2]), 100)
+
+        self.assertEqual(response, {1: {'doc1': 'submission1'}, 2: {}})
+        get_bulk.assert_called_once_with(100)
+        get_by_id.assert_not_called()
+
+    @ddt.data(404, 405, 501)
+    def test_get_latest_submissions_for_workgroups_fallback(self, error_code):
+        with mock.patch.object(self.project_api, 'get_latest_project_submissions_by_group') as get_bulk, \
+                mock.patch.object(self.project_api, 'get_latest_workgroup_submissions_by_id') as get_by_id:
+            get_bulk.side_effect = self._make_api_error(error_code)
+            get_by_id.side_effect = lambda group_id: {'doc': group_id}
+            self.assertEqual(
+                self.project_api.get_latest_submissions_for_workgroups([1, 2], 100), {1: {'doc': 1}, 2: {'doc': 2}}
+            )
+            self.assertEqual(
+                self.project_api.get_latest_submissions_for_workgroups([3], 100), {3: {'doc': 3}}
+            )
+
+        get_bulk.assert_called_once_with(100)  # bulk listing is tried only once
+        self.assertEqual(sorted(get_by_id.mock_calls), [mock.call(1), mock.call(2), mock.call(3)])
+
+    def test_get_submitted_document_urls(self):
+        submissions_by_group = {
+            1: {'doc1': mock.Mock(document_url='url1'), 'doc2': mock.Mock(document_url='url2')},
+            3: {'doc1': mock.Mock(document_url='url1')},
+        }
+        with mock.patch.object(self.project_api, 'get_latest_project_submissions_by_group') as get_bulk, \
+                mock.patch.object(self.project_api, 'get_latest_workgroup_submissions_by_id') as get_by_id:
+            get_bulk.return_value = submissions_by_group
+            self.assertEqual(self.project_api.get_submitted_document_urls(1, 100), {'url1', 'url2'})
+
+        get_bulk.assert_called_once_with(100)
+        get_by_id.assert_not_called()
+
+    @ddt.data((100, 404), (None, None))
+    @ddt.unpack
+    def test_get_submitted_document_urls_workgroup_only(self, project_id, error_code):
+        with mock.patch.object(self.project_api, 'get_latest_project_submissions_by_group') as get_bulk, \
+                mock.patch.object(self.project_api, 'get_latest_workgroup_submissions_by_id') as get_by_id:
+            if error_code:
+                get_bulk.side_effect = self._make_api_error(error_code)
+            get_by_id.return_value = {'doc1': mock.Mock(document_url='url1')}
+            self.assertEqual(self.project_api.get_submitted_document_urls(1, project_id), {'url1'})
+
+        get_by_id.assert_called_once_with(1)
+
+    def test_get_latest_submissions_for_workgroups_no_project(self):
+        with mock.patch.object(self.project_api, 'get_latest_project_submissions_by_group') as get_bulk, \
+                mock.patch.object(self.project_api, 'get_latest_workgroup_submissions_by_id') as get_by_id:
+            get_by_id.return_value = {}
+            self.assertEqual(self.project_api.get_latest_submissions_for_workgroups([1], None), {1: {}})
+
+        get_bulk.assert_not_called()
+
+    def test_get_latest_submissions_for_workgroups_error(self):
+        with mock.patch.object(self.project_api, 'get_latest_project_submissions_by_group') as get_bulk:
+            get_bulk.side_effect = self._make_api_error(500)
+            with self.assertRaises(ApiError):
+                self.project_api.get_latest_submissions_for_workgroups([1], 100)
+
+    def test_create_submission_invalidates_latest_submissions(self):
+        submissions = []
+        calls_and_results = {
+            (WORKGROUP_API, 1, 'submissions'): submissions,
+            (WORKGROUP_API, 1): {'id': 1, 'project': 100, 'users': []},
+        }
+
+        with self._patch_send_request(calls_and_results) as patched_send_request:
+            self.assertEqual(self.project_api.get_latest_workgroup_submissions_by_id(1), {})
+            submissions.append({'document_id': 'doc1', 'modified': '2017-01-01T00:00:00Z', 'user': None})
+            self.assertEqual(self.project_api.get_latest_workgroup_submissions_by_id(1), {})
+
+            submit_hash = {'document_id': 'doc1', 'workgroup': 1}
+            self.project_api.create_submission(submit_hash)
+            self.assertEqual(self.project_api.get_latest_workgroup_submissions_by_id(1).keys(), ['doc1'])
+
+        patched_send_request.assert_any_call(POST, (SUBMISSION_API, ), data=submit_hash)
+
+    def test_create_submission_invalidates_latest_project_submissions(self):
+        submissions_url = self.project_api.build_url((SUBMISSION_API,), query_params={'workgroup__project': 100})
+        submissions = []
+        calls_and_results = {(WORKGROUP_API, 1): {'id': 1, 'project': 100, 'users': []}}
+
+        with self._patch_do_send_request({submissions_url: {'results': submissions, 'next': None}}), \
+                self._patch_send_request(calls_and_results), self._patch_project_details(100, [1]):
+            self.assertEqual(self.project_api.get_latest_project_submissions_by_group(100), {})
+            submissions.append({'document_id': 'doc1', 'modified': '2017-01-01T00:00:00Z', 'workgroup': 1})
+            self.assertEqual(self.project_api.get_latest_project_submissions_by_group(100), {})
+
+            self.project_api.create_submission({'document_id': 'doc1', 'workgroup': 1})
+            self.assertEqual(self.project_api.get_latest_project_submissions_by_group(100)[1].keys(), ['doc1'])
+
+    def test_create_submission_project_not_found(self):
+        def missing_callback(url_parts):
+            if url_parts == (WORKGROUP_API, 1):
+                raise self._make_api_error(404)
+
+        with self._patch_send_request({}, missing_callback) as patched_send_request:
+            self.project_api.create_submission({'document_id': 'doc1', 'workgroup': 1})
+
+        patched_send_request.assert_any_call(POST, (SUBMISSION_API, ), data={'document_id': 'doc1', 'workgroup': 1})
+
+    def test_latest_submissions_cached_and_invalidated_in_all_processes(self):
+        submissions = []
+        other_process_api = TypedProjectAPI(self.api_server_address, dry_run=False)
+
+        with self._patch_send_request({(WORKGROUP_API, 1, 'submissions'): submissions}) as patched_send_request, \
+                mock.patch.object(other_process_api, 'send_request'):
+            self.assertEqual(self.project_api.get_latest_workgroup_submissions_by_id(1), {})
+            TypedProjectAPI.clear_local_caches()  # processes do not share memory
+            self.assertEqual(self.project_api.get_latest_workgroup_submissions_by_id(1), {})
+
+            submissions.append({'document_id': 'doc1', 'modified': '2017-01-01T00:00:00Z', 'user': None})
+            other_process_api.create_submission({'document_id': 'doc1', 'workgroup': 1})
+            self.assertEqual(self.project_api.get_latest_workgroup_submissions_by_id(1).keys(), ['doc1'])
+
+        self.assertEqual(patched_send_request.call_count, 2)
+
+    def _patch_project_details(self, project_id, group_ids):
+        project_details = ProjectDetails(id=project_id, workgroups=group_ids)
+        return mock.patch.object(self.project_api, 'get_project_details', mock.Mock(return_value=project_details))
+
+    @staticmethod
+    def _make_api_error(code):
+        http_error = mock.Mock(code=code, reason='reason')
+        http_error.read.return_value = ''
+        return ApiError(http_error)
+
+    def _submit_workgroup_review_items(self, data):
+        current_items = [
+            {'id': 1, 'question': 'q1', 'answer': 'same', 'created': 'c', 'modified': 'm'},
+            {'id': 2, 'question': 'q2', 'answer': 'old', 'created': 'c', 'modified': 'm'},
+            {'id': 3, 'question': 'q3', 'answer': 'to delete', 'created': 'c', 'modified': 'm'},
+        ]
+        with mock.patch.object(self.project_api, 'get_workgroup_review_items', mock.Mock(return_value=current_items)):
+            self.project_api.submit_workgroup_review_items('reviewer', 10, 'content1', data)
+
+    def test_submit_workgroup_review_items_bulk(self):
+        data = {'q1': 'same', 'q2': 'new', 'q3': '', 'q4': 'created', 'q5': ''}
+        with mock.patch.object(self.project_api, 'send_request') as patched_send_request:
+            self._submit_workgroup_review_items(data)
+
+        patched_send_request.assert_called_once_with(
+            POST, (WORKGROUP_REVIEW_API, 'bulk'), data={
+                'create': [{
+                    'question': 'q4', 'answer': 'created', 'workgroup': 10, 'reviewer': 'reviewer',
+                    'content_id': 'content1'
+                }],
+                'update': [{'id': 2, 'question': 'q2', 'answer': 'new'}],
+                'delete': [3],
+            }
+        )
+
+    def test_submit_workgroup_review_items_no_changes(self):
+        with mock.patch.object(self.project_api, 'send_request') as patched_send_request:
+            self._submit_workgroup_review_items({'q1': 'same', 'q5': ''})
+
+        patched_send_request.assert_not_called()
+
+    def test_submit_workgroup_review_items_fallback(self):
+        def send_request(method, url_parts, data=None):  # pylint: disable=unused-argument
+            if url_parts[-1] == 'bulk':
+                raise self._make_api_error(404)
+
+        with mock.patch.object(self.project_api, 'send_request', mock.Mock(side_effect=send_request)), \
+                mock.patch.object(self.project_api, 'create_workgroup_review_assessment') as create, \
+                mock.patch.object(self.project_api, 'update_workgroup_review_assessment') as update, \
+                mock.patch.object(self.project_api, 'delete_workgroup_review_assessment') as delete:
+            self._submit_workgroup_review_items({'q2': 'new', 'q3': '', 'q4': 'created'})
+            self._submit_workgroup_review_items({'q2': 'newer'})
+
+            self.assertEqual(self.project_api.send_request.call_count, 1)  # bulk endpoint is tried only once
+
+        create.assert_called_once_with(
+            {'question': 'q4', 'answer': 'created', 'workgroup': 10, 'reviewer': 'reviewer', 'content_id': 'content1'}
+        )
+        self.assertEqual(update.mock_calls, [
+            mock.call({'id': 2, 'question': 'q2', 'answer': 'new'}),
+            mock.call({'id': 2, 'question': 'q2', 'answer': 'newer'}),
+        ])
+        delete.assert_called_once_with(3)
+
+    def test_submit_workgroup_review_items_fallback_partial_failure(self):
+        def send_request(method, url_parts, data=None):  # pylint: disable=unused-argument
+            if url_parts[-1] == 'bulk':
+                raise self._make_api_error(404)
+
+        with mock.patch.object(self.project_api, 'send_request', mock.Mock(side_effect=send_request)), \
+                mock.patch.object(self.project_api, 'create_workgroup_review_assessment') as create, \
+                mock.patch.object(self.project_api, 'update_workgroup_review_assessment') as update, \
+                mock.patch.object(self.project_api, 'delete_workgroup_review_assessment') as delete, \
+                mock.patch.object(api_implementation, 'log') as patched_log:
+            update.side_effect = self._make_api_error(500)
+            with self.assertRaises(ApiError):
+                self._submit_workgroup_review_items({'q2': 'secret answer', 'q3': '', 'q4': 'created'})
+
+        # independent changes are still saved
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(update.call_count, 1)
+        delete.assert_called_once_with(3)
+        log_args = patched_log.error.call_args[0]
+        self.assertEqual(log_args[1:3], (1, 3))
+        self.assertEqual(log_args[-1], u"question q2")
+        self.assertNotIn('secret answer', repr(patched_log.error.call_args))
+
+    def test_submit_workgroup_review_items_bulk_error(self):
+        with mock.patch.object(self.project_api, 'send_request') as patched_send_request:
+            patched_send_request.side_effect = self._make_api_error(500)
+            with self.assertRaises(ApiError):
+                self._submit_workgroup_review_items({'q2': 'new'})
+
+    def test_submit_peer_review_items_bulk(self):
+        current_items = [{'id': 1, 'question': 'q1', 'answer': 'old', 'created': 'c', 'modified': 'm'}]
+        with mock.patch.object(self.project_api, 'get_peer_review_items', mock.Mock(return_value=current_items)), \
+                mock.patch.object(self.project_api, 'send_request') as patched_send_request:
+            self.project_api.submit_peer_review_items('reviewer', 5, 10, 'content1', {'q1': 'new', 'q2': 'created'})
+
+        patched_send_request.assert_called_once_with(
+            POST, (PEER_REVIEW_API, 'bulk'), data={
+                'create': [{
+                    'question': 'q2', 'answer': 'created', 'workgroup': 10, 'user': 5, 'reviewer': 'reviewer',
+                    'content_id': 'content1'
+                }],
+                'update': [{'id': 1, 'question': 'q1', 'answer': 'new'}],
+                'delete': [],
+            }
+        )
+
+    def test_get_reviewers_for_workgroup(self):
+        reviewers = [ReducedUserDetails(id=1)]
+        with mock.patch.object(self.project_api, 'get_reviewers_for_workgroups') as get_reviewers_for_workgroups:
+            get_reviewers_for_workgroups.return_value = {1: reviewers}
+
+            self.assertEqual(self.project_api.get_reviewers_for_workgroup(1, 'content1'), reviewers)
+            self.assertEqual(self.project_api.get_reviewers_for_workgroup(1, 'content1'), reviewers)
+
+        get_reviewers_for_workgroups.assert_called_once_with([1], 'content1')
+
     @ddt.data(
         (1, 2, [mri(1, 'qwe', peer=2), mri(1, 'asd', peer=3)], [mri(1, 'qwe', peer=2)]),
         (
@@ -0,0 +1,103 @@
+import threading
+from unittest import TestCase
+
+import mock
+
+from group_project_v2.background_jobs import BackgroundJobQueue
+
+
+class TestBackgroundJobQueue(TestCase):
+    def setUp(self):
+        self.queue = BackgroundJobQueue()
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def _blocking_job(self):
+        self.started.set()
+        self.release.wait()
+
+    def test_jobs_processed(self):
+        jobs = [mock.Mock(), mock.Mock()]
+        self.queue.enqueue(('key', 1), jobs[0])
+        self.queue.enqueue(('key', 2), jobs[1])
+
+        self.assertTrue(self.queue.join(5))
+        for job in jobs:
+            job.assert_called_once_with()
+        self.assertEqual(self.queue.get_stats(), {'enqueued': 2, 'coalesced': 0, 'processed': 2, 'failed': 0})
+
+    def test_pending_jobs_coalesced(self):
+        self.queue.enqueue(('key', 1), self._blocking_job)
+        self.assertTrue(self.started.wait(5))
+
+        first_job, second_job, other_key_job = mock.Mock(), mock.Mock(), mock.Mock()
+        self.queue.enqueue(('key', 2), first_job)
+        self.queue.enqueue(('key', 3), other_key_job)
+        self.queue.enqueue(('key', 2), second_job)
+        self.release.set()
+
+        self.assertTrue(self.queue.join(5))
+        first_job.assert_not_called()
+        second_job.assert_called_once_with()
+        other_key_job.assert_called_once_with()
+        self.assertEqual(self.queue.get_stats(), {'enqueued': 4, 'coalesced': 1, 'processed': 3, 'failed': 0})
+
+    def test_failed_job_does_not_stop_worker(self):
+        failing_job, job = mock.Mock(side_effect=ValueError("Failed")), mock.Mock()
+        self.queue.enqueue(('key', 1), failing_job)
+        self.queue.enqueue(('key', 2), job)
+
+        self.assertTrue(self.queue.join(5))
+        job.assert_called_once_with()
+        self.assertEqual(self.queue.get_stats()['failed'], 1)
+
+    def test_join_timeout(self):
+        self.queue.enqueue(('key', 1), self._blocking_job)
+
+        self.assertFalse(self.queue.join(0.01))
+        self.release.set()
+        self.assertTrue(self.queue.join(5))
+
+    def test_delayed_jobs_debounced(self):
+        first_job, second_job, other_key_job = mock.Mock(), mock.Mock(), mock.Mock()
+        self.queue.enqueue(('key', 1), first_job, delay=0.2)
+        self.queue.enqueue(('key', 2), other_key_job, delay=0.2)
+        self.queue.enqueue(('key', 1), second_job, delay=0.2)
+
+        self.assertFalse(self.queue.join(0.05))
+        second_job.assert_not_called()
+        self.assertTrue(self.queue.join(5))
+
+        first_job.assert_not_called()
+        second_job.assert_called_once_with()
+        other_key_job.assert_called_once_with()
+        self.assertEqual(self.queue.get_stats(), {'enqueued': 3, 'coalesced': 1, 'processed': 2, 'failed': 0})
+
+    def test_delayed_job_not_postponed_past_max_delays(self):
+        job = mock.Mock()
+        with mock.patch('group_project_v2.background_jobs.time.time', mock.Mock(return_value=100)):
+            self.queue.enqueue(('key', 1), job, delay=10)
+        with mock.patch('group_project_v2.background_jobs.time.time', mock.Mock(return_value=145)):
+            self.queue.enqueue(('key', 1), job, delay=10)
+            due_time, first_enqueued_at, _ = self.queue._pending[('key', 1)]  # pylint: disable=protected-access
+
+        self.assertEqual((due_time, first_enqueued_at), (150, 100))
+
+    def test_flush_runs_delayed_jobs(self):
+        job = mock.Mock()
+        self.queue.enqueue(('key', 1), job, delay=60)
+
+        self.assertFalse(self.queue.join(0.01))
+        self.assertTrue(self.queue.flush(5))
+        job.assert_called_once_with()
+
+    def test_pending_jobs_flushed_at_exit(self):
+        job = mock.Mock()
+        with mock.patch('group_project_v2.background_jobs.atexit.register') as register_mock:
+            self.queue.enqueue(('key', 1), job, delay=60)
+            self.queue.enqueue(('key', 2), mock.Mock(), delay=60)
+
+        register_mock.assert_called_once_with(self.queue._flush_at_exit)  # pylint: disable=protected-access
+        self.queue._flush_at_exit()  # pylint: disable=protected-access
+        job.assert_called_once_with()
+        self.assertEqual(self.queue.get_stats()['processed'], 2)
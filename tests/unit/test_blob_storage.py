@@ -0,0 +1,65 @@
+import shutil
+import tempfile
+from unittest import TestCase
+
+import ddt
+import mock
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from group_project_v2 import blob_storage
+from tests.utils import TestWithPatchesMixin
+
+
+@ddt.ddt
+class TestBlobStorage(TestCase, TestWithPatchesMixin):
+    sha1 = 'a94a8fe5ccb19ba61c4c0873d391e987982fbbd3'
+
+    def setUp(self):
+        storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_dir)
+        self.storage = FileSystemStorage(location=storage_dir)
+        self.make_patch(blob_storage, 'default_storage', self.storage)
+
+    @ddt.data(
+        (u'pitch.pptx', u'group_work/blobs/a9/a94a8fe5ccb19ba61c4c0873d391e987982fbbd3/pitch.pptx'),
+        (u'My Report.PDF', u'group_work/blobs/a9/a94a8fe5ccb19ba61c4c0873d391e987982fbbd3/My Report.PDF'),
+        (u'README', u'group_work/blobs/a9/a94a8fe5ccb19ba61c4c0873d391e987982fbbd3/README'),
+    )
+    @ddt.unpack
+    def test_get_blob_path(self, file_name, expected_path):
+        self.assertEqual(blob_storage.get_blob_path(self.sha1, file_name), expected_path)
+
+    def test_save_blob(self):
+        blob_path = blob_storage.get_blob_path(self.sha1, u'file.txt')
+
+        self.assertTrue(blob_storage.save_blob(blob_path, ContentFile(b"test")))
+        with mock.patch.object(self.storage, 'save') as patched_save:
+            self.assertFalse(blob_storage.save_blob(blob_path, ContentFile(b"test")))
+        patched_save.assert_not_called()
+
+        with self.storage.open(blob_path) as blob_file:
+            self.assertEqual(blob_file.read(), b"test")
+
+    def test_deleted_blob_stored_again(self):
+        blob_path = blob_storage.get_blob_path(self.sha1, u'file.txt')
+        blob_storage.save_blob(blob_path, ContentFile(b"test"))
+        self.storage.delete(blob_path)
+
+        self.assertTrue(blob_storage.save_blob(blob_path, ContentFile(b"test")))
+        self.assertTrue(self.storage.exists(blob_path))
+
+    def test_save_blob_stored_concurrently(self):
+        blob_path = blob_storage.get_blob_path(self.sha1, u'file.txt')
+        self.storage.save(blob_path, ContentFile(b"test"))
+        # blob is stored by another process after this one checks it is missing
+        exists_results = [False]
+        original_exists = self.storage.exists
+
+        def exists(path):
+            return exists_results.pop() if exists_results else original_exists(path)
+
+        with mock.patch.object(self.storage, 'exists', exists):
+            self.assertTrue(blob_storage.save_blob(blob_path, ContentFile(b"test")))
+
+        self.assertEqual(self.storage.listdir(blob_path.rsplit('/', 1)[0]), ([], [u'file.txt']))
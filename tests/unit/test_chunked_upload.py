@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import TestCase
+
+import ddt
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from group_project_v2 import chunked_upload
+from group_project_v2.chunked_upload import (
+    ChunkedUpload, ChunkOffsetError, ContentRange, discard_expired_uploads, parse_content_range
+)
+from tests.utils import TestWithPatchesMixin
+
+
+@ddt.ddt
+class TestParseContentRange(TestCase):
+    @ddt.data(
+        (None, None),
+        ('', None),
+        ('bytes 0-9/100', ContentRange(0, 9, 100)),
+        ('bytes 90-99/100 ', ContentRange(90, 99, 100)),
+    )
+    @ddt.unpack
+    def test_parse(self, header, expected_result):
+        self.assertEqual(parse_content_range(header), expected_result)
+
+    @ddt.data('bytes 0-9', 'bytes */100', 'items 0-9/100', 'bytes 9-0/100', 'bytes 0-100/100')
+    def test_malformed(self, header):
+        with self.assertRaises(ValueError):
+            parse_content_range(header)
+
+
+class TestChunkedUpload(TestCase, TestWithPatchesMixin):
+    content = b"0123456789" * 3
+
+    def setUp(self):
+        self.storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_dir)
+        self.storage = FileSystemStorage(location=self.storage_dir)
+        self.make_patch(chunked_upload, 'default_storage', self.storage)
+        self.upload = ChunkedUpload.for_submission(1, 10, 'upload1', u'pitch.pptx', len(self.content))
+
+    def _save_chunk(self, upload, start, end):
+        chunk = ContentFile(self.content[start:end + 1], name=upload.file_name)
+        return upload.save_chunk(chunk, ContentRange(start, end, upload.total_size))
+
+    def test_session_id(self):
+        same_upload = ChunkedUpload.for_submission(1, 10, 'upload1', u'pitch.pptx', len(self.content))
+        other_upload = ChunkedUpload.for_submission(2, 10, 'upload1', u'pitch.pptx', len(self.content))
+        changed_file_upload = ChunkedUpload.for_submission(
+            1, 10, 'upload1', u'pitch.pptx', len(self.content), u'1500000000000'
+        )
+        self.assertEqual(same_upload.session_id, self.upload.session_id)
+        self.assertNotEqual(other_upload.session_id, self.upload.session_id)
+        self.assertNotEqual(changed_file_upload.session_id, self.upload.session_id)
+
+    def test_upload_in_chunks(self):
+        self.assertEqual(self.upload.uploaded_bytes, 0)
+        self.assertEqual(self._save_chunk(self.upload, 0, 11), 12)
+        self.assertFalse(self.upload.is_complete)
+
+        resumed_upload = ChunkedUpload.for_submission(1, 10, 'upload1', u'pitch.pptx', len(self.content))
+        self.assertEqual(resumed_upload.uploaded_bytes, 12)
+        self.assertEqual(self._save_chunk(resumed_upload, 12, 23), 24)
+        self.assertEqual(self._save_chunk(resumed_upload, 24, 29), 30)
+        self.assertTrue(resumed_upload.is_complete)
+
+        assembled_file = resumed_upload.open()
+        self.assertEqual(assembled_file.name, u'pitch.pptx')
+        self.assertEqual(assembled_file.size, 30)
+        self.assertEqual(b"".join(assembled_file.chunks()), self.content)
+
+        resumed_upload.discard()
+        self.assertEqual(resumed_upload.uploaded_bytes, 0)
+        self.assertEqual(self.storage.listdir(resumed_upload.chunks_path), ([], []))
+
+    def test_chunk_out_of_order(self):
+        self._save_chunk(self.upload, 0, 9)
+
+        for start, end in ((20, 29), (0, 9), (5, 14)):
+            with self.assertRaises(ChunkOffsetError) as raises_cm:
+                self._save_chunk(self.upload, start, end)
+            self.assertEqual(raises_cm.exception.uploaded_bytes, 10)
+
+        self.assertEqual(self.upload.uploaded_bytes, 10)
+
+    def test_chunk_size_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.upload.save_chunk(ContentFile(b"0123"), ContentRange(0, 9, 30))
+
+        self.assertEqual(self.upload.uploaded_bytes, 0)
+
+    def test_discard_nothing_uploaded(self):
+        self.upload.discard()
+        self.assertEqual(self.upload.uploaded_bytes, 0)
+
+    def _make_old(self, upload, age):
+        chunks_dir = self.storage.path(upload.chunks_path)
+        modified_time = time.time() - age.total_seconds()
+        for file_name in os.listdir(chunks_dir):
+            os.utime(os.path.join(chunks_dir, file_name), (modified_time, modified_time))
+
+    def test_is_expired(self):
+        self.assertFalse(self.upload.is_expired())
+
+        self._save_chunk(self.upload, 0, 9)
+        self.assertFalse(self.upload.is_expired())
+
+        self._make_old(self.upload, timedelta(hours=2))
+        self.assertFalse(self.upload.is_expired())
+        self.assertTrue(self.upload.is_expired(timedelta(hours=1)))
+
+    def test_discard_expired_uploads(self):
+        self.assertEqual(discard_expired_uploads(), 0)
+
+        other_upload = ChunkedUpload.for_submission(2, 10, 'upload1', u'pitch.pptx', len(self.content))
+        self._save_chunk(self.upload, 0, 9)
+        self._save_chunk(other_upload, 0, 9)
+        self._make_old(self.upload, timedelta(days=2))
+
+        self.assertEqual(discard_expired_uploads(), 1)
+        self.assertEqual(self.upload.uploaded_bytes, 0)
+        self.assertEqual(other_upload.uploaded_bytes, 10)
@@ -0,0 +1,102 @@
+from unittest import TestCase
+
+import mock
+from django.core.cache import caches
+
+from group_project_v2.deferred_grading import (
+    JOBS_CACHE_ALIAS, MAX_DELAYS, RETRY_DELAY, GradingState, _make_claim_key, get_due_group_ids, get_grading_stats,
+    process_job, schedule_grading
+)
+
+
+class TestDeferredGrading(TestCase):
+    def setUp(self):
+        caches[JOBS_CACHE_ALIAS].clear()
+
+    def test_job_pending(self):
+        self.assertEqual(schedule_grading(u'activity1', 1), {'state': GradingState.PENDING, 'due_in': 0})
+
+        self.assertEqual(get_due_group_ids(u'activity1', [1, 2]), [1])
+        self.assertEqual(get_due_group_ids(u'activity2', [1, 2]), [])
+
+    def test_repeated_submissions_graded_once(self):
+        processor = mock.Mock()
+        schedule_grading(u'activity1', 1)
+        schedule_grading(u'activity1', 1)
+
+        self.assertEqual(process_job(u'activity1', 1, processor), {'state': GradingState.COMPLETE, 'due_in': 0})
+        self.assertEqual(process_job(u'activity1', 1, processor), {'state': GradingState.UNKNOWN, 'due_in': 0})
+
+        processor.assert_called_once_with(1)
+        self.assertEqual(get_due_group_ids(u'activity1', [1]), [])
+
+    @mock.patch('group_project_v2.deferred_grading.time.time')
+    def test_repeated_submissions_postpone_grading(self, time_mock):
+        time_mock.return_value = 1000
+        self.assertEqual(schedule_grading(u'activity1', 1, delay=10), {'state': GradingState.PENDING, 'due_in': 10})
+
+        time_mock.return_value = 1008
+        self.assertEqual(get_due_group_ids(u'activity1', [1]), [])
+        self.assertEqual(schedule_grading(u'activity1', 1, delay=10), {'state': GradingState.PENDING, 'due_in': 10})
+
+        time_mock.return_value = 1017
+        self.assertEqual(get_due_group_ids(u'activity1', [1]), [])
+        time_mock.return_value = 1018
+        self.assertEqual(get_due_group_ids(u'activity1', [1]), [1])
+
+    @mock.patch('group_project_v2.deferred_grading.time.time')
+    def test_grading_not_postponed_past_max_delays(self, time_mock):
+        for now in range(1000, 1000 + 10 * MAX_DELAYS, 5):
+            time_mock.return_value = now
+            schedule_grading(u'activity1', 1, delay=10)
+
+        time_mock.return_value = 1000 + 10 * MAX_DELAYS
+        self.assertEqual(get_due_group_ids(u'activity1', [1]), [1])
+
+    def test_stats(self):
+        schedule_grading(u'activity1', 1)
+        schedule_grading(u'activity1', 1)
+        schedule_grading(u'activity1', 2)
+        process_job(u'activity1', 1, mock.Mock())
+        process_job(u'activity1', 2, mock.Mock(side_effect=ValueError("API is down")))
+
+        self.assertEqual(get_grading_stats(), {'scheduled': 3, 'coalesced': 1, 'processed': 1, 'failed': 1})
+
+    def test_submission_made_while_grading_kept(self):
+        def processor(group_id):
+            schedule_grading(u'activity1', group_id)
+
+        schedule_grading(u'activity1', 1)
+
+        self.assertEqual(process_job(u'activity1', 1, processor), {'state': GradingState.COMPLETE, 'due_in': 0})
+        self.assertEqual(get_due_group_ids(u'activity1', [1]), [1])
+
+    @mock.patch('group_project_v2.deferred_grading.time.time')
+    def test_job_failed(self, time_mock):
+        time_mock.return_value = 1000
+        schedule_grading(u'activity1', 1)
+        status = process_job(u'activity1', 1, mock.Mock(side_effect=ValueError("API is down")))
+        self.assertEqual(status, {'state': GradingState.FAILED, 'due_in': 0})
+
+        time_mock.return_value = 1001
+        processor = mock.Mock()
+        self.assertEqual(
+            process_job(u'activity1', 1, processor), {'state': GradingState.PENDING, 'due_in': RETRY_DELAY - 1}
+        )
+        processor.assert_not_called()
+        self.assertEqual(get_due_group_ids(u'activity1', [1]), [])
+
+        time_mock.return_value = 1000 + RETRY_DELAY
+        self.assertEqual(get_due_group_ids(u'activity1', [1]), [1])
+
+    def test_claimed_job_not_processed(self):
+        processor = mock.Mock()
+        schedule_grading(u'activity1', 1)
+        caches[JOBS_CACHE_ALIAS].add(_make_claim_key(u'activity1', 1), True)
+
+        self.assertEqual(process_job(u'activity1', 1, processor), {'state': GradingState.PENDING, 'due_in': 0})
+        processor.assert_not_called()
+
+        caches[JOBS_CACHE_ALIAS].delete(_make_claim_key(u'activity1', 1))
+        process_job(u'activity1', 1, processor)
+        processor.assert_called_once_with(1)
@@ -10,8 +10,11 @@ from xblock.fields import ScopeIds
 from xblock.runtime import Runtime
 from xblock.field_data import DictFieldData
 
+from group_project_v2 import group_project
 from group_project_v2.group_project import GroupActivityXBlock, GroupProjectXBlock
+from group_project_v2.notifications import StageNotificationsMixin
 from group_project_v2.project_api import TypedProjectAPI
+from group_project_v2.project_api.cache_warmer import DEFAULT_MAX_WORKERS
 from group_project_v2.project_api.dtos import ProjectDetails, WorkgroupDetails, ReducedUserDetails
 from group_project_v2.stage import BaseGroupActivityStage, TeamEvaluationStage, PeerReviewStage
 from group_project_v2.stage_components import GroupProjectReviewQuestionXBlock
@@ -61,6 +64,75 @@ class TestGroupProjectXBlock(TestWithPatchesMixin, TestCase):
             self.block.course_id, self.block.content_id
         )
 
+    @ddt.data(False, None)
+    def test_on_studio_published_cache_warm_up_disabled(self, setting_value):
+        with mock.patch.object(self.block, '_get_setting', mock.Mock(return_value=setting_value)), \
+                mock.patch('group_project_v2.group_project.ProjectAPICacheWarmer') as warmer_class:
+            self.assertIsNone(self.block.on_studio_published('course1', {}))
+
+        warmer_class.assert_not_called()
+
+    def test_on_studio_published_warms_up_caches(self):
+        settings = {GroupProjectXBlock.WARM_UP_CACHES_ON_PUBLISH_KEY: True}
+        unsuitable_policies = mock.Mock(return_value=[])
+        with mock.patch.object(self.block, '_get_setting', mock.Mock(side_effect=settings.get)), \
+                mock.patch('group_project_v2.group_project.get_unsuitable_cache_policies', unsuitable_policies), \
+                mock.patch('group_project_v2.group_project.ProjectAPICacheWarmer') as warmer_class:
+            warm_up_thread = self.block.on_studio_published('course1', {})
+            warm_up_thread.join()
+
+        warmer_class.assert_called_once_with(self.project_api_mock, DEFAULT_MAX_WORKERS)
+        warmer_class.return_value.warm_up_course.assert_called_once_with(u'course1', [self.block.content_id])
+
+    def test_on_studio_published_cache_warm_up_skipped_for_unsuitable_policies(self):
+        settings = {GroupProjectXBlock.WARM_UP_CACHES_ON_PUBLISH_KEY: True}
+        unsuitable_policies = mock.Mock(return_value=['get_user_details'])
+        with mock.patch.object(self.block, '_get_setting', mock.Mock(side_effect=settings.get)), \
+                mock.patch('group_project_v2.group_project.get_unsuitable_cache_policies', unsuitable_policies), \
+                mock.patch('group_project_v2.group_project.ProjectAPICacheWarmer') as warmer_class:
+            self.assertIsNone(self.block.on_studio_published('course1', {}))
+
+        warmer_class.assert_not_called()
+
+    def test_on_studio_published_schedules_notification_timers(self):
+        with mock.patch.object(self.block, 'schedule_notification_timers') as patched_schedule:
+            self.block.on_studio_published('course1', {'notifications': 'service'})
+
+        patched_schedule.assert_called_once_with('course1', {'notifications': 'service'})
+
+    def test_schedule_notification_timers(self):
+        settings = {StageNotificationsMixin.BATCH_NOTIFICATION_TIMERS_KEY: True}
+        stages = [mock.Mock(spec=BaseGroupActivityStage) for _ in range(3)]
+        for index, stage in enumerate(stages):
+            stage.get_notification_timers.return_value = {'stage{}-open'.format(index): 'timer', 'other': None}
+        activities = [mock.Mock(stages=stages[:2]), mock.Mock(stages=stages[2:])]
+        register_mock = self.make_patch(group_project, 'register_timed_notifications', mock.Mock())
+        self.make_patch(self.block, '_get_setting', mock.Mock(side_effect=settings.get))
+        self.make_patch(GroupProjectXBlock, 'activities', mock.PropertyMock(return_value=activities))
+
+        self.block.schedule_notification_timers('course1', {'notifications': 'service'})
+
+        for stage in stages:
+            stage.get_notification_timers.assert_called_once_with('course1')
+        register_mock.assert_called_once_with(
+            {'stage0-open': 'timer', 'stage1-open': 'timer', 'stage2-open': 'timer', 'other': None}
+        )
+
+    @ddt.data(
+        ({StageNotificationsMixin.BATCH_NOTIFICATION_TIMERS_KEY: True}, {}),
+        ({}, {'notifications': 'service'}),
+    )
+    @ddt.unpack
+    def test_schedule_notification_timers_disabled(self, settings, services):
+        register_mock = self.make_patch(group_project, 'register_timed_notifications', mock.Mock())
+        self.make_patch(self.block, '_get_setting', mock.Mock(side_effect=settings.get))
+        activities_mock = self.make_patch(GroupProjectXBlock, 'activities', mock.PropertyMock())
+
+        self.block.schedule_notification_timers('course1', services)
+
+        activities_mock.assert_not_called()
+        register_mock.assert_not_called()
+
     def test_download_incomplete_list_no_stage(self):
         request_mock = mock.Mock()
         request_mock.GET = {Constants.ACTIVATE_BLOCK_ID_PARAMETER_NAME: 'missing_stage_id'}
@@ -380,8 +452,8 @@ class TestCalculateGradeGroupActivityXBlock(TestWithPatchesMixin, TestCase):
     )
     @ddt.unpack
     def test_calculate_grade(self, group_id, question_ids, reviewer_ids, reviews, expected_grade):
-        self.project_api_mock.get_workgroup_reviewers = mock.Mock(
-            return_value=[{"id": rew_id} for rew_id in reviewer_ids]
+        self.project_api_mock.get_reviewers_for_workgroup = mock.Mock(
+            return_value=[ReducedUserDetails(id=rew_id) for rew_id in reviewer_ids]
         )
         self.project_api_mock.get_workgroup_review_items_for_group = mock.Mock(return_value=_make_reviews(reviews))
 
@@ -389,7 +461,7 @@ class TestCalculateGradeGroupActivityXBlock(TestWithPatchesMixin, TestCase):
 
         grade = self.block.calculate_grade(group_id)
         self.assertEqual(grade, expected_grade)
-        self.project_api_mock.get_workgroup_reviewers.assert_called_once_with(group_id, self.block.content_id)
+        self.project_api_mock.get_reviewers_for_workgroup.assert_called_once_with(group_id, self.block.content_id)
         self.project_api_mock.get_workgroup_review_items_for_group.assert_called_once_with(
             group_id, self.block.content_id
         )
@@ -410,8 +482,8 @@ class TestCalculateGradeGroupActivityXBlock(TestWithPatchesMixin, TestCase):
     def test_calculate_grade_with_admins(
         self, group_id, question_ids, reviewer_ids, reviews, admin_reviews, expected_grade
     ):
-        self.project_api_mock.get_workgroup_reviewers = mock.Mock(
-            return_value=[{"id": rew_id} for rew_id in reviewer_ids]
+        self.project_api_mock.get_reviewers_for_workgroup = mock.Mock(
+            return_value=[ReducedUserDetails(id=rew_id) for rew_id in reviewer_ids]
         )
         self.project_api_mock.get_workgroup_review_items_for_group = mock.Mock(
             return_value=_make_reviews(reviews)+_make_reviews(admin_reviews)
@@ -422,7 +494,7 @@ class TestCalculateGradeGroupActivityXBlock(TestWithPatchesMixin, TestCase):
 
         grade = self.block.calculate_grade(group_id)
         self.assertEqual(grade, expected_grade)
-        self.project_api_mock.get_workgroup_reviewers.assert_called_once_with(group_id, self.block.content_id)
+        self.project_api_mock.get_reviewers_for_workgroup.assert_called_once_with(group_id, self.block.content_id)
         self.project_api_mock.get_workgroup_review_items_for_group.assert_called_once_with(
             group_id, self.block.content_id
         )
@@ -449,6 +521,40 @@ class TestEventsAndCompletionGroupActivityXBlock(TestWithPatchesMixin, TestCase)
         self.calculate_grade_mock = self.make_patch(self.block, 'calculate_grade')
         self.mark_complete = self.make_patch(self.block, 'mark_complete')
 
+    @ddt.data(False, None)
+    def test_schedule_grade_calculation_deferred_grading_disabled(self, setting_value):
+        with mock.patch.object(self.block, '_get_setting', mock.Mock(return_value=setting_value)), \
+                mock.patch.object(self.block, 'calculate_and_send_grade') as calculate_and_send_grade, \
+                mock.patch('group_project_v2.group_project.deferred_grading') as deferred_grading:
+            self.assertIsNone(self.block.schedule_grade_calculation(1))
+            self.block.process_due_grading_jobs([1])
+
+        calculate_and_send_grade.assert_called_once_with(1)
+        deferred_grading.schedule_grading.assert_not_called()
+        deferred_grading.get_due_group_ids.assert_not_called()
+
+    @ddt.data(
+        ({GroupActivityXBlock.DEFERRED_GRADING_KEY: True}, 0),
+        ({GroupActivityXBlock.GRADE_RECALCULATION_WINDOW_KEY: 5}, 5),
+        ({GroupActivityXBlock.DEFERRED_GRADING_KEY: True, GroupActivityXBlock.GRADE_RECALCULATION_WINDOW_KEY: 3}, 3),
+    )
+    @ddt.unpack
+    def test_schedule_grade_calculation_deferred_grading_enabled(self, settings, expected_delay):
+        with mock.patch.object(self.block, '_get_setting', mock.Mock(side_effect=settings.get)), \
+                mock.patch.object(GroupActivityXBlock, 'content_id', mock.PropertyMock(return_value='content1')), \
+                mock.patch.object(self.block, 'calculate_and_send_grade') as calculate_and_send_grade, \
+                mock.patch('group_project_v2.group_project.deferred_grading') as deferred_grading:
+            deferred_grading.get_due_group_ids.return_value = [2]
+
+            status = self.block.schedule_grade_calculation(1)
+            calculate_and_send_grade.assert_not_called()
+            self.block.process_due_grading_jobs([1, 2])
+
+        self.assertEqual(status, deferred_grading.schedule_grading.return_value)
+        deferred_grading.schedule_grading.assert_called_once_with('content1', 1, delay=expected_delay)
+        deferred_grading.get_due_group_ids.assert_called_once_with('content1', [1, 2])
+        deferred_grading.process_job.assert_called_once_with('content1', 2, calculate_and_send_grade)
+
     @ddt.data(
         (1, [], 100),
         (2, [1, 2], 10),
@@ -134,6 +134,29 @@ class TestChildrenNavigationXBlockMixin(TestWithPatchesMixin, TestCase):
         self.assertIsNone(self.block.get_child_of_category('missing_category'))
         self.assertIsNone(self.block.get_child_of_category('other_missing_category'))
 
+    def test_children_loaded_once(self):
+        child_categories = {'block_1': 'category_1', 'block_2': 'category_2', 'block_3': 'category_1'}
+        self.children_mock.return_value = ['block_1', 'block_2', 'missing_block', 'block_3']
+        self.runtime_mock.get_block.side_effect = lambda block_id: _make_block_mock(
+            block_id, child_categories[block_id]
+        ) if block_id in child_categories else None
+
+        self.assertEqual([child.usage_id for child in self.block._children], ['block_1', 'block_2', 'block_3'])
+        self.assertEqual(
+            [child.usage_id for child in self.block.get_children_by_category('category_1')], ['block_1', 'block_3']
+        )
+        self.assertEqual(self.block.get_child_of_category('category_2').usage_id, 'block_2')
+        self.assertEqual(self.block.get_block_by_id('block_3').usage_id, 'block_3')
+        self.assertEqual(self.runtime_mock.get_block.call_count, 4)
+
+    def test_get_block_by_id_not_a_child(self):
+        self.children_mock.return_value = ['block_1']
+        self.runtime_mock.get_block.side_effect = None
+        self.runtime_mock.get_block.return_value = other_block = mock.Mock()
+
+        self.assertEqual(self.block.get_block_by_id('other_block'), other_block)
+        self.runtime_mock.get_block.assert_called_with('other_block')
+
     def test_has_child_of_category(self):
         def _make_block_usage(block_id, block_type):
             result = mock.Mock(spec=BlockUsageLocator)
@@ -1,11 +1,17 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from unittest import TestCase
 import ddt
 import mock
+import pytz
+from django.core.cache import caches
 from group_project_v2.notifications import (
     StageNotificationsMixin,
     NotificationMessageTypes,
     NotificationScopes,
+    TIMERS_CACHE_ALIAS,
+    TIMERS_TIMEOUT,
+    notification_timers_queue,
+    upload_notification_dispatcher,
 )
 from group_project_v2.project_api.dtos import WorkgroupDetails
 from tests.utils import TestWithPatchesMixin, parse_datetime
@@ -38,6 +44,20 @@ class StageNotificationsGuineaPig(StageNotificationsMixin):
         self.open_date = open_date
 
 
+class StageTimersGuineaPig(StageNotificationsMixin):
+    def __init__(self, open_date=None, close_date=None, settings=None):
+        self.activity = mock.Mock(display_name='Activity')
+        self.activity.project.location = 'project-location'
+        self.location = 'stage-location'
+        self.display_name = 'Stage'
+        self.open_date = open_date
+        self.close_date = close_date
+        self.settings = settings or {}
+
+    def _get_setting(self, key, default):
+        return self.settings.get(key, default)
+
+
 WORK_GROUP1 = make_workgroup([1, 2, 3])
 WORK_GROUP2 = make_workgroup([7, 12, 54])
 
@@ -51,8 +71,11 @@ class BaseNotificationsTestCase(TestCase):
     def setUp(self):
         self.notifications_service_mock = mock.Mock()
         self.notifications_service_mock.get_notification_type = mock.Mock(side_effect=get_notification_type)
-        self.notifications_service_mock.bulk_publish_notification_to_users = mock.Mock()
         self.notifications_service_mock.publish_timed_notification = mock.Mock()
+        patcher = mock.patch('group_project_v2.notifications.notifications_publisher', create=True)
+        self.publisher_mock = patcher.start()
+        self.publisher_mock.get_notification_type.side_effect = get_notification_type
+        self.addCleanup(patcher.stop)
 
     def _get_call_args(self, target, including_kwargs=False):
         self.assertTrue(target.called)
@@ -70,71 +93,6 @@ class TestStageNotificationsMixin(BaseNotificationsTestCase, TestWithPatchesMixi
     def setUp(self):
         super(TestStageNotificationsMixin, self).setUp()
 
-    @ddt.data(
-        (1, 'course1', 'stage-location', WORK_GROUP1, 'Activity1'),
-        (2, 'course2', 'other-stage-location', WORK_GROUP1, 'Activity2'),
-        (54, 'course3', 'yet-another-stage-location', WORK_GROUP2, 'NotAnActivity'),
-    )
-    @ddt.unpack
-    def test_file_upload_success_scenario(self, user_id, course_id, stage_location, workgroup, name):
-        activity = mock.Mock(
-            user_id=user_id,
-            course_id=course_id,
-            location='irrelevant',
-            workgroup=workgroup,
-            display_name=name
-        )
-        block = StageNotificationsGuineaPig(activity, stage_location)
-
-        expected_user = next(user for user in workgroup.users if user.id == user_id)
-        expected_action_username = expected_user.username
-        expected_user_ids = set([user.id for user in workgroup.users]) - {user_id}
-
-        with mock.patch('edx_notifications.data.NotificationMessage.add_click_link_params') as patched_link_params:
-            block.fire_file_upload_notification(self.notifications_service_mock)
-
-            self.notifications_service_mock.get_notification_type.assert_called_once_with(
-                NotificationMessageTypes.FILE_UPLOADED
-            )
-
-            user_ids, message = self._get_call_args(self.notifications_service_mock.bulk_publish_notification_to_users)
-            self.assertEqual(set(user_ids), expected_user_ids)
-            self.assertEqual(message.msg_type.name, NotificationMessageTypes.FILE_UPLOADED)
-            self.assertEqual(message.namespace, unicode(course_id))
-            self.assertEqual(message.payload['action_username'], expected_action_username)
-            self.assertEqual(message.payload['activity_name'], name)
-
-            patched_link_params.assert_called_once_with(
-                {'course_id': unicode(course_id), 'location': unicode(stage_location)}
-            )
-
-    @ddt.data(ValueError("test"), TypeError("QWE"), AttributeError("OMG"), Exception("Very Generic"))
-    def test_file_upload_notification_type_raises(self, exception):
-        activity = mock.Mock()
-        block = StageNotificationsGuineaPig(activity)
-
-        with mock.patch('logging.Logger.exception') as patched_exception_logger:
-            self.notifications_service_mock.get_notification_type.side_effect = \
-                lambda msg_type: self.raise_exception(exception)
-
-            block.fire_file_upload_notification(self.notifications_service_mock)
-            patched_exception_logger.assert_called_once_with(exception)
-
-    @ddt.data(ValueError("test"), TypeError("QWE"), AttributeError("OMG"), Exception("Very Generic"))
-    def test_file_upload_publish_raises(self, exception):
-        activity = mock.Mock(
-            user_id=1,
-            workgroup=WORK_GROUP1,
-        )
-        block = StageNotificationsGuineaPig(activity)
-
-        with mock.patch('logging.Logger.exception') as patched_exception_logger:
-            self.notifications_service_mock.bulk_publish_notification_to_users.side_effect = \
-                lambda unused_1, unused_2: self.raise_exception(exception)
-
-            block.fire_file_upload_notification(self.notifications_service_mock)
-            patched_exception_logger.assert_called_once_with(exception)
-
     @ddt.data(
         (1, 'course1', 'some-location', False, '2016-02-26 04:30:48'),
         (2, 'course2', 'other-location', False, None),
@@ -194,3 +152,181 @@ class TestStageNotificationsMixin(BaseNotificationsTestCase, TestWithPatchesMixi
             self.notifications_service_mock.publish_timed_notification.side_effect = exception
             block.fire_grades_posted_notification('irrelevant', self.notifications_service_mock)
             patched_exception_logger.assert_called_once_with(exception)
+
+
+@ddt.ddt
+class TestStageNotificationTimers(BaseNotificationsTestCase):
+    def setUp(self):
+        super(TestStageNotificationTimers, self).setUp()
+        caches[TIMERS_CACHE_ALIAS].clear()
+        self.services = {'notifications': self.notifications_service_mock}
+
+    def _publish(self, block):
+        block.on_studio_published('course1', self.services)
+        self.assertTrue(notification_timers_queue.join(5))
+
+    def _get_published_timers(self):
+        return {
+            kwargs['timer_name']: kwargs
+            for _args, kwargs in self.publisher_mock.publish_timed_notification.call_args_list
+        }
+
+    def test_timers(self):
+        block = StageTimersGuineaPig(open_date=date(2016, 3, 1), close_date=date(2016, 3, 14))
+
+        self._publish(block)
+
+        published_timers = self._get_published_timers()
+        self.assertEqual(
+            set(published_timers), {'stage-location-open', 'stage-location-due', 'stage-location-coming-due'}
+        )
+        self.assertEqual(published_timers['stage-location-open']['send_at'], datetime(2016, 3, 1, tzinfo=pytz.UTC))
+        self.assertEqual(published_timers['stage-location-due']['send_at'], datetime(2016, 3, 14, tzinfo=pytz.UTC))
+        self.assertEqual(
+            published_timers['stage-location-coming-due']['send_at'], datetime(2016, 3, 11, tzinfo=pytz.UTC)
+        )
+        coming_due_timer = published_timers['stage-location-coming-due']
+        self.assertEqual(coming_due_timer['scope_name'], NotificationScopes.PARTICIPANTS)
+        self.assertEqual(coming_due_timer['scope_context'], {'course_id': 'course1', 'content_id': 'project-location'})
+        self.assertTrue(coming_due_timer['ignore_if_past_due'])
+        self.assertEqual(coming_due_timer['msg'].msg_type.name, NotificationMessageTypes.STAGE_DUE)
+        self.assertEqual(coming_due_timer['msg'].payload['due_date'], '3/14/16')
+        self.publisher_mock.cancel_timed_notification.assert_not_called()
+        self.notifications_service_mock.publish_timed_notification.assert_not_called()
+
+    def test_timers_registered_outside_of_publish(self):
+        block = StageTimersGuineaPig(open_date=date(2016, 3, 1))
+
+        with mock.patch.object(notification_timers_queue, 'enqueue') as enqueue_mock:
+            block.on_studio_published('course1', self.services)
+
+        self.publisher_mock.publish_timed_notification.assert_not_called()
+        enqueue_mock.assert_called_once_with(('stage-location-open', ), mock.ANY)
+
+    def test_unchanged_timers_are_not_registered_again(self):
+        block = StageTimersGuineaPig(open_date=date(2016, 3, 1), close_date=date(2016, 3, 14))
+        self._publish(block)
+        self.publisher_mock.publish_timed_notification.reset_mock()
+
+        self._publish(block)
+        self.publisher_mock.publish_timed_notification.assert_not_called()
+
+        block.close_date = date(2016, 3, 21)
+        self._publish(block)
+        self.assertEqual(
+            set(self._get_published_timers()), {'stage-location-due', 'stage-location-coming-due'}
+        )
+
+    def test_fingerprints_do_not_expire(self):
+        block = StageTimersGuineaPig(open_date=date(2016, 3, 1))
+
+        # caches are thread local, so the cache class is patched to see the fingerprint recorded in background
+        cache_class = type(caches[TIMERS_CACHE_ALIAS])
+        with mock.patch.object(cache_class, 'set', autospec=True, side_effect=cache_class.set) as set_mock:
+            self._publish(block)
+
+        set_mock.assert_called_once_with(mock.ANY, mock.ANY, mock.ANY, TIMERS_TIMEOUT)
+        self.assertIsNone(TIMERS_TIMEOUT)
+
+    def test_removed_timers_are_cancelled(self):
+        block = StageTimersGuineaPig(open_date=date(2016, 3, 1), close_date=date(2016, 3, 14))
+        self._publish(block)
+
+        block.close_date = None
+        self._publish(block)
+        self.assertEqual(
+            self.publisher_mock.cancel_timed_notification.call_args_list,
+            [mock.call('stage-location-coming-due'), mock.call('stage-location-due')]
+        )
+
+        self.publisher_mock.cancel_timed_notification.reset_mock()
+        self._publish(block)
+        self.publisher_mock.cancel_timed_notification.assert_not_called()
+
+    def test_failed_timer_is_registered_again(self):
+        block = StageTimersGuineaPig(open_date=date(2016, 3, 1))
+        self.publisher_mock.publish_timed_notification.side_effect = ValueError("Service is down")
+        with mock.patch('logging.Logger.exception') as patched_exception_logger:
+            self._publish(block)
+        self.assertEqual(patched_exception_logger.call_count, 1)
+
+        self.publisher_mock.publish_timed_notification.side_effect = None
+        self.publisher_mock.publish_timed_notification.reset_mock()
+        self._publish(block)
+        self.assertEqual(set(self._get_published_timers()), {'stage-location-open'})
+
+    def test_batch_registration_enabled(self):
+        block = StageTimersGuineaPig(
+            open_date=date(2016, 3, 1), settings={StageNotificationsMixin.BATCH_NOTIFICATION_TIMERS_KEY: True}
+        )
+
+        self._publish(block)
+
+        self.publisher_mock.publish_timed_notification.assert_not_called()
+
+    def test_deleted_stage_timers_are_forgotten(self):
+        block = StageTimersGuineaPig(open_date=date(2016, 3, 1))
+        self._publish(block)
+
+        block.on_before_studio_delete('course1', self.services)
+        self.assertEqual(self.notifications_service_mock.cancel_timed_notification.call_count, 3)
+
+        self.publisher_mock.publish_timed_notification.reset_mock()
+        self._publish(block)
+        self.assertEqual(set(self._get_published_timers()), {'stage-location-open'})
+
+
+class TestFileUploadNotificationDispatcher(BaseNotificationsTestCase):
+    def setUp(self):
+        super(TestFileUploadNotificationDispatcher, self).setUp()
+        activity = mock.Mock(user_id=1, course_id='course1', workgroup=WORK_GROUP1, display_name='Activity')
+        self.block = StageNotificationsGuineaPig(activity)
+
+    def _get_sent_notifications(self):
+        self.assertTrue(upload_notification_dispatcher.join(5))
+        return {
+            tuple(user_ids): message
+            for (user_ids, message), _kwargs
+            in self.publisher_mock.bulk_publish_notification_to_users.call_args_list
+        }
+
+    def test_single_upload(self):
+        self.block.dispatch_file_upload_notification(WORK_GROUP1, 1)
+
+        sent_notifications = self._get_sent_notifications()
+        self.assertEqual(list(sent_notifications), [(2, 3)])
+        message = sent_notifications[(2, 3)]
+        self.assertEqual(message.msg_type.name, NotificationMessageTypes.FILE_UPLOADED)
+        self.assertEqual(message.namespace, u'course1')
+        self.assertEqual(message.payload['action_username'], 'User1')
+        self.assertEqual(message.payload['activity_name'], 'Activity')
+
+    def test_uploads_digest(self):
+        for user_id in (1, 2, 1):
+            self.block.dispatch_file_upload_notification(WORK_GROUP1, user_id, 0.5)
+
+        sent_notifications = self._get_sent_notifications()
+        self.publisher_mock.get_notification_type.assert_called_once_with(
+            NotificationMessageTypes.FILE_UPLOADED
+        )
+        self.assertEqual(
+            {user_ids: message.payload['action_username'] for user_ids, message in sent_notifications.iteritems()},
+            {(1,): 'User2', (2,): 'User1', (3,): 'User1, User2'}
+        )
+
+    def test_uploads_of_other_workgroups_are_not_batched(self):
+        workgroup1 = WorkgroupDetails(id=1, users=[{"id": 1, "username": "User1"}, {"id": 2, "username": "User2"}])
+        workgroup2 = WorkgroupDetails(id=2, users=[{"id": 7, "username": "User7"}, {"id": 12, "username": "User12"}])
+        self.block.dispatch_file_upload_notification(workgroup1, 1, 0.5)
+        self.block.dispatch_file_upload_notification(workgroup2, 7, 0.5)
+
+        self.assertEqual(set(self._get_sent_notifications()), {(2,), (12,)})
+
+    def test_publish_raises(self):
+        self.publisher_mock.bulk_publish_notification_to_users.side_effect = ValueError("test")
+
+        with mock.patch('logging.Logger.exception') as patched_exception_logger:
+            self.block.dispatch_file_upload_notification(WORK_GROUP1, 1)
+            self.assertTrue(upload_notification_dispatcher.join(5))
+
+        self.assertEqual(patched_exception_logger.call_count, 1)
@@ -0,0 +1,70 @@
+from unittest import TestCase
+
+import mock
+from django.core.cache import caches
+
+from group_project_v2.post_upload import (
+    JOBS_CACHE_ALIAS, PostUploadState, _make_claim_key, create_job, get_job_status, get_pending_job_id, process_job
+)
+
+
+class TestPostUpload(TestCase):
+    def setUp(self):
+        caches[JOBS_CACHE_ALIAS].clear()
+
+    def test_job_pending(self):
+        job_id = create_job(u'upload1', 1, {'document_id': 'doc'})
+
+        self.assertEqual(get_job_status(job_id, 1), {'state': PostUploadState.PENDING, 'data': {}})
+        self.assertEqual(get_pending_job_id(u'upload1', 1), job_id)
+        self.assertIsNone(get_pending_job_id(u'upload1', 2))
+
+    def test_job_completed(self):
+        processor = mock.Mock(return_value={'user_label': 'User'})
+        job_id = create_job(u'upload1', 1, {'document_id': 'doc'})
+
+        expected_status = {'state': PostUploadState.COMPLETE, 'data': {'user_label': 'User'}}
+        self.assertEqual(process_job(job_id, 1, processor), expected_status)
+        self.assertEqual(process_job(job_id, 1, processor), expected_status)
+
+        processor.assert_called_once_with({'document_id': 'doc'})
+        self.assertEqual(get_job_status(job_id, 1), expected_status)
+        self.assertIsNone(get_pending_job_id(u'upload1', 1))
+
+    def test_job_failed(self):
+        job_id = create_job(u'upload1', 1, {'document_id': 'doc'})
+
+        self.assertEqual(
+            process_job(job_id, 1, mock.Mock(side_effect=ValueError("API is down"))),
+            {'state': PostUploadState.FAILED, 'data': {'message': "API is down"}}
+        )
+        self.assertIsNone(get_pending_job_id(u'upload1', 1))
+
+    def test_claimed_job_not_processed(self):
+        processor = mock.Mock()
+        job_id = create_job(u'upload1', 1, {'document_id': 'doc'})
+        caches[JOBS_CACHE_ALIAS].add(_make_claim_key(job_id), True)
+
+        self.assertEqual(process_job(job_id, 1, processor), {'state': PostUploadState.PENDING, 'data': {}})
+        processor.assert_not_called()
+
+        caches[JOBS_CACHE_ALIAS].delete(_make_claim_key(job_id))
+        process_job(job_id, 1, processor)
+        processor.assert_called_once_with({'document_id': 'doc'})
+
+    def test_latest_job_kept_pending(self):
+        first_job_id = create_job(u'upload1', 1, {'document_id': 'doc1'})
+        second_job_id = create_job(u'upload1', 1, {'document_id': 'doc2'})
+        self.assertEqual(get_pending_job_id(u'upload1', 1), second_job_id)
+
+        process_job(first_job_id, 1, mock.Mock(return_value={}))
+        self.assertEqual(get_pending_job_id(u'upload1', 1), second_job_id)
+
+    def test_status_unknown(self):
+        processor = mock.Mock()
+        job_id = create_job(u'upload1', 1, {'document_id': 'doc'})
+
+        self.assertEqual(process_job(job_id, 2, processor), {'state': PostUploadState.UNKNOWN, 'data': {}})
+        self.assertEqual(process_job('job2', 1, processor), {'state': PostUploadState.UNKNOWN, 'data': {}})
+        self.assertEqual(get_job_status(job_id, 2), {'state': PostUploadState.UNKNOWN, 'data': {}})
+        processor.assert_not_called()
@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import ddt
+import mock
+from django.test import override_settings
+from webob import Request
+from xblock.core import XBlock
+
+from group_project_v2 import profiling
+from group_project_v2.profiling import profiled
+from tests.utils import TestWithPatchesMixin
+
+
+class ProfiledGuineaPig(object):
+    def __init__(self):
+        self.calls = []
+
+    @profiled
+    def student_view(self, context):
+        self.calls.append('student_view')
+        return self.child_view(context)
+
+    @profiled
+    def child_view(self, context):
+        self.calls.append('child_view')
+        return context
+
+    @profiled
+    @XBlock.handler
+    def handler(self, request, _suffix=''):
+        self.calls.append('handler')
+        return request
+
+    @profiled
+    def failing_view(self, _context):
+        raise ValueError("Rendering failed")
+
+
+@ddt.ddt
+class TestProfiling(TestCase, TestWithPatchesMixin):
+    def setUp(self):
+        self.output_dir = os.path.join(tempfile.mkdtemp(), 'profiles')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.output_dir))
+        self.block = ProfiledGuineaPig()
+
+    def _profiling_settings(self, **profiling_settings):
+        profiling_settings.setdefault('enabled', True)
+        profiling_settings.setdefault('output_dir', self.output_dir)
+        return override_settings(XBLOCK_SETTINGS={'group_project_v2': {'profiling': profiling_settings}})
+
+    def _get_profiles(self):
+        if not os.path.isdir(self.output_dir):
+            return []
+        return sorted(os.listdir(self.output_dir))
+
+    @ddt.data(
+        {},
+        {'enabled': False, 'sample_rate': 1},
+        {'sample_rate': 0},
+    )
+    def test_not_profiled(self, profiling_settings):
+        save_profile_mock = self.make_patch(profiling, 'save_profile', mock.Mock())
+
+        with override_settings(XBLOCK_SETTINGS={'group_project_v2': {'profiling': profiling_settings}}):
+            self.assertEqual(self.block.student_view({'key': 'value'}), {'key': 'value'})
+
+        self.assertEqual(self.block.calls, ['student_view', 'child_view'])
+        save_profile_mock.assert_not_called()
+
+    @ddt.data(None, {}, {'group_project_v2': None})
+    def test_not_configured(self, xblock_settings):
+        save_profile_mock = self.make_patch(profiling, 'save_profile', mock.Mock())
+
+        with override_settings(XBLOCK_SETTINGS=xblock_settings):
+            self.assertEqual(profiling.get_profiling_settings(), {})
+            self.assertEqual(self.block.student_view({'key': 'value'}), {'key': 'value'})
+
+        save_profile_mock.assert_not_called()
+
+    def test_sampled_view(self):
+        with self._profiling_settings(sample_rate=1):
+            self.assertEqual(self.block.student_view({'key': 'value'}), {'key': 'value'})
+
+        profiles = self._get_profiles()
+        self.assertEqual(len(profiles), 1)  # nested view is profiled as part of the outer one
+        self.assertIn('-ProfiledGuineaPig.student_view-', profiles[0])
+        self.assertEqual(self.block.calls, ['student_view', 'child_view'])
+
+    @ddt.data(
+        ({}, {'X-Group-Project-Profile': '1'}, False),
+        ({'token': ''}, {'X-Group-Project-Profile': ''}, False),
+        ({'token': 'secret'}, {}, False),
+        ({'token': 'secret', 'header': 'X-Profile'}, {'X-Profile': 'secret'}, True),
+        ({'token': 'secret'}, {'X-Group-Project-Profile': 'secret'}, True),
+        ({'token': 'secret'}, {'X-Group-Project-Profile': '1'}, False),
+    )
+    @ddt.unpack
+    def test_handler_profiled_on_request(self, profiling_settings, headers, expected_profiled):
+        request = Request.blank('/', headers=headers)
+
+        with self._profiling_settings(**profiling_settings):
+            self.assertEqual(self.block.handler(request), request)
+
+        self.assertEqual(len(self._get_profiles()), 1 if expected_profiled else 0)
+        self.assertTrue(getattr(ProfiledGuineaPig.handler, '_is_xblock_handler', False))
+
+    def test_view_profiled_on_request(self):
+        django_request = mock.Mock(META={'HTTP_X_GROUP_PROJECT_PROFILE': 'secret'})
+        self.make_patch(profiling, 'get_current_request', mock.Mock(return_value=django_request))
+
+        with self._profiling_settings(token='secret'):
+            self.block.student_view({})
+
+        self.assertEqual(len(self._get_profiles()), 1)
+
+    def test_profile_saved_on_error(self):
+        with self._profiling_settings(sample_rate=1), self.assertRaises(ValueError):
+            self.block.failing_view({})
+
+        self.assertEqual(len(self._get_profiles()), 1)
+
+    def test_max_profiles(self):
+        os.makedirs(self.output_dir)
+        old_profiles = ['20160101000000-old-{}.prof'.format(index) for index in range(3)]
+        for file_name in old_profiles + ['notes.txt']:
+            open(os.path.join(self.output_dir, file_name), 'w').close()
+
+        with self._profiling_settings(sample_rate=1, max_profiles=2):
+            self.block.student_view({})
+
+        profiles = self._get_profiles()
+        self.assertEqual(len(profiles), 3)
+        self.assertEqual(profiles[0], old_profiles[2])
+        self.assertIn('-ProfiledGuineaPig.student_view-', profiles[1])
+        self.assertEqual(profiles[2], 'notes.txt')  # only profiles are removed
@@ -0,0 +1,41 @@
+import io
+from unittest import TestCase
+
+import ddt
+import pkg_resources
+
+from group_project_v2.project_navigator import ProjectNavigatorViewXBlockBase
+from group_project_v2.resource_bundles import (
+    PACKAGE_NAME, RESOURCE_BUNDLES, build_bundle, get_bundle_files, get_bundle_path
+)
+from group_project_v2.stage import (
+    BasicStage, CompletionStage, SubmissionStage, TeamEvaluationStage, PeerReviewStage, EvaluationDisplayStage,
+    GradeDisplayStage
+)
+
+
+@ddt.ddt
+class TestResourceBundles(TestCase):
+    @ddt.data(*get_bundle_files())
+    @ddt.unpack
+    def test_bundle_file_up_to_date(self, bundle_name, resource_type):
+        bundle_path = pkg_resources.resource_filename(PACKAGE_NAME, get_bundle_path(bundle_name, resource_type))
+        with io.open(bundle_path, encoding='utf-8') as bundle_file:
+            content = bundle_file.read()
+
+        self.assertEqual(content, build_bundle(bundle_name, resource_type), "Run `make bundles` to rebuild bundles")
+
+    def test_components_bundle_complete(self):
+        bundle = RESOURCE_BUNDLES['project_components']
+        stage_classes = (
+            BasicStage, CompletionStage, SubmissionStage, TeamEvaluationStage, PeerReviewStage, EvaluationDisplayStage,
+            GradeDisplayStage
+        )
+        for stage_class in stage_classes:
+            if stage_class.js_file:
+                self.assertIn(stage_class.js_file, bundle['javascript'])
+        for view_class in ProjectNavigatorViewXBlockBase.__subclasses__():
+            if view_class.css_file:
+                self.assertIn(view_class.CSS_BASE + view_class.css_file, bundle['css'])
+            if view_class.js_file:
+                self.assertIn(view_class.JS_BASE + view_class.js_file, bundle['javascript'])
@@ -1,5 +1,7 @@
 import json
 import os
+import shutil
+import tempfile
 from unittest import TestCase
 from xml.etree import ElementTree
 
@@ -8,16 +10,20 @@ import mock
 from datetime import datetime
 
 import pytz
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
 from freezegun import freeze_time
 from xblock.field_data import DictFieldData
 from xblock.fields import ScopeIds
 from xblock.runtime import Runtime
 from xblock.validation import ValidationMessage
 
-from group_project_v2 import messages
+from group_project_v2 import chunked_upload, messages
+from group_project_v2.chunked_upload import ChunkedUpload
 from group_project_v2.group_project import GroupActivityXBlock
+from group_project_v2.post_upload import PostUploadState, create_job, get_pending_job_id
 from group_project_v2.project_api import TypedProjectAPI
-from group_project_v2.project_api.dtos import WorkgroupDetails
+from group_project_v2.project_api.dtos import SubmissionDetails, WorkgroupDetails
 from group_project_v2.project_navigator import ProjectNavigatorViewXBlockBase
 from group_project_v2.stage import BaseGroupActivityStage
 from group_project_v2.stage_components import (
@@ -25,6 +31,7 @@ from group_project_v2.stage_components import (
     GroupProjectReviewQuestionXBlock, GroupProjectTeamEvaluationDisplayXBlock, GroupProjectGradeEvaluationDisplayXBlock
 )
 from group_project_v2.upload_file import UploadFile
+from group_project_v2.utils import get_block_content_id, render_content_scoped_template
 from tests.utils import TestWithPatchesMixin, make_api_error, make_review_item as mri, make_question
 
 
@@ -54,6 +61,10 @@ class TestableStaticContentXBlock(StaticContentBaseXBlock):
 class TestStaticContentBaseXBlockMixin(StageComponentXBlockTestBase):
     block_to_test = TestableStaticContentXBlock
 
+    def setUp(self):
+        super(TestStaticContentBaseXBlockMixin, self).setUp()
+        render_content_scoped_template.cache.clear()
+
     def _set_up_navigator(self, activity_name='Activity 1'):
         stage = self.stage_mock
 
@@ -156,12 +167,12 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
         upload_datetime = datetime(2015, 11, 19, 22, 54, 13, tzinfo=pytz.UTC)
         self.block.upload_id = upload_id
         self.project_api_mock.get_latest_workgroup_submissions_by_id.return_value = {
-            upload_id: {
+            upload_id: SubmissionDetails.from_dict({
                 "document_url": 'some_url',
                 "document_filename": 'some_filename',
                 "modified": upload_datetime.strftime('%Y-%m-%dT%H:%M:%SZ'),
                 "user_details": {"id": 1, "name": 'qwe'}
-            }
+            })
         }
 
         with mock.patch('group_project_v2.stage_components.format_date') as patched_format_date:
@@ -180,21 +191,23 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
     def test_no_upload(self):
         self.block.upload_id = 150
 
-        self.project_api_mock.get_latest_workgroup_submissions_by_id.return_value = {1: {}, 2: {}}
+        self.project_api_mock.get_latest_workgroup_submissions_by_id.return_value = {
+            1: SubmissionDetails(), 2: SubmissionDetails()
+        }
         self.assertIsNone(self.block.upload)
 
     def test_upload_submission_stage_is_not_available(self):
         self.stage_mock.available_now = False
         self.stage_mock.STAGE_ACTION = 'something'
 
-        response = self.block.upload_submission(mock.Mock())
+        response = self.block.upload_submission(mock.Mock(headers={}))
         self.assertEqual(response.status_code, 422)
 
     def test_upload_submission_stage_is_not_group_member(self):
         self.stage_mock.is_group_member = False
         self.stage_mock.is_admin_grader = False
 
-        response = self.block.upload_submission(mock.Mock())
+        response = self.block.upload_submission(mock.Mock(headers={}))
         self.assertEqual(response.status_code, 403)
 
     @ddt.data(
@@ -206,7 +219,7 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
     def test_upload_submission_persist_and_submit_file_raises(self, exception, expected_code):
         upload_id = "upload_id"
 
-        request_mock = mock.Mock()
+        request_mock = mock.Mock(headers={})
         request_mock.params = {upload_id: mock.Mock()}
         request_mock.params[upload_id].file = self._make_file()
 
@@ -238,7 +251,7 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
         self.stage_mock.is_admin_grader = is_admin_grader
         self.stage_mock.is_group_member = not is_admin_grader
 
-        request_mock = mock.Mock()
+        request_mock = mock.Mock(headers={})
         request_mock.params = {upload_id: mock.Mock()}
         uploaded_file = self._make_file()
         request_mock.params[upload_id].file = uploaded_file
@@ -250,6 +263,7 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
         expected_context = {
             "user_id": self.user_id,
             "group_id": self.group_id,
+            "project_id": None,
             "project_api": self.project_api_mock,
             "course_id": self.course_id
         }
@@ -271,9 +285,225 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
 
             self.stage_mock.check_submissions_and_mark_complete.assert_called_once_with()
             patched_persist_and_submit_file.assert_called_once_with(
-                self.stage_mock.activity, expected_context, uploaded_file
+                self.stage_mock.activity, self.stage_mock.activity.workgroup, expected_context, uploaded_file
             )
 
+    def _make_chunk_request(self, upload_id, content, start, total):
+        content_range = 'bytes {}-{}/{}'.format(start, start + len(content) - 1, total)
+        request_mock = mock.Mock(headers={'Content-Range': content_range})
+        request_mock.params = {upload_id: mock.Mock()}
+        request_mock.params[upload_id].file = ContentFile(content, name='image.png')
+        return request_mock
+
+    def _set_up_chunk_storage(self):
+        storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_dir)
+        self.make_patch(chunked_upload, 'default_storage', FileSystemStorage(location=storage_dir))
+
+    def test_upload_submission_in_chunks(self):
+        self._set_up_chunk_storage()
+        self.block.upload_id = upload_id = "upload_id"
+        self.stage_mock.is_group_member = True
+        with open(os.path.join(os.path.split(__file__)[0], "../resources/", 'image.png'), 'rb') as image_file:
+            content = image_file.read()
+        first_chunk, second_chunk = content[:100], content[100:]
+        self.stage_mock.check_submissions_and_mark_complete = mock.Mock()
+        self.stage_mock.get_new_stage_state_data = mock.Mock(return_value={})
+        assembled_contents = []
+        workgroup = self.stage_mock.activity.workgroup
+        workgroup_property = mock.PropertyMock(return_value=workgroup)
+        type(self.stage_mock.activity).workgroup = workgroup_property
+
+        def persist_and_submit_file(_activity, _workgroup, _context, file_stream):
+            assembled_contents.append(b"".join(file_stream.chunks()))
+            return mock.Mock(submission_id=upload_id, file_url='url')
+
+        with mock.patch.object(self.block, 'persist_and_submit_file') as patched_persist_and_submit_file, \
+                mock.patch.object(self.block, 'validator') as patched_validator:
+            patched_persist_and_submit_file.side_effect = persist_and_submit_file
+
+            response = self.block.upload_submission(self._make_chunk_request(upload_id, first_chunk, 0, len(content)))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.body), {'result': 'success', 'uploaded_bytes': 100})
+            self.assertEqual(response.headers['Range'], '0-99')
+            patched_persist_and_submit_file.assert_not_called()
+            self.assertEqual(len(patched_validator.mock_calls), 1)
+
+            response = self.block.upload_submission(
+                self._make_chunk_request(upload_id, second_chunk, 100, len(content))
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.body)["submissions"], {upload_id: 'url'})
+            self.assertEqual(len(patched_validator.mock_calls), 1)  # only first chunk is validated
+            self.assertEqual(workgroup_property.call_count, 2)  # resolved once per request
+
+        patched_persist_and_submit_file.assert_called_once_with(
+            self.stage_mock.activity, workgroup, mock.ANY, mock.ANY
+        )
+        self.assertEqual(patched_persist_and_submit_file.call_args[0][3].name, 'image.png')
+        self.assertEqual(assembled_contents, [content])
+        chunked_upload_session = self.block._get_chunked_upload(  # pylint: disable=protected-access
+            workgroup, 'image.png', len(content), None
+        )
+        self.assertEqual(chunked_upload_session.uploaded_bytes, 0)
+
+    def test_upload_submission_in_chunks_failed(self):
+        self._set_up_chunk_storage()
+        self.block.upload_id = upload_id = "upload_id"
+        self.stage_mock.is_group_member = True
+
+        with mock.patch.object(self.block, 'persist_and_submit_file') as patched_persist_and_submit_file, \
+                mock.patch.object(self.block, 'validator'):
+            patched_persist_and_submit_file.side_effect = Exception("Storage is down")
+            self.block.upload_submission(self._make_chunk_request(upload_id, b"0" * 100, 0, 200))
+            response = self.block.upload_submission(self._make_chunk_request(upload_id, b"0" * 100, 100, 200))
+
+        self.assertEqual(response.status_code, 500)
+        chunked_upload_session = self.block._get_chunked_upload(  # pylint: disable=protected-access
+            self.stage_mock.activity.workgroup, 'image.png', 200, None
+        )
+        self.assertEqual(chunked_upload_session.uploaded_bytes, 0)
+
+    def test_upload_submission_chunk_out_of_order(self):
+        self._set_up_chunk_storage()
+        self.block.upload_id = upload_id = "upload_id"
+        self.stage_mock.is_group_member = True
+
+        with mock.patch.object(self.block, 'persist_and_submit_file') as patched_persist_and_submit_file:
+            response = self.block.upload_submission(self._make_chunk_request(upload_id, b"chunk", 100, 200))
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(json.loads(response.body), {
+            'result': 'error', 'message': messages.UPLOAD_CHUNK_OUT_OF_ORDER, 'uploaded_bytes': 0
+        })
+        patched_persist_and_submit_file.assert_not_called()
+
+    def test_upload_submission_malformed_content_range(self):
+        request_mock = mock.Mock(headers={'Content-Range': 'bytes 100-0/50'})
+
+        response = self.block.upload_submission(request_mock)
+        self.assertEqual(response.status_code, 400)
+
+    @ddt.data(
+        ({'file_name': 'image.png', 'size': 200}, 0, {'result': 'success', 'uploaded_bytes': 0, 'chunk_size': 1024}),
+        (
+            {'file_name': 'image.png', 'size': 200}, 100,
+            {'result': 'success', 'uploaded_bytes': 100, 'chunk_size': 1024}
+        ),
+        ({'size': 200}, 0, {'result': 'error', 'message': messages.UPLOAD_SESSION_INVALID}),
+        (
+            {'file_name': 'image.png', 'size': 'many'}, 0,
+            {'result': 'error', 'message': messages.UPLOAD_SESSION_INVALID}
+        ),
+    )
+    @ddt.unpack
+    def test_upload_session(self, data, uploaded_bytes, expected_response):
+        self._set_up_chunk_storage()
+        self.block.upload_id = upload_id = "upload_id"
+        self.stage_mock.is_group_member = True
+        self.make_patch(self.block, '_get_setting', mock.Mock(return_value=1024))
+        if uploaded_bytes:
+            with mock.patch.object(self.block, 'validator'):
+                self.block.upload_submission(self._make_chunk_request(upload_id, b"0" * uploaded_bytes, 0, 200))
+
+        request_mock = mock.Mock(method='POST', body=json.dumps(data))
+        response = json.loads(self.block.upload_session(request_mock).body)
+        response.pop('session_id', None)
+        self.assertEqual(response, expected_response)
+
+    def test_upload_session_expired(self):
+        self._set_up_chunk_storage()
+        self.block.upload_id = upload_id = "upload_id"
+        self.stage_mock.is_group_member = True
+        with mock.patch.object(self.block, 'validator'):
+            self.block.upload_submission(self._make_chunk_request(upload_id, b"0" * 100, 0, 200))
+
+        request_mock = mock.Mock(method='POST', body=json.dumps({'file_name': 'image.png', 'size': 200}))
+        with mock.patch.object(ChunkedUpload, 'is_expired', mock.Mock(return_value=True)):
+            response = json.loads(self.block.upload_session(request_mock).body)
+
+        self.assertEqual(response['uploaded_bytes'], 0)
+
+    def test_upload_session_not_group_member(self):
+        self.stage_mock.is_group_member = False
+        self.stage_mock.is_admin_grader = False
+
+        request_mock = mock.Mock(method='POST', body=json.dumps({'file_name': 'image.png', 'size': 200}))
+        response = json.loads(self.block.upload_session(request_mock).body)
+        self.assertEqual(response, {'result': 'error', 'message': messages.NON_GROUP_MEMBER_UPLOAD})
+
+    @freeze_time("2015-08-01")
+    def test_upload_submission_async_processing(self):
+        self.block.upload_id = upload_id = "upload_id"
+        self.stage_mock.is_group_member = True
+        self.stage_mock.get_new_stage_state_data = mock.Mock(return_value={'state': 'complete'})
+        self.stage_mock.check_submissions_and_mark_complete = mock.Mock()
+        self.runtime_mock.service.return_value.get_settings_bucket.return_value = {'async_upload_processing': True}
+
+        request_mock = mock.Mock(headers={})
+        request_mock.params = {upload_id: mock.Mock()}
+        request_mock.params[upload_id].file = self._make_file()
+        uploaded_file_mock = mock.Mock(submission_id=upload_id, file_url='url', submission_data={'document_id': 1})
+
+        with mock.patch.object(self.block, 'persist_file') as patched_persist_file, \
+                mock.patch.object(self.block, 'submit_file') as patched_submit_file, \
+                mock.patch.object(self.block, 'persist_and_submit_file') as patched_persist_and_submit_file:
+            patched_persist_file.return_value = uploaded_file_mock
+
+            response = self.block.upload_submission(request_mock)
+            self.assertEqual(response.status_code, 200)
+            response_payload = json.loads(response.body)
+            self.assertEqual(response_payload["submissions"], {upload_id: 'url'})
+            self.assertNotIn("new_stage_states", response_payload)
+            patched_submit_file.assert_not_called()
+            self.stage_mock.check_submissions_and_mark_complete.assert_not_called()
+
+            status_request = mock.Mock(method='POST', body=json.dumps({'job_id': response_payload["upload_job_id"]}))
+            self.assertEqual(json.loads(self.block.upload_status(status_request).body), {
+                'state': PostUploadState.COMPLETE,
+                'data': {
+                    'new_stage_states': [{'state': 'complete'}], 'user_label': 'Test label', 'submission_date': 'Aug 01'
+                }
+            })
+
+        patched_persist_and_submit_file.assert_not_called()
+        patched_submit_file.assert_called_once_with(
+            self.stage_mock.activity, self.stage_mock.activity.workgroup, {'document_id': 1}
+        )
+        self.stage_mock.check_submissions_and_mark_complete.assert_called_once_with()
+
+    def test_upload_status_failed(self):
+        job_id = create_job(get_block_content_id(self.block), self.user_id, {'document_id': 1})
+
+        status_request = mock.Mock(method='POST', body=json.dumps({'job_id': job_id}))
+        with mock.patch.object(self.block, 'submit_file', mock.Mock(side_effect=ValueError('API is down'))):
+            response = json.loads(self.block.upload_status(status_request).body)
+
+        self.assertEqual(response, {
+            'state': PostUploadState.FAILED,
+            'data': {
+                'title': messages.FAILED_UPLOAD_TITLE,
+                'message': messages.FAILED_UPLOAD_MESSAGE_TPL.format(error_goes_here='API is down')
+            }
+        })
+
+    @ddt.data(True, False)
+    def test_pending_upload_job_processed_on_render(self, async_processing):
+        self.make_patch(self.block, '_get_setting', mock.Mock(return_value=async_processing))
+        upload_key = get_block_content_id(self.block)
+        job_id = create_job(upload_key, self.user_id, {'document_id': 1})
+
+        with mock.patch.object(self.block, '_process_upload_job', mock.Mock(return_value={})) as process_upload_job, \
+                mock.patch.object(GroupProjectSubmissionXBlock, 'upload', mock.PropertyMock(return_value=None)):
+            self.block.submissions_view({})
+
+        if async_processing:
+            process_upload_job.assert_called_once_with({'document_id': 1})
+            self.assertIsNone(get_pending_job_id(upload_key, self.user_id))
+        else:
+            process_upload_job.assert_not_called()
+            self.assertEqual(get_pending_job_id(upload_key, self.user_id), job_id)
+
     def test_persist_and_submit_file_propagates_exceptions(self):
         context_mock = mock.Mock()
         uploaded_file = self._make_file()
@@ -286,16 +516,21 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
             upload_file_class_mock.return_value = upload_file_mock
 
             with self.assertRaises(Exception) as raises_cm:
-                self.block.persist_and_submit_file(self.stage_mock.activity, context_mock, uploaded_file)
+                self.block.persist_and_submit_file(
+                    self.stage_mock.activity, self.stage_mock.activity.workgroup, context_mock, uploaded_file
+                )
                 exception = raises_cm.exception
                 expected_message = "Error storing file {} - {}".format(upload_file_mock.file.name, "some error")
                 self.assertEqual(exception.message, expected_message)
 
             upload_file_mock.save_file.side_effect = lambda: 1
-            upload_file_mock.submit = mock.Mock(side_effect=Exception("other error"))
+            upload_file_mock.submission_data = {'document_id': 1, 'document_filename': 'file_name'}
+            self.project_api_mock.create_submission = mock.Mock(side_effect=Exception("other error"))
 
             with self.assertRaises(Exception) as raises_cm:
-                self.block.persist_and_submit_file(self.stage_mock.activity, context_mock, uploaded_file)
+                self.block.persist_and_submit_file(
+                    self.stage_mock.activity, self.stage_mock.activity.workgroup, context_mock, uploaded_file
+                )
                 exception = raises_cm.exception
                 expected_message = "Error recording file information {} - {}".format(
                     upload_file_mock.file.name, "other error"
@@ -306,7 +541,8 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
     def test_persist_and_submit_file_success_path(self, upload_id):
         self.block.upload_id = upload_id
         self.stage_mock.activity.content_id = 'content_id 12'
-        self.stage_mock.fire_file_upload_notification = mock.Mock()
+        self.stage_mock.dispatch_file_upload_notification = mock.Mock()
+        self.make_patch(self.block, '_get_setting', mock.Mock(side_effect=lambda key, default: default))
         context_mock = mock.Mock()
         uploaded_file = self._make_file()
 
@@ -316,17 +552,20 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
 
         with mock.patch('group_project_v2.stage_components.UploadFile') as upload_file_class_mock:
             upload_file_mock = mock.create_autospec(UploadFile)
-            upload_file_mock.submission_id = '12345'
-            upload_file_mock.file = mock.Mock()
-            upload_file_mock.file.name = 'file_name'
+            upload_file_mock.submission_data = {
+                'document_id': '12345', 'document_filename': 'file_name', 'user': self.user_id,
+                'workgroup': self.group_id
+            }
             upload_file_class_mock.return_value = upload_file_mock
 
-            result = self.block.persist_and_submit_file(self.stage_mock.activity, context_mock, uploaded_file)
+            result = self.block.persist_and_submit_file(
+                self.stage_mock.activity, self.stage_mock.activity.workgroup, context_mock, uploaded_file
+            )
             self.assertEqual(result, upload_file_mock)
             upload_file_class_mock.assert_called_once_with(uploaded_file, upload_id, context_mock)
 
             upload_file_mock.save_file.assert_called_once_with()
-            upload_file_mock.submit.assert_called_once_with()
+            self.project_api_mock.create_submission.assert_called_once_with(upload_file_mock.submission_data)
 
             self.runtime_mock.publish.assert_called_once_with(
                 self.block,
@@ -340,13 +579,20 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
                 }
             )
 
-            self.stage_mock.fire_file_upload_notification.assert_called_with(notification_service_mock)
+            self.stage_mock.dispatch_file_upload_notification.assert_called_with(
+                self.stage_mock.activity.workgroup, self.user_id, 0
+            )
 
 
 @ddt.ddt
 class TestGroupProjectReviewQuestionXBlock(StageComponentXBlockTestBase):
     block_to_test = GroupProjectReviewQuestionXBlock
 
+    def setUp(self):
+        super(TestGroupProjectReviewQuestionXBlock, self).setUp()
+        self.block.question_id = "q1"
+        GroupProjectReviewQuestionXBlock._rendered_content_cache.clear()  # pylint: disable=protected-access
+
     def test_render_content_bad_content(self):
         self.block.question_content = "imparsable as XML"
 
@@ -383,6 +629,30 @@ class TestGroupProjectReviewQuestionXBlock(StageComponentXBlockTestBase):
             self.assertEqual(set(node_to_render.get('class').split(' ')), expected_classes)
             self.assertEqual(node_to_render.get('disabled', None), 'disabled' if closed else None)
 
+    def test_render_content_cached(self):
+        self.block.question_content = "<input type='text'/>"
+        self.stage_mock.is_closed = False
+
+        with mock.patch('group_project_v2.stage_components.outer_html') as patched_outer_html:
+            patched_outer_html.side_effect = ["content 1", "content 2", "content 3", "content 4"]
+
+            self.assertEqual(self.block.render_content(), "content 1")
+            self.assertEqual(self.block.render_content(), "content 1")
+            self.assertEqual(patched_outer_html.call_count, 1)
+
+            self.stage_mock.is_closed = True
+            self.assertEqual(self.block.render_content(), "content 2")
+            self.block.question_content = "<textarea/>"
+            self.assertEqual(self.block.render_content(), "content 3")
+            self.block.question_id = "q2"
+            self.assertEqual(self.block.render_content(), "content 4")
+
+            self.stage_mock.is_closed = False
+            self.block.question_id = "q1"
+            self.block.question_content = "<input type='text'/>"
+            self.assertEqual(self.block.render_content(), "content 1")
+            self.assertEqual(patched_outer_html.call_count, 4)
+
 
 class CommonFeedbackDisplayStageTests(object):
     def setUp(self):
@@ -1,6 +1,7 @@
 import ddt
 import mock
 
+from group_project_v2.project_api.dtos import ReducedUserDetails
 from group_project_v2.stage import EvaluationDisplayStage, GradeDisplayStage
 from tests.unit.test_stages.base import BaseStageTest
 from tests.unit.test_stages.utils import patch_obj
@@ -110,7 +111,7 @@ class TestGradeDisplayStage(EvaluationStagesBaseTestMixin, BaseStageTest):
 
     def setUp(self):
         super(TestGradeDisplayStage, self).setUp()
-        self.project_api_mock.get_workgroup_reviewers.return_value = [{"id": 1}]
+        self.project_api_mock.get_reviewers_for_workgroup.return_value = [ReducedUserDetails(id=1)]
 
     def assert_proceeds_calculation(self, should_perform_expensive_part):
         if should_perform_expensive_part:
@@ -1,11 +1,13 @@
 import itertools
+import json
 from collections import defaultdict
 
 import ddt
 import mock
 from xblock.validation import ValidationMessage
 
-from group_project_v2.project_api.dtos import WorkgroupDetails
+from group_project_v2.deferred_grading import GradingState
+from group_project_v2.project_api.dtos import WorkgroupDetails, ReducedUserDetails
 from group_project_v2.stage import PeerReviewStage
 from group_project_v2.stage.utils import ReviewState, StageState
 from group_project_v2.stage_components import GroupProjectReviewQuestionXBlock, GroupSelectorXBlock
@@ -67,6 +69,49 @@ class TestPeerReviewStage(ReviewStageBaseTest, BaseStageTest):
         categories = [GroupProjectReviewQuestionXBlock.CATEGORY, GroupSelectorXBlock.CATEGORY]
         self.validate_and_check_message(categories, questions)
 
+    @ddt.data(
+        (None, None),
+        ({'state': GradingState.PENDING, 'due_in': 0}, {'state': GradingState.PENDING, 'due_in': 0, 'group_id': 2}),
+    )
+    @ddt.unpack
+    def test_do_submit_review_grading(self, grading_status, expected_response_data):
+        self.activity_mock.schedule_grade_calculation.return_value = grading_status
+        with patch_obj(self.block_to_test, 'grade_questions', mock.PropertyMock(return_value=[])):
+            response_data = self.block.do_submit_review({'review_subject_id': '2', 'q1': 'answer'})
+
+        self.activity_mock.schedule_grade_calculation.assert_called_once_with(2)
+        expected = {'grading': expected_response_data} if expected_response_data else None
+        self.assertEqual(response_data, expected)
+
+    def test_grading_status(self):
+        status = {'state': GradingState.COMPLETE, 'due_in': 0}
+        self.activity_mock.process_grading_job.return_value = status
+        review_subjects = mock.PropertyMock(return_value=[mk_wg(GROUP_ID), mk_wg(OTHER_GROUP_ID)])
+        with patch_obj(self.block_to_test, 'review_subjects', review_subjects):
+            request = mock.Mock(method='POST', body=json.dumps({'group_id': OTHER_GROUP_ID}))
+            self.assertEqual(json.loads(self.block.grading_status(request).body), status)
+
+        self.activity_mock.process_grading_job.assert_called_once_with(OTHER_GROUP_ID)
+
+    def test_grading_status_group_not_reviewed(self):
+        review_subjects = mock.PropertyMock(return_value=[mk_wg(GROUP_ID)])
+        with patch_obj(self.block_to_test, 'review_subjects', review_subjects):
+            request = mock.Mock(method='POST', body=json.dumps({'group_id': OTHER_GROUP_ID}))
+            self.assertEqual(
+                json.loads(self.block.grading_status(request).body), {'state': GradingState.UNKNOWN, 'due_in': 0}
+            )
+
+        self.activity_mock.process_grading_job.assert_not_called()
+
+    def test_student_view_processes_due_grading_jobs(self):
+        review_subjects = mock.PropertyMock(return_value=[mk_wg(GROUP_ID), mk_wg(OTHER_GROUP_ID)])
+        with patch_obj(self.block_to_test, 'review_subjects', review_subjects), \
+                mock.patch('group_project_v2.stage.review.ReviewBaseStage.student_view') as base_student_view:
+            self.block.student_view({})
+
+        self.activity_mock.process_due_grading_jobs.assert_called_once_with([GROUP_ID, OTHER_GROUP_ID])
+        base_student_view.assert_called_once_with({})
+
 
 @ddt.ddt
 class TestPeerReviewStageReviewStatus(ReviewStageBaseTest, ReviewStageUserCompletionStatsMixin, BaseStageTest):
@@ -84,6 +129,7 @@ class TestPeerReviewStageReviewStatus(ReviewStageBaseTest, ReviewStageUserComple
             return review_items.get(workgroup_id, [])
 
         self.project_api_mock.get_workgroups_to_review.side_effect = workgroups_side_effect
+        self.project_api_mock.get_workgroups_to_review_by_user.return_value = workgroups
         self.project_api_mock.get_workgroup_review_items_for_group.side_effect = review_items_side_effect
 
     @staticmethod
@@ -244,6 +290,10 @@ class TestPeerReviewStageReviewStatus(ReviewStageBaseTest, ReviewStageUserComple
         self.project_api_mock.get_workgroup_review_items_for_group.assert_called_once_with(
             GROUP_ID, self.block.activity_content_id
         )
+        self.project_api_mock.get_workgroups_to_review_by_user.assert_called_once_with(
+            self.block.course_id, self.block.activity_content_id
+        )
+        self.assertFalse(self.project_api_mock.get_workgroups_to_review.called)
 
     @ddt.data(
         # no reviews - both not started
@@ -325,7 +375,9 @@ class TestPeerReviewStageReviewStatus(ReviewStageBaseTest, ReviewStageUserComple
     @ddt.unpack
     def test_get_external_group_status(self, reviewers, questions, review_items, expected_result):
         group = mk_wg(GROUP_ID, [{"id": 1}])
-        self.project_api_mock.get_workgroup_reviewers.return_value = [{'id': user_id} for user_id in reviewers]
+        self.project_api_mock.get_reviewers_for_workgroup.return_value = [
+            ReducedUserDetails(id=user_id) for user_id in reviewers
+        ]
 
         self._set_project_api_responses(
             group,
@@ -336,7 +388,33 @@ class TestPeerReviewStageReviewStatus(ReviewStageBaseTest, ReviewStageUserComple
         )
 
         self.assert_group_completion(group, questions, expected_result)
-        self.project_api_mock.get_workgroup_reviewers.assert_called_once_with(group.id, self.block.activity_content_id)
+        self.project_api_mock.get_reviewers_for_workgroup.assert_called_once_with(
+            group.id, self.block.activity_content_id
+        )
+
+    def test_get_external_group_statuses(self):
+        group, other_group = mk_wg(GROUP_ID, [{"id": 1}]), mk_wg(OTHER_GROUP_ID, [{"id": 2}])
+        self.project_api_mock.get_reviewers_for_workgroups.return_value = {
+            group.id: [ReducedUserDetails(id=1)],
+            other_group.id: [ReducedUserDetails(id=1), ReducedUserDetails(id=2)],
+        }
+        self._set_project_api_responses(
+            group,
+            {
+                group.id: [self._parse_review_item_string('1:q1:{}:a'.format(group.id))],
+                other_group.id: [self._parse_review_item_string('1:q1:{}:a'.format(other_group.id))],
+            }
+        )
+
+        with patch_obj(self.block_to_test, 'required_questions', mock.PropertyMock()) as patched_questions:
+            patched_questions.return_value = [make_question('q1', 'irrelevant')]
+            statuses = self.block.get_external_group_statuses([group, other_group])
+
+        self.assertEqual(statuses, {group.id: StageState.COMPLETED, other_group.id: StageState.INCOMPLETE})
+        self.project_api_mock.get_reviewers_for_workgroups.assert_called_once_with(
+            [group.id, other_group.id], self.block.activity_content_id
+        )
+        self.assertFalse(self.project_api_mock.get_reviewers_for_workgroup.called)
 
     @ddt.data(
         # no ta reviewers - not started
@@ -1,7 +1,18 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime
+
 import ddt
 import mock
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from webob import Request
 
-from group_project_v2.stage import SubmissionStage
+from group_project_v2.project_api.dtos import WorkgroupDetails
+from group_project_v2.stage import SubmissionStage, basic
+from group_project_v2.stage.utils import StageState
 from tests.unit.test_stages.base import BaseStageTest
 from tests.utils import make_workgroup as mk_wg
 
@@ -71,18 +82,183 @@ class TestSubmissionStage(BaseStageTest):
         }
 
         expected_completed, expected_partially_completed = expected_result
-        expected_calls = [mock.call(group.id) for group in workgroups]
 
-        def get_submissions_by_id(group_id):
-            return workgroup_submissions.get(group_id, {})
+        def get_submissions_for_workgroups(group_ids, project_id):  # pylint: disable=unused-argument
+            return {group_id: workgroup_submissions.get(group_id, {}) for group_id in group_ids}
 
         self._set_upload_ids(uploads)
-        self.project_api_mock.get_latest_workgroup_submissions_by_id.side_effect = get_submissions_by_id
+        self.activity_mock.project.project_details.id = 100
+        self.project_api_mock.get_latest_submissions_for_workgroups.side_effect = get_submissions_for_workgroups
         completed, partially_completed = self.block.get_users_completion(workgroups, 'irrelevant')
 
         self.assertEqual(completed, expected_completed)
         self.assertEqual(partially_completed, expected_partially_completed)
+        self.project_api_mock.get_latest_submissions_for_workgroups.assert_called_once_with(
+            [group.id for group in workgroups], 100
+        )
+        self.project_api_mock.get_latest_workgroup_submissions_by_id.assert_not_called()
+
+    @ddt.data(
+        (['u1', 'u2'], {}, StageState.NOT_STARTED),
+        (['u1', 'u2'], {'u1': 'irrelevant'}, StageState.INCOMPLETE),
+        (['u1', 'u2'], {'u1': 'irrelevant', 'u2': 'irrelevant'}, StageState.COMPLETED),
+        (['u1'], {'u2': 'irrelevant'}, StageState.NOT_STARTED),
+    )
+    @ddt.unpack
+    def test_get_external_group_status(self, uploads, group_submissions, expected_status):
+        self._set_upload_ids(uploads)
+        self.project_api_mock.get_latest_workgroup_submissions_by_id.return_value = group_submissions
+
+        self.assertEqual(self.block.get_external_group_status(mk_wg(1, [{'id': 1}])), expected_status)
+        self.project_api_mock.get_latest_workgroup_submissions_by_id.assert_called_once_with(1)
+
+    def test_get_external_group_statuses(self):
+        self._set_upload_ids(['u1', 'u2'])
+        self.activity_mock.project.project_details.id = 100
+        self.project_api_mock.get_latest_submissions_for_workgroups.return_value = {
+            1: {'u1': 'irrelevant', 'u2': 'irrelevant'}, 2: {'u2': 'irrelevant'}, 3: {},
+        }
+        workgroups = [mk_wg(1, [{'id': 1}]), mk_wg(2, [{'id': 2}]), mk_wg(3, [{'id': 3}])]
+
+        self.assertEqual(
+            self.block.get_external_group_statuses(iter(workgroups)),
+            {1: StageState.COMPLETED, 2: StageState.INCOMPLETE, 3: StageState.NOT_STARTED}
+        )
+        self.project_api_mock.get_latest_submissions_for_workgroups.assert_called_once_with([1, 2, 3], 100)
+
+    def test_get_external_group_statuses_no_project(self):
+        self._set_upload_ids(['u1'])
+        self.activity_mock.project.project_details = None
+        self.project_api_mock.get_latest_submissions_for_workgroups.return_value = {1: {}}
+
+        self.assertEqual(
+            self.block.get_external_group_statuses([mk_wg(1, [{'id': 1}])]), {1: StageState.NOT_STARTED}
+        )
+        self.project_api_mock.get_latest_submissions_for_workgroups.assert_called_once_with([1], None)
+
+    def _set_up_archive_download(self):
+        storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_dir)
+        storage = FileSystemStorage(location=storage_dir)
+        self.make_patch(basic, 'default_storage', storage)
+        self.make_patch(self.block_to_test, 'is_admin_grader', mock.PropertyMock(return_value=True))
+
+        storage.save('group_work/blobs/aa/aaaa.pdf', ContentFile(b"report"))
+        storage.save('group_work/blobs/bb/bbbb.pptx', ContentFile(b"slides"))
+        storage.save('group_work/2/cccc/report.pdf', ContentFile(b"other report"))
+
+        def make_submission(document_url, document_filename):
+            return mock.Mock(
+                document_url=document_url, document_filename=document_filename,
+                modified_date=datetime(2016, 3, 14, 15, 9, 26)
+            )
+
+        self._set_upload_ids(['u1', 'u2'])
+        self.activity_mock.project.workgroups = iter([
+            WorkgroupDetails(id=1, name=u"Team/1", users=[{'id': 1}, {'id': 2}]),
+            WorkgroupDetails(id=2, name=u"Team 2", users=[{'id': 3}]),
+            WorkgroupDetails(id=3, name=u"Team 3", users=[{'id': 4}]),
+            WorkgroupDetails(id=4, name=u"Team 4", users=[{'id': 5}]),
+            WorkgroupDetails(id=5, name=u"Other organization", users=[{'id': 6}]),
+        ])
+        self.org_filter_mock = mock.Mock()
+        self.org_filter_mock.can_access_other_user.side_effect = lambda user_id: user_id != 6
+        self.make_patch(
+            self.block, 'get_organization_filter_for_user', mock.Mock(return_value=self.org_filter_mock)
+        )
+        self.activity_mock.project.project_details.id = 100
+        self.project_api_mock.get_latest_submissions_for_workgroups.return_value = {
+            1: {
+                'u1': make_submission('/media/group_work/blobs/aa/aaaa.pdf', u'report.pdf'),
+                'u2': make_submission('/media/group_work/blobs/bb/bbbb.pptx', u'slides.pptx'),
+                'other_stage_upload': make_submission('/media/group_work/blobs/aa/aaaa.pdf', u'other.pdf'),
+            },
+            2: {
+                'u1': make_submission('/media/group_work/2/cccc/report.pdf', u'report.pdf'),
+                'u2': make_submission('/media/group_work/blobs/aa/aaaa.pdf', u'report.pdf'),
+            },
+            3: {'u1': make_submission('/media/group_work/blobs/dd/missing.pdf', u'missing.pdf')},
+            4: {},
+        }
+
+    def test_download_submissions(self):
+        self._set_up_archive_download()
+
+        response = self.block.download_submissions(Request.blank('/'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'application/zip')
+        self.assertIn('attachment; filename="Submission Stage_submissions_', response.headers['Content-Disposition'])
+        self.project_api_mock.get_latest_submissions_for_workgroups.assert_called_once_with([1, 2, 3, 4], 100)
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.app_iter)))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(
+            {name: archive.read(name) for name in archive.namelist()},
+            {
+                u"Team_1 (1)/report.pdf": b"report",
+                u"Team_1 (1)/slides.pptx": b"slides",
+                u"Team 2 (2)/report.pdf": b"other report",
+                u"Team 2 (2)/u2_report.pdf": b"report",
+            }
+        )
+
+    def test_get_submissions_archive_handler_url(self):
+        self.runtime_mock.handler_url.return_value = '/handler/download_submissions'
+
+        self.assertEqual(self.block.get_submissions_archive_handler_url(), '/handler/download_submissions')
+        self.assertEqual(
+            self.block.get_submissions_archive_handler_url(7), '/handler/download_submissions?client_filter_id=7'
+        )
+
+    def test_download_submissions_client_filter(self):
+        self._set_up_archive_download()
+
+        response = self.block.download_submissions(Request.blank('/?client_filter_id=7'))
+
+        self.assertEqual(response.status_code, 200)
+        self.block.get_organization_filter_for_user.assert_called_once_with(self.block.user_id, [7])
+
+    def test_download_submissions_invalid_client_filter(self):
+        self._set_up_archive_download()
+
+        response = self.block.download_submissions(Request.blank('/?client_filter_id=abc'))
+
+        self.assertEqual(response.status_code, 400)
+        self.project_api_mock.get_latest_submissions_for_workgroups.assert_not_called()
+
+    def test_download_submissions_too_large(self):
+        self._set_up_archive_download()
+        self.make_patch(basic, 'fits_without_zip64', mock.Mock(return_value=False))
+
+        response = self.block.download_submissions(Request.blank('/'))
+
+        self.assertEqual(response.status_code, 413)
+        basic.fits_without_zip64.assert_called_once()
         self.assertEqual(
-            self.project_api_mock.get_latest_workgroup_submissions_by_id.mock_calls,
-            expected_calls
+            sorted(basic.fits_without_zip64.call_args[0][0]),
+            [
+                (u"Team 2 (2)/report.pdf", 12), (u"Team 2 (2)/u2_report.pdf", 6),
+                (u"Team_1 (1)/report.pdf", 6), (u"Team_1 (1)/slides.pptx", 6),
+            ]
         )
+
+    def test_download_submissions_streams_archive(self):
+        self._set_up_archive_download()
+        open_mock = mock.Mock(wraps=basic.default_storage.open)
+        self.make_patch(basic.default_storage, 'open', open_mock)
+
+        response = self.block.download_submissions(Request.blank('/'))
+
+        open_mock.assert_not_called()  # files are only read while archive is sent
+        next(iter(response.app_iter))
+        open_mock.assert_called_once_with(u'group_work/blobs/aa/aaaa.pdf')
+
+    def test_download_submissions_access_denied(self):
+        self.make_patch(self.block_to_test, 'is_admin_grader', mock.PropertyMock(return_value=False))
+        self.make_patch(self.block, 'can_access_dashboard', mock.Mock(return_value=False))
+
+        response = self.block.download_submissions(Request.blank('/'))
+
+        self.assertEqual(response.status_code, 403)
+        self.project_api_mock.get_latest_submissions_for_workgroups.assert_not_called()
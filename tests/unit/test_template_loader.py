@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+import mock
+from django.test.utils import override_settings
+from xblockutils.resources import ResourceLoader
+
+from group_project_v2.template_loader import CachingResourceLoader
+
+URL_NAME_TEMPLATE = 'templates/html/url_name.html'
+
+
+class TestCachingResourceLoader(TestCase):
+    def setUp(self):
+        self.loader = CachingResourceLoader('group_project_v2.utils')
+        patcher = mock.patch.object(self.loader, 'load_unicode', wraps=self.loader.load_unicode)
+        self.load_unicode = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_renders_same_as_resource_loader(self):
+        context = {'url_name': 'url name', 'caption': 'caption <b>'}
+        expected = ResourceLoader('group_project_v2.utils').render_django_template(URL_NAME_TEMPLATE, dict(context))
+        self.assertEqual(self.loader.render_template(URL_NAME_TEMPLATE, dict(context)), expected)
+
+    def test_template_compiled_once(self):
+        first = self.loader.render_template(URL_NAME_TEMPLATE, {'url_name': 'url1', 'caption': 'caption'})
+        second = self.loader.render_template(URL_NAME_TEMPLATE, {'url_name': 'url2', 'caption': 'caption'})
+
+        self.assertIn('url1', first)
+        self.assertIn('url2', second)
+        self.load_unicode.assert_called_once_with(URL_NAME_TEMPLATE)
+
+    def test_warm_up(self):
+        compiled_count = self.loader.warm_up()
+
+        self.assertGreater(compiled_count, 1)
+        self.assertEqual(self.load_unicode.call_count, compiled_count)
+        self.assertIn(mock.call(URL_NAME_TEMPLATE), self.load_unicode.call_args_list)
+
+        self.loader.render_template(URL_NAME_TEMPLATE, {})
+        self.assertEqual(self.load_unicode.call_count, compiled_count)
+
+    def test_warm_up_on_first_use(self):
+        with override_settings(XBLOCK_SETTINGS={'group_project_v2': {'warm_up_templates': True}}):
+            self.loader.get_template(URL_NAME_TEMPLATE)
+        self.assertGreater(self.load_unicode.call_count, 1)
+
+    def test_no_warm_up_by_default(self):
+        self.loader.get_template(URL_NAME_TEMPLATE)
+        self.load_unicode.assert_called_once_with(URL_NAME_TEMPLATE)
+
+    def test_clear(self):
+        self.loader.get_template(URL_NAME_TEMPLATE)
+        self.loader.clear()
+        self.loader.get_template(URL_NAME_TEMPLATE)
+        self.assertEqual(self.load_unicode.call_count, 2)
+
+    @mock.patch('group_project_v2.template_loader.django.VERSION', (1, 8, 0, 'final', 0))
+    @mock.patch.object(ResourceLoader, 'render_django_template')
+    def test_django_18_falls_back_to_resource_loader(self, render_django_template):
+        render_django_template.return_value = u"rendered"
+        self.assertEqual(self.loader.render_template(URL_NAME_TEMPLATE, {}), u"rendered")
+        render_django_template.assert_called_once_with(URL_NAME_TEMPLATE, {}, None)
+        self.load_unicode.assert_not_called()
+
+
+class TestCachingResourceLoaderResources(TestCase):
+    def setUp(self):
+        self.loader = CachingResourceLoader('group_project_v2.utils')
+        patcher = mock.patch.object(ResourceLoader, 'load_unicode', side_effect=lambda path: u"content of " + path)
+        self.load_unicode = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_resource_loaded_once(self):
+        self.assertEqual(self.loader.load_unicode('public/file.css'), u"content of public/file.css")
+        self.assertEqual(self.loader.load_unicode('public/file.css'), u"content of public/file.css")
+        self.load_unicode.assert_called_once_with('public/file.css')
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import ddt
+import mock
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from group_project_v2 import blob_storage, upload_file
+from group_project_v2.api_error import ApiError
+from group_project_v2.project_api import TypedProjectAPI
+from group_project_v2.upload_file import UploadFile, get_storage_path
+from tests.utils import TestWithPatchesMixin
+
+
+class TestUploadFile(TestCase, TestWithPatchesMixin):
+    content = b"presentation content" * 1000
+
+    def setUp(self):
+        self.storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_dir)
+        self.storage = FileSystemStorage(location=self.storage_dir)
+        self.make_patch(upload_file, 'default_storage', self.storage)
+        self.make_patch(blob_storage, 'default_storage', self.storage)
+
+        self.file = ContentFile(self.content, name='pitch.pptx')
+        self.chunks_spy = self.make_patch(self.file, 'chunks', mock.Mock(wraps=self.file.chunks))
+        self.project_api = mock.Mock(spec=TypedProjectAPI)
+        self.project_api.get_submitted_document_urls.return_value = set()
+        self.upload = UploadFile(self.file, 'upload1', self._make_context(1, 10))
+
+    def _make_context(self, user_id, group_id):
+        return {
+            'user_id': user_id, 'group_id': group_id, 'course_id': 'course1', 'project_id': 100,
+            'project_api': self.project_api
+        }
+
+    def _spy_on_temporary_files(self):
+        temporary_paths = []
+        original_spool_and_hash = UploadFile._spool_and_hash  # pylint: disable=protected-access
+
+        def spool_and_hash(upload, temporary_file):
+            temporary_paths.append(temporary_file.temporary_file_path())
+            return original_spool_and_hash(upload, temporary_file)
+
+        self.make_patch(UploadFile, '_spool_and_hash', spool_and_hash)
+        return temporary_paths
+
+    def test_save_file(self):
+        temporary_paths = self._spy_on_temporary_files()
+        expected_sha1 = hashlib.sha1(self.content).hexdigest()
+
+        self.upload.save_file()
+
+        self.assertEqual(self.upload.sha1, expected_sha1)
+        self.assertEqual(
+            self.upload.file_storage_path, "group_work/blobs/{}/{}/pitch.pptx".format(expected_sha1[:2], expected_sha1)
+        )
+        with self.storage.open(self.upload.file_storage_path) as stored_file:
+            self.assertEqual(stored_file.read(), self.content)
+        self.chunks_spy.assert_called_once_with()  # uploaded file is read once
+        self.assertFalse(os.path.exists(temporary_paths[0]))
+
+    def test_save_file_already_stored(self):
+        temporary_paths = self._spy_on_temporary_files()
+        self.upload.save_file()
+        stored_path = self.upload.file_storage_path
+
+        other_group_upload = UploadFile(
+            ContentFile(self.content, name='pitch.pptx'), 'upload2', self._make_context(2, 11)
+        )
+        with mock.patch.object(self.storage, 'save') as patched_save:
+            other_group_upload.save_file()
+
+        patched_save.assert_not_called()
+        self.assertEqual(other_group_upload.file_storage_path, stored_path)
+        self.assertEqual(self.storage.listdir(os.path.dirname(stored_path)), ([], ['pitch.pptx']))
+
+        renamed_upload = UploadFile(
+            ContentFile(self.content, name='Pitch v2.pptx'), 'upload1', self._make_context(3, 10)
+        )
+        renamed_upload.save_file()
+        self.assertEqual(os.path.dirname(renamed_upload.file_storage_path), os.path.dirname(stored_path))
+        self.assertEqual(
+            sorted(self.storage.listdir(os.path.dirname(stored_path))[1]), ['Pitch v2.pptx', 'pitch.pptx']
+        )
+        self.assertFalse(any(os.path.exists(path) for path in temporary_paths))
+
+    def test_save_file_referenced_by_submission(self):
+        expected_sha1 = hashlib.sha1(self.content).hexdigest()
+        self.project_api.get_submitted_document_urls.return_value = {
+            None, u"/media/group_work/blobs/{}/{}/pitch.pptx".format(expected_sha1[:2], expected_sha1)
+        }
+
+        with mock.patch.object(self.storage, 'exists') as patched_exists, \
+                mock.patch.object(self.storage, 'save') as patched_save:
+            self.upload.save_file()
+
+        self.project_api.get_submitted_document_urls.assert_called_once_with(10, 100)
+        patched_exists.assert_not_called()
+        patched_save.assert_not_called()
+
+    def test_save_file_index_error(self):
+        self.project_api.get_submitted_document_urls.side_effect = ApiError(mock.Mock(code=500))
+
+        self.upload.save_file()
+
+        with self.storage.open(self.upload.file_storage_path) as stored_file:
+            self.assertEqual(stored_file.read(), self.content)
+
+    def test_save_file_storage_error(self):
+        temporary_paths = self._spy_on_temporary_files()
+
+        with mock.patch.object(self.storage, 'save', mock.Mock(side_effect=IOError("disk full"))):
+            with self.assertRaises(IOError):
+                self.upload.save_file()
+
+        self.assertFalse(os.path.exists(temporary_paths[0]))
+
+
+@ddt.ddt
+class TestGetStoragePath(TestCase):
+    @ddt.data(
+        (u"/media/group_work/blobs/a9/a94a8fe5.pdf", u"group_work/blobs/a9/a94a8fe5.pdf"),
+        (u"https://bucket.s3.amazonaws.com/group_work/blobs/a9/a94a8fe5.pdf?Signature=abc",
+         u"group_work/blobs/a9/a94a8fe5.pdf"),
+        (u"/media/group_work/10/a94a8fe5/My%20Report%C3%BC.pdf", u"group_work/10/a94a8fe5/My Report\xfc.pdf"),
+        (u"file:////edx/app/edxapp/media/group_work/10/a94a8fe5/report.pdf", u"group_work/10/a94a8fe5/report.pdf"),
+        (u"https://example.com/report.pdf", None),
+    )
+    @ddt.unpack
+    def test_get_storage_path(self, file_url, expected_path):
+        self.assertEqual(get_storage_path(file_url), expected_path)
@@ -1,15 +1,25 @@
+import threading
+import time
 from unittest import TestCase
 import ddt
 import mock
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytz
+from django.test.utils import override_settings
+from freezegun import freeze_time
 from dateutil.tz import tzoffset
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 from xblock.core import XBlock
 from xblock.field_data import DictFieldData
 from xblock.fields import String
-from group_project_v2.utils import FieldValuesContextManager, get_block_content_id, build_date_field
+from xblock.fragment import Fragment
+from group_project_v2.utils import (
+    FieldValuesContextManager, get_block_content_id, build_date_field, map_concurrently, memoize_with_expiration,
+    SingleFlight, BoundedExecutor, CachePolicy, render_content_scoped_template, add_resource_bundle,
+    get_xblock_settings_bucket
+)
+from group_project_v2.resource_bundles import RESOURCE_BUNDLES
 
 
 class DummyXBlock(XBlock):
@@ -66,3 +76,375 @@ class TestUtils(TestCase):
     def test_build_date_field(self, json_string, expected):
         actual = build_date_field(json_string)
         self.assertEqual(actual, expected)
+
+    @ddt.data(1, 2, 10)
+    def test_map_concurrently(self, max_workers):
+        self.assertEqual(map_concurrently(lambda x: x * 2, range(20), max_workers), [x * 2 for x in range(20)])
+        self.assertEqual(map_concurrently(lambda x: x * 2, [], max_workers), [])
+
+    @ddt.data(*RESOURCE_BUNDLES.keys())
+    def test_add_resource_bundle(self, bundle_name):
+        block = mock.Mock()
+        block.runtime.local_resource_url.side_effect = lambda _block, path: '/static/' + path
+        fragment = Fragment()
+        add_resource_bundle(block, bundle_name, fragment)
+
+        expected_resources = []
+        bundle_names = [bundle_name]
+        while 'base' in RESOURCE_BUNDLES[bundle_names[0]]:
+            bundle_names.insert(0, RESOURCE_BUNDLES[bundle_names[0]]['base'])
+        for name in bundle_names:
+            expected_resources.extend(
+                (mimetype, '/static/public/bundles/{}.{}'.format(name, extension))
+                for resource_type, mimetype, extension in (
+                    ('css', 'text/css', 'css'), ('javascript', 'application/javascript', 'js')
+                )
+                if resource_type in RESOURCE_BUNDLES[name]
+            )
+        self.assertEqual([(resource.mimetype, resource.data) for resource in fragment.resources], expected_resources)
+        for resource in fragment.resources:
+            self.assertEqual(resource.kind, 'url')
+
+    def test_add_resource_bundle_shared_resources_added_once(self):
+        block = mock.Mock()
+        block.runtime.local_resource_url.side_effect = lambda _block, path: '/static/' + path
+        fragment = Fragment()
+        add_resource_bundle(block, 'author_edit_view', fragment)
+        add_resource_bundle(block, 'author_preview_view', fragment)
+        add_resource_bundle(block, 'author_edit_view', fragment)
+
+        self.assertEqual(
+            [resource.data for resource in fragment.resources],
+            [
+                '/static/public/bundles/author_view.css', '/static/public/bundles/author_edit_view.css',
+                '/static/public/bundles/author_preview_view.css'
+            ]
+        )
+
+    @ddt.data(
+        (None, {}),
+        ({}, {}),
+        ({'other_xblock': {'key': 'value'}}, {}),
+        ({'group_project_v2': None}, {}),
+        ({'group_project_v2': {'key': 'value'}}, {'key': 'value'}),
+    )
+    @ddt.unpack
+    def test_get_xblock_settings_bucket(self, xblock_settings, expected):
+        with override_settings(XBLOCK_SETTINGS=xblock_settings):
+            self.assertEqual(get_xblock_settings_bucket(), expected)
+
+    def test_map_concurrently_propagates_exceptions(self):
+        def func(item):
+            if item == 3:
+                raise ValueError("Failed")
+            return item
+
+        with self.assertRaises(ValueError):
+            map_concurrently(func, range(5), 3)
+
+
+class TestSingleFlight(TestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.release = threading.Event()
+
+    def _wait_for_coalesced(self, count):
+        deadline = time.time() + 5
+        while self.single_flight.coalesced < count and time.time() < deadline:
+            time.sleep(0.001)
+
+    def _call_in_threads(self, key, func, threads_count):
+        results, errors = [], []
+
+        def target():
+            try:
+                results.append(self.single_flight.call(key, func))
+            except ValueError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=target) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        self._wait_for_coalesced(threads_count - 1)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_calls_coalesced(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            self.release.wait()
+            return 'result'
+
+        results, errors = self._call_in_threads('key', func, 5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['result'] * 5)
+        self.assertEqual(errors, [])
+        self.assertEqual((self.single_flight.calls, self.single_flight.coalesced), (5, 4))
+
+    def test_exception_shared_with_waiters(self):
+        def func():
+            self.release.wait()
+            raise ValueError("Failed")
+
+        results, errors = self._call_in_threads('key', func, 3)
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(self.single_flight.coalesced, 2)
+
+    def test_sequential_calls_not_coalesced(self):
+        func = mock.Mock(side_effect=['result1', 'result2'])
+
+        self.assertEqual(self.single_flight.call('key', func), 'result1')
+        self.assertEqual(self.single_flight.call('key', func), 'result2')
+        self.assertEqual((self.single_flight.calls, self.single_flight.coalesced), (2, 0))
+
+    def test_memoize_with_expiration_coalesces_cache_misses(self):
+        release = self.release
+        calls = []
+
+        @memoize_with_expiration()
+        def get_value(value):
+            calls.append(value)
+            release.wait()
+            return value * 2
+
+        self.single_flight = get_value.single_flight
+        threads = [threading.Thread(target=get_value, args=(1,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        self._wait_for_coalesced(2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(get_value(1), 2)
+        self.assertEqual(calls, [1])
+        self.assertEqual((get_value.single_flight.calls, get_value.single_flight.coalesced), (3, 2))
+
+
+class TestBoundedExecutor(TestCase):
+    def test_calls_run_by_fixed_number_of_threads(self):
+        executor = BoundedExecutor(2, 100, "test-executor")
+        thread_names, lock = set(), threading.Lock()
+
+        def record_thread():
+            with lock:
+                thread_names.add(threading.current_thread().name)
+
+        for _ in range(20):
+            self.assertTrue(executor.submit(record_thread))
+        executor._queue.join()  # pylint: disable=protected-access
+
+        self.assertTrue(thread_names <= {"test-executor-0", "test-executor-1"})
+
+    def test_calls_rejected_when_queue_is_full(self):
+        executor = BoundedExecutor(1, 1, "test-executor")
+        started, release = threading.Event(), threading.Event()
+
+        def blocking_call():
+            started.set()
+            release.wait()
+
+        self.assertTrue(executor.submit(blocking_call))
+        started.wait(5)
+        self.assertTrue(executor.submit(mock.Mock()))
+        self.assertFalse(executor.submit(mock.Mock()))
+        release.set()
+
+    def test_failed_call_does_not_stop_worker(self):
+        executor = BoundedExecutor(1, 10, "test-executor")
+        func = mock.Mock()
+        executor.submit(mock.Mock(side_effect=ValueError("Failed")))
+        executor.submit(func, 1, key='value')
+        executor._queue.join()  # pylint: disable=protected-access
+
+        func.assert_called_once_with(1, key='value')
+
+
+@ddt.ddt
+class TestMemoizeWithExpiration(TestCase):
+    def setUp(self):
+        self.func = mock.Mock(side_effect=['value1', 'value2', 'value3'])
+        self.func.__name__ = 'func'
+        self.refresh_executor = mock.Mock()
+        self.refresh_executor.submit.side_effect = lambda func, *args, **kwargs: func(*args, **kwargs) or True
+        patcher = mock.patch('group_project_v2.utils.refresh_executor', self.refresh_executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _memoize(self, stale_grace_period=None, policy=None):
+        func = self.func
+
+        @memoize_with_expiration(
+            expires_after=timedelta(seconds=10), stale_grace_period=stale_grace_period, policy=policy
+        )
+        def memoized(arg):
+            return func(arg)
+
+        return memoized
+
+    @ddt.data(None, timedelta(seconds=60))
+    def test_fresh_value_cached(self, stale_grace_period):
+        memoized = self._memoize(stale_grace_period)
+        with freeze_time("2017-01-01 00:00:00") as frozen_time:
+            self.assertEqual(memoized(1), 'value1')
+            frozen_time.tick(timedelta(seconds=9))
+            self.assertEqual(memoized(1), 'value1')
+
+        self.func.assert_called_once_with(1)
+        self.refresh_executor.submit.assert_not_called()
+
+    def test_expired_value_refreshed_without_grace_period(self):
+        memoized = self._memoize()
+        with freeze_time("2017-01-01 00:00:00") as frozen_time:
+            self.assertEqual(memoized(1), 'value1')
+            frozen_time.tick(timedelta(seconds=10))
+            self.assertEqual(memoized(1), 'value2')
+
+        self.assertEqual(self.func.call_count, 2)
+        self.refresh_executor.submit.assert_not_called()
+
+    def test_stale_value_served_within_grace_period(self):
+        memoized = self._memoize(timedelta(seconds=60))
+        with freeze_time("2017-01-01 00:00:00") as frozen_time:
+            self.assertEqual(memoized(1), 'value1')
+            frozen_time.tick(timedelta(seconds=30))
+            self.assertEqual(memoized(1), 'value1')
+            self.assertEqual(self.refresh_executor.submit.call_count, 1)
+            self.assertEqual(memoized(1), 'value2')
+
+        self.assertEqual(self.func.call_count, 2)
+
+    def test_stale_value_not_served_after_grace_period(self):
+        memoized = self._memoize(timedelta(seconds=60))
+        with freeze_time("2017-01-01 00:00:00") as frozen_time:
+            self.assertEqual(memoized(1), 'value1')
+            frozen_time.tick(timedelta(seconds=70))
+            self.assertEqual(memoized(1), 'value2')
+
+        self.refresh_executor.submit.assert_not_called()
+
+    def test_failed_refresh_keeps_stale_value(self):
+        self.func.side_effect = ['value1', ValueError("Failed"), 'value2']
+        memoized = self._memoize(timedelta(seconds=60))
+        with freeze_time("2017-01-01 00:00:00") as frozen_time:
+            self.assertEqual(memoized(1), 'value1')
+            frozen_time.tick(timedelta(seconds=30))
+            self.assertEqual(memoized(1), 'value1')
+            self.assertEqual(memoized(1), 'value1')
+            self.assertEqual(memoized(1), 'value2')
+
+        self.assertEqual(self.refresh_executor.submit.call_count, 2)
+
+    def test_rejected_refresh_retried(self):
+        self.refresh_executor.submit.side_effect = [False, True]
+        memoized = self._memoize(timedelta(seconds=60))
+        with freeze_time("2017-01-01 00:00:00") as frozen_time:
+            self.assertEqual(memoized(1), 'value1')
+            frozen_time.tick(timedelta(seconds=30))
+            self.assertEqual(memoized(1), 'value1')
+            self.assertEqual(memoized(1), 'value1')
+
+        self.assertEqual(self.refresh_executor.submit.call_count, 2)
+
+    def test_policy_evaluated_on_each_call(self):
+        policy = mock.Mock(return_value=CachePolicy(expires_after=timedelta(seconds=10)))
+        memoized = self._memoize(policy=policy)
+        with freeze_time("2017-01-01 00:00:00") as frozen_time:
+            self.assertEqual(memoized(1), 'value1')
+            policy.return_value = CachePolicy(expires_after=timedelta(seconds=5))
+            frozen_time.tick(timedelta(seconds=6))
+            self.assertEqual(memoized(1), 'value2')
+
+        self.assertEqual(policy.call_count, 2)
+
+    @ddt.data(False, True)
+    def test_invalidate(self, shared):
+        cache_values = {}
+        cache_mock = mock.Mock()
+        cache_mock.get.side_effect = cache_values.get
+        cache_mock.set.side_effect = lambda key, value, timeout: cache_values.update({key: value})
+        cache_mock.delete.side_effect = cache_values.pop
+        memoized = self._memoize(policy=lambda: CachePolicy(shared=shared))
+
+        with mock.patch('group_project_v2.utils.caches', {'default': cache_mock}):
+            self.assertEqual(memoized(1), 'value1')
+            self.assertEqual(memoized(2), 'value2')
+            memoized.invalidate(1)
+            self.assertEqual(memoized(2), 'value2')
+            self.assertEqual(memoized(1), 'value3')
+
+    def test_local_cache_max_size(self):
+        self.func.side_effect = lambda arg: arg * 2
+        memoized = self._memoize(policy=lambda: CachePolicy(max_size=2))
+
+        self.assertEqual([memoized(1), memoized(2), memoized(3)], [2, 4, 6])
+        self.assertEqual(len(memoized.cache), 2)
+        self.assertEqual(memoized(2), 4)
+        self.assertEqual(memoized(1), 2)
+        self.assertEqual(self.func.call_count, 4)
+
+    def test_shared_cache(self):
+        cache_mock = mock.Mock()
+        cache_mock.get.return_value = None
+        policy = CachePolicy(expires_after=timedelta(seconds=10), stale_grace_period=timedelta(seconds=20), shared=True)
+        memoized = self._memoize(policy=lambda: policy)
+
+        with mock.patch('group_project_v2.utils.caches', {'default': cache_mock}):
+            self.assertEqual(memoized(1), 'value1')
+
+            cache_key, entry, timeout = cache_mock.set.call_args[0]
+            self.assertEqual(cache_mock.get.call_args[0][0], cache_key)
+            self.assertEqual(entry['result'], 'value1')
+            self.assertEqual(timeout, 30)
+
+            cache_mock.get.return_value = entry
+            self.assertEqual(memoized(1), 'value1')
+
+        self.assertEqual(len(memoized.cache), 0)
+        self.func.assert_called_once_with(1)
+
+
+@ddt.ddt
+class TestRenderContentScopedTemplate(TestCase):
+    def setUp(self):
+        render_content_scoped_template.cache.clear()
+        self.block = DummyXBlock(mock.Mock(), field_data=DictFieldData({}), scope_ids=mock.Mock(usage_id='usage_1'))
+        patcher = mock.patch('group_project_v2.utils.loader.render_template')
+        self.render_template = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.render_template.side_effect = lambda template, context: u"{}: {}".format(template, len(context))
+
+    def _render(self, *key_values):
+        context = {'block': self.block, 'values': key_values}
+        return render_content_scoped_template(self.block, 'template.html', context, key_values)
+
+    def test_rendered_once(self):
+        self.assertEqual(self._render(1), u"template.html: 2")
+        self.assertEqual(self._render(1), u"template.html: 2")
+        self.render_template.assert_called_once_with('template.html', {'block': self.block, 'values': (1,)})
+
+    def test_rendered_again_when_key_values_change(self):
+        self._render(u"content", 1)
+        self._render(u"content", 2)
+        self._render(u"new content", 1)
+        self._render(u"content", 1, None)
+        self.assertEqual(self.render_template.call_count, 4)
+
+    def test_cached_per_block(self):
+        other_block = DummyXBlock(mock.Mock(), field_data=DictFieldData({}), scope_ids=mock.Mock(usage_id='usage_2'))
+        self._render()
+        render_content_scoped_template(other_block, 'template.html', {'block': other_block}, ())
+        self.assertEqual(self.render_template.call_count, 2)
+
+    @ddt.data(object(), [1], {'key': 'value'})
+    def test_non_primitive_key_values_rejected(self, value):
+        with self.assertRaises(TypeError):
+            self._render(u"content", value)
+        self.render_template.assert_not_called()
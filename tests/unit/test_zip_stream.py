@@ -0,0 +1,58 @@
+import io
+import zipfile
+from datetime import datetime
+from unittest import TestCase
+
+from group_project_v2.zip_stream import MAX_ENTRIES, MAX_SIZE, ZipStream, fits_without_zip64
+
+
+class TestZipStream(TestCase):
+    @staticmethod
+    def _write_archive(files):
+        archive = ZipStream()
+        output = io.BytesIO()
+        for file_name, chunks, date_time in files:
+            for data in archive.add_file(file_name, chunks, date_time):
+                output.write(data)
+        for data in archive.close():
+            output.write(data)
+        output.seek(0)
+        return zipfile.ZipFile(output)
+
+    def test_archive(self):
+        archive = self._write_archive([
+            (u"Group 1/report.pdf", iter([b"report ", b"content"]), datetime(2016, 3, 14, 15, 9, 26)),
+            (u"Gr\xfcppe 2/empty.txt", iter([]), datetime(2016, 3, 15)),
+        ])
+
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(), [u"Group 1/report.pdf", u"Gr\xfcppe 2/empty.txt"])
+        self.assertEqual(archive.read(u"Group 1/report.pdf"), b"report content")
+        self.assertEqual(archive.read(u"Gr\xfcppe 2/empty.txt"), b"")
+        self.assertEqual(archive.getinfo(u"Group 1/report.pdf").date_time, (2016, 3, 14, 15, 9, 26))
+
+    def test_old_and_missing_dates(self):
+        archive = self._write_archive([
+            (u"old.txt", [b"old"], datetime(1970, 1, 1)),
+            (u"now.txt", [b"now"], None),
+        ])
+
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.getinfo(u"old.txt").date_time, (1980, 1, 1, 0, 0, 0))
+        self.assertGreaterEqual(archive.getinfo(u"now.txt").date_time[0], 2016)
+
+    def test_empty_archive(self):
+        archive = self._write_archive([])
+
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(), [])
+
+    def test_fits_without_zip64(self):
+        # each entry takes 30 bytes of local header, 16 bytes of data descriptor and the file name before content
+        self.assertTrue(fits_without_zip64([(u"a", MAX_SIZE - 47)]))
+        self.assertFalse(fits_without_zip64([(u"a", MAX_SIZE - 46)]))
+        self.assertFalse(fits_without_zip64([(u"a", MAX_SIZE + 1)]))
+        self.assertFalse(fits_without_zip64([(u"a", MAX_SIZE // 2), (u"b", MAX_SIZE // 2)]))
+        self.assertTrue(fits_without_zip64([(u"file", 0)] * MAX_ENTRIES))
+        self.assertFalse(fits_without_zip64([(u"file", 0)] * (MAX_ENTRIES + 1)))
+        self.assertTrue(fits_without_zip64([]))
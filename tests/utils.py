@@ -9,7 +9,7 @@ from xblockutils.resources import ResourceLoader
 from group_project_v2.api_error import ApiError
 from group_project_v2.mixins import UserAwareXBlockMixin, AuthXBlockMixin
 from group_project_v2.project_api import TypedProjectAPI
-from group_project_v2.project_api.dtos import UserDetails, WorkgroupDetails
+from group_project_v2.project_api.dtos import SubmissionDetails, UserDetails, WorkgroupDetails
 from group_project_v2.stage_components import GroupProjectReviewQuestionXBlock
 
 loader = ResourceLoader(__name__)  # pylint: disable=invalid-name
@@ -64,12 +64,12 @@ OTHER_GROUPS = {
 
 
 def make_submission_data(doc_url, doc_filename, upload_date, user_details):
-    return {
+    return SubmissionDetails.from_dict({
         'document_url': doc_url,
         'document_filename': doc_filename,
         'modified': upload_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
         'user_details': user_details
-    }
+    })
 
 
 def _get_user_details(user_id):
@@ -87,13 +87,21 @@ def get_mock_project_api():
     mock_api.get_stage_state = Mock(return_value=({1, 2}, set()))
     mock_api.get_user_details = Mock(side_effect=_get_user_details)
     mock_api.get_workgroups_to_review = Mock(return_value={})
+    mock_api.get_workgroups_to_review_by_user = Mock(return_value={})
     mock_api.get_latest_workgroup_submissions_by_id = Mock(return_value={})
+    mock_api.get_latest_submissions_for_workgroups = Mock(
+        side_effect=lambda group_ids, project_id: {group_id: {} for group_id in group_ids}
+    )
     mock_api.get_user_peer_review_items = Mock(return_value={})
     mock_api.get_peer_review_items_for_group = Mock(return_value={})
     mock_api.get_workgroup_review_items = Mock(return_value={})
     mock_api.get_workgroup_review_items_for_group = Mock(return_value={})
     mock_api.get_user_organizations = Mock(return_value=[{'display_name': "Org1", "id": 1}])
     mock_api.get_workgroup_reviewers = Mock(return_value={})
+    mock_api.get_reviewers_for_workgroup = Mock(return_value=[])
+    mock_api.get_reviewers_for_workgroups = Mock(side_effect=lambda group_ids, content_id: {
+        group_id: [] for group_id in group_ids
+    })
     mock_api.get_member_data = Mock(side_effect=_get_user_details)
     mock_api.get_user_groups = Mock(return_value=tuple())
     mock_api.get_user_permissions = Mock(return_value=tuple())